@@ -376,11 +376,11 @@ async def _cmd_paid(db_session_factory: Any) -> str:
 def _cmd_cron(cron_store_path: Path | None, arg: str = "") -> str:
     """Quantidade de cron jobs, por utilizador, duplicatas e atrasados (>60s). arg=detalhado → mais detalhes."""
     path = cron_store_path or (Path.home() / ".zapista" / "cron" / "jobs.json")
-    if not path.exists():
+    from zapista.cron.storage import load_jobs_raw, store_available
+    if not store_available(path):
         return "#cron\n0 jobs (ficheiro não encontrado)."
     try:
-        data = json.loads(path.read_text())
-        jobs = data.get("jobs", [])
+        jobs = load_jobs_raw(path)
         enabled_jobs = [j for j in jobs if j.get("enabled", True)]
         disabled_jobs = [j for j in jobs if not j.get("enabled", True)]
         total = len(jobs)
@@ -519,11 +519,11 @@ def _cmd_lembretes(cron_store_path: Path | None, user_arg: str) -> str:
     if not user_arg or len(_digits(user_arg)) < 8:
         return "#lembretes\nUso: #lembretes <número> (ex: #lembretes 5511999999999)"
     path = cron_store_path or (Path.home() / ".zapista" / "cron" / "jobs.json")
-    if not path.exists():
+    from zapista.cron.storage import load_jobs_raw, store_available
+    if not store_available(path):
         return "#lembretes\n0 jobs (ficheiro não encontrado)."
     try:
-        data = json.loads(path.read_text())
-        jobs = data.get("jobs", [])
+        jobs = load_jobs_raw(path)
         user_jobs = [
             j for j in jobs
             if j.get("enabled", True)
@@ -915,6 +915,207 @@ def _cmd_system(wa_channel: Any = None) -> str:
             lines.append("Fila: em memória (Redis não configurado)")
     except Exception as e:
         lines.append(f"Redis: {str(e)[:50]}")
+    # Workers do agente (fila e mensagens em curso por worker)
+    try:
+        from zapista.agent.worker_pool import get_worker_pool_stats
+        wstats = get_worker_pool_stats()
+        if wstats:
+            lines.append(f"Workers agente: {len(wstats)}")
+            for w in wstats:
+                line = f"  w{w['worker']}: fila {w['queue_depth']} | em curso {w['in_flight']} | feitas {w['processed']}"
+                if w["errors"]:
+                    line += f" | erros {w['errors']}"
+                if w["busy_s"]:
+                    line += f" | ocupado {w['busy_s']}s"
+                lines.append(line)
+        else:
+            lines.append("Workers agente: 1 (em série)")
+    except Exception:
+        pass
+    # Cron: atraso dos disparos (real - agendado) e último lote
+    try:
+        from zapista.cron.service import get_cron_fire_stats
+        cstats = get_cron_fire_stats()
+        if cstats and cstats["fired"]:
+            line = (
+                f"Cron disparos: {cstats['fired']} (paralelo {cstats['concurrency']}) | atraso p50 {cstats['late_p50_ms'] / 1000:.1f}s"
+                f" p95 {cstats['late_p95_ms'] / 1000:.1f}s máx {cstats['late_max_ms'] / 1000:.1f}s"
+            )
+            batch = cstats.get("last_batch")
+            if batch:
+                line += f" | último lote: {batch['jobs']} em {batch['duration_ms'] / 1000:.1f}s"
+            lines.append(line)
+    except Exception:
+        pass
+    # Fila de média do WhatsApp (STT, .ics fora do leitor do bridge)
+    try:
+        from zapista.channels.media_jobs import get_media_job_stats
+        mstats = get_media_job_stats()
+        if mstats:
+            line = (
+                f"Média WhatsApp: fila {mstats['queue_depth']} | em curso {mstats['in_flight']} | feitas {mstats['processed']}"
+                f" | espera máx {mstats['wait_max_ms'] / 1000:.1f}s"
+            )
+            if mstats["blocked"]:
+                line += f" | fila cheia {mstats['blocked']}x"
+            if mstats["errors"]:
+                line += f" | erros {mstats['errors']}"
+            lines.append(line)
+    except Exception:
+        pass
+    # Contadores diários em memória (mensagens por chat, lembrete inteligente enviado)
+    try:
+        from backend.daily_counters import get_daily_counter_stats
+        for name, cstats in get_daily_counter_stats().items():
+            line = f"Contadores {name}: {cstats['entries']} chats | por gravar {cstats['pending']} | gravações {cstats['flushes']}"
+            if cstats["flush_errors"]:
+                line += f" | erros {cstats['flush_errors']}"
+            lines.append(line)
+    except Exception:
+        pass
+    # Despacho de handlers: quantos são aguardados por mensagem e quem demora a recusar
+    try:
+        from backend.router import get_router_stats
+        rstats = get_router_stats()
+        if rstats["dispatches"]:
+            line = f"Router: {rstats['dispatches']} despachos | {rstats['handlers_per_dispatch']} handlers/despacho"
+            slow = [
+                (st["miss_ms"] / st["misses"], name)
+                for name, st in rstats["handlers"].items() if st["misses"]
+            ]
+            if slow:
+                ms, name = max(slow)
+                line += f" | recusa mais lenta: {name} ({ms:.1f}ms)"
+            lines.append(line)
+    except Exception:
+        pass
+    # Estado pequeno (lockout, mutes, allowlist extra, métricas, painpoints): KVStore
+    try:
+        from backend.kv_store import get_kv_store_stats
+        kstats = get_kv_store_stats()
+        if kstats:
+            line = (
+                f"KV ({kstats['backend']}): {kstats['keys']} chaves | leituras {kstats['reads']} | "
+                f"escritas {kstats['writes']} → {kstats['rows_written']} linhas em {kstats['flushes']} lotes"
+            )
+            if kstats["flush_errors"]:
+                line += f" | erros {kstats['flush_errors']}"
+            lines.append(line)
+    except Exception:
+        pass
+    # Prompt: prefixo estático reutilizado e tokens servidos pela cache de prefixo do provedor
+    try:
+        from zapista.agent.context import get_prompt_prefix_stats
+        from backend.token_usage import get_prompt_cache_stats
+        pstats = get_prompt_prefix_stats()
+        cstats = get_prompt_cache_stats()
+        if pstats["builds"] or cstats:
+            line = f"Prompt: prefixo {pstats['builds']} construções / {pstats['hits']} reutilizações"
+            if pstats.get("invalidations"):
+                line += f" / {pstats['invalidations']} invalidações (skills ou ficheiros alterados)"
+            if pstats["hashes"]:
+                line += " (" + ", ".join(f"{lang} {h}" for lang, h in sorted(pstats["hashes"].items())) + ")"
+            for provider, st in sorted(cstats.items()):
+                line += (
+                    f" | {provider}: hit {st['hit_rate'] * 100:.0f}% das chamadas, "
+                    f"{st['cached_ratio'] * 100:.0f}% do input em cache (${st['saved_usd']:.4f} poupados)"
+                )
+            lines.append(line)
+    except Exception:
+        pass
+    # Memória do agente (MEMORY.md, notas diárias): cache de conteúdo por (mtime_ns, size)
+    try:
+        from zapista.utils.file_cache import get_file_cache_stats
+        fstats = get_file_cache_stats()
+        if fstats:
+            lines.append(
+                f"Ficheiros (cache): {fstats['entries']} entradas | hit {fstats['hit_rate'] * 100:.0f}% "
+                f"({fstats['hits']}/{fstats['hits'] + fstats['misses']}) | stat {fstats['stat_calls']} | "
+                f"lidos {fstats['bytes_read'] // 1024} KB | escritos {fstats['bytes_written'] // 1024} KB"
+            )
+    except Exception:
+        pass
+    # Sessões: appends vs reescritas do JSONL, fsync em lote e cache LRU
+    try:
+        from zapista.session.manager import get_session_store_stats
+        sstats = get_session_store_stats()
+        if sstats:
+            lines.append(
+                f"Sessões: {sstats['cached']} em cache ({sstats['cached_bytes'] // 1024} KB, evicted {sstats['evictions']}) | "
+                f"append {sstats['appends']} / reescritas {sstats['rewrites']} | fsync {sstats['fsyncs']} | "
+                f"escritos {sstats['bytes_written'] // 1024} KB"
+            )
+    except Exception:
+        pass
+    # Etapas pré-LLM: tempo médio em paralelo vs soma das etapas
+    try:
+        from zapista.agent.pre_llm import get_pre_llm_stats
+        qstats = get_pre_llm_stats()
+        if qstats:
+            parts = [
+                f"{name} {st['avg_ms']:.0f}ms" + (f" (timeout {st['timeout']})" if st["timeout"] else "")
+                for name, st in qstats["stages"].items()
+            ]
+            lines.append(
+                f"Pré-LLM: {qstats['avg_ms']:.0f}ms em paralelo vs {qstats['avg_serial_ms']:.0f}ms em série | "
+                f"bloqueadas {qstats['blocked']}/{qstats['runs']} | " + ", ".join(parts)
+            )
+    except Exception:
+        pass
+    # Tools: latência por tool e ganho das calls em paralelo
+    try:
+        from zapista.agent.tools.registry import get_tool_stats
+        tstats = get_tool_stats()
+        if tstats["tools"]:
+            parts = [
+                f"{name} {st['avg_ms']:.0f}/{st['p95_ms']:.0f}ms ({st['calls']})"
+                for name, st in sorted(tstats["tools"].items(), key=lambda kv: -kv[1]["calls"])
+            ]
+            line = "Tools (média/p95): " + ", ".join(parts)
+            b = tstats["batches"]
+            if b["batches"]:
+                line += f" | paralelo: {b['batches']} lotes, {b['wall_ms']:.0f}ms vs {b['serial_ms']:.0f}ms em série"
+            lines.append(line)
+    except Exception:
+        pass
+    # Logs: fila do writer e registos descartados (fila cheia / limite por evento)
+    try:
+        from backend.logger import get_log_stats
+        lstats = get_log_stats()
+        if lstats:
+            line = f"Logs ({lstats['mode']}): escritos {lstats['written']} em {lstats['batches']} lotes | na fila {lstats['queued']}"
+            dropped = lstats["dropped_queue_full"] + lstats["dropped_rate_limited"]
+            if dropped:
+                line += f" | descartados {dropped} (fila {lstats['dropped_queue_full']}, limite {lstats['dropped_rate_limited']})"
+                if lstats["top_rate_limited"]:
+                    line += " | " + ", ".join(f"{ev}×{n}" for ev, n in lstats["top_rate_limited"])
+            lines.append(line)
+    except Exception:
+        pass
+    # Lembretes: texto de entrega gerado antes da hora
+    try:
+        from zapista.cron.prerender import get_reminder_prerender_stats
+        pstats = get_reminder_prerender_stats()
+        if pstats:
+            line = (
+                f"Lembretes pré-gerados: cache {pstats['cached']} | prontos no disparo {pstats['hits']}"
+                f" | sem texto {pstats['misses']} | lotes {pstats['batches']}"
+            )
+            if pstats["failures"]:
+                line += f" | falhas {pstats['failures']}"
+            lines.append(line)
+    except Exception:
+        pass
+    # HTTP: latência por upstream (clientes partilhados com keep-alive)
+    try:
+        from zapista.utils.http_clients import get_http_client_stats
+        for upstream, h in get_http_client_stats().items():
+            line = f"HTTP {upstream}: {h['count']} pedidos | p50 ≤{h['p50_ms'] / 1000:.2g}s p95 ≤{h['p95_ms'] / 1000:.2g}s máx {h['max_ms'] / 1000:.1f}s"
+            if h["errors"]:
+                line += f" | erros {h['errors']}"
+            lines.append(line)
+    except Exception:
+        pass
     # Health: bridge
     if wa_channel:
         bridge = "conectado" if getattr(wa_channel, "_connected", None) else "desconectado"
@@ -1125,16 +1326,11 @@ def _cmd_painpoints(cron_store_path: Path | None) -> str:
     lines = ["#painpoints"]
     path = cron_store_path or (Path.home() / ".zapista" / "cron" / "jobs.json")
     now_ms = int(time.time() * 1000)
-    atrasados = 0
-    if path.exists():
+    from zapista.cron.storage import load_jobs_between, store_available
+    if store_available(path):
         try:
-            data = json.loads(path.read_text())
-            for j in data.get("jobs", []):
-                if not j.get("enabled", True):
-                    continue
-                next_run = (j.get("state") or {}).get("nextRunAtMs")
-                if next_run and next_run < now_ms - 60_000:  # 1 min atraso
-                    atrasados += 1
+            # Só os jobs com next_run há mais de 1 min (com CRON_STORE=sqlite, consulta indexada)
+            atrasados = len(load_jobs_between(path, 1, now_ms - 60_000 - 1))
             if atrasados:
                 lines.append(f"Jobs em atraso: {atrasados}")
             else:
@@ -1319,10 +1515,10 @@ async def _cmd_diagnostico(
         except Exception:
             lines.append("👥 Utilizadores: N/A")
     path = cron_store_path or (Path.home() / ".zapista" / "cron" / "jobs.json")
-    if path.exists():
+    from zapista.cron.storage import load_jobs_raw, store_available
+    if store_available(path):
         try:
-            data = json.loads(path.read_text())
-            jobs = data.get("jobs", [])
+            jobs = load_jobs_raw(path)
             enabled = sum(1 for j in jobs if j.get("enabled", True))
             lines.append(f"📅 Jobs: {len(jobs)} total, {enabled} ativos")
         except Exception:
@@ -1406,11 +1602,11 @@ async def _cmd_clientes(db_session_factory: Any) -> str:
 def _cmd_jobs(cron_store_path: Path | None, arg: str) -> str:
     """Listar jobs de um usuário (#jobs chat_id) ou todos (#jobs)."""
     path = cron_store_path or (Path.home() / ".zapista" / "cron" / "jobs.json")
-    if not path.exists():
+    from zapista.cron.storage import load_jobs_raw, store_available
+    if not store_available(path):
         return "#jobs\n0 jobs (ficheiro não encontrado)."
     try:
-        data = json.loads(path.read_text())
-        jobs = data.get("jobs", [])
+        jobs = load_jobs_raw(path)
         if arg and _digits(arg):
             jobs = [j for j in jobs if _to_matches_user((j.get("payload") or {}).get("to"), arg)]
         lines = [f"#jobs\n{len(jobs)} jobs"]
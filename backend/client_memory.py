@@ -35,14 +35,14 @@ def build_client_memory_content(db: "Session", chat_id: str) -> str:
     devem ser calculadas/no fuso do cliente para lembretes no horário certo.
     """
     from backend.user_store import (
-        get_or_create_user,
+        get_user_profile,
         get_user_timezone,
         get_user_language,
         get_user_preferred_name,
     )
     from backend.locale import resolve_response_language
 
-    user = get_or_create_user(db, chat_id)
+    user = get_user_profile(db, chat_id)
     name = (get_user_preferred_name(db, chat_id) or "").strip() or "(nome não definido)"
     tz_iana = get_user_timezone(db, chat_id)
     lang = get_user_language(db, chat_id)
@@ -1,18 +1,31 @@
 """Filtragem de comandos: blocklist de padrões perigosos (shell, SQL, path) com logging.
 
 Complementa injection_guard (prompt injection) e sanitize (cron, control chars).
-Comandos bloqueados são registados para auditoria (#blocked no God mode).
+Comandos bloqueados são registados para auditoria (#blocked no God mode), no KVStore
+(namespace blocked_commands, chave entries: lista das últimas _MAX_ENTRIES tentativas).
 """
 
-import json
 import re
 import time
 from pathlib import Path
 from typing import Any
 
-_STORE_PATH = Path.home() / ".zapista" / "security" / "blocked_commands.json"
+from backend.kv_store import Namespace, read_legacy_json
+
+_LEGACY_PATH = Path.home() / ".zapista" / "security" / "blocked_commands.json"
 _MAX_ENTRIES = 500
 
+
+def _import_legacy() -> dict[str, list]:
+    """blocked_commands.json antigo (lista) → chave entries."""
+    entries = read_legacy_json(_LEGACY_PATH)
+    if not isinstance(entries, list):
+        return {}
+    return {"entries": entries[-_MAX_ENTRIES:]}
+
+
+_blocked = Namespace("blocked_commands", legacy=_import_legacy)
+
 # Padrões perigosos: shell injection, SQL, path traversal, comandos destrutivos
 _BLOCKED_PATTERNS: list[tuple[str, str]] = [
     # Shell / command injection
@@ -73,26 +86,17 @@ def record_blocked(
 ) -> None:
     """Regista tentativa de comando bloqueada (para auditoria e #blocked)."""
     try:
-        _STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
-        entries: list[dict] = []
-        if _STORE_PATH.exists():
-            try:
-                entries = json.loads(_STORE_PATH.read_text())
-            except Exception:
-                entries = []
         ts = int(time.time())
         digits = "".join(c for c in str(chat_id) if c.isdigit())
         client_id = (digits[:5] + "***" + digits[-4:]) if len(digits) >= 9 else (digits or str(chat_id)[:12])
-        entries.append({
+        entry = {
             "channel": channel,
             "chat_id": client_id,
             "timestamp": ts,
             "reason": reason,
             "preview": (preview or "")[:80],
-        })
-        if len(entries) > _MAX_ENTRIES:
-            entries = entries[-_MAX_ENTRIES:]
-        _STORE_PATH.write_text(json.dumps(entries, ensure_ascii=False))
+        }
+        _blocked.update("entries", lambda entries: ((entries or []) + [entry])[-_MAX_ENTRIES:])
     except Exception:
         pass
 
@@ -103,9 +107,7 @@ def get_blocked_stats() -> list[dict[str, Any]]:
     Para God mode #blocked.
     """
     try:
-        if not _STORE_PATH.exists():
-            return []
-        entries = json.loads(_STORE_PATH.read_text())
+        entries = _blocked.get("entries") or []
     except Exception:
         return []
     by_client: dict[str, dict[str, Any]] = {}
@@ -2,10 +2,13 @@
 
 Cada comando /xyz pode ser invocado por frases em NL (ex.: "ajuda" → /help).
 Usado por handlers e views para aceitar NL além do comando explícito.
+Os handlers/views chamam-na em série para a mesma mensagem (e o agent loop antes, para o rate limit):
+o resultado é uma função pura do texto, por isso fica em cache (LRU).
 """
 
 import re
 import unicodedata
+from functools import lru_cache
 
 
 def _normalize_lower(text: str) -> str:
@@ -25,6 +28,11 @@ def normalize_nl_to_command(content: str) -> str:
     """
     if not content or not isinstance(content, str):
         return content
+    return _normalize_cached(content)
+
+
+@lru_cache(maxsize=2048)
+def _normalize_cached(content: str) -> str:
     t = content.strip()
     if not t or t.startswith("/"):
         return content
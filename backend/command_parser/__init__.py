@@ -1,5 +1,5 @@
 """Command parser package."""
 
-from .core import parse, CATEGORY_TO_LIST
+from .core import parse, match_intents, CATEGORY_TO_LIST
 
-__all__ = ["parse", "CATEGORY_TO_LIST"]
+__all__ = ["parse", "match_intents", "CATEGORY_TO_LIST"]
@@ -3,6 +3,7 @@
 import re
 from typing import Any
 from . import pt, en, es
+from .matcher import IntentMatcher
 
 # Dynamically build unified lists/mappings (sorted by length to avoid regex shadowing)
 LEMBRETE_ALIASES_STR = "|".join(sorted(set(pt.LEMBRETE_ALIASES + en.LEMBRETE_ALIASES + es.LEMBRETE_ALIASES), key=len, reverse=True))
@@ -163,6 +164,20 @@ def _extract_list_name(full: str) -> str:
     clean = re.sub(r"\s+", " ", clean).strip()
     return clean.lower() if clean else "mercado"
 
+# Trie de prefixos sobre todas as RE_* acima: parse() só corre as regexes que podem casar.
+INTENT_MATCHER = IntentMatcher(
+    (name, value) for name, value in list(globals().items())
+    if name.startswith("RE_") and isinstance(value, re.Pattern)
+)
+
+
+def match_intents(raw: str) -> list:
+    """Todos os padrões (RE_*) que casam com a mensagem, com as capturas, numa só passagem pela trie."""
+    if not raw or not isinstance(raw, str):
+        return []
+    return INTENT_MATCHER.match_all(raw.strip())
+
+
 def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
     """Parseia a mensagem. Retorna um intent dict ou None."""
     from backend.time_parse import extract_start_date, parse_lembrete_time
@@ -174,8 +189,9 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
 
     if text.lower().startswith(PARSE_REJECT_PREFIXES):
         return None
+    scan = INTENT_MATCHER.scan(text)
 
-    m = RE_LEMBRETE.match(text)
+    m = scan.match(RE_LEMBRETE)
     if m:
         rest = m.group(1).strip()
         if rest:
@@ -190,31 +206,31 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
             return intent
         return None
 
-    m = RE_LIST_ADD.match(text)
+    m = scan.match(RE_LIST_ADD)
     if m:
         list_name_raw = m.group(1).strip().lower()
         list_name = CATEGORY_TO_LIST.get(list_name_raw, list_name_raw)
         return {"type": "list_add", "list_name": list_name, "item": m.group(2).strip()}
-    m = RE_LIST_CATEGORY_ADD.match(text)
+    m = scan.match(RE_LIST_CATEGORY_ADD)
     if m:
         cat = m.group(1).strip().lower()
         list_name = CATEGORY_TO_LIST.get(cat, cat)
         return {"type": "list_add", "list_name": list_name, "item": m.group(2).strip()}
-    m = RE_LIST_SHOW.match(text)
+    m = scan.match(RE_LIST_SHOW)
     if m:
         raw_name = m.group(1).strip().lower()
         return {"type": "list_show", "list_name": CATEGORY_TO_LIST.get(raw_name, m.group(1).strip())}
-    if RE_LIST_ALL.match(text):
+    if scan.match(RE_LIST_ALL):
         return {"type": "list_show", "list_name": None}
  
-    m = RE_FEITO_LIST_ID.match(text)
+    m = scan.match(RE_FEITO_LIST_ID)
     if m:
         _fn = m.group(1).strip().lower()
         return {"type": "feito", "list_name": CATEGORY_TO_LIST.get(_fn, m.group(1).strip()), "item_id": int(m.group(2))}
-    m = RE_FEITO_ID_ONLY.match(text)
+    m = scan.match(RE_FEITO_ID_ONLY)
     if m:
         return {"type": "feito", "list_name": None, "item_id": int(m.group(1))}
-    m = RE_FEITO_TEXT.match(text)
+    m = scan.match(RE_FEITO_TEXT)
     if m:
         parts = m.group(1).strip().split(None, 1)
         if len(parts) == 2:
@@ -222,14 +238,14 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
             return {"type": "feito", "list_name": CATEGORY_TO_LIST.get(_fn, parts[0].strip()), "item": parts[1].strip()}
         return {"type": "feito", "list_name": None, "item": m.group(1).strip()}
  
-    m = RE_REMOVE_LIST_ID.match(text)
+    m = scan.match(RE_REMOVE_LIST_ID)
     if m:
         _rn = m.group(1).strip().lower()
         return {"type": "remove", "list_name": CATEGORY_TO_LIST.get(_rn, m.group(1).strip()), "item_id": int(m.group(2))}
-    m = RE_REMOVE_ID_ONLY.match(text)
+    m = scan.match(RE_REMOVE_ID_ONLY)
     if m:
         return {"type": "remove", "list_name": None, "item_id": int(m.group(1))}
-    m = RE_REMOVE_TEXT.match(text)
+    m = scan.match(RE_REMOVE_TEXT)
     if m:
         parts = m.group(1).strip().split(None, 1)
         if len(parts) == 2:
@@ -237,12 +253,12 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
             return {"type": "remove", "list_name": CATEGORY_TO_LIST.get(_rn, parts[0].strip()), "item": parts[1].strip()}
         return {"type": "remove", "list_name": None, "item": m.group(1).strip()}
 
-    if RE_HORA.match(text): return {"type": "hora"}
-    if RE_DATA.match(text): return {"type": "data"}
+    if scan.match(RE_HORA): return {"type": "hora"}
+    if scan.match(RE_DATA): return {"type": "data"}
  
-    if RE_NL_AGENDA_SHOW.match(text): return {"type": "agenda"}
+    if scan.match(RE_NL_AGENDA_SHOW): return {"type": "agenda"}
  
-    m = RE_NL_LIST_SHOW.match(text)
+    m = scan.match(RE_NL_LIST_SHOW)
     if m:
         _remainder = m.group(1).strip()
         _name = _extract_list_name(_remainder)
@@ -251,12 +267,12 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
         list_name = CATEGORY_TO_LIST.get(_name, _name)
         return {"type": "list_show", "list_name": list_name}
  
-    if RE_HOJE.match(text): return {"type": "hoje"}
-    if RE_SEMANA.match(text): return {"type": "semana"}
-    m = RE_AGENDA.match(text)
+    if scan.match(RE_HOJE): return {"type": "hoje"}
+    if scan.match(RE_SEMANA): return {"type": "semana"}
+    m = scan.match(RE_AGENDA)
     if m: return {"type": "agenda", "query": m.group(1).strip()}
  
-    m = RE_NL_LIST_ADD.match(text)
+    m = scan.match(RE_NL_LIST_ADD)
     if m:
         _name = m.group(1).strip().lower()
         if _name in _REMINDER_AGENDA_WORDS_SHOW:
@@ -266,7 +282,7 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
         if item:
             return {"type": "list_add", "list_name": list_name, "item": item}
 
-    m = RE_NL_LISTA_SOZINHA.match(text)
+    m = scan.match(RE_NL_LISTA_SOZINHA)
     if m:
         p1 = m.group(1).strip()
         p2 = (m.group(2) or "").strip()
@@ -284,35 +300,35 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
 
 
 
-    m = RE_FILME.match(text)
+    m = scan.match(RE_FILME)
     if m: return {"type": "list_add", "list_name": "filmes", "item": m.group(1).strip()}
-    m = RE_LIVRO.match(text)
+    m = scan.match(RE_LIVRO)
     if m: return {"type": "list_add", "list_name": "livros", "item": m.group(1).strip()}
     m = re.match(r"^/(?:musica|m[uú]sica)s?\s+(.+)$", text, re.I)
     if m: return {"type": "list_add", "list_name": "músicas", "item": m.group(1).strip()}
-    m = RE_SERIE.match(text)
+    m = scan.match(RE_SERIE)
     if m: return {"type": "list_add", "list_name": "séries", "item": m.group(1).strip()}
-    m = RE_JOGO.match(text)
+    m = scan.match(RE_JOGO)
     if m: return {"type": "list_add", "list_name": "jogos", "item": m.group(1).strip()}
-    m = RE_PELICULA.match(text)
+    m = scan.match(RE_PELICULA)
     if m: return {"type": "list_add", "list_name": "filmes", "item": m.group(1).strip()}
-    m = RE_LIBRO.match(text)
+    m = scan.match(RE_LIBRO)
     if m: return {"type": "list_add", "list_name": "livros", "item": m.group(1).strip()}
-    m = RE_MOVIE.match(text)
+    m = scan.match(RE_MOVIE)
     if m: return {"type": "list_add", "list_name": "filmes", "item": m.group(1).strip()}
-    m = RE_BOOK.match(text)
+    m = scan.match(RE_BOOK)
     if m: return {"type": "list_add", "list_name": "livros", "item": m.group(1).strip()}
-    m = RE_RECEITA.match(text)
+    m = scan.match(RE_RECEITA)
     if m: return {"type": "list_add", "list_name": "receitas", "item": m.group(1).strip()}
 
-    m = RE_NL_ADD_LISTA_CATEGORIA.match(text)
+    m = scan.match(RE_NL_ADD_LISTA_CATEGORIA)
     if m:
         cat = m.group(1).strip().lower()
         list_name = CATEGORY_TO_LIST.get(cat, cat)
         item = m.group(2).strip()
         if item: return {"type": "list_add", "list_name": list_name, "item": item}
 
-    m = RE_NL_POR_LISTA.match(text)
+    m = scan.match(RE_NL_POR_LISTA)
     if m:
         item = m.group(1).strip()
         if item:
@@ -321,7 +337,7 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
             list_name = CATEGORY_TO_LIST.get(_name, _name)
             return {"type": "list_add", "list_name": list_name, "item": item}
 
-    m = RE_NL_LISTA_DOIS_PONTOS.match(text)
+    m = scan.match(RE_NL_LISTA_DOIS_PONTOS)
     if m:
         raw_items = m.group(1).strip()
         if raw_items:
@@ -331,12 +347,12 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
                 if len(items) == 1: return {"type": "list_add", "list_name": "mercado", "item": items[0]}
                 return {"type": "list_add", "list_name": "mercado", "items": items}
 
-    m = RE_NL_ANOTA.match(text)
+    m = scan.match(RE_NL_ANOTA)
     if m:
         item = m.group(1).strip()
         if item: return {"type": "list_add", "list_name": "notas", "item": item}
 
-    m = RE_NL_MUITA_COISA.match(text)
+    m = scan.match(RE_NL_MUITA_COISA)
     if m:
         raw_items = (m.group(3) or "").strip()
         if raw_items:
@@ -346,7 +362,7 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
                 if len(items) == 1: return {"type": "list_add", "list_name": "hoje", "item": items[0]}
                 return {"type": "list_add", "list_name": "hoje", "items": items}
 
-    m = RE_NL_HOJE_TENHO_DE.match(text)
+    m = scan.match(RE_NL_HOJE_TENHO_DE)
     if m:
         raw_items = m.group(2).strip()
         if raw_items:
@@ -356,19 +372,19 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
             if len(items) == 1: return None
             return {"type": "list_or_events_ambiguous", "items": items}
 
-    m = RE_NL_LEMBRA_COMPRAR.match(text)
+    m = scan.match(RE_NL_LEMBRA_COMPRAR)
     if m:
         item = m.group(1).strip()
         if item: return {"type": "list_add", "list_name": "mercado", "item": item}
 
-    m = RE_NL_FILME_LIVRO_VER.match(text)
+    m = scan.match(RE_NL_FILME_LIVRO_VER)
     if m:
         item = m.group(1).strip()
         if item:
             list_name = "livros" if "ler" in text.lower() or "livro" in text.lower() else "filmes"
             return {"type": "list_add", "list_name": list_name, "item": item}
 
-    m = RE_NL_ADICIONE_LISTA.match(text)
+    m = scan.match(RE_NL_ADICIONE_LISTA)
     if m:
         raw_items = m.group(1).strip()
         _raw_name = m.group(2).strip()
@@ -380,11 +396,11 @@ def parse(raw: str, tz_iana: str = "UTC") -> dict[str, Any] | None:
         if len(items) == 1: return {"type": "list_add", "list_name": list_name, "item": items[0]}
         return {"type": "list_add", "list_name": list_name, "items": items}
 
-    m = RE_NL_REMIND_ME.match(text)
+    m = scan.match(RE_NL_REMIND_ME)
     if m:
         return {"type": "lembrete", "msg": m.group(1).strip()}
 
-    m = RE_NL_GENERIC_LEMBRETE.match(text)
+    m = scan.match(RE_NL_GENERIC_LEMBRETE)
     if m:
         return {"type": "lembrete", "msg": m.group(1).strip()}
 
@@ -0,0 +1,229 @@
+"""Matcher de intents numa só passagem: trie sobre os prefixos possíveis de cada regex.
+
+As regexes do core são ancoradas (^) e construídas a partir dos vocabulários pt/en/es. Em vez de as
+tentar todas por ordem, o IntentMatcher deriva (uma vez, no import) o conjunto de prefixos literais
+que cada padrão aceita — até PREFIX_DEPTH caracteres, em minúsculas — e indexa-os numa trie de
+caracteres. Para uma mensagem, um percurso pelos primeiros caracteres devolve a máscara dos padrões
+que *podem* casar; só esses correm o .match() (as capturas continuam a vir da regex original).
+
+Garantia: a máscara é sempre um superconjunto dos padrões que casam. Quando um padrão não permite
+derivar prefixos (classe negada, repetição opcional, explosão de combinações), fica com o prefixo
+vazio e corre sempre; caracteres não ASCII no texto fazem o percurso incluir a subárvore inteira.
+"""
+
+from __future__ import annotations
+
+import re
+import string
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable
+
+try:
+    from re import _parser as _sre  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre  # type: ignore[no-redef]
+
+PREFIX_DEPTH = 4
+_MAX_PREFIXES = 4096  # por padrão; acima disto o padrão corre sempre
+
+_WHITESPACE = " \t\n\r\f\v"
+_CATEGORY_CHARS = {
+    _sre.CATEGORY_SPACE: _WHITESPACE,
+    _sre.CATEGORY_DIGIT: string.digits,
+}
+
+
+class _Unbounded(Exception):
+    """O padrão não permite enumerar prefixos (vai para a raiz da trie)."""
+
+
+@lru_cache(maxsize=None)
+def _variants(ch: str) -> frozenset[str]:
+    """Caracteres ASCII/minúsculos que casam com ch sob re.I (o texto é comparado em minúsculas)."""
+    out = {ch.lower()}
+    if not ch.isascii():
+        out.update(a for a in string.ascii_letters if re.fullmatch(re.escape(ch), a, re.I))
+        out = {c.lower() for c in out}
+    return frozenset(out)
+
+
+def _class_chars(items) -> set[str] | None:
+    chars: set[str] = set()
+    for op, av in items:
+        if op is _sre.LITERAL:
+            chars.update(_variants(chr(av)))
+        elif op is _sre.RANGE:
+            lo, hi = av
+            if hi - lo > 64:
+                return None
+            for code in range(lo, hi + 1):
+                chars.update(_variants(chr(code)))
+        elif op is _sre.CATEGORY and av in _CATEGORY_CHARS:
+            chars.update(_CATEGORY_CHARS[av])
+        else:  # NEGATE, \w, \S, ...
+            return None
+    return chars
+
+
+def _walk(items, prefixes: set[str], depth: int) -> tuple[set[str], set[str]]:
+    """Consome a sequência; devolve (prefixos que continuam, prefixos fechados)."""
+    closed: set[str] = set()
+    for op, av in items:
+        closed.update(p for p in prefixes if len(p) >= depth)
+        prefixes = {p for p in prefixes if len(p) < depth}
+        if not prefixes:
+            break
+        if op is _sre.LITERAL:
+            prefixes = {p + c for p in prefixes for c in _variants(chr(av))}
+        elif op is _sre.IN:
+            chars = _class_chars(av)
+            if chars is None:
+                closed |= prefixes
+                prefixes = set()
+                break
+            prefixes = {p + c for p in prefixes for c in chars}
+        elif op is _sre.BRANCH:
+            opened: set[str] = set()
+            for alt in av[1]:
+                o, c = _walk(alt, prefixes, depth)
+                opened |= o
+                closed |= c
+            prefixes = opened
+        elif op is _sre.SUBPATTERN:
+            o, c = _walk(av[-1], prefixes, depth)
+            closed |= c
+            prefixes = o
+        elif op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT):
+            lo, hi, sub = av
+            if lo == 0 and hi == 1:  # opcional: com e sem
+                o, c = _walk(sub, prefixes, depth)
+                closed |= c
+                prefixes = prefixes | o
+            elif lo == 1 and hi == 1:
+                o, c = _walk(sub, prefixes, depth)
+                closed |= c
+                prefixes = o
+            elif lo >= 1:  # pelo menos uma vez; o que vem depois é incerto
+                o, c = _walk(sub, prefixes, depth)
+                closed |= c | o
+                prefixes = set()
+                break
+            else:
+                closed |= prefixes
+                prefixes = set()
+                break
+        elif op is _sre.AT and av is not _sre.AT_END and av is not _sre.AT_END_STRING:
+            continue  # ^, \b: largura zero
+        elif op in (_sre.ASSERT, _sre.ASSERT_NOT):
+            continue
+        else:  # $, ANY, NOT_LITERAL, GROUPREF, CATEGORY solta...
+            closed |= prefixes
+            prefixes = set()
+            break
+        if len(prefixes) + len(closed) > _MAX_PREFIXES:
+            raise _Unbounded
+    return prefixes, closed
+
+
+def lead_prefixes(pattern: re.Pattern, depth: int = PREFIX_DEPTH) -> set[str]:
+    """Prefixos (minúsculos, até depth caracteres) com que um texto tem de começar para casar o padrão.
+
+    Conjunto com "" = sem restrição. Só faz sentido para padrões ancorados no início (^ ou .match).
+    """
+    try:
+        opened, closed = _walk(_sre.parse(pattern.pattern, pattern.flags), {""}, depth)
+    except _Unbounded:
+        return {""}
+    return {p[:depth] for p in opened | closed}
+
+
+class _Node:
+    __slots__ = ("children", "mask", "subtree")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.mask = 0  # padrões cujo prefixo termina aqui
+        self.subtree = 0  # padrões com prefixo nesta subárvore (inclui mask)
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    name: str
+    groups: tuple[Any, ...]
+    match: re.Match
+
+
+class IntentMatcher:
+    """Trie de prefixos sobre um conjunto nomeado de regexes ancoradas, construída uma vez."""
+
+    def __init__(self, patterns: Iterable[tuple[str, re.Pattern]], depth: int = PREFIX_DEPTH):
+        self.depth = depth
+        self.names: list[str] = []
+        self.patterns: list[re.Pattern] = []
+        self._bit: dict[re.Pattern, int] = {}
+        self._root = _Node()
+        for name, pattern in patterns:
+            index = len(self.patterns)
+            self.names.append(name)
+            self.patterns.append(pattern)
+            self._bit.setdefault(pattern, 1 << index)
+            for prefix in lead_prefixes(pattern, depth):
+                self._insert(prefix, 1 << index)
+        self.always = self._root.mask  # padrões sem prefixo derivável
+
+    def _insert(self, prefix: str, bit: int) -> None:
+        node = self._root
+        node.subtree |= bit
+        for ch in prefix:
+            node = node.children.setdefault(ch, _Node())
+            node.subtree |= bit
+        node.mask |= bit
+
+    def candidates(self, text: str) -> int:
+        """Máscara de bits dos padrões que podem casar com text (superconjunto exato)."""
+        node = self._root
+        mask = node.mask
+        for ch in text[: self.depth]:
+            if not ch.isascii():
+                return mask | node.subtree
+            node = node.children.get(ch.lower())
+            if node is None:
+                return mask
+            mask |= node.mask
+        return mask
+
+    def scan(self, text: str) -> "Scan":
+        return Scan(self, text, self.candidates(text))
+
+    def match_all(self, text: str) -> list[IntentMatch]:
+        """Todos os intents que casam com text, pela ordem de registo, com as capturas."""
+        out: list[IntentMatch] = []
+        mask = self.candidates(text)
+        while mask:
+            low = mask & -mask
+            index = low.bit_length() - 1
+            m = self.patterns[index].match(text)
+            if m:
+                out.append(IntentMatch(self.names[index], m.groups(), m))
+            mask ^= low
+        return out
+
+
+class Scan:
+    """Resultado do percurso na trie para um texto: .match(rx) só corre as regexes candidatas."""
+
+    __slots__ = ("_matcher", "text", "mask", "skipped")
+
+    def __init__(self, matcher: IntentMatcher, text: str, mask: int):
+        self._matcher = matcher
+        self.text = text
+        self.mask = mask
+        self.skipped = 0
+
+    def match(self, pattern: re.Pattern) -> re.Match | None:
+        bit = self._matcher._bit.get(pattern)
+        if bit is not None and not (self.mask & bit):
+            self.skipped += 1
+            return None
+        return pattern.match(self.text)
@@ -6,10 +6,10 @@ from backend.handler_context import HandlerContext, _reply_confirm_prompt
 def _get_lang(ctx: HandlerContext) -> str:
     """Resolve idioma do utilizador com fallback pt-BR."""
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import get_user_language
         from backend.locale import phone_to_default_language
-        db = SessionLocal()
+        db = get_session()
         try:
             return get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         finally:
@@ -121,8 +121,7 @@ async def resolve_confirm(ctx: HandlerContext, content: str) -> str | None:
             if choice == "lista":
                 if items and ctx.list_tool:
                     ctx.list_tool.set_context(ctx.channel, ctx.chat_id, ctx.phone_for_locale)
-                    for it in items:
-                        await ctx.list_tool.execute(action="add", list_name="hoje", item_text=it)
+                    await ctx.list_tool.execute(action="add", list_name="hoje", items=items)
                     from backend.locale import CONFIRM_LIST_CREATED
                     _lang = _get_lang(ctx)
                     return CONFIRM_LIST_CREATED.get(_lang, CONFIRM_LIST_CREATED["en"]).format(count=len(items))
@@ -134,8 +133,7 @@ async def resolve_confirm(ctx: HandlerContext, content: str) -> str | None:
             if choice == "os dois":
                 if items and ctx.list_tool:
                     ctx.list_tool.set_context(ctx.channel, ctx.chat_id, ctx.phone_for_locale)
-                    for it in items:
-                        await ctx.list_tool.execute(action="add", list_name="hoje", item_text=it)
+                    await ctx.list_tool.execute(action="add", list_name="hoje", items=items)
                     from backend.locale import CONFIRM_LIST_AND_REMINDERS
                     _lang = _get_lang(ctx)
                     return CONFIRM_LIST_AND_REMINDERS.get(_lang, CONFIRM_LIST_AND_REMINDERS["en"]).format(count=len(items))
@@ -163,8 +161,7 @@ async def resolve_confirm(ctx: HandlerContext, content: str) -> str | None:
             list_name = payload.get("list_name") or "compras_receita"
             if ingredients and ctx.list_tool:
                 ctx.list_tool.set_context(ctx.channel, ctx.chat_id, ctx.phone_for_locale)
-                for item in ingredients:
-                    await ctx.list_tool.execute(action="add", list_name=list_name, item_text=item)
+                await ctx.list_tool.execute(action="add", list_name=list_name, items=ingredients)
                 from backend.locale import CONFIRM_RECIPE_LIST_CREATED
                 _lang = _get_lang(ctx)
                 lines = [CONFIRM_RECIPE_LIST_CREATED.get(_lang, CONFIRM_RECIPE_LIST_CREATED["en"]).format(list_name=list_name, count=len(ingredients))]
@@ -190,8 +187,7 @@ async def resolve_confirm(ctx: HandlerContext, content: str) -> str | None:
             list_name = payload.get("list_name") or "filme"
             if items and ctx.list_tool:
                 ctx.list_tool.set_context(ctx.channel, ctx.chat_id, ctx.phone_for_locale)
-                for item in items:
-                    await ctx.list_tool.execute(action="add", list_name=list_name, item_text=item)
+                await ctx.list_tool.execute(action="add", list_name=list_name, items=items)
                 from backend.locale import CONFIRM_SEARCH_LIST_CREATED
                 _lang = _get_lang(ctx)
                 lines = [CONFIRM_SEARCH_LIST_CREATED.get(_lang, CONFIRM_SEARCH_LIST_CREATED["en"]).format(list_name=list_name, count=len(items))]
@@ -224,8 +220,8 @@ async def resolve_confirm(ctx: HandlerContext, content: str) -> str | None:
                 from backend.locale import REMINDER_DATE_PAST_SCHEDULED
                 try:
                     from backend.user_store import get_user_language
-                    from backend.database import SessionLocal
-                    db = SessionLocal()
+                    from backend.database import get_session
+                    db = get_session()
                     try:
                         lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
                         scheduled_msg = REMINDER_DATE_PAST_SCHEDULED.get(lang, REMINDER_DATE_PAST_SCHEDULED["pt-BR"])
@@ -249,10 +245,10 @@ async def resolve_confirm(ctx: HandlerContext, content: str) -> str | None:
         if is_confirm_no(content):
             return CONFIRM_EXPORT_CANCEL.get(_lang, CONFIRM_EXPORT_CANCEL["en"])
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import get_or_create_user
             from backend.models_db import List, ListItem
-            db = SessionLocal()
+            db = get_session()
             try:
                 user = get_or_create_user(db, ctx.chat_id)
                 lists = db.query(List).filter(List.user_id == user.id).all()
@@ -276,10 +272,10 @@ async def resolve_confirm(ctx: HandlerContext, content: str) -> str | None:
         if is_confirm_no(content):
             return CONFIRM_DELETE_CANCEL.get(_lang, CONFIRM_DELETE_CANCEL["en"])
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import get_or_create_user
             from backend.models_db import List, ListItem, Event
-            db = SessionLocal()
+            db = get_session()
             try:
                 user = get_or_create_user(db, ctx.chat_id)
                 for lst in db.query(List).filter(List.user_id == user.id).all():
@@ -315,9 +311,9 @@ async def resolve_confirm(ctx: HandlerContext, content: str) -> str | None:
             return STOP_CANCELLED_MSG.get(_lang, STOP_CANCELLED_MSG["en"])
         if is_confirm_yes(content):
             try:
-                from backend.database import SessionLocal
+                from backend.database import get_session
                 from backend.user_store import get_or_create_user
-                db = SessionLocal()
+                db = get_session()
                 try:
                     user = get_or_create_user(db, ctx.chat_id)
                     user.is_paused = True
@@ -336,11 +332,11 @@ async def resolve_confirm(ctx: HandlerContext, content: str) -> str | None:
             return _NUKE_CANCELLED_MSGS.get(lang, _NUKE_CANCELLED_MSGS["pt-BR"])
         # Apaga tudo!
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import get_or_create_user, clear_onboarding_data
             from backend.models_db import List, ListItem, Event, Bookmark, Note, Habit, HabitCheck, Goal, Project, ListTemplate, ReminderHistory, AuditLog
 
-            db = SessionLocal()
+            db = get_session()
             try:
                 user = get_or_create_user(db, ctx.chat_id)
                 uid = user.id
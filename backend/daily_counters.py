@@ -0,0 +1,217 @@
+"""Contadores diários por chat em memória, gravados em lote (daily_user_messages.json, smart_reminder_sent.json).
+
+Antes, cada mensagem recebida lia e reescrevia o daily_user_messages.json inteiro no event loop.
+Agora:
+- o estado vive em memória, repartido por shards (crc32 do chat_id, como no worker pool), cada um
+  com o seu lock: record_* e get_* não tocam no disco;
+- as entradas alteradas são gravadas a cada DAILY_COUNTERS_FLUSH_SECONDS (default 5) numa thread,
+  e também na paragem do gateway (flush_daily_counters) e no atexit: a I/O cresce com a frequência de
+  flush, não com o tráfego;
+- com REDIS_URL (e Redis acessível) o estado fica num hash Redis por ficheiro (HSET só dos chats
+  alterados), partilhado entre reinícios e réplicas; senão, ficheiro JSON com escrita atómica
+  (tmp + os.replace). O formato do ficheiro mantém-se.
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Callable
+
+from backend.logger import get_logger
+from zapista.utils.helpers import env_float
+
+logger = get_logger(__name__)
+
+_REDIS_KEY_PREFIX = "zapista:state:"
+
+
+class _Shard:
+    __slots__ = ("lock", "data", "dirty")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.data: dict[str, Any] = {}
+        self.dirty: set[str] = set()
+
+
+class ShardedState:
+    """{chat_id: valor JSON} em memória, carregado uma vez e gravado em lote (só o que mudou)."""
+
+    def __init__(self, path: Path, shards: int = 16, keep: Callable[[Any], bool] | None = None):
+        self.path = path
+        self.name = path.stem
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._keep = keep  # ao gravar o ficheiro: descartar entradas antigas (ex.: de outro dia)
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.updates = 0
+        self.flushes = 0
+        self.flush_errors = 0
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[zlib.crc32(key.encode("utf-8")) % len(self._shards)]
+
+    # --- backend (Redis ou ficheiro) ---
+
+    def _redis(self):
+        from backend.redis_client import get_redis_client
+        return get_redis_client()
+
+    def _read_all(self) -> dict[str, Any]:
+        client = self._redis()
+        if client is not None:
+            try:
+                raw = client.hgetall(_REDIS_KEY_PREFIX + self.name)
+                return {k: json.loads(v) for k, v in (raw or {}).items()}
+            except Exception as e:
+                logger.warning("daily_counters_redis_load_failed", extra={"extra": {"name": self.name, "error": str(e)}})
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text())
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            for key, value in self._read_all().items():
+                self._shard(key).data[key] = value
+            self._loaded = True
+
+    # --- API ---
+
+    def get(self, key: str) -> Any:
+        self._ensure_loaded()
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.data.get(key)
+
+    def update(self, key: str, fn: Callable[[Any], Any]) -> Any:
+        """Aplica fn(valor atual) → novo valor; marca o chat para a próxima gravação."""
+        self._ensure_loaded()
+        shard = self._shard(key)
+        with shard.lock:
+            value = fn(shard.data.get(key))
+            shard.data[key] = value
+            shard.dirty.add(key)
+        self.updates += 1
+        _ensure_flusher()
+        return value
+
+    @property
+    def pending(self) -> int:
+        return sum(len(s.dirty) for s in self._shards)
+
+    def flush(self) -> int:
+        """Grava as entradas alteradas desde a última gravação. Retorna quantas. Seguro numa thread."""
+        with self._flush_lock:
+            changed: dict[str, Any] = {}
+            for shard in self._shards:
+                with shard.lock:
+                    for key in shard.dirty:
+                        changed[key] = shard.data.get(key)
+                    shard.dirty.clear()
+            if not changed:
+                return 0
+            try:
+                self._write(changed)
+                self.flushes += 1
+                return len(changed)
+            except Exception as e:
+                self.flush_errors += 1
+                logger.warning("daily_counters_flush_failed", extra={"extra": {"name": self.name, "error": str(e)}})
+                for key in changed:  # tentar de novo no próximo flush
+                    shard = self._shard(key)
+                    with shard.lock:
+                        shard.dirty.add(key)
+                return 0
+
+    def _write(self, changed: dict[str, Any]) -> None:
+        client = self._redis()
+        if client is not None:
+            try:
+                client.hset(
+                    _REDIS_KEY_PREFIX + self.name,
+                    mapping={k: json.dumps(v, separators=(",", ":")) for k, v in changed.items()},
+                )
+                return
+            except Exception as e:
+                logger.warning("daily_counters_redis_write_failed", extra={"extra": {"name": self.name, "error": str(e)}})
+        snapshot: dict[str, Any] = {}
+        for shard in self._shards:
+            with shard.lock:
+                snapshot.update(shard.data)
+        if self._keep is not None:
+            snapshot = {k: v for k, v in snapshot.items() if self._keep(v)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(snapshot, indent=0))
+        os.replace(tmp, self.path)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": sum(len(s.data) for s in self._shards),
+            "pending": self.pending,
+            "updates": self.updates,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+        }
+
+
+_STATES: list[ShardedState] = []
+_FLUSH_TASK: asyncio.Task | None = None
+
+
+def register_state(state: ShardedState) -> ShardedState:
+    """Regista o estado para o flush periódico, flush_daily_counters() e atexit."""
+    _STATES.append(state)
+    return state
+
+
+async def _flush_loop() -> None:
+    interval = env_float("DAILY_COUNTERS_FLUSH_SECONDS", 5.0, lo=0.1)
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        for state in list(_STATES):
+            if state.pending:
+                await loop.run_in_executor(None, state.flush)
+
+
+def _ensure_flusher() -> None:
+    """Arranca o flush periódico no event loop atual (1.ª alteração). Sem loop: só atexit/flush explícito."""
+    global _FLUSH_TASK
+    if _FLUSH_TASK is not None and not _FLUSH_TASK.done():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    _FLUSH_TASK = loop.create_task(_flush_loop(), name="daily-counters-flush")
+
+
+def flush_daily_counters() -> int:
+    """Grava já tudo o que está pendente (paragem do gateway). Retorna o número de entradas gravadas."""
+    global _FLUSH_TASK
+    if _FLUSH_TASK is not None and not _FLUSH_TASK.done():
+        _FLUSH_TASK.cancel()
+    _FLUSH_TASK = None
+    return sum(state.flush() for state in _STATES)
+
+
+def get_daily_counter_stats() -> dict[str, dict[str, int]]:
+    """Métricas por estado (para #system)."""
+    return {state.name: state.stats() for state in _STATES}
+
+
+atexit.register(lambda: sum(state.flush() for state in _STATES))
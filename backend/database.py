@@ -5,8 +5,14 @@ Produção: criptografia em repouso via SQLCipher (opcional) ou volume criptogra
 - Alternativa: montar volume criptografado (LUKS, BitLocker) e colocar o ficheiro da BD nesse volume.
 """
 
+import asyncio
 import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
+from typing import Iterator
+
 import sqlalchemy
 
 from sqlalchemy import create_engine
@@ -100,6 +106,78 @@ _using_sqlcipher = _DB_PASSPHRASE and _is_using_sqlcipher()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=ENGINE)
 
 
+class RequestSession(Session):
+    """
+    Sessão partilhada por todo o processamento de uma mensagem (request_scope).
+    close() dos chamadores não fecha: o identity map (ex.: o User) mantém-se até ao fim do pedido,
+    e quem fecha e faz o commit final é o request_scope. Se a transação falhou (commit/flush com
+    erro apanhado sem rollback), close() faz o rollback, como o close() de uma sessão normal,
+    para o resto da mensagem não herdar o PendingRollbackError.
+    """
+
+    def close(self) -> None:
+        tx = self.get_transaction()
+        if tx is not None and not tx.is_active:
+            self.rollback()
+
+    def close_request(self) -> None:
+        super().close()
+
+
+def _scope_owner() -> tuple[int, "asyncio.Task | None"]:
+    """Dono da sessão do pedido: a thread e a task asyncio que abriram o request_scope."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return threading.get_ident(), task
+
+
+_RequestSessionLocal = sessionmaker(class_=RequestSession, autocommit=False, autoflush=False, bind=ENGINE)
+# (sessão, dono): tasks criadas dentro do pedido (create_task, gather) e threads herdam o contexto,
+# mas não são o dono → get_session() dá-lhes uma SessionLocal própria (a Session não é partilhável
+# entre tasks concorrentes e a do pedido é fechada quando a mensagem termina).
+_request_db: ContextVar["tuple[RequestSession, tuple] | None"] = ContextVar("request_db", default=None)
+
+
+def _current_request_session() -> "RequestSession | None":
+    current = _request_db.get()
+    if current is None or current[1] != _scope_owner():
+        return None
+    return current[0]
+
+
+@contextmanager
+def request_scope() -> Iterator[Session]:
+    """
+    Unidade de trabalho de uma mensagem: 1 sessão para loop, context builder, handlers e tools (get_session).
+    No fim faz commit do que ficou pendente (ou rollback se houve exceção) e fecha.
+    Aninhado (ex.: mensagem reencaminhada internamente) reutiliza a sessão exterior.
+    """
+    current = _current_request_session()
+    if current is not None:
+        yield current
+        return
+    db = _RequestSessionLocal()
+    token = _request_db.set((db, _scope_owner()))
+    try:
+        yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        _request_db.reset(token)
+        db.close_request()
+
+
+def get_session() -> Session:
+    """Sessão do pedido em curso (request_scope) ou, fora de um pedido (ou numa task/thread lançada
+    a partir dele), uma SessionLocal nova. Os chamadores continuam a fazer db.close() no fim."""
+    current = _current_request_session()
+    return current if current is not None else SessionLocal()
+
+
 def init_db() -> None:
     """Create tables if not exist. Add missing columns for existing DBs (e.g. users.language)."""
     Base.metadata.create_all(bind=ENGINE)
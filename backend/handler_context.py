@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from typing import Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
     from zapista.agent.tools.cron import CronTool
     from zapista.agent.tools.list_tool import ListTool
     from zapista.cron.service import CronService
@@ -25,6 +26,12 @@ class HandlerContext:
     main_model: str | None = None  # modelo principal do agente
     phone_for_locale: str | None = None  # número real para inferir fuso/idioma em sessões LID
 
+    @property
+    def db(self) -> "Session":
+        """Sessão de BD do pedido (request_scope do AgentLoop); fora de um pedido, uma sessão nova (fechar no fim)."""
+        from backend.database import get_session
+        return get_session()
+
 
 def _reply_confirm_prompt(msg: str) -> str:
     """Sufixo padrão para pedir confirmação sem botões."""
@@ -11,7 +11,7 @@ if TYPE_CHECKING:
 async def handle_hora_data(ctx: "HandlerContext", content: str) -> str | None:
     """/hora ou /data. Mostra data/hora atual no timezone do usuário."""
     from backend.command_parser import parse
-    from backend.database import SessionLocal
+    from backend.database import get_session
     from backend.user_store import get_user_timezone, get_user_language
     from zoneinfo import ZoneInfo
     from datetime import datetime
@@ -22,7 +22,7 @@ async def handle_hora_data(ctx: "HandlerContext", content: str) -> str | None:
     tz_iana = "UTC"
     lang = "pt-BR"
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale) or "UTC"
             lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
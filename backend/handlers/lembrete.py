@@ -145,7 +145,7 @@ async def handle_vague_time_reminder(ctx: HandlerContext, content: str) -> str |
         PROACTIVE_NUDGE_12H_MSG,
     )
     from backend.user_store import get_user_language, get_user_timezone
-    from backend.database import SessionLocal
+    from backend.database import get_session
     from backend.locale import resolve_response_language
 
     if not ctx.session_manager or not ctx.cron_tool or not content or not content.strip():
@@ -154,7 +154,7 @@ async def handle_vague_time_reminder(ctx: HandlerContext, content: str) -> str |
     # Resolve user_lang early for cancel check (avoid NameError)
     _cancel_lang: LangCode = "pt-BR"
     try:
-        _cdb = SessionLocal()
+        _cdb = get_session()
         try:
             _cancel_lang = get_user_language(_cdb, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         finally:
@@ -192,7 +192,7 @@ async def handle_vague_time_reminder(ctx: HandlerContext, content: str) -> str |
     user_lang: LangCode = "pt-BR"
     tz_iana = "UTC"
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
             user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             user_lang = resolve_response_language(user_lang, ctx.chat_id, ctx.phone_for_locale)
@@ -478,14 +478,14 @@ async def handle_vague_time_reminder(ctx: HandlerContext, content: str) -> str |
             has_full_event_datetime,
         )
         from backend.models_db import Event, AuditLog
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import get_or_create_user
 
         if has_full_event_datetime(text) and not _looks_like_new_reminder_request(text):
             parsed = parse_full_event_datetime(text, tz_iana)
             if parsed:
                 content_ev, in_sec, data_at = parsed
-                db_ev = SessionLocal()
+                db_ev = get_session()
                 try:
                     user_ev = get_or_create_user(db_ev, ctx.chat_id)
                     from backend.limits import check_event_limits, LIMIT_EVENTS_PER_DAY
@@ -662,7 +662,7 @@ async def handle_lembrete(ctx: HandlerContext, content: str) -> str | None:
     from backend.recurring_detector import maybe_ask_recurrence
     from backend.locale import LangCode, resolve_response_language
     from backend.user_store import get_user_language, get_user_timezone
-    from backend.database import SessionLocal
+    from backend.database import get_session
     from backend.handlers.utils import _normalize_nl_to_command
 
     text = content.strip()
@@ -684,7 +684,7 @@ async def handle_lembrete(ctx: HandlerContext, content: str) -> str | None:
     tz_iana = "UTC"
     user_lang: LangCode = "pt-BR"
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale) or "UTC"
             user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
@@ -758,7 +758,7 @@ async def handle_lembrete(ctx: HandlerContext, content: str) -> str | None:
         else:
             user_lang: LangCode = "pt-BR"
             try:
-                db = SessionLocal()
+                db = get_session()
                 try:
                     user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
                     user_lang = resolve_response_language(user_lang, ctx.chat_id, ctx.phone_for_locale)
@@ -803,7 +803,7 @@ async def handle_recorrente(ctx: HandlerContext, content: str) -> str | None:
     content = _normalize_nl_to_command(content)
     from backend.command_parser import parse
     from backend.user_store import get_user_timezone
-    from backend.database import SessionLocal
+    from backend.database import get_session
     m = re.match(r"^/recorrente(?:\s+(.+))?$", content.strip(), re.I)
     if not m:
         return None
@@ -816,7 +816,7 @@ async def handle_recorrente(ctx: HandlerContext, content: str) -> str | None:
 
     tz_iana = "UTC"
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale) or "UTC"
         finally:
@@ -903,7 +903,7 @@ async def handle_recurring_prompt(ctx: HandlerContext, content: str) -> str | No
     from backend.recurring_detector import maybe_ask_recurrence
     from backend.scope_filter import is_in_scope_fast
     from backend.user_store import get_user_language
-    from backend.database import SessionLocal
+    from backend.database import get_session
     from backend.locale import LangCode, resolve_response_language
     from backend.integrations.sacred_text import _is_sacred_text_intent
 
@@ -919,7 +919,7 @@ async def handle_recurring_prompt(ctx: HandlerContext, content: str) -> str | No
             return None
     user_lang: LangCode = "pt-BR"
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
             user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             user_lang = resolve_response_language(user_lang, ctx.chat_id, ctx.phone_for_locale)
@@ -977,7 +977,7 @@ async def handle_recurring_event(ctx: HandlerContext, content: str) -> str | Non
         RECURRING_REGISTERED_UNTIL,
     )
     from backend.user_store import get_user_language, get_user_timezone
-    from backend.database import SessionLocal
+    from backend.database import get_session
     from backend.locale import resolve_response_language
 
     if not ctx.session_manager or not ctx.cron_tool or not content or not content.strip():
@@ -990,7 +990,7 @@ async def handle_recurring_event(ctx: HandlerContext, content: str) -> str | Non
     # Resolve user_lang early for cancel check (avoid NameError)
     _cancel_lang: LangCode = "pt-BR"
     try:
-        _cdb = SessionLocal()
+        _cdb = get_session()
         try:
             _cancel_lang = get_user_language(_cdb, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         finally:
@@ -1023,7 +1023,7 @@ async def handle_recurring_event(ctx: HandlerContext, content: str) -> str | Non
     user_lang: LangCode = "pt-BR"
     tz_iana = "UTC"
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
             user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             user_lang = resolve_response_language(user_lang, ctx.chat_id, ctx.phone_for_locale)
@@ -31,11 +31,11 @@ async def handle_list_or_events_ambiguous(ctx: "HandlerContext", content: str) -
         return None
     set_pending(ctx.channel, ctx.chat_id, "list_or_events_choice", {"items": items})
     from backend.user_store import get_user_language
-    from backend.database import SessionLocal
+    from backend.database import get_session
     from backend.locale import AMBIGUOUS_CHOICE_MSG
     lang = "pt-BR"
     try:
-        db = SessionLocal()
+        db = get_session()
         lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         db.close()
     except Exception:
@@ -83,15 +83,9 @@ async def handle_list(ctx: "HandlerContext", content: str) -> str | None:
         if not items_to_add:
             return None
         list_name = intent.get("list_name", "")
-        results = []
-        for it in items_to_add:
-            r = await ctx.list_tool.execute(
-                action="add",
-                list_name=list_name,
-                item_text=it,
-            )
-            results.append(r)
-        return "\n".join(results) if len(results) > 1 else (results[0] if results else None)
+        if len(items_to_add) == 1:
+            return await ctx.list_tool.execute(action="add", list_name=list_name, item_text=items_to_add[0])
+        return await ctx.list_tool.execute(action="add", list_name=list_name, items=items_to_add)
     return await ctx.list_tool.execute(
         action="list",
         list_name=intent.get("list_name") or "",
@@ -13,10 +13,10 @@ def _append_tz_hint_if_needed(reply: str, chat_id: str, phone_for_locale: str |
     if not reply or not reply.strip():
         return reply
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import get_user_timezone_and_source, get_user_language
         from backend.locale import TZ_HINT_SET_CITY, resolve_response_language
-        db = SessionLocal()
+        db = get_session()
         try:
             _, source = get_user_timezone_and_source(db, chat_id, phone_for_locale)
             if source == "db":
@@ -60,9 +60,9 @@ async def handle_help(ctx: "HandlerContext", content: str) -> str | list[str] |
 
     user_lang = "pt-BR"
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import get_user_language
-        db = SessionLocal()
+        db = get_session()
         try:
             user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             user_lang = resolve_response_language(user_lang, ctx.chat_id, ctx.phone_for_locale)
@@ -84,10 +84,10 @@ async def handle_stop(ctx: "HandlerContext", content: str) -> str | None:
     
     from backend.locale import STOP_CONFIRM_PROMPT, resolve_response_language
     from backend.user_store import get_user_language
-    from backend.database import SessionLocal
+    from backend.database import get_session
     
     lang = "pt-BR"
-    db = SessionLocal()
+    db = get_session()
     try:
         lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         lang = resolve_response_language(lang, ctx.chat_id, ctx.phone_for_locale)
@@ -112,11 +112,11 @@ async def handle_resume(ctx: "HandlerContext", content: str) -> str | None:
     if not (c.startswith("/resume") or c.startswith("/start") or c.startswith("/continuar") or c.startswith("/retomar")):
         return None
         
-    from backend.database import SessionLocal
+    from backend.database import get_session
     from backend.user_store import get_user_language, get_or_create_user
     from backend.locale import RESUME_SUCCESS_MSG, RESUME_ALREADY_ACTIVE_MSG, resolve_response_language
     
-    db = SessionLocal()
+    db = get_session()
     try:
         user = get_or_create_user(db, ctx.chat_id)
         lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
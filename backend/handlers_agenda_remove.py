@@ -2,7 +2,7 @@
 
 import re
 from backend.handler_context import HandlerContext
-from backend.database import SessionLocal
+from backend.database import get_session
 from backend.user_store import get_or_create_user, get_user_timezone, get_user_language
 from backend.models_db import Event
 from backend.locale import (
@@ -134,7 +134,7 @@ async def handle_agenda_remove(ctx: HandlerContext, content: str) -> str | None:
         # Só procedemos se a busca por evento for bem sucedida (fazemos a busca abaixo)
         pass
 
-    db = SessionLocal()
+    db = get_session()
     try:
         user = get_or_create_user(db, ctx.chat_id)
         tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
@@ -7,7 +7,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
-from backend.database import SessionLocal
+from backend.database import get_session
 from backend.user_store import get_or_create_user, get_user_timezone, get_user_language
 from backend.models_db import HouseChoreTask, HouseChorePerson
 import backend.locale as locale
@@ -93,7 +93,7 @@ async def handle_limpeza(ctx: "HandlerContext", content: str) -> str | None:
     t = content.strip()
     # Linguagem natural: "preciso limpar a casa", "limpar banheiro", etc.
     if not t.lower().startswith("/limpeza") and _is_limpeza_nl_intent(t):
-        db = SessionLocal()
+        db = get_session()
         try:
             user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             return locale.LIMPEZA_INTRO.get(user_lang, locale.LIMPEZA_INTRO["en"])
@@ -102,7 +102,7 @@ async def handle_limpeza(ctx: "HandlerContext", content: str) -> str | None:
     if not t.lower().startswith("/limpeza"):
         return None
     rest = t[8:].strip().lower()
-    db = SessionLocal()
+    db = get_session()
     try:
         user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         user = get_or_create_user(db, ctx.chat_id)
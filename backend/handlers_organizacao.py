@@ -7,7 +7,7 @@ import re
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from backend.database import SessionLocal
+from backend.database import get_session
 from backend.user_store import get_or_create_user, get_user_language
 from backend.models_db import Goal, Project, List, ListItem, ListTemplate
 from backend.sanitize import sanitize_string, MAX_LIST_NAME_LEN, MAX_ITEM_TEXT_LEN, MAX_LIST_ITEM_TEXT_LEN
@@ -47,7 +47,7 @@ async def handle_meta(ctx: "HandlerContext", content: str) -> str | None:
     if not t.lower().startswith("/meta"):
         return None
     rest = t[5:].strip()
-    db = SessionLocal()
+    db = get_session()
     try:
         user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         user = get_or_create_user(db, ctx.chat_id)
@@ -103,7 +103,7 @@ async def handle_projeto(ctx: "HandlerContext", content: str) -> str | None:
     if not t.lower().startswith("/projeto"):
         return None
     rest = t[8:].strip()
-    db = SessionLocal()
+    db = get_session()
     try:
         user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         user = get_or_create_user(db, ctx.chat_id)
@@ -189,7 +189,7 @@ async def handle_template(ctx: "HandlerContext", content: str) -> str | None:
     if not t.lower().startswith("/template"):
         return None
     rest = t[9:].strip()
-    db = SessionLocal()
+    db = get_session()
     try:
         user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         user = get_or_create_user(db, ctx.chat_id)
@@ -6,7 +6,7 @@ import re
 import time
 from zapista.clock_drift import get_effective_time, get_effective_time_ms
 from typing import TYPE_CHECKING
-from backend.database import SessionLocal
+from backend.database import get_session
 from backend.user_store import get_user_language
 from backend.locale import (
     POMODORO_INFO, POMODORO_UNAVAILABLE, POMODORO_NONE_ACTIVE, POMODORO_STOPPED,
@@ -90,7 +90,7 @@ async def handle_pomodoro(ctx: "HandlerContext", content: str) -> str | None:
     if not t.lower().startswith("/pomodoro") and not is_nl and not is_info:
         return None
 
-    db = SessionLocal()
+    db = get_session()
     try:
         lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
     finally:
@@ -114,7 +114,7 @@ async def handle_pomodoro(ctx: "HandlerContext", content: str) -> str | None:
 
     # /pomodoro stop
     if sub == "stop":
-        jobs = ctx.cron_service.list_jobs(include_disabled=False)
+        jobs = ctx.cron_service.list_jobs(include_disabled=False, to=ctx.chat_id)
         pomo_jobs = [
             j for j in jobs
             if getattr(j.payload, "to", None) == ctx.chat_id and _is_pomodoro_job(j)
@@ -128,7 +128,7 @@ async def handle_pomodoro(ctx: "HandlerContext", content: str) -> str | None:
 
     # /pomodoro status
     if sub == "status":
-        jobs = ctx.cron_service.list_jobs(include_disabled=False)
+        jobs = ctx.cron_service.list_jobs(include_disabled=False, to=ctx.chat_id)
         pomo_jobs = [
             j for j in jobs
             if getattr(j.payload, "to", None) == ctx.chat_id and _is_pomodoro_job(j)
@@ -160,7 +160,7 @@ async def handle_pomodoro(ctx: "HandlerContext", content: str) -> str | None:
         message = POMODORO_FINISHED.get(lang, POMODORO_FINISHED["pt-BR"])
 
     # Só um Pomodoro ativo por vez
-    jobs = ctx.cron_service.list_jobs(include_disabled=False)
+    jobs = ctx.cron_service.list_jobs(include_disabled=False, to=ctx.chat_id)
     if any(
         getattr(j.payload, "to", None) == ctx.chat_id and _is_pomodoro_job(j)
         for j in jobs
@@ -182,10 +182,10 @@ async def handle_pomodoro(ctx: "HandlerContext", content: str) -> str | None:
             return result
         # Formatar resposta com hora de término
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import get_user_timezone
             from backend.timezone import format_utc_timestamp_for_user
-            db = SessionLocal()
+            db = get_session()
             try:
                 tz = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
                 end_sec = int(get_effective_time()) + POMODORO_WORK_SEC
@@ -15,7 +15,7 @@ from sqlalchemy.orm import Session
 from backend.models_db import HouseChoreTask, HouseChorePerson
 from backend.house_chores_catalog import CHORE_CATALOG, get_chore_name
 from backend.user_store import get_or_create_user, get_user_timezone, get_user_language, is_user_in_quiet_window
-from backend.database import SessionLocal
+from backend.database import get_session
 
 
 WEEKDAY_NAMES_PT = ["segunda", "terça", "quarta", "quinta", "sexta", "sábado", "domingo"]
@@ -122,7 +122,7 @@ async def run_house_chores_daily(
             continue
 
         try:
-            db = SessionLocal()
+            db = get_session()
             try:
                 if is_user_in_quiet_window(chat_id):
                     continue
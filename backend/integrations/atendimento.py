@@ -13,9 +13,9 @@ async def handle_atendimento_request(ctx: HandlerContext, content: str) -> str |
     add_painpoint(ctx.chat_id, "pedido explícito de contacto")
     user_lang = "pt-BR"
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import get_user_language
-        db = SessionLocal()
+        db = get_session()
         try:
             user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale)
         finally:
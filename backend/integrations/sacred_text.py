@@ -29,9 +29,9 @@ def _is_sacred_text_intent(content: str) -> bool:
 
 def _get_user_lang(chat_id: str) -> str:
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import get_user_language
-        db = SessionLocal()
+        db = get_session()
         try:
             return get_user_language(db, chat_id) or "en"
         finally:
@@ -0,0 +1,405 @@
+"""Estado pequeno chave-valor (lockout, mutes, allowlist extra, métricas, painpoints, relógio...).
+
+Substitui os vários ficheiros JSON que cada módulo lia e reescrevia inteiros a cada alteração
+(alguns por mensagem, ex.: server_metrics.record_event). Um único KVStore por processo:
+- namespaces (um por módulo), valores JSON, TTL opcional por chave (expirados não são devolvidos
+  e são apagados no flush);
+- leituras servidas de cache em memória (cada namespace é carregado uma vez);
+- escritas vão para a cache e ficam pendentes; são gravadas em lote a cada KV_FLUSH_SECONDS
+  (default 2) numa thread, na paragem do gateway (flush_kv_store) e no atexit. set(..., sync=True)
+  grava já (ações de admin como mute/#add);
+- update(ns, key, fn) faz ler-modificar-escrever sob lock: sem lost updates entre threads/tasks;
+- backend escolhido por KV_BACKEND, nunca por tentativa: "sqlite" (default; modo WAL, KV_STORE_PATH,
+  default <ZAPISTA_DATA>/state.db, cada lote numa transação) ou "redis" (hash zapista:kv:<ns>;
+  exige REDIS_URL acessível, senão o arranque falha em vez de cair para SQLite e dividir o estado).
+
+Cada namespace pode importar o ficheiro JSON antigo na primeira carga (uma só vez: fica marcado
+em _kv_meta). A cache é por processo: o gateway é o único escritor.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from backend.logger import get_logger
+from zapista.utils.helpers import env_float
+
+logger = get_logger(__name__)
+
+_REDIS_KEY_PREFIX = "zapista:kv:"
+_META_NS = "_kv_meta"
+_MISSING = object()
+
+
+def default_store_path() -> Path:
+    raw = os.environ.get("KV_STORE_PATH", "").strip()
+    if raw:
+        return Path(raw).expanduser()
+    return Path(os.environ.get("ZAPISTA_DATA", "").strip() or str(Path.home() / ".zapista")) / "state.db"
+
+
+class _SqliteBackend:
+    name = "sqlite"
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv ("
+                " ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL,"
+                " PRIMARY KEY (ns, key))"
+            )
+
+    def load(self, ns: str) -> dict[str, tuple[Any, float | None]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value, expires_at FROM kv WHERE ns = ? ORDER BY rowid", (ns,)
+            ).fetchall()
+        return {k: (json.loads(v), e) for k, v, e in rows}
+
+    def write(self, batch: list[tuple[str, str, Any, float | None, bool]]) -> None:
+        """batch: [(ns, key, value, expires_at, deleted)], numa transação."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for ns, key, value, expires_at, deleted in batch:
+                    if deleted:
+                        self._conn.execute("DELETE FROM kv WHERE ns = ? AND key = ?", (ns, key))
+                    else:
+                        self._conn.execute(
+                            "INSERT INTO kv (ns, key, value, expires_at) VALUES (?, ?, ?, ?)"
+                            " ON CONFLICT (ns, key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at",
+                            (ns, key, json.dumps(value, ensure_ascii=False, separators=(",", ":")), expires_at),
+                        )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _RedisBackend:
+    name = "redis"
+
+    def __init__(self, client):
+        self._client = client
+
+    def load(self, ns: str) -> dict[str, tuple[Any, float | None]]:
+        raw = self._client.hgetall(_REDIS_KEY_PREFIX + ns) or {}
+        out = {}
+        for key, blob in raw.items():
+            rec = json.loads(blob)
+            out[key] = (rec.get("v"), rec.get("e"))
+        return out
+
+    def write(self, batch: list[tuple[str, str, Any, float | None, bool]]) -> None:
+        pipe = self._client.pipeline()
+        for ns, key, value, expires_at, deleted in batch:
+            if deleted:
+                pipe.hdel(_REDIS_KEY_PREFIX + ns, key)
+            else:
+                pipe.hset(
+                    _REDIS_KEY_PREFIX + ns, key,
+                    json.dumps({"v": value, "e": expires_at}, ensure_ascii=False, separators=(",", ":")),
+                )
+        pipe.execute()
+
+    def close(self) -> None:
+        pass
+
+
+class KVStore:
+    """Namespaces {chave: valor JSON} em memória, gravados em lote num backend SQLite/Redis."""
+
+    def __init__(self, path: Path | None = None, backend: Any = None):
+        if backend is None:
+            backend = _open_backend(path or default_store_path())
+        self._backend = backend
+        self._lock = threading.RLock()
+        # ns -> {key: (valor, expires_at)}
+        self._data: dict[str, dict[str, tuple[Any, float | None]]] = {}
+        self._dirty: dict[tuple[str, str], None] = {}  # ordem de alteração
+        self._importers: dict[str, Callable[[], dict[str, Any]]] = {}
+        self._flusher: threading.Thread | None = None
+        self._wake = threading.Event()
+        self._closed = False
+        self.reads = 0
+        self.writes = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.rows_written = 0
+
+    @property
+    def backend_name(self) -> str:
+        return self._backend.name
+
+    # --- carga ---
+
+    def register_legacy(self, ns: str, importer: Callable[[], dict[str, Any]]) -> None:
+        """importer() → {chave: valor} do ficheiro JSON antigo; corre uma vez, na 1.ª carga do namespace."""
+        with self._lock:
+            self._importers[ns] = importer
+
+    def _ns(self, ns: str) -> dict[str, tuple[Any, float | None]]:
+        entries = self._data.get(ns)
+        if entries is not None:
+            return entries
+        try:
+            entries = self._backend.load(ns)
+        except Exception as e:
+            logger.warning("kv_load_failed", extra={"extra": {"ns": ns, "error": str(e)}})
+            entries = {}
+        self._data[ns] = entries
+        importer = self._importers.get(ns)
+        if importer is not None and ns != _META_NS and self.get(_META_NS, f"imported:{ns}") is None:
+            try:
+                imported = importer() or {}
+            except Exception as e:
+                logger.warning("kv_legacy_import_failed", extra={"extra": {"ns": ns, "error": str(e)}})
+                imported = {}
+            for key, value in imported.items():
+                if key not in entries:
+                    entries[key] = (value, None)
+                    self._dirty[(ns, key)] = None
+            self.set(_META_NS, f"imported:{ns}", int(time.time()))
+            if imported:
+                logger.info("kv_legacy_imported", extra={"extra": {"ns": ns, "keys": len(imported)}})
+        return entries
+
+    # --- API ---
+
+    def get(self, ns: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            self.reads += 1
+            rec = self._ns(ns).get(key)
+            if rec is None:
+                return default
+            value, expires_at = rec
+            if expires_at is not None and expires_at <= time.time():
+                return default
+            return value
+
+    def set(self, ns: str, key: str, value: Any, ttl: float | None = None, sync: bool = False) -> None:
+        with self._lock:
+            self._ns(ns)[key] = (value, time.time() + ttl if ttl is not None else None)
+            self._dirty[(ns, key)] = None
+            self.writes += 1
+        self._after_write(sync)
+
+    def delete(self, ns: str, key: str, sync: bool = False) -> bool:
+        with self._lock:
+            entries = self._ns(ns)
+            if key not in entries:
+                return False
+            del entries[key]
+            self._dirty[(ns, key)] = None
+            self.writes += 1
+        self._after_write(sync)
+        return True
+
+    def update(
+        self,
+        ns: str,
+        key: str,
+        fn: Callable[[Any], Any],
+        ttl: float | Callable[[Any], float] | None = None,
+        sync: bool = False,
+    ) -> Any:
+        """fn(valor atual ou None) → novo valor (None apaga), atómico face a outros update/set.
+
+        ttl pode ser uma função do novo valor (ex.: expirar no fim de um bloqueio).
+        """
+        with self._lock:
+            value = fn(self.get(ns, key))
+            if value is None:
+                self.delete(ns, key, sync=False)
+            else:
+                if callable(ttl):
+                    ttl = ttl(value)
+                self._ns(ns)[key] = (value, time.time() + ttl if ttl is not None else None)
+                self._dirty[(ns, key)] = None
+                self.writes += 1
+        self._after_write(sync)
+        return value
+
+    def items(self, ns: str) -> list[tuple[str, Any]]:
+        """Pares (chave, valor) não expirados, pela ordem de inserção."""
+        now = time.time()
+        with self._lock:
+            self.reads += 1
+            return [(k, v) for k, (v, e) in self._ns(ns).items() if e is None or e > now]
+
+    # --- gravação ---
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    def flush(self) -> int:
+        """Grava as chaves alteradas (e apaga as expiradas). Retorna o número de linhas gravadas."""
+        now = time.time()
+        with self._lock:
+            for ns, entries in self._data.items():
+                for key in [k for k, (_, e) in entries.items() if e is not None and e <= now]:
+                    del entries[key]
+                    self._dirty[(ns, key)] = None
+            if not self._dirty:
+                return 0
+            dirty, self._dirty = self._dirty, {}
+            batch = []
+            for ns, key in dirty:
+                rec = self._data.get(ns, {}).get(key, _MISSING)
+                if rec is _MISSING:
+                    batch.append((ns, key, None, None, True))
+                else:
+                    batch.append((ns, key, rec[0], rec[1], False))
+        try:
+            self._backend.write(batch)
+        except Exception as e:
+            with self._lock:
+                self.flush_errors += 1
+                self._dirty = {**dirty, **self._dirty}  # tentar de novo no próximo flush
+            logger.warning("kv_flush_failed", extra={"extra": {"rows": len(batch), "error": str(e)}})
+            return 0
+        with self._lock:
+            self.flushes += 1
+            self.rows_written += len(batch)
+        return len(batch)
+
+    def _after_write(self, sync: bool) -> None:
+        if sync:
+            self.flush()
+            return
+        if self._flusher is None and not self._closed:
+            with self._lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, name="kv-flush", daemon=True)
+                    self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        interval = env_float("KV_FLUSH_SECONDS", 2.0, lo=0.1)
+        while not self._wake.wait(interval):
+            if self._dirty:
+                self.flush()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend_name,
+                "namespaces": len(self._data),
+                "keys": sum(len(e) for e in self._data.values()),
+                "pending": len(self._dirty),
+                "reads": self.reads,
+                "writes": self.writes,
+                "flushes": self.flushes,
+                "rows_written": self.rows_written,
+                "flush_errors": self.flush_errors,
+            }
+
+
+def _open_backend(path: Path):
+    """Backend pedido em KV_BACKEND; erro se não estiver disponível (sem fallback silencioso)."""
+    kind = os.environ.get("KV_BACKEND", "").strip().lower() or "sqlite"
+    if kind == "sqlite":
+        return _SqliteBackend(path)
+    if kind == "redis":
+        from backend.redis_client import get_redis_client
+        client = get_redis_client()
+        if client is None:
+            raise RuntimeError("KV_BACKEND=redis mas REDIS_URL não está definido ou o Redis não responde")
+        return _RedisBackend(client)
+    raise ValueError(f"KV_BACKEND inválido: {kind!r} (usar sqlite ou redis)")
+
+
+def read_legacy_json(path: Path) -> Any:
+    """Conteúdo de um ficheiro JSON antigo (None se não existir ou estiver inválido)."""
+    try:
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        pass
+    return None
+
+
+_STORE: KVStore | None = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_kv_store() -> KVStore:
+    """KVStore do processo (aberto na primeira utilização)."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = KVStore()
+    return _STORE
+
+
+def set_kv_store(store: KVStore | None) -> KVStore | None:
+    """Substitui o KVStore do processo (testes). Retorna o anterior."""
+    global _STORE
+    with _STORE_LOCK:
+        previous, _STORE = _STORE, store
+    return previous
+
+
+def flush_kv_store() -> int:
+    """Grava já tudo o que está pendente (paragem do gateway)."""
+    return _STORE.flush() if _STORE is not None else 0
+
+
+def get_kv_store_stats() -> dict[str, Any] | None:
+    """Métricas do KVStore (para #system); None se ainda não foi aberto."""
+    return _STORE.stats() if _STORE is not None else None
+
+
+class Namespace:
+    """Vista de um namespace do KVStore do processo, com importação opcional do ficheiro JSON antigo."""
+
+    def __init__(self, name: str, legacy: Callable[[], dict[str, Any]] | None = None):
+        self.name = name
+        self._legacy = legacy
+
+    @property
+    def store(self) -> KVStore:
+        store = get_kv_store()
+        if self._legacy is not None and self.name not in store._importers:
+            store.register_legacy(self.name, self._legacy)
+        return store
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.store.get(self.name, key, default)
+
+    def set(self, key: str, value: Any, ttl: float | None = None, sync: bool = False) -> None:
+        self.store.set(self.name, key, value, ttl=ttl, sync=sync)
+
+    def delete(self, key: str, sync: bool = False) -> bool:
+        return self.store.delete(self.name, key, sync=sync)
+
+    def update(
+        self, key: str, fn: Callable[[Any], Any], ttl: float | Callable[[Any], float] | None = None, sync: bool = False,
+    ) -> Any:
+        return self.store.update(self.name, key, fn, ttl=ttl, sync=sync)
+
+    def items(self) -> list[tuple[str, Any]]:
+        return self.store.items(self.name)
+
+
+atexit.register(flush_kv_store)
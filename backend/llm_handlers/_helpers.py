@@ -3,9 +3,9 @@
 def get_user_lang(chat_id: str) -> str:
     """Obtém idioma do utilizador. Fallback: en."""
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import get_user_language
-        db = SessionLocal()
+        db = get_session()
         try:
             return get_user_language(db, chat_id) or "en"
         finally:
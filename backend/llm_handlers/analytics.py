@@ -43,11 +43,11 @@ async def handle_analytics(ctx: "HandlerContext", content: str) -> str | None:
 
     user_lang = get_user_lang(ctx.chat_id)
 
-    from backend.database import SessionLocal
+    from backend.database import get_session
     from backend.reminder_history import get_reminder_history
 
     tz_iana = "UTC"
-    db = SessionLocal()
+    db = get_session()
     try:
         from backend.user_store import get_user_timezone
         from backend.timezone import phone_to_default_timezone
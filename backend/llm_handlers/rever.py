@@ -96,9 +96,9 @@ async def handle_rever(ctx: "HandlerContext", content: str) -> str | None:
 
     if intent == "lembretes":
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.reminder_history import get_reminder_history
-            db = SessionLocal()
+            db = get_session()
             try:
                 entries = get_reminder_history(db, ctx.chat_id, kind=None, limit=50)
                 if not entries:
@@ -133,9 +133,9 @@ async def handle_rever(ctx: "HandlerContext", content: str) -> str | None:
             return f"Erro ao buscar lembretes: {e}"
 
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.reminder_history import get_last_scheduled, get_last_delivered
-        db = SessionLocal()
+        db = get_session()
         try:
             last_pedido = get_last_scheduled(db, ctx.chat_id)
             last_lembrete = get_last_delivered(db, ctx.chat_id)
@@ -1,44 +1,294 @@
 # backend/logger.py
+"""JSON logging for backend and zapista modules.
+
+Modes (env):
+- LOG_QUEUE=1 (default): records are only enqueued on the caller's thread; a background thread
+  formats them and writes to stdout in batches. LOG_QUEUE=0 writes synchronously, as before.
+- LOG_QUEUE_SIZE (default 10000): bounded queue; when full, records are dropped and counted.
+- LOG_RATE_LIMIT (default 200): max records per second per event name (the log message) below
+  ERROR; extra records are dropped, counted and summarised in a "log_rate_limited" record. 0 = off.
+- LOG_LEVEL (default INFO).
+
+Hot paths can skip building `extra` dicts with `if log_enabled(logger, logging.INFO, "event"):`,
+which is False when the level is off or the event is currently rate-limited.
+"""
+import atexit
 import logging
 import json
+import os
+import queue
 import sys
+import threading
+import time
+from collections import Counter
 from datetime import datetime, timezone
 
+from zapista.utils.helpers import env_int
+
+_get_trace_id = None
+
+
+def _trace_id() -> str | None:
+    """Current trace_id (resolved on the caller's thread: contextvars don't cross to the writer)."""
+    global _get_trace_id
+    if _get_trace_id is None:
+        try:
+            from zapista.utils.logging_config import get_trace_id
+        except ImportError:
+            return None
+        _get_trace_id = get_trace_id
+    return _get_trace_id()
+
+
 class JSONFormatter(logging.Formatter):
     """Formats log records as single-line JSON."""
     def format(self, record: logging.LogRecord) -> str:
         log_entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             "level": record.levelname,
             "module": record.module,
             "function": record.funcName,
             "message": record.getMessage(),
         }
-        
+
         # Inject trace_id if available (Zappelin/Zapista correlation)
-        try:
-            from zapista.utils.logging_config import get_trace_id
-            log_entry["trace_id"] = get_trace_id()
-        except ImportError:
-            pass
+        trace_id = record.trace_id if hasattr(record, "trace_id") else _trace_id()
+        if trace_id is not None:
+            log_entry["trace_id"] = trace_id
 
         if record.exc_info:
             log_entry["exception"] = self.formatException(record.exc_info)
-        
+        elif record.exc_text:
+            log_entry["exception"] = record.exc_text
+
         # Standard logging's 'extra' dictionary keys are added to the record object.
         # We also support a dedicated 'extra' key in the record for our structured logging.
         if hasattr(record, "extra") and isinstance(record.extra, dict):
             log_entry.update(record.extra)
-        
+
         return json.dumps(log_entry, ensure_ascii=False)
 
+
+_STOP = object()
+
+
+class JSONLogHandler(logging.Handler):
+    """Shared handler: per-event rate limit, then either enqueue (writer thread) or write inline."""
+
+    def __init__(self, use_queue: bool = True, queue_size: int = 10000, rate_limit: int = 200, batch_size: int = 256):
+        super().__init__()
+        self.setFormatter(JSONFormatter())
+        self.use_queue = use_queue
+        self.rate_limit = rate_limit
+        self.batch_size = batch_size
+        self.queue_size = max(1, queue_size)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()  # C put/get; bounded via queue_size below
+        self._enqueued = 0
+        self._processed = 0
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._windows: dict[str, list] = {}  # event -> [window_start, admitted, dropped]
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.dropped_queue_full = 0
+        self.dropped_rate_limited = 0
+        self.dropped_by_event: Counter[str] = Counter()
+
+    # --- rate limit (called with self.lock held or from log_enabled) ---
+
+    def _over_limit(self, event: str, now: float) -> bool:
+        window = self._windows.get(event)
+        return window is not None and now - window[0] < 1.0 and window[1] >= self.rate_limit
+
+    def _count_drop(self, event: str) -> None:
+        self._windows[event][2] += 1
+        self.dropped_rate_limited += 1
+        self.dropped_by_event[event] += 1
+
+    def _admit(self, record: logging.LogRecord) -> bool:
+        if self.rate_limit <= 0 or record.levelno >= logging.ERROR:
+            return True
+        event = record.msg if isinstance(record.msg, str) else str(record.msg)
+        now = time.monotonic()
+        if self._over_limit(event, now):
+            self._count_drop(event)
+            return False
+        window = self._windows.get(event)
+        if window is None or now - window[0] >= 1.0:
+            if window is not None and window[2]:
+                self._enqueue(self._summary(event, window[2]))
+            if len(self._windows) > 4096:  # f-string messages: forget expired windows
+                self._windows = {k: w for k, w in self._windows.items() if now - w[0] < 1.0}
+            self._windows[event] = [now, 1, 0]
+        else:
+            window[1] += 1
+        return True
+
+    def would_drop(self, event: str) -> bool:
+        """True when a record for event would be rate-limited now (counted as dropped)."""
+        if self.rate_limit <= 0:
+            return False
+        with self.lock:
+            if self._over_limit(event, time.monotonic()):
+                self._count_drop(event)
+                return True
+        return False
+
+    @staticmethod
+    def _summary(event: str, dropped: int) -> logging.LogRecord:
+        record = logging.LogRecord("backend.logger", logging.WARNING, __file__, 0, "log_rate_limited", None, None, "_admit")
+        record.extra = {"event": event, "dropped": dropped}
+        return record
+
+    # --- output ---
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if not self._admit(record):
+                return
+            if not self.use_queue or self._closed:
+                self._write([record])
+                return
+            # Everything that depends on the caller's context or mutable state is resolved here.
+            record.trace_id = _trace_id()
+            if record.args:
+                record.msg = record.getMessage()
+                record.args = None
+            if record.exc_info:
+                record.exc_text = self.formatter.formatException(record.exc_info)
+                record.exc_info = None
+            self._enqueue(record)
+        except Exception:
+            self.handleError(record)
+
+    def _enqueue(self, record: logging.LogRecord) -> None:
+        if not self.use_queue or self._closed:
+            self._write([record])
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+        if self._enqueued - self._processed >= self.queue_size:
+            self.dropped_queue_full += 1
+            return
+        self._enqueued += 1
+        self._queue.put(record)
+
+    def _write(self, records: list) -> None:
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.errors += 1
+        if not lines:
+            return
+        try:
+            stream = sys.stdout  # resolved per write (pytest capture, redirects)
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+            self.written += len(lines)
+            self.batches += 1
+        except Exception:
+            self.errors += 1
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(r is _STOP for r in batch)
+            records = [r for r in batch if r is not _STOP]
+            self._write(records)
+            self._processed += len(records)
+            if stop:
+                return
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """Wait until the writer has drained the queue (tests, shutdown)."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        deadline = time.monotonic() + timeout
+        while self._enqueued > self._processed and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def close(self) -> None:
+        if self._thread is not None and self._thread.is_alive() and not self._closed:
+            self._closed = True
+            try:
+                self._queue.put(_STOP)
+                self._thread.join(timeout=2.0)
+            except Exception:
+                pass
+        self._closed = True
+        super().close()
+
+    def stats(self) -> dict:
+        return {
+            "mode": "queue" if self.use_queue else "sync",
+            "queued": self._enqueued - self._processed,
+            "written": self.written,
+            "batches": self.batches,
+            "errors": self.errors,
+            "dropped_queue_full": self.dropped_queue_full,
+            "dropped_rate_limited": self.dropped_rate_limited,
+            "top_rate_limited": self.dropped_by_event.most_common(3),
+        }
+
+
+_HANDLER: JSONLogHandler | None = None
+_HANDLER_LOCK = threading.Lock()
+
+
+def _shared_handler() -> JSONLogHandler:
+    global _HANDLER
+    if _HANDLER is None:
+        with _HANDLER_LOCK:
+            if _HANDLER is None:
+                _HANDLER = JSONLogHandler(
+                    use_queue=os.environ.get("LOG_QUEUE", "1").strip().lower() not in ("0", "false", "no"),
+                    queue_size=env_int("LOG_QUEUE_SIZE", 10000),
+                    rate_limit=env_int("LOG_RATE_LIMIT", 200),
+                )
+                atexit.register(_HANDLER.close)
+    return _HANDLER
+
+
+def _level() -> int:
+    value = os.environ.get("LOG_LEVEL", "").strip().upper()
+    level = logging.getLevelName(value) if value else logging.INFO
+    return level if isinstance(level, int) else logging.INFO
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a JSON-formatted logger for a module."""
     logger = logging.getLogger(name)
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(JSONFormatter())
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
+        logger.addHandler(_shared_handler())
+        logger.setLevel(_level())
         logger.propagate = False
     return logger
+
+
+def log_enabled(logger: logging.Logger, level: int, event: str | None = None) -> bool:
+    """Level gate for hot paths: False if level is off or event is rate-limited right now."""
+    if not logger.isEnabledFor(level):
+        return False
+    if event is None or level >= logging.ERROR or _HANDLER is None or _HANDLER not in logger.handlers:
+        return True
+    return not _HANDLER.would_drop(event)
+
+
+def flush_logs(timeout: float = 2.0) -> None:
+    """Block until queued records are written."""
+    if _HANDLER is not None:
+        _HANDLER.flush(timeout)
+
+
+def get_log_stats() -> dict | None:
+    """Counters of the shared handler (for #system)."""
+    return _HANDLER.stats() if _HANDLER is not None else None
@@ -16,7 +16,7 @@ def _utc_now() -> datetime:
 
 # FIX EXPLANATION: Keeps naive UTC for compatibility with SQLAlchemy's default DateTime columns and clarifies the contract.
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON, Float, Index
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -206,6 +206,26 @@ class SentReminderMapping(Base):
     created_at = Column(DateTime, default=_utc_now)
 
 
+class CronJobRow(Base):
+    """Job do cron (CRON_STORE=sqlite). data = job completo em JSON (formato camelCase do jobs.json);
+    as outras colunas são cópias para índices/consultas (próximo disparo, destinatário, ligações entre jobs)."""
+    __tablename__ = "cron_jobs"
+    __table_args__ = (Index("ix_cron_jobs_to_next_run", "payload_to", "next_run_at_ms"),)
+
+    id = Column(String(64), primary_key=True)
+    name = Column(String(256), nullable=False)
+    enabled = Column(Boolean, default=True, nullable=False)
+    schedule_kind = Column(String(8), nullable=False)            # at | every | cron
+    next_run_at_ms = Column(Integer, nullable=True, index=True)
+    payload_to = Column(String(256), nullable=True, index=True)  # chat_id do destinatário
+    depends_on_job_id = Column(String(64), nullable=True, index=True)
+    parent_job_id = Column(String(64), nullable=True, index=True)
+    deadline_check_for_job_id = Column(String(64), nullable=True, index=True)
+    deadline_main_job_id = Column(String(64), nullable=True, index=True)
+    updated_at_ms = Column(Integer, default=0)
+    data = Column(Text, nullable=False)
+
+
 class HouseChoreTask(Base):
     """Tarefa de limpeza: frequency weekly | bi-weekly, weekday, time."""
     __tablename__ = "house_chore_tasks"
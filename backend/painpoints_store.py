@@ -1,13 +1,27 @@
 """Painpoints de clientes: registo para atendimento ao cliente contactar.
 
 Usado quando Mimo detecta frustração/reclamação no histórico ou quando o cliente pede contato.
+Guardado no KVStore (namespace client_painpoints, chave entries: lista dos últimos _MAX_ENTRIES).
 """
 
-import json
 import time
 from pathlib import Path
 
-_STORE_PATH = Path.home() / ".zapista" / "security" / "client_painpoints.json"
+from backend.kv_store import Namespace, read_legacy_json
+
+_LEGACY_PATH = Path.home() / ".zapista" / "security" / "client_painpoints.json"
+_MAX_ENTRIES = 200
+
+
+def _import_legacy() -> dict[str, list]:
+    """client_painpoints.json antigo (lista) → chave entries."""
+    entries = read_legacy_json(_LEGACY_PATH)
+    if not isinstance(entries, list):
+        return {}
+    return {"entries": entries[-_MAX_ENTRIES:]}
+
+
+_painpoints = Namespace("client_painpoints", legacy=_import_legacy)
 
 
 def _digits_from_chat_id(chat_id: str) -> str:
@@ -24,30 +38,27 @@ def _format_phone(digits: str) -> str:
 def add_painpoint(chat_id: str, reason: str = "frustração/reclamação") -> None:
     """Regista um cliente como painpoint (atendimento deve contactar)."""
     try:
-        _STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
-        entries: list[dict] = []
-        if _STORE_PATH.exists():
-            try:
-                entries = json.loads(_STORE_PATH.read_text())
-            except Exception:
-                entries = []
         digits = _digits_from_chat_id(chat_id)
         if not digits:
             return
         phone_display = _format_phone(digits)
         ts = int(time.time())
-        # Evitar duplicados recentes (mesmo número nas últimas 24h)
-        for e in entries:
-            if e.get("digits") == digits and (ts - (e.get("timestamp") or 0)) < 86400:
-                return
-        entries.append({
+        entry = {
             "digits": digits,
             "phone_display": phone_display,
             "timestamp": ts,
             "reason": (reason or "frustração/reclamação")[:100],
-        })
-        entries = entries[-200:]  # manter últimos 200
-        _STORE_PATH.write_text(json.dumps(entries, ensure_ascii=False, indent=0))
+        }
+
+        def _add(entries):
+            entries = entries or []
+            # Evitar duplicados recentes (mesmo número nas últimas 24h)
+            for e in entries:
+                if e.get("digits") == digits and (ts - (e.get("timestamp") or 0)) < 86400:
+                    return entries
+            return (entries + [entry])[-_MAX_ENTRIES:]
+
+        _painpoints.update("entries", _add)
     except Exception:
         pass
 
@@ -55,9 +66,6 @@ def add_painpoint(chat_id: str, reason: str = "frustração/reclamação") -> No
 def get_painpoints() -> list[dict]:
     """Lista painpoints para #painpoints (God mode)."""
     try:
-        if not _STORE_PATH.exists():
-            return []
-        entries = json.loads(_STORE_PATH.read_text())
-        return list(reversed(entries[-50:]))  # últimos 50
+        return list(reversed((_painpoints.get("entries") or [])[-50:]))  # últimos 50
     except Exception:
         return []
@@ -157,25 +157,28 @@ async def _call_perplexity_chat(api_key: str, user_message: str, lang: str = "pt
     }
     system = instructions.get(lang, instructions["en"])
     try:
-        async with httpx.AsyncClient(timeout=PERPLEXITY_TIMEOUT) as client:
-            r = await client.post(
-                PERPLEXITY_CHAT_URL,
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": PERPLEXITY_MODEL,
-                    "messages": [
-                        {"role": "system", "content": system},
-                        {"role": "user", "content": user_message},
-                    ],
-                    "max_tokens": 1024,
-                    "temperature": 0.2,
-                },
-            )
-            r.raise_for_status()
-            data = r.json()
+        from zapista.utils.http_clients import upstream_request
+        r = await upstream_request(
+            "perplexity",
+            "POST",
+            PERPLEXITY_CHAT_URL,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": PERPLEXITY_MODEL,
+                "messages": [
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user_message},
+                ],
+                "max_tokens": 1024,
+                "temperature": 0.2,
+            },
+            timeout=PERPLEXITY_TIMEOUT,
+        )
+        r.raise_for_status()
+        data = r.json()
     except httpx.TimeoutException:
         return None
     except Exception:
@@ -239,8 +242,8 @@ async def handle_recipe(ctx: "HandlerContext", content: str) -> str | None:
     user_lang = "pt-BR"
     try:
         from backend.user_store import get_user_language
-        from backend.database import SessionLocal
-        db = SessionLocal()
+        from backend.database import get_session
+        db = get_session()
         try:
             user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         finally:
@@ -279,8 +282,8 @@ async def _handle_save_provided_recipe(ctx: "HandlerContext", content: str) -> s
     user_lang = "pt-BR"
     try:
         from backend.user_store import get_user_language
-        from backend.database import SessionLocal
-        db = SessionLocal()
+        from backend.database import get_session
+        db = get_session()
         try:
             user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         finally:
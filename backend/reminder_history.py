@@ -20,8 +20,11 @@ def add_scheduled(
     schedule_at: datetime | None = None,
     channel: str | None = None,
     recipient: str | None = None,
+    commit: bool = True,
 ) -> None:
-    """Regista um pedido de lembrete agendado (para rever depois)."""
+    """Regista um pedido de lembrete agendado (para rever depois).
+    commit=False: só flush; o chamador faz commit (ex.: mesma transação que o job em cron_jobs).
+    """
     user = get_or_create_user(db, chat_id)
     row = ReminderHistory(
         user_id=user.id,
@@ -35,7 +38,10 @@ def add_scheduled(
     )
     db.add(row)
     _trim_history(db, user.id)
-    db.commit()
+    if commit:
+        db.commit()
+    else:
+        db.flush()
 
 
 def add_delivered(db: Session, chat_id: str, message: str) -> None:
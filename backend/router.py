@@ -1,6 +1,9 @@
 """Lista de handlers e função route() para despacho de mensagens."""
 
 import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterator
 
 from backend.handler_context import HandlerContext
 from backend.handlers import (
@@ -54,63 +57,296 @@ from backend.views import (
 )
 
 
+# ---------------------------------------------------------------------------
+# Pré-condições baratas por handler (índice de despacho)
+# ---------------------------------------------------------------------------
+# Antes, route() aguardava os ~50 handlers por ordem até um responder; muitos abrem sessão de BD
+# ou correm regex grandes só para recusar. Cada Route declara o que o handler exige logo à entrada
+# (o mesmo teste que o handler faz antes de qualquer I/O):
+# - commands: prefixos de comando com barra (texto como chega ou após normalize_nl_to_command,
+#   que é o que os handlers fazem);
+# - intents: tipos devolvidos por command_parser.parse (calculado uma vez por texto);
+# - when: predicado puro do próprio handler (regex, sem BD/LLM).
+# Um handler é candidato se alguma pré-condição declarada bater; sem nenhuma (fluxos com estado
+# por chat, lembretes em linguagem natural) é sempre candidato. A ordem de prioridade mantém-se.
+
+
+@dataclass(frozen=True)
+class Route:
+    handler: Callable[[HandlerContext, str], Awaitable[Any]]
+    commands: tuple[str, ...] = ()
+    intents: tuple[str, ...] = ()
+    when: Callable[[str], bool] | None = None
+
+    @property
+    def name(self) -> str:
+        return getattr(self.handler, "__name__", "unknown")
+
+    @property
+    def always(self) -> bool:
+        return not (self.commands or self.intents or self.when)
+
+
+def _renormalized(text: str) -> str:
+    from backend.command_nl import normalize_nl_to_command
+    return normalize_nl_to_command(text) or ""
+
+
+def _when_atendimento(text: str) -> bool:
+    from backend.atendimento_contact import is_atendimento_request
+    return is_atendimento_request(text)
+
+
+def _when_pending_confirmation(text: str) -> bool:
+    from backend.pending_confirmation import looks_like_confirmation, looks_like_time_response
+    return looks_like_confirmation(text) or looks_like_time_response(text)
+
+
+def _when_search(text: str) -> bool:
+    from backend.search_handler import _is_search_intent
+    return _is_search_intent(text)
+
+
+def _when_eventos_unificado(text: str) -> bool:
+    from backend.views.unificado import _is_eventos_unificado_intent
+    return _is_eventos_unificado_intent(text)
+
+
+def _when_agenda_remove(text: str) -> bool:
+    from backend.handlers_agenda_remove import _extract_event_reference
+    return _extract_event_reference(text) is not None
+
+
+def _when_agenda_nl(text: str) -> bool:
+    from backend.views.hoje_semana import _AGENDA_NL_PHRASES
+    return (text or "").strip().lower().rstrip(".?!") in _AGENDA_NL_PHRASES
+
+
+def _when_sacred_text(text: str) -> bool:
+    from backend.integrations.sacred_text import _is_sacred_text_intent
+    return _is_sacred_text_intent(text)
+
+
+def _when_pomodoro(text: str) -> bool:
+    from backend.handlers_pomodoro import _NL_POMODORO_INFO, _is_nl_pomodoro_start
+    t = (text or "").strip()
+    return _is_nl_pomodoro_start(t) or bool(_NL_POMODORO_INFO.search(t))
+
+
+def _when_quiet(text: str) -> bool:
+    from backend.settings_handlers import _is_nl_quiet_off
+    return _is_nl_quiet_off(_renormalized(text).strip())
+
+
+def _when_recipe(text: str) -> bool:
+    from backend.recipe_handler import _is_recipe_intent, _is_save_recipe_intent
+    t = (text or "").strip()
+    return _is_save_recipe_intent(t) or _is_recipe_intent(t)
+
+
+def _when_limpeza(text: str) -> bool:
+    from backend.handlers_limpeza import _is_limpeza_nl_intent
+    return _is_limpeza_nl_intent(_renormalized(text).strip())
+
+
+def _when_crypto(text: str) -> bool:
+    from backend.integrations.crypto import is_crypto_intent
+    return is_crypto_intent(text)
+
+
+def _when_resumo_conversa(text: str) -> bool:
+    from backend.llm_handlers.resumo import _is_resumo_conversa_intent
+    return _is_resumo_conversa_intent(text)
+
+
+def _when_analytics(text: str) -> bool:
+    from backend.llm_handlers.analytics import _is_analytics_intent
+    return _is_analytics_intent(text)
+
+
+def _when_rever(text: str) -> bool:
+    from backend.llm_handlers.rever import _parse_rever_intent
+    return _parse_rever_intent(text)[0] is not None
+
+
 # ---------------------------------------------------------------------------
 # Lista mestre de Handlers (por ordem de prioridade)
 # ---------------------------------------------------------------------------
-HANDLERS = [
-    handle_atendimento_request,
-    handle_pending_confirmation,
-    handle_feito,
-    handle_remove,
-    handle_curated_search,  # Busca filmes/livros/música — antes de list
-    handle_list,  # primeiro: "cria lista de X", "mostre lista" → evita cair no LLM com histórico de erro
-    handle_list_or_events_ambiguous,  # "tenho de X, Y" → pergunta lista ou lembretes
-    handle_eventos_unificado,  # Handle periods/specific dates first
-    handle_agenda_remove,  # "remover a consulta", "já fiz a reunião" → remove da agenda
-    handle_agenda_nl,  # "minha agenda", "o que tenho hoje/amanhã"
-    handle_vague_time_reminder,
-    handle_recurring_event,
-    handle_sacred_text,  # ativo: responde quando cliente pede versículo bíblia/alcorão
-    handle_pomodoro,  # /pomodoro — timer 25 min foco
-    handle_quiet,  # /quiet e NL "parar horário silencioso" — antes do fluxo de lembrete
-    handle_recipe,  # receita/ingredientes via Perplexity (rápido, fallback agent)
-    handle_recurring_prompt,
-    handle_lembrete,
-    handle_add,
-    handle_start,
-    handle_help,
-    handle_recorrente,
-    handle_limpeza,  # fallback limpeza: "preciso limpar a casa" → fluxo limpeza
-    handle_pendente,
-    handle_hora_data,
-    handle_hoje,
-    handle_semana,
-    handle_agenda,
-    handle_mes,
-    handle_timeline,
-    handle_stats,
-    handle_produtividade,
-    handle_revisao,
-    handle_metas,
-    handle_meta,
-    handle_projetos,
-    handle_projeto,
-    handle_templates,
-    handle_template,
-    handle_crypto,
-    handle_tz,
-    handle_lang,
-    handle_resumo_conversa,
-    handle_analytics,
-    handle_rever,
-    handle_resume,
-    handle_stop,
-    handle_reset,
-    handle_exportar,
-    handle_deletar_tudo,
-    handle_nuke,
+ROUTES = [
+    Route(handle_atendimento_request, when=_when_atendimento),
+    Route(handle_pending_confirmation, when=_when_pending_confirmation),
+    Route(handle_feito, intents=("feito",)),
+    Route(handle_remove, intents=("remove",)),
+    Route(handle_curated_search, when=_when_search),  # Busca filmes/livros/música — antes de list
+    Route(handle_list, intents=("list_add", "list_show")),  # primeiro: "cria lista de X", "mostre lista" → evita cair no LLM com histórico de erro
+    Route(handle_list_or_events_ambiguous, intents=("list_or_events_ambiguous",)),  # "tenho de X, Y" → pergunta lista ou lembretes
+    Route(handle_eventos_unificado, when=_when_eventos_unificado),  # Handle periods/specific dates first
+    Route(handle_agenda_remove, when=_when_agenda_remove),  # "remover a consulta", "já fiz a reunião" → remove da agenda
+    Route(handle_agenda_nl, commands=("/agenda",), when=_when_agenda_nl),  # "minha agenda", "o que tenho hoje/amanhã"
+    Route(handle_vague_time_reminder),
+    Route(handle_recurring_event),
+    Route(handle_sacred_text, when=_when_sacred_text),  # ativo: responde quando cliente pede versículo bíblia/alcorão
+    Route(handle_pomodoro, commands=("/pomodoro",), when=_when_pomodoro),  # /pomodoro — timer 25 min foco
+    Route(handle_quiet, commands=("/quiet", "/silencio", "/silent"), when=_when_quiet),  # /quiet e NL "parar horário silencioso" — antes do fluxo de lembrete
+    Route(handle_recipe, when=_when_recipe),  # receita/ingredientes via Perplexity (rápido, fallback agent)
+    Route(handle_recurring_prompt),
+    Route(handle_lembrete),
+    Route(handle_add, commands=("/add", "/añadir")),
+    Route(handle_start, commands=("/start",)),
+    Route(handle_help, commands=("/help", "/ajuda", "/ayuda")),
+    Route(handle_recorrente, commands=("/recorrente",)),
+    Route(handle_limpeza, commands=("/limpeza",), when=_when_limpeza),  # fallback limpeza: "preciso limpar a casa" → fluxo limpeza
+    Route(handle_pendente, commands=("/pendente",)),
+    Route(handle_hora_data, intents=("hora", "data")),
+    Route(handle_hoje, commands=("/hoje",)),
+    Route(handle_semana, commands=("/semana",)),
+    Route(handle_agenda, commands=("/agenda",)),
+    Route(handle_mes, commands=("/mes", "/mês")),
+    Route(handle_timeline, commands=("/timeline",)),
+    Route(handle_stats, commands=("/stats",)),
+    Route(handle_produtividade, commands=("/produtividade",)),
+    Route(handle_revisao, commands=("/resumo", "/revisao")),
+    Route(handle_metas, commands=("/metas",)),
+    Route(handle_meta, commands=("/meta",)),
+    Route(handle_projetos, commands=("/projetos",)),
+    Route(handle_projeto, commands=("/projeto",)),
+    Route(handle_templates, commands=("/templates",)),
+    Route(handle_template, commands=("/template",)),
+    Route(handle_crypto, when=_when_crypto),
+    Route(handle_tz, commands=("/tz", "/fuso", "/timezone")),
+    Route(handle_lang, commands=("/lang",)),
+    Route(handle_resumo_conversa, when=_when_resumo_conversa),
+    Route(handle_analytics, when=_when_analytics),
+    Route(handle_rever, when=_when_rever),
+    Route(handle_resume, commands=("/resume", "/start", "/continuar", "/retomar")),
+    Route(handle_stop, commands=("/stop",)),
+    Route(handle_reset, commands=("/reset", "/reboot", "/reiniciar")),
+    Route(handle_exportar, commands=("/exportar",)),
+    Route(handle_deletar_tudo, commands=("/deletar",)),
+    Route(handle_nuke, commands=("/nuke", "/bomba", "/bomb")),
 ]
 
+HANDLERS = [r.handler for r in ROUTES]
+
+# prefixo de comando → índices em ROUTES (lookup pelos prefixos da 1.ª palavra, não por varrimento)
+_COMMAND_INDEX: dict[str, list[int]] = {}
+for _i, _r in enumerate(ROUTES):
+    for _prefix in _r.commands:
+        _COMMAND_INDEX.setdefault(_prefix.lower(), []).append(_i)
+
+
+def _command_matches(text: str) -> set[int]:
+    """Índices de ROUTES cujo prefixo de comando bate no texto (tal como chega ou renormalizado)."""
+    found: set[int] = set()
+    for form in {text.strip().lower(), _renormalized(text).strip().lower()}:
+        if not form.startswith("/"):
+            continue
+        word = form.split(None, 1)[0]
+        for end in range(2, len(word) + 1):
+            found.update(_COMMAND_INDEX.get(word[:end], ()))
+    return found
+
+
+class _Probe:
+    """Pré-condições calculadas no máximo uma vez por texto (parse só se algum candidato o pedir)."""
+
+    __slots__ = ("text", "commands", "_intent", "_parsed")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.commands = _command_matches(text)
+        self._intent: str | None = None
+        self._parsed = False
+
+    @property
+    def intent(self) -> str | None:
+        if not self._parsed:
+            self._parsed = True
+            try:
+                from backend.command_parser import parse
+                self._intent = (parse(self.text) or {}).get("type")
+            except Exception:
+                self._intent = None
+        return self._intent
+
+    def accepts(self, index: int, route: Route) -> bool:
+        if route.always or index in self.commands:
+            return True
+        if route.intents and self.intent in route.intents:
+            return True
+        if route.when is not None:
+            try:
+                return bool(route.when(self.text))
+            except Exception:
+                return True  # na dúvida, deixar o handler decidir
+        return False
+
+
+def candidate_routes(text: str) -> Iterator[Route]:
+    """ROUTES cujas pré-condições batem no texto, pela ordem de prioridade (avaliadas à medida)."""
+    probe = _Probe(text)
+    for index, route in enumerate(ROUTES):
+        if probe.accepts(index, route):
+            yield route
+        else:
+            _stats(route.name)["skipped"] += 1
+
+
+# ---------------------------------------------------------------------------
+# Métricas por handler (para #system)
+# ---------------------------------------------------------------------------
+_HANDLER_STATS: dict[str, dict[str, float]] = {}
+_ROUTE_STATS = {"dispatches": 0, "handlers_awaited": 0}
+
+
+def _stats(name: str) -> dict[str, float]:
+    st = _HANDLER_STATS.get(name)
+    if st is None:
+        st = _HANDLER_STATS[name] = {
+            "hits": 0, "misses": 0, "errors": 0, "skipped": 0, "hit_ms": 0.0, "miss_ms": 0.0,
+        }
+    return st
+
+
+def get_router_stats() -> dict[str, Any]:
+    """Despachos, handlers aguardados por despacho e, por handler, acertos/recusas e tempo gasto a recusar."""
+    dispatches = _ROUTE_STATS["dispatches"]
+    return {
+        "dispatches": dispatches,
+        "handlers_per_dispatch": round(_ROUTE_STATS["handlers_awaited"] / dispatches, 2) if dispatches else 0.0,
+        "handlers": {name: dict(st) for name, st in _HANDLER_STATS.items()},
+    }
+
+
+async def _dispatch(ctx: HandlerContext, text: str, strict: bool, failed_event: str, line: str | None = None):
+    """Aguarda os handlers candidatos por ordem; devolve a 1.ª resposta não-None (ou None)."""
+    _ROUTE_STATS["dispatches"] += 1
+    for route in candidate_routes(text):
+        st = _stats(route.name)
+        _ROUTE_STATS["handlers_awaited"] += 1
+        t0 = time.perf_counter()
+        try:
+            out = await route.handler(ctx, text)
+        except Exception as e:
+            st["errors"] += 1
+            st["miss_ms"] += (time.perf_counter() - t0) * 1000
+            if strict: raise
+            from backend.logger import get_logger
+            logger = get_logger(__name__)
+            detail = {"handler": route.name, "error": str(e)}
+            if line is not None:
+                detail = {"handler": route.name, "line": line[:100], "error": str(e)}
+            logger.debug(failed_event, extra={"extra": detail})
+            continue
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        if out is not None:
+            st["hits"] += 1
+            st["hit_ms"] += elapsed_ms
+            return out
+        st["misses"] += 1
+        st["miss_ms"] += elapsed_ms
+    return None
+
 
 async def route(ctx: HandlerContext, content: str) -> str | None:
     """Despacha mensagem para o handler adequado. Retorna texto ou None (fallback LLM)."""
@@ -120,9 +356,9 @@ async def route(ctx: HandlerContext, content: str) -> str | None:
     # Se o utilizador usou /ayuda, reforçar idioma espanhol para lembretes e respostas seguintes
     if content.strip().lower().startswith("/ayuda"):
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import set_user_language
-            db = SessionLocal()
+            db = get_session()
             try:
                 set_user_language(db, ctx.chat_id, "es")
                 db.commit()
@@ -156,19 +392,9 @@ async def route(ctx: HandlerContext, content: str) -> str | None:
     strict = os.environ.get("STRICT_HANDLERS", "").strip().lower() in ("1", "true", "yes")
     
     # Tentativa 1: Tratar o bloco inteiro como um só comando (comportamento original)
-    for h in HANDLERS:
-        try:
-            out = await h(ctx, content_norm)
-            if out is not None:
-                return out
-        except Exception as e:
-            if strict: raise
-            from backend.logger import get_logger
-            logger = get_logger(__name__)
-            logger.debug("handler_failed_full_block", extra={"extra": {
-                "handler": getattr(h, "__name__", "unknown"),
-                "error": str(e)
-            }})
+    out = await _dispatch(ctx, content_norm, strict, "handler_failed_full_block")
+    if out is not None:
+        return out
 
     # Tentativa 2: Se tem múltiplas linhas, tentar processar cada uma como comando/NL separado (Batch Handling)
     lines = content.strip().splitlines()
@@ -181,26 +407,13 @@ async def route(ctx: HandlerContext, content: str) -> str | None:
             line_norm = normalize_nl_to_command(line)
             line_norm = normalize_command(line_norm.strip())
             
-            line_handled = False
-            for h in HANDLERS:
-                try:
-                    out = await h(ctx, line_norm)
-                    if out is not None:
-                        if isinstance(out, list):
-                            results.extend(out)
-                        else:
-                            results.append(out)
-                        line_handled = True
-                        break
-                except Exception as e:
-                    from backend.logger import get_logger
-                    logger = get_logger(__name__)
-                    logger.debug("handler_failed_batch_line", extra={"extra": {
-                        "handler": getattr(h, "__name__", "unknown"),
-                        "line": line[:100],
-                        "error": str(e)
-                    }})
-            
+            out = await _dispatch(ctx, line_norm, False, "handler_failed_batch_line", line=line)
+            line_handled = out is not None
+            if isinstance(out, list):
+                results.extend(out)
+            elif out is not None:
+                results.append(out)
+
             if not line_handled:
                 from backend.logger import get_logger
                 logger = get_logger(__name__)
@@ -69,8 +69,8 @@ async def handle_curated_search(ctx: HandlerContext, content: str) -> str | None
     user_lang = "pt-BR"
     try:
         from backend.user_store import get_user_language
-        from backend.database import SessionLocal
-        db = SessionLocal()
+        from backend.database import get_session
+        db = get_session()
         try:
             user_lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         finally:
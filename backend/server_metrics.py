@@ -1,17 +1,23 @@
 """
 Métricas do servidor para #server (god-mode): snapshot atual + histórico N dias.
 Usado para detectar tendências: vazamento RAM, disco a encher, cron atrasado, etc.
+
+Guardado no KVStore (namespace server_metrics): record_event (chamado por mensagem/evento)
+só atualiza a cache em memória; snapshots e agregados diários são uma chave por dia, com TTL
+de DEFAULT_HISTORY_DAYS.
 """
 
-import json
 import os
 import time
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+from backend.kv_store import Namespace, read_legacy_json
+
 # Retenção padrão de histórico (dias)
 DEFAULT_HISTORY_DAYS = 14
+_HISTORY_TTL = (DEFAULT_HISTORY_DAYS + 1) * 86400
 
 
 def _metrics_path() -> Path:
@@ -19,33 +25,49 @@ def _metrics_path() -> Path:
     return data_dir / "server_metrics.json"
 
 
-def _load_metrics() -> dict[str, Any]:
-    path = _metrics_path()
-    if not path.exists():
-        return {"snapshots": {}, "daily": {}, "today_events": {}, "last_pid": None, "last_create_time": None}
-    try:
-        data = json.loads(path.read_text())
-        return data
-    except Exception:
-        return {"snapshots": {}, "daily": {}, "today_events": {}, "last_pid": None, "last_create_time": None}
+def _import_legacy() -> dict[str, Any]:
+    """server_metrics.json antigo → chaves snapshots:<dia>, daily:<dia>, today_events, last_*."""
+    data = read_legacy_json(_metrics_path())
+    if not isinstance(data, dict):
+        return {}
+    out: dict[str, Any] = {}
+    for day, snaps in (data.get("snapshots") or {}).items():
+        out[f"snapshots:{day}"] = snaps
+    for day, agg in (data.get("daily") or {}).items():
+        out[f"daily:{day}"] = agg
+    for key in ("today_events", "last_pid", "last_create_time"):
+        if data.get(key) is not None:
+            out[key] = data[key]
+    return out
 
 
-def _save_metrics(data: dict[str, Any]) -> None:
-    path = _metrics_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, indent=2))
+_metrics = Namespace("server_metrics", legacy=_import_legacy)
+
+
+def _load_metrics() -> dict[str, Any]:
+    """Vista no formato do antigo server_metrics.json (leitores em admin_commands)."""
+    data: dict[str, Any] = {"snapshots": {}, "daily": {}, "today_events": {}, "last_pid": None, "last_create_time": None}
+    for key, value in _metrics.items():
+        kind, _, day = key.partition(":")
+        if day and kind in ("snapshots", "daily"):
+            data[kind][day] = value
+        else:
+            data[key] = value
+    return data
 
 
 def record_event(event_type: str) -> None:
     """Regista um evento (whatsapp_skipped, unknown_channel, bridge_reconnect)."""
     today = date.today().isoformat()
-    data = _load_metrics()
-    events = data.setdefault("today_events", {})
-    if events.get("_date") != today:
-        events.clear()
-        events["_date"] = today
-    events[event_type] = events.get(event_type, 0) + 1
-    _save_metrics(data)
+
+    def _bump(events: dict | None) -> dict:
+        events = dict(events or {})
+        if events.get("_date") != today:
+            events = {"_date": today}
+        events[event_type] = events.get(event_type, 0) + 1
+        return events
+
+    _metrics.update("today_events", _bump)
 
 
 def record_snapshot(
@@ -64,7 +86,6 @@ def record_snapshot(
         return None
 
     today = date.today().isoformat()
-    data = _load_metrics()
 
     # Snapshot atual
     mem = psutil.virtual_memory()
@@ -112,11 +133,12 @@ def record_snapshot(
     # Cron
     cron_jobs = 0
     cron_delayed_60s = 0
-    if cron_store_path and cron_store_path.exists():
+    from zapista.cron.storage import load_jobs_raw, store_available
+    if cron_store_path and store_available(cron_store_path):
         try:
-            jdata = json.loads(cron_store_path.read_text())
+            jobs = load_jobs_raw(cron_store_path)
             now_ms = int(time.time() * 1000)
-            for j in jdata.get("jobs", []):
+            for j in jobs:
                 if j.get("enabled", True):
                     cron_jobs += 1
                     nr = (j.get("state") or {}).get("nextRunAtMs")
@@ -146,28 +168,21 @@ def record_snapshot(
         "create_time": create_time,
     }
 
-    snapshots = data.setdefault("snapshots", {})
-    if today not in snapshots:
-        snapshots[today] = []
-    snapshots[today].append(snapshot)
     # Manter no máx 96 snapshots por dia (a cada 15 min)
-    snapshots[today] = snapshots[today][-96:]
+    snapshots = (_metrics.get(f"snapshots:{today}") or []) + [snapshot]
+    _metrics.set(f"snapshots:{today}", snapshots[-96:], ttl=_HISTORY_TTL)
 
     # Agregar no daily
-    daily = data.setdefault("daily", {})
-    if today not in daily:
-        daily[today] = {
-            "ram_max": 0,
-            "load_max": 0,
-            "load_spikes": 0,
-            "disk_mb": 0,
-            "cron_jobs": 0,
-            "cron_delayed_60s_max": 0,
-            "gateway_restarts": 0,
-            "bridge_reconnects": 0,
-        }
-
-    d = daily[today]
+    d = dict(_metrics.get(f"daily:{today}") or {
+        "ram_max": 0,
+        "load_max": 0,
+        "load_spikes": 0,
+        "disk_mb": 0,
+        "cron_jobs": 0,
+        "cron_delayed_60s_max": 0,
+        "gateway_restarts": 0,
+        "bridge_reconnects": 0,
+    })
     d["ram_max"] = max(d.get("ram_max", 0), snapshot["ram_pct"])
     d["load_max"] = max(d.get("load_max", 0), snapshot["load_1m"])
     if snapshot["load_1m"] > 1.5:
@@ -177,40 +192,39 @@ def record_snapshot(
     d["cron_delayed_60s_max"] = max(d.get("cron_delayed_60s_max", 0), snapshot["cron_delayed_60s"])
 
     # Eventos de hoje (whatsapp_skipped, unknown_channel)
-    events = data.get("today_events", {})
+    events = _metrics.get("today_events") or {}
     if events.get("_date") == today:
         d["whatsapp_skipped"] = events.get("whatsapp_skipped", 0)
         d["unknown_channel"] = events.get("unknown_channel", 0)
     d["bridge_reconnects"] = events.get("bridge_reconnect", 0)
 
     # Detetar restart do gateway
-    last_pid = data.get("last_pid")
-    last_create = data.get("last_create_time")
+    last_pid = _metrics.get("last_pid")
+    last_create = _metrics.get("last_create_time")
     if last_pid is not None and last_create is not None:
         if create_time > last_create + 60:  # novo processo (restart)
             d["gateway_restarts"] = d.get("gateway_restarts", 0) + 1
-    data["last_pid"] = proc.pid
-    data["last_create_time"] = create_time
+    _metrics.set(f"daily:{today}", d, ttl=_HISTORY_TTL)
+    _metrics.set("last_pid", proc.pid)
+    _metrics.set("last_create_time", create_time)
 
-    # Purge dias antigos
+    # Purge dias antigos (chaves importadas do ficheiro antigo não têm TTL)
     cutoff = date.today() - timedelta(days=DEFAULT_HISTORY_DAYS)
-    for k in list(snapshots.keys()):
-        try:
-            if datetime.fromisoformat(k).date() < cutoff:
-                del snapshots[k]
-                if k in daily:
-                    del daily[k]
-        except Exception:
-            pass
+    for key, _ in _metrics.items():
+        kind, _, day = key.partition(":")
+        if kind in ("snapshots", "daily") and day:
+            try:
+                if datetime.fromisoformat(day).date() < cutoff:
+                    _metrics.delete(key)
+            except Exception:
+                pass
 
-    _save_metrics(data)
     return snapshot
 
 
 def get_historical(days: int = 7) -> list[dict[str, Any]]:
     """Retorna agregados diários dos últimos N dias."""
-    data = _load_metrics()
-    daily = data.get("daily", {})
+    daily = _load_metrics()["daily"]
     today = date.today()
     result = []
     for i in range(days):
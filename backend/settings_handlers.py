@@ -7,7 +7,7 @@ from backend.handler_context import HandlerContext
 
 async def handle_tz(ctx: HandlerContext, content: str) -> str | None:
     """/tz Cidade, /fuso ou /timezone IANA."""
-    from backend.database import SessionLocal
+    from backend.database import get_session
     from backend.user_store import get_user_language, get_user_timezone
     from backend.locale import (
         SETTINGS_TZ_USAGE, SETTINGS_TZ_NOT_FOUND, SETTINGS_TZ_SET,
@@ -15,7 +15,7 @@ async def handle_tz(ctx: HandlerContext, content: str) -> str | None:
     )
     def _lang():
         try:
-            db = SessionLocal()
+            db = get_session()
             try:
                 return get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             finally:
@@ -26,7 +26,7 @@ async def handle_tz(ctx: HandlerContext, content: str) -> str | None:
     # Se for apenas /tz ou /fuso ou /timezone, mostrar o atual
     if re.match(r"^/(tz|fuso|timezone)\s*$", content.strip(), re.I):
         try:
-            db = SessionLocal()
+            db = get_session()
             try:
                 lg = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
                 tz_current = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
@@ -63,9 +63,9 @@ async def handle_tz(ctx: HandlerContext, content: str) -> str | None:
         lg = _lang()
         return SETTINGS_TZ_NOT_FOUND.get(lg, SETTINGS_TZ_NOT_FOUND["en"]).format(city=raw)
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import set_user_timezone
-        db = SessionLocal()
+        db = get_session()
         try:
             lg = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             if set_user_timezone(db, ctx.chat_id, tz_iana):
@@ -81,7 +81,7 @@ async def handle_tz(ctx: HandlerContext, content: str) -> str | None:
 
 async def handle_lang(ctx: HandlerContext, content: str) -> str | None:
     """/lang pt-pt | pt-br | es | en."""
-    from backend.database import SessionLocal
+    from backend.database import get_session
     from backend.user_store import get_user_language
     from backend.locale import SETTINGS_LANG_USAGE, SETTINGS_LANG_SET, SETTINGS_LANG_ERROR
     m = re.match(r"^/lang\s+(\S+)\s*$", content.strip(), re.I)
@@ -92,7 +92,7 @@ async def handle_lang(ctx: HandlerContext, content: str) -> str | None:
     code = mapping.get(lang) or (lang if lang in ("pt-PT", "pt-BR", "es", "en") else None)
     if not code:
         try:
-            db = SessionLocal()
+            db = get_session()
             try:
                 lg = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             finally:
@@ -101,9 +101,9 @@ async def handle_lang(ctx: HandlerContext, content: str) -> str | None:
             lg = "pt-BR"
         return SETTINGS_LANG_USAGE.get(lg, SETTINGS_LANG_USAGE["en"])
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import set_user_language
-        db = SessionLocal()
+        db = get_session()
         try:
             set_user_language(db, ctx.chat_id, code)
             return SETTINGS_LANG_SET.get(code, SETTINGS_LANG_SET["en"]).format(lang=code)
@@ -111,7 +111,7 @@ async def handle_lang(ctx: HandlerContext, content: str) -> str | None:
             db.close()
     except Exception:
         try:
-            db2 = SessionLocal()
+            db2 = get_session()
             try:
                 lg = get_user_language(db2, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             finally:
@@ -149,9 +149,9 @@ async def handle_quiet(ctx: HandlerContext, content: str) -> str | None:
     from backend.locale import QUIET_OFF_SUCCESS, QUIET_OFF_ERROR, QUIET_USAGE, QUIET_TIME_FORMAT, QUIET_SAVE_ERROR
     _qlang = "pt-BR"
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import get_user_language
-        _qdb = SessionLocal()
+        _qdb = get_session()
         try:
             _qlang = get_user_language(_qdb, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
         finally:
@@ -164,9 +164,9 @@ async def handle_quiet(ctx: HandlerContext, content: str) -> str | None:
         rest = t[6:].strip()  # após "/quiet"
     if is_nl_off or not rest or rest.lower() in ("off", "desligar", "não", "nao"):
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import set_user_quiet
-            db = SessionLocal()
+            db = get_session()
             try:
                 if set_user_quiet(db, ctx.chat_id, None, None):
                     return QUIET_OFF_SUCCESS.get(_qlang, QUIET_OFF_SUCCESS["en"])
@@ -180,11 +180,11 @@ async def handle_quiet(ctx: HandlerContext, content: str) -> str | None:
         return QUIET_USAGE.get(_qlang, QUIET_USAGE["en"])
     start_hhmm, end_hhmm = parts[0].strip(), parts[1].strip()
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import set_user_quiet, _parse_time_hhmm
         if _parse_time_hhmm(start_hhmm) is None or _parse_time_hhmm(end_hhmm) is None:
             return QUIET_TIME_FORMAT.get(_qlang, QUIET_TIME_FORMAT["en"])
-        db = SessionLocal()
+        db = get_session()
         try:
             if set_user_quiet(db, ctx.chat_id, start_hhmm, end_hhmm):
                 from backend.locale import QUIET_STATUS
@@ -224,10 +224,10 @@ async def handle_reset(ctx: HandlerContext, content: str) -> str | None:
     if not (c.startswith("/reset") or c.startswith("/reboot") or c.startswith("/reiniciar")):
         return None
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import clear_onboarding_data, get_user_language
         from backend.locale import LangCode
-        db = SessionLocal()
+        db = get_session()
         try:
             clear_onboarding_data(db, ctx.chat_id)
             lang: LangCode = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
@@ -339,10 +339,10 @@ async def handle_nuke(ctx: HandlerContext, content: str) -> str | None:
         return None
 
     try:
-        from backend.database import SessionLocal
+        from backend.database import get_session
         from backend.user_store import get_user_language
         from backend.locale import resolve_response_language
-        db = SessionLocal()
+        db = get_session()
         try:
             lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             lang = resolve_response_language(lang, ctx.chat_id, ctx.phone_for_locale)
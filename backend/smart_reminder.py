@@ -30,6 +30,7 @@ from backend.user_store import (
     get_user_quiet,
 )
 from backend.timezone import phone_to_default_timezone
+from backend.daily_counters import ShardedState, register_state
 
 
 _SENT_FILE = Path.home() / ".zapista" / "smart_reminder_sent.json"
@@ -55,73 +56,56 @@ def _today_in_tz(tz_iana: str) -> str:
         return datetime.fromtimestamp(_now_ts, tz=timezone.utc).strftime("%Y-%m-%d")
 
 
-def _load_daily_user_messages() -> dict[str, dict]:
-    """Carrega {chat_id: {"date": "YYYY-MM-DD", "count": N}} (data no fuso do user)."""
-    import json
-    if not _DAILY_USER_MSGS_FILE.exists():
-        return {}
-    try:
-        data = json.loads(_DAILY_USER_MSGS_FILE.read_text())
-        return data if isinstance(data, dict) else {}
-    except Exception:
-        return {}
+def _recent_date(value: Any) -> bool:
+    """Entrada de ontem ou mais recente (ao gravar o ficheiro, as de dias anteriores são descartadas)."""
+    date = value.get("date") if isinstance(value, dict) else value
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=2)).strftime("%Y-%m-%d")
+    return isinstance(date, str) and date >= cutoff
+
+
+# Estado em memória, gravado em lote (backend.daily_counters): nada de I/O por mensagem
+_daily_user_msgs = register_state(ShardedState(_DAILY_USER_MSGS_FILE, keep=_recent_date))
+_sent_state = register_state(ShardedState(_SENT_FILE, keep=_recent_date))
 
 
 def record_user_message_sent(chat_id: str, tz_iana: str) -> None:
     """Regista que o cliente enviou uma mensagem hoje (no fuso dele). Chamar ao receber cada mensagem."""
-    import json
-    _DAILY_USER_MSGS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    data = _load_daily_user_messages()
     today = _today_in_tz(tz_iana)
-    key = str(chat_id)
-    if key not in data or data[key].get("date") != today:
-        data[key] = {"date": today, "count": 1}
-    else:
-        data[key]["count"] = data[key].get("count", 0) + 1
-    _DAILY_USER_MSGS_FILE.write_text(json.dumps(data, indent=0))
+
+    def bump(entry: Any) -> dict:
+        if not isinstance(entry, dict) or entry.get("date") != today:
+            return {"date": today, "count": 1}
+        return {"date": today, "count": entry.get("count", 0) + 1}
+
+    _daily_user_msgs.update(str(chat_id), bump)
 
 
 def get_daily_user_message_count(chat_id: str, tz_iana: str) -> int:
     """Número de mensagens que o cliente enviou hoje (no fuso dele). Só enviar lembrete inteligente se >= SMART_REMINDER_MIN_MESSAGES_FROM_USER."""
-    data = _load_daily_user_messages()
-    today = _today_in_tz(tz_iana)
-    entry = data.get(str(chat_id), {})
-    if entry.get("date") != today:
+    entry = _daily_user_msgs.get(str(chat_id)) or {}
+    if entry.get("date") != _today_in_tz(tz_iana):
         return 0
     return entry.get("count", 0)
 
 
-def _load_sent_tracking() -> dict[str, str]:
-    """Carrega {chat_id: "YYYY-MM-DD"} de lembretes inteligentes já enviados hoje."""
-    import json
-    if not _SENT_FILE.exists():
-        return {}
+def _utc_today() -> str:
     try:
         from zapista.clock_drift import get_effective_time
         _now_ts = get_effective_time()
     except Exception:
         _now_ts = __import__("time").time()
+    return datetime.fromtimestamp(_now_ts, tz=timezone.utc).strftime("%Y-%m-%d")
 
-    try:
-        data = json.loads(_SENT_FILE.read_text())
-        today = datetime.fromtimestamp(_now_ts, tz=timezone.utc).strftime("%Y-%m-%d")
-        return {k: v for k, v in (data or {}).items() if v == today}
-    except Exception:
-        return {}
+
+def _already_sent_today(chat_id: str) -> bool:
+    """True se já enviámos o lembrete inteligente hoje (UTC) a este chat."""
+    return _sent_state.get(str(chat_id)) == _utc_today()
 
 
 def _mark_sent_today(chat_id: str) -> None:
     """Marca que enviamos lembrete inteligente hoje a este chat."""
-    import json
-    _SENT_FILE.parent.mkdir(parents=True, exist_ok=True)
-    try:
-        from zapista.clock_drift import get_effective_time
-        _now_ts = get_effective_time()
-    except Exception:
-        _now_ts = __import__("time").time()
-
-    data[str(chat_id)] = datetime.fromtimestamp(_now_ts, tz=timezone.utc).strftime("%Y-%m-%d")
-    _SENT_FILE.write_text(json.dumps(data, indent=0))
+    today = _utc_today()
+    _sent_state.update(str(chat_id), lambda _old: today)
 
 
 def _is_in_smart_reminder_window(tz_iana: str, hour_start: int, hour_end: int) -> bool:
@@ -490,7 +474,6 @@ async def run_smart_reminder_daily(
 
     sent = 0
     errors = 0
-    sent_today = _load_sent_tracking()
 
     sessions = session_manager.list_sessions()
     cron_jobs_by_chat: dict[str, list] = {}
@@ -505,7 +488,7 @@ async def run_smart_reminder_daily(
         if ":" not in key:
             continue
         channel, chat_id = key.split(":", 1)
-        if not chat_id or chat_id in sent_today:
+        if not chat_id or _already_sent_today(chat_id):
             continue
         ch = channel if channel else default_channel
         if ch != "whatsapp":
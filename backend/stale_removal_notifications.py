@@ -3,44 +3,38 @@ Notificações atrasadas de lembretes removidos (jobs "at" no passado).
 
 A limpeza diária remove esses jobs e regista aqui. A mensagem de desculpa
 só é enviada após 2 mensagens do cliente na mesma sessão (anti-spam WhatsApp).
+Pendentes no KVStore (namespace stale_removal_pending): consume() corre a cada
+mensagem e só lê da cache em memória.
 """
 
-import json
 import os
 from pathlib import Path
 from typing import Any
 
+from backend.kv_store import Namespace, read_legacy_json
+
 _MESSAGES_UNTIL_SEND = 2
 
 
-def _store_path() -> Path:
+def _legacy_path() -> Path:
     try:
         from zapista.config.loader import get_data_dir
         d = get_data_dir() / "cron"
     except Exception:
         d = Path(os.environ.get("ZAPISTA_DATA", os.path.expanduser("~/.zapista"))) / "cron"
-    d.mkdir(parents=True, exist_ok=True)
     return d / "stale_removal_pending.json"
 
 
-def _key(channel: str, chat_id: str) -> str:
-    return f"{channel}:{chat_id}"
+def _import_legacy() -> dict[str, Any]:
+    data = read_legacy_json(_legacy_path())
+    return data if isinstance(data, dict) else {}
 
 
-def _load() -> dict[str, Any]:
-    p = _store_path()
-    if not p.exists():
-        return {}
-    try:
-        return json.loads(p.read_text(encoding="utf-8"))
-    except Exception:
-        return {}
+_pending = Namespace("stale_removal_pending", legacy=_import_legacy)
 
 
-def _save(data: dict[str, Any]) -> None:
-    p = _store_path()
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+def _key(channel: str, chat_id: str) -> str:
+    return f"{channel}:{chat_id}"
 
 
 def add_removals(
@@ -57,16 +51,17 @@ def add_removals(
     """
     if not removed_jobs:
         return
-    data = _load()
-    key = _key(channel, chat_id)
-    existing = data.get(key, {"removed": [], "messages_until_send": _MESSAGES_UNTIL_SEND})
-    existing["removed"] = existing.get("removed", []) + [list(r) for r in removed_jobs]
-    existing["messages_until_send"] = _MESSAGES_UNTIL_SEND
-    # Guardar phone_for_locale para resolver idioma de @lid
-    if phone_for_locale and not existing.get("phone_for_locale"):
-        existing["phone_for_locale"] = phone_for_locale
-    data[key] = existing
-    _save(data)
+
+    def _merge(existing: dict | None) -> dict:
+        existing = dict(existing or {"removed": [], "messages_until_send": _MESSAGES_UNTIL_SEND})
+        existing["removed"] = existing.get("removed", []) + [list(r) for r in removed_jobs]
+        existing["messages_until_send"] = _MESSAGES_UNTIL_SEND
+        # Guardar phone_for_locale para resolver idioma de @lid
+        if phone_for_locale and not existing.get("phone_for_locale"):
+            existing["phone_for_locale"] = phone_for_locale
+        return existing
+
+    _pending.update(_key(channel, chat_id), _merge)
 
 
 def consume(channel: str, chat_id: str) -> tuple[bool, str | None]:
@@ -75,26 +70,27 @@ def consume(channel: str, chat_id: str) -> tuple[bool, str | None]:
     Quando chega a 0, retorna (True, mensagem_de_desculpa) e remove o pendente.
     Caso contrário (False, None).
     """
-    data = _load()
     key = _key(channel, chat_id)
-    entry = data.get(key)
-    if not entry:
-        return False, None
-    count = entry.get("messages_until_send", _MESSAGES_UNTIL_SEND)
-    count -= 1
-    if count > 0:
-        entry["messages_until_send"] = count
-        data[key] = entry
-        _save(data)
+    if _pending.get(key) is None:
         return False, None
-    # Enviar agora
-    removed = entry.get("removed", [])
-    phone_for_locale = entry.get("phone_for_locale")
-    del data[key]
-    _save(data)
-    if not removed:
+    due: list[dict] = []
+
+    def _countdown(entry: dict | None) -> dict | None:
+        if not entry:
+            return None
+        count = entry.get("messages_until_send", _MESSAGES_UNTIL_SEND) - 1
+        if count > 0:
+            return {**entry, "messages_until_send": count}
+        due.append(entry)  # enviar agora: remove o pendente
+        return None
+
+    _pending.update(key, _countdown)
+    if not due or not due[0].get("removed"):
         return False, None
-    return True, _build_apology_message(channel, chat_id, removed, phone_for_locale=phone_for_locale)
+    entry = due[0]
+    return True, _build_apology_message(
+        channel, chat_id, entry["removed"], phone_for_locale=entry.get("phone_for_locale"),
+    )
 
 
 def _build_apology_message(
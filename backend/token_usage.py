@@ -59,6 +59,34 @@ def calculate_cost(provider: str, input_tokens: int, output_tokens: int, cached_
     
     return cost_input + cost_cache + cost_output
 
+# Por chamada, em memória desde o arranque: quanto do prompt veio da cache de prefixo do provedor.
+_PROMPT_CACHE_STATS: dict[str, dict[str, int]] = {}
+
+
+def _record_prompt_cache(provider: str, input_tokens: int, cached_tokens: int) -> None:
+    st = _PROMPT_CACHE_STATS.setdefault(provider, {"calls": 0, "cache_hits": 0, "prompt_tokens": 0, "cached_tokens": 0})
+    st["calls"] += 1
+    st["prompt_tokens"] += input_tokens
+    st["cached_tokens"] += cached_tokens
+    if cached_tokens:
+        st["cache_hits"] += 1
+
+
+def get_prompt_cache_stats() -> dict[str, dict[str, Any]]:
+    """Por provedor: chamadas, % com cache hit, % de tokens de input em cache e custo de input poupado (USD)."""
+    out: dict[str, dict[str, Any]] = {}
+    for provider, st in _PROMPT_CACHE_STATS.items():
+        full = calculate_cost(provider, st["cached_tokens"], 0, 0)
+        discounted = calculate_cost(provider, 0, 0, st["cached_tokens"])
+        out[provider] = {
+            **st,
+            "hit_rate": round(st["cache_hits"] / st["calls"], 3) if st["calls"] else 0.0,
+            "cached_ratio": round(st["cached_tokens"] / st["prompt_tokens"], 3) if st["prompt_tokens"] else 0.0,
+            "saved_usd": round(full - discounted, 6),
+        }
+    return out
+
+
 def record_usage(
     provider: str,
     model: str,
@@ -81,11 +109,10 @@ def record_usage(
 
     today_str = date.today().isoformat()
     
-    # Tentativa de extrair cache hit dos kwargs (se o provider passar details)
-    # Atualmente litellm_provider passa input_tokens = prompt_tokens.
-    # Se tivermos acesso a prompt_tokens_details, precisaríamos alterar litellm_provider.
-    # Por agora, assumimos cache_hit=0 a menos que venha num kwarg específico.
-    cached_tokens = kwargs.get("cached_tokens", 0)
+    # Cache hit: litellm_provider passa cached_tokens (prompt_tokens_details / prompt_cache_hit_tokens);
+    # input_tokens = prompt_tokens (total, inclui os em cache).
+    cached_tokens = min(kwargs.get("cached_tokens") or 0, input_tokens or 0)
+    _record_prompt_cache(provider, input_tokens or 0, cached_tokens)
     
     # Input cobrado (miss) = input_tokens - cached_tokens
     # (Assumindo que input_tokens é o total bruto)
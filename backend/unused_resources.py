@@ -67,11 +67,10 @@ def gather_unused_resources(
 
     # Cron jobs: lastRunAtMs antigo ou nunca executou (e createdAt antigo)
     cron_unused: list[dict[str, Any]] = []
-    if cron_store_path and cron_store_path.exists():
-        import json
+    from zapista.cron.storage import load_jobs_raw, store_available
+    if cron_store_path and store_available(cron_store_path):
         try:
-            data = json.loads(cron_store_path.read_text())
-            jobs = data.get("jobs", [])
+            jobs = load_jobs_raw(cron_store_path)
             for j in jobs:
                 if not j.get("enabled", True):
                     continue
@@ -1,11 +1,21 @@
-"""User lookup by phone: get_or_create with truncated PII, hash for id. Idioma por chat_id."""
+"""User lookup by phone: get_or_create with truncated PII, hash for id. Idioma por chat_id.
+
+Leituras de perfil (idioma, timezone, horário silencioso, antecedências, nome) passam por uma cache
+em processo de snapshots imutáveis (UserProfile), com TTL e invalidação pelas funções set_*.
+Uma mensagem faz no máximo um SELECT ao utilizador em vez de um por cada get_user_*.
+"""
 
 import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from sqlalchemy.orm import Session
 
 from backend.models_db import User, _truncate_phone
 from backend.locale import LangCode, phone_to_default_language
 from backend.timezone import phone_to_default_timezone, DEFAULT_TZ_BY_LANG
+from zapista.utils.helpers import env_int
 
 
 def phone_hash(phone: str) -> str:
@@ -27,6 +37,88 @@ def get_or_create_user(db: Session, phone: str) -> User:
     return user
 
 
+@dataclass(frozen=True)
+class UserProfile:
+    """Snapshot imutável dos campos de perfil do User (sem sessão SQLAlchemy associada)."""
+
+    id: int
+    preferred_name: str | None
+    city: str | None
+    language: str | None
+    timezone: str | None
+    quiet_start: str | None
+    quiet_end: str | None
+    default_reminder_lead_seconds: int | None
+    extra_reminder_leads: str | None
+    context_notes: str | None
+    last_list_name: str | None
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserProfile":
+        return cls(
+            id=user.id,
+            preferred_name=user.preferred_name,
+            city=user.city,
+            language=user.language,
+            timezone=user.timezone,
+            quiet_start=user.quiet_start,
+            quiet_end=user.quiet_end,
+            default_reminder_lead_seconds=user.default_reminder_lead_seconds,
+            extra_reminder_leads=user.extra_reminder_leads,
+            context_notes=user.context_notes,
+            last_list_name=user.last_list_name,
+        )
+
+
+# USER_PROFILE_CACHE_TTL=0 desativa a cache (cada leitura vai à BD, como antes)
+_PROFILE_TTL_S = env_int("USER_PROFILE_CACHE_TTL", 300, lo=0)
+_PROFILE_MAX = env_int("USER_PROFILE_CACHE_MAX", 10000, lo=0)
+_profiles: "OrderedDict[str, tuple[float, UserProfile]]" = OrderedDict()  # chat_id -> (expira_em, perfil), LRU
+_profiles_lock = threading.Lock()
+
+
+def get_user_profile(db: Session | None, chat_id: str) -> UserProfile:
+    """
+    Perfil do utilizador (read-through): da cache se ainda válido, senão 1 SELECT (get_or_create_user).
+    db=None usa get_session() (sessão do pedido ou uma nova) só quando há miss.
+    """
+    now = time.monotonic()
+    with _profiles_lock:
+        hit = _profiles.get(chat_id)
+        if hit and hit[0] > now:
+            _profiles.move_to_end(chat_id)
+            return hit[1]
+    if db is None:
+        from backend.database import get_session
+        own = get_session()
+        try:
+            profile = UserProfile.from_user(get_or_create_user(own, chat_id))
+        finally:
+            own.close()
+    else:
+        profile = UserProfile.from_user(get_or_create_user(db, chat_id))
+    if _PROFILE_TTL_S > 0:
+        with _profiles_lock:
+            _profiles[chat_id] = (now + _PROFILE_TTL_S, profile)
+            _profiles.move_to_end(chat_id)
+            while len(_profiles) > _PROFILE_MAX:
+                _profiles.popitem(last=False)
+    return profile
+
+
+def invalidate_user_profile(*chat_ids: str) -> None:
+    """Descarta o perfil em cache (chamar depois de gravar campos do User fora deste módulo)."""
+    with _profiles_lock:
+        for chat_id in chat_ids:
+            _profiles.pop(chat_id, None)
+
+
+def clear_user_profile_cache() -> None:
+    """Esvazia a cache de perfis (testes, comandos de admin que alteram utilizadores em massa)."""
+    with _profiles_lock:
+        _profiles.clear()
+
+
 def migrate_user_identity(db: Session, lid_id: str, jid_id: str) -> bool:
     """
     Se o utilizador era conhecido por LID e agora temos o JID (pn),
@@ -58,6 +150,7 @@ def migrate_user_identity(db: Session, lid_id: str, jid_id: str) -> bool:
         # phone_truncated não precisa mudar se for só estatístico, mas podemos atualizar
         user_lid.phone_truncated = _truncate_phone(jid_id)
         db.commit()
+        invalidate_user_profile(lid_id, jid_id)
         return True
 
     return False
@@ -69,7 +162,7 @@ def get_user_language(db: Session, chat_id: str, phone_for_locale: str | None =
     phone_for_locale: quando chat_id é LID (ex.: 369...@lid), passar o número real para inferir idioma.
     """
     from backend.locale import SUPPORTED_LANGS
-    user = get_or_create_user(db, chat_id)
+    user = get_user_profile(db, chat_id)
     if user.language and user.language in SUPPORTED_LANGS:
         return user.language  # type: ignore
     return phone_to_default_language(phone_for_locale or chat_id)
@@ -83,12 +176,13 @@ def set_user_language(db: Session, chat_id: str, lang: LangCode) -> None:
     user = get_or_create_user(db, chat_id)
     user.language = lang
     db.commit()
+    invalidate_user_profile(chat_id)
 
 
-def get_user_timezone(db: Session, chat_id: str, phone_for_locale: str | None = None) -> str:
+def get_user_timezone(db: Session | None, chat_id: str, phone_for_locale: str | None = None) -> str:
     """Timezone do utilizador. Prioridade: (1) timezone/cidade informada pelo cliente (/tz ou onboarding),
     (2) inferido do número de telefone, (3) padrão do idioma. Assim o horário fica sempre ligado ao que
-    o cliente informou quando possível."""
+    o cliente informou quando possível. db=None: perfil em cache, sessão só se houver miss."""
     return _get_user_timezone_impl(db, chat_id, phone_for_locale)[0]
 
 
@@ -98,8 +192,8 @@ def get_user_timezone_and_source(db: Session, chat_id: str, phone_for_locale: st
     return _get_user_timezone_impl(db, chat_id, phone_for_locale)
 
 
-def _get_user_timezone_impl(db: Session, chat_id: str, phone_for_locale: str | None = None) -> tuple[str, str]:
-    user = get_or_create_user(db, chat_id)
+def _get_user_timezone_impl(db: Session | None, chat_id: str, phone_for_locale: str | None = None) -> tuple[str, str]:
+    user = get_user_profile(db, chat_id)
     # 1) Timezone/cidade informada pelo cliente (/tz ou onboarding com cidade)
     if user.timezone:
         try:
@@ -125,6 +219,7 @@ def set_user_timezone(db: Session, chat_id: str, tz_iana: str) -> bool:
     user = get_or_create_user(db, chat_id)
     user.timezone = tz_iana
     db.commit()
+    invalidate_user_profile(chat_id)
     return True
 
 
@@ -143,9 +238,9 @@ def _parse_time_hhmm(s: str) -> tuple[int, int] | None:
     return None
 
 
-def get_user_quiet(db: Session, chat_id: str) -> tuple[str | None, str | None]:
+def get_user_quiet(db: Session | None, chat_id: str) -> tuple[str | None, str | None]:
     """Retorna (quiet_start, quiet_end) em HH:MM ou (None, None)."""
-    user = get_or_create_user(db, chat_id)
+    user = get_user_profile(db, chat_id)
     return (user.quiet_start, user.quiet_end)
 
 
@@ -156,6 +251,7 @@ def set_user_quiet(db: Session, chat_id: str, start_hhmm: str | None, end_hhmm:
         user.quiet_start = None
         user.quiet_end = None
         db.commit()
+        invalidate_user_profile(chat_id)
         return True
     start = _parse_time_hhmm(start_hhmm or "")
     end = _parse_time_hhmm(end_hhmm or "")
@@ -164,6 +260,7 @@ def set_user_quiet(db: Session, chat_id: str, start_hhmm: str | None, end_hhmm:
     user.quiet_start = start_hhmm.strip()[:5]
     user.quiet_end = end_hhmm.strip()[:5]
     db.commit()
+    invalidate_user_profile(chat_id)
     return True
 
 
@@ -174,31 +271,27 @@ def is_user_in_quiet_window(chat_id: str, phone_for_locale: str | None = None) -
     """
     from datetime import datetime
     from zoneinfo import ZoneInfo
-    from backend.database import SessionLocal
-    db = SessionLocal()
+    # Sem sessão própria: o perfil vem da cache (a BD só é aberta em miss)
+    start_str, end_str = get_user_quiet(None, chat_id)
+    if not start_str or not end_str:
+        return False
+    start = _parse_time_hhmm(start_str)
+    end = _parse_time_hhmm(end_str)
+    if not start or not end:
+        return False
+    tz_iana = get_user_timezone(None, chat_id, phone_for_locale)
     try:
-        start_str, end_str = get_user_quiet(db, chat_id)
-        if not start_str or not end_str:
-            return False
-        start = _parse_time_hhmm(start_str)
-        end = _parse_time_hhmm(end_str)
-        if not start or not end:
-            return False
-        tz_iana = get_user_timezone(db, chat_id, phone_for_locale)
-        try:
-            from zapista.clock_drift import get_effective_time
-            _now_ts = get_effective_time()
-            now = datetime.fromtimestamp(_now_ts, tz=ZoneInfo(tz_iana))
-        except Exception:
-            return False
-        now_m = now.hour * 60 + now.minute
-        start_m = start[0] * 60 + start[1]
-        end_m = end[0] * 60 + end[1]
-        if start_m <= end_m:
-            return start_m <= now_m < end_m
-        return now_m >= start_m or now_m < end_m
-    finally:
-        db.close()
+        from zapista.clock_drift import get_effective_time
+        _now_ts = get_effective_time()
+        now = datetime.fromtimestamp(_now_ts, tz=ZoneInfo(tz_iana))
+    except Exception:
+        return False
+    now_m = now.hour * 60 + now.minute
+    start_m = start[0] * 60 + start[1]
+    end_m = end[0] * 60 + end[1]
+    if start_m <= end_m:
+        return start_m <= now_m < end_m
+    return now_m >= start_m or now_m < end_m
 
 
 def get_seconds_until_quiet_end(chat_id: str, phone_for_locale: str | None = None) -> int:
@@ -208,50 +301,45 @@ def get_seconds_until_quiet_end(chat_id: str, phone_for_locale: str | None = Non
     """
     from datetime import datetime, timedelta
     from zoneinfo import ZoneInfo
-    from backend.database import SessionLocal
+
+    start_str, end_str = get_user_quiet(None, chat_id)
+    if not start_str or not end_str:
+        return 0
     
-    db = SessionLocal()
+    start = _parse_time_hhmm(start_str)
+    end = _parse_time_hhmm(end_str)
+    if not start or not end:
+        return 0
+        
+    tz_iana = get_user_timezone(None, chat_id, phone_for_locale)
     try:
-        start_str, end_str = get_user_quiet(db, chat_id)
-        if not start_str or not end_str:
-            return 0
+        from zapista.clock_drift import get_effective_time
+        _now_ts = get_effective_time()
+        tz = ZoneInfo(tz_iana)
+        now = datetime.fromtimestamp(_now_ts, tz=tz)
+    except Exception:
+        return 0
         
-        start = _parse_time_hhmm(start_str)
-        end = _parse_time_hhmm(end_str)
-        if not start or not end:
-            return 0
-            
-        tz_iana = get_user_timezone(db, chat_id, phone_for_locale)
-        try:
-            from zapista.clock_drift import get_effective_time
-            _now_ts = get_effective_time()
-            tz = ZoneInfo(tz_iana)
-            now = datetime.fromtimestamp(_now_ts, tz=tz)
-        except Exception:
-            return 0
-            
-        now_m = now.hour * 60 + now.minute
-        start_m = start[0] * 60 + start[1]
-        end_m = end[0] * 60 + end[1]
+    now_m = now.hour * 60 + now.minute
+    start_m = start[0] * 60 + start[1]
+    end_m = end[0] * 60 + end[1]
+    
+    is_quiet = False
+    if start_m <= end_m:
+        is_quiet = start_m <= now_m < end_m
+    else:
+        is_quiet = now_m >= start_m or now_m < end_m
+        
+    if not is_quiet:
+        return 0
         
-        is_quiet = False
-        if start_m <= end_m:
-            is_quiet = start_m <= now_m < end_m
-        else:
-            is_quiet = now_m >= start_m or now_m < end_m
-            
-        if not is_quiet:
-            return 0
-            
-        # Calcular segundos até end_m
-        end_dt = now.replace(hour=end[0], minute=end[1], second=0, microsecond=0)
-        if end_dt <= now:
-            end_dt += timedelta(days=1)
-            
-        diff = (end_dt - now).total_seconds()
-        return max(0, int(diff))
-    finally:
-        db.close()
+    # Calcular segundos até end_m
+    end_dt = now.replace(hour=end[0], minute=end[1], second=0, microsecond=0)
+    if end_dt <= now:
+        end_dt += timedelta(days=1)
+        
+    diff = (end_dt - now).total_seconds()
+    return max(0, int(diff))
 
 
 def _sanitize_preferred_name(raw: str, max_len: int = 128) -> str | None:
@@ -276,7 +364,7 @@ def _sanitize_city(raw: str, max_len: int = 128) -> str | None:
 
 def get_user_city(db: Session, chat_id: str) -> str | None:
     """Cidade do utilizador (guardada no onboarding). None se não definida."""
-    user = get_or_create_user(db, chat_id)
+    user = get_user_profile(db, chat_id)
     c = (user.city or "").strip()
     return c if c else None
 
@@ -296,12 +384,13 @@ def set_user_city(db: Session, chat_id: str, city: str, tz_iana: str | None = No
         if tz and is_valid_iana(tz):
             user.timezone = tz
     db.commit()
+    invalidate_user_profile(chat_id)
     return True
 
 
 def get_user_preferred_name(db: Session, chat_id: str) -> str | None:
     """Nome como o cliente gostaria de ser chamado (ou None se ainda não definido)."""
-    user = get_or_create_user(db, chat_id)
+    user = get_user_profile(db, chat_id)
     name = (user.preferred_name or "").strip()
     return name if name else None
 
@@ -314,12 +403,13 @@ def set_user_preferred_name(db: Session, chat_id: str, name: str) -> bool:
     user = get_or_create_user(db, chat_id)
     user.preferred_name = sanitized
     db.commit()
+    invalidate_user_profile(chat_id)
     return True
 
 
 def get_default_reminder_lead_seconds(db: Session, chat_id: str) -> int | None:
     """Segundos de antecedência do primeiro aviso (ex.: 86400 = 1 dia). None se não definido."""
-    user = get_or_create_user(db, chat_id)
+    user = get_user_profile(db, chat_id)
     v = user.default_reminder_lead_seconds
     return int(v) if v is not None and v > 0 else None
 
@@ -331,13 +421,14 @@ def set_default_reminder_lead_seconds(db: Session, chat_id: str, seconds: int) -
     user = get_or_create_user(db, chat_id)
     user.default_reminder_lead_seconds = seconds
     db.commit()
+    invalidate_user_profile(chat_id)
     return True
 
 
 def get_extra_reminder_leads_seconds(db: Session, chat_id: str) -> list[int]:
     """Lista de até 3 antecedências extra em segundos (ex.: [259200, 86400, 7200])."""
     from backend.lead_time import extra_leads_from_json
-    user = get_or_create_user(db, chat_id)
+    user = get_user_profile(db, chat_id)
     return extra_leads_from_json(user.extra_reminder_leads)
 
 
@@ -347,6 +438,7 @@ def set_extra_reminder_leads_seconds(db: Session, chat_id: str, seconds_list: li
     user = get_or_create_user(db, chat_id)
     user.extra_reminder_leads = extra_leads_to_json(seconds_list, max_count=3)
     db.commit()
+    invalidate_user_profile(chat_id)
     return True
 
 
@@ -367,4 +459,5 @@ def clear_onboarding_data(db: Session, chat_id: str) -> bool:
     user.timezone = None  # volta ao phone_to_default_timezone
     changed = True
     db.commit()
+    invalidate_user_profile(chat_id)
     return changed
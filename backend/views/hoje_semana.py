@@ -13,13 +13,13 @@ from backend.views.utils import get_events_in_period, get_reminders_in_period
 
 def _visao_hoje(ctx: "HandlerContext", target_date=None) -> str:
     """/hoje: agenda + lembretes do dia. target_date opcional para 'amanhã'."""
-    from backend.database import SessionLocal
-    from backend.user_store import get_or_create_user, get_user_timezone, get_user_language
+    from backend.database import get_session
+    from backend.user_store import get_user_profile, get_user_timezone, get_user_language
 
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
-            user = get_or_create_user(db, ctx.chat_id)
+            user = get_user_profile(db, ctx.chat_id)
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
             try:
                 tz = ZoneInfo(tz_iana)
@@ -114,15 +114,15 @@ def _visao_hoje(ctx: "HandlerContext", target_date=None) -> str:
 
 def _visao_agenda_dia(ctx: "HandlerContext", target_date=None) -> str:
     """/agenda: apenas agenda (eventos) do dia corrente ou target_date."""
-    from backend.database import SessionLocal
-    from backend.user_store import get_or_create_user, get_user_timezone, get_user_language
+    from backend.database import get_session
+    from backend.user_store import get_user_profile, get_user_timezone, get_user_language
     from backend.locale import AGENDA_OFFER_REMINDER, AGENDA_SECOND_VIEW_PROMPT, resolve_response_language
     from backend.agenda_view_tracker import record_agenda_view
 
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
-            user = get_or_create_user(db, ctx.chat_id)
+            user = get_user_profile(db, ctx.chat_id)
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
             try:
                 tz = ZoneInfo(tz_iana)
@@ -185,13 +185,13 @@ def _visao_agenda_dia(ctx: "HandlerContext", target_date=None) -> str:
 
 def _visao_semana(ctx: "HandlerContext") -> str:
     """/semana: apenas agenda (eventos) da semana; não mostra lembretes."""
-    from backend.database import SessionLocal
-    from backend.user_store import get_or_create_user, get_user_timezone, get_user_language
+    from backend.database import get_session
+    from backend.user_store import get_user_profile, get_user_timezone, get_user_language
 
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
-            user = get_or_create_user(db, ctx.chat_id)
+            user = get_user_profile(db, ctx.chat_id)
             lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
             try:
@@ -304,9 +304,9 @@ async def handle_agenda_nl(ctx: "HandlerContext", content: str) -> str | None:
         if offset == 1:
             from datetime import datetime, timedelta
             # Precisamos da timezone para calcular "amanhã"
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import get_user_timezone
-            db = SessionLocal()
+            db = get_session()
             try:
                 tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
                 try:
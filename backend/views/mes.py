@@ -11,8 +11,8 @@ if TYPE_CHECKING:
 
 def _visao_mes(ctx: "HandlerContext", year: int, month: int) -> str:
     """Visão de lista filtrada pelo mês (agenda e lembretes)."""
-    from backend.database import SessionLocal
-    from backend.user_store import get_or_create_user, get_user_timezone, get_user_language
+    from backend.database import get_session
+    from backend.user_store import get_user_profile, get_user_timezone, get_user_language
     from backend.locale import (
         VIEW_MONTH_NAMES, VIEW_ERROR, VIEW_AGENDA_MONTH_HEADER,
         VIEW_NO_EVENTS_MONTH, VIEW_REMINDERS_MONTH_HEADER, VIEW_NO_REMINDERS_MONTH
@@ -20,9 +20,9 @@ def _visao_mes(ctx: "HandlerContext", year: int, month: int) -> str:
     from backend.views.utils import get_events_in_period, get_reminders_in_period
 
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
-            user = get_or_create_user(db, ctx.chat_id)
+            user = get_user_profile(db, ctx.chat_id)
             lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
             try:
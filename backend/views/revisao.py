@@ -10,14 +10,14 @@ if TYPE_CHECKING:
 
 def _visao_resumo_semana(ctx: "HandlerContext") -> str:
     """Resumo da semana (últimos 7 dias)."""
-    from backend.database import SessionLocal
-    from backend.user_store import get_or_create_user, get_user_timezone, get_user_language, get_user_preferred_name
+    from backend.database import get_session
+    from backend.user_store import get_user_profile, get_user_timezone, get_user_language, get_user_preferred_name
     from backend.weekly_recap import get_week_stats, build_weekly_recap_text
 
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
-            user = get_or_create_user(db, ctx.chat_id)
+            user = get_user_profile(db, ctx.chat_id)
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
             try:
                 tz = ZoneInfo(tz_iana)
@@ -40,14 +40,14 @@ def _visao_resumo_semana(ctx: "HandlerContext") -> str:
 
 def _visao_resumo_mes(ctx: "HandlerContext") -> str:
     """Resumo do mês (mês atual até hoje)."""
-    from backend.database import SessionLocal
-    from backend.user_store import get_or_create_user, get_user_timezone, get_user_language, get_user_preferred_name
+    from backend.database import get_session
+    from backend.user_store import get_user_profile, get_user_timezone, get_user_language, get_user_preferred_name
     from backend.weekly_recap import get_month_stats, build_monthly_recap_text
 
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
-            get_or_create_user(db, ctx.chat_id)
+            get_user_profile(db, ctx.chat_id)
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
             try:
                 tz = ZoneInfo(tz_iana)
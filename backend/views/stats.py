@@ -10,8 +10,8 @@ if TYPE_CHECKING:
 
 def _visao_stats(ctx: "HandlerContext", mode: str = "resumo") -> str:
     """Estatísticas: tarefas feitas (list_feito) e lembretes recebidos (ReminderHistory sent)."""
-    from backend.database import SessionLocal
-    from backend.user_store import get_or_create_user, get_user_timezone, get_user_language
+    from backend.database import get_session
+    from backend.user_store import get_user_profile, get_user_timezone, get_user_language
     from backend.models_db import ReminderHistory, AuditLog
     from backend.locale import (
         VIEW_STATS_HEADER, VIEW_STATS_TODAY, VIEW_STATS_WEEK,
@@ -19,9 +19,9 @@ def _visao_stats(ctx: "HandlerContext", mode: str = "resumo") -> str:
     )
 
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
-            user = get_or_create_user(db, ctx.chat_id)
+            user = get_user_profile(db, ctx.chat_id)
             lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
             try:
@@ -11,8 +11,8 @@ if TYPE_CHECKING:
 
 def _visao_timeline(ctx: "HandlerContext", dias: int = 7) -> str:
     """Histórico cronológico: lembretes entregues, tarefas feitas, eventos criados."""
-    from backend.database import SessionLocal
-    from backend.user_store import get_or_create_user, get_user_timezone, get_user_language
+    from backend.database import get_session
+    from backend.user_store import get_user_profile, get_user_timezone, get_user_language
     from backend.models_db import Event, ReminderHistory, AuditLog
     from backend.locale import (
         VIEW_TIMELINE_HEADER, VIEW_TIMELINE_TZ_INFO, VIEW_TIMELINE_REMINDER,
@@ -21,9 +21,9 @@ def _visao_timeline(ctx: "HandlerContext", dias: int = 7) -> str:
     )
 
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
-            user = get_or_create_user(db, ctx.chat_id)
+            user = get_user_profile(db, ctx.chat_id)
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale)
             lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
             try:
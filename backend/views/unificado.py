@@ -56,14 +56,14 @@ def _is_eventos_unificado_intent(content: str) -> bool:
 
 def _get_user_tz_and_lang(ctx: HandlerContext) -> tuple[ZoneInfo, str]:
     """Helper to get user timezone and language."""
-    from backend.database import SessionLocal
-    from backend.user_store import get_or_create_user, get_user_timezone, get_user_language
+    from backend.database import get_session
+    from backend.user_store import get_user_profile, get_user_timezone, get_user_language
     from backend.locale import resolve_response_language
 
     tz = ZoneInfo("UTC")
     lang = "pt-BR"
     try:
-        db = SessionLocal()
+        db = get_session()
         try:
             tz_iana = get_user_timezone(db, ctx.chat_id, ctx.phone_for_locale) or "UTC"
             lang = get_user_language(db, ctx.chat_id, ctx.phone_for_locale) or "pt-BR"
@@ -241,13 +241,13 @@ async def handle_eventos_unificado(ctx: HandlerContext, content: str) -> str | N
     }
 
     try:
-        from backend.database import SessionLocal
-        from backend.user_store import get_or_create_user
+        from backend.database import get_session
+        from backend.user_store import get_user_profile
         from backend.models_db import Event
 
-        db = SessionLocal()
+        db = get_session()
         try:
-            user = get_or_create_user(db, ctx.chat_id)
+            user = get_user_profile(db, ctx.chat_id)
 
             from backend.views.utils import get_events_in_period
             if period:
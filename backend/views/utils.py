@@ -52,10 +52,11 @@ def get_events_in_period(db, user_id: int, start_date, end_date, tz, lang: str =
     return out
 
 def get_reminders_in_period(ctx: "HandlerContext", tz, start_utc_ms: int, end_utc_ms: int) -> list:
-    """Lembretes (cron) do chat no intervalo [start_utc_ms, end_utc_ms]."""
+    """Lembretes (cron) do chat no intervalo [start_utc_ms, end_utc_ms].
+    Recorrentes (every/cron) aparecem uma vez por ocorrência no intervalo, não só na próxima execução."""
     reminders = []
     if ctx.cron_service:
-        for job in ctx.cron_service.list_jobs():
+        for nr, job in ctx.cron_service.occurrences_between(start_utc_ms, end_utc_ms, to=ctx.chat_id):
             if getattr(job.payload, "to", None) != ctx.chat_id:
                 continue
             # Filtrar: avisos pré-evento, nudges proativos e deadline checkers
@@ -67,7 +68,6 @@ def get_reminders_in_period(ctx: "HandlerContext", tz, start_utc_ms: int, end_ut
                 continue
             if getattr(job.payload, "deadline_main_job_id", None):
                 continue
-            nr = getattr(job.state, "next_run_at_ms", None)
             if nr and start_utc_ms <= nr <= end_utc_ms:
                 dt = datetime.fromtimestamp(nr / 1000, tz=ZoneInfo("UTC")).astimezone(tz)
                 reminders.append((dt, getattr(job.payload, "message", "") or job.name))
@@ -0,0 +1,84 @@
+"""Microbenchmark: matcher de intents (trie de prefixos) vs caminho antigo (todas as RE_* por ordem).
+
+Corpus: todas as strings curtas dos testes (tests/*.py), as mesmas com "/" à frente e em maiúsculas.
+Mede, por mensagem:
+- regex: RE_*.match() sobre todos os padrões (o que parse() fazia até ao 1.º acerto, no pior caso);
+- matcher: INTENT_MATCHER.match_all() (percurso na trie + só as regexes candidatas);
+- parse(): com a trie vs com a máscara "tudo" (equivalente ao parse antigo);
+- normalize_nl_to_command(): 5 chamadas seguidas por mensagem, sem e com a cache LRU.
+
+Uso: python scripts/bench_intent_matcher.py [repetições]
+"""
+
+import ast
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def load_corpus() -> list[str]:
+    corpus: set[str] = set()
+    for path in sorted((ROOT / "tests").glob("*.py")):
+        try:
+            tree = ast.parse(path.read_text(encoding="utf-8"))
+        except SyntaxError:
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and 0 < len(node.value) < 200:
+                corpus.update((node.value, "/" + node.value, node.value.upper()))
+    return sorted(corpus)
+
+
+def _timeit(fn, corpus: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(corpus) * 1e6  # µs por mensagem
+
+
+def main() -> None:
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    from backend import command_nl
+    from backend.command_parser import core
+
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    corpus = load_corpus()
+    matcher = core.INTENT_MATCHER
+    patterns = matcher.patterns
+
+    def regex_all(text: str):
+        text = text.strip()
+        return [p.match(text) for p in patterns]
+
+    avg_candidates = sum(bin(matcher.candidates(t.strip())).count("1") for t in corpus) / len(corpus)
+    print(f"corpus: {len(corpus)} mensagens, {len(patterns)} padrões, {avg_candidates:.2f} candidatos/mensagem")
+
+    rows = [
+        ("regex (todas as RE_*)", _timeit(regex_all, corpus, repeat)),
+        ("matcher.match_all", _timeit(core.match_intents, corpus, repeat)),
+    ]
+    parse_trie = _timeit(core.parse, corpus, repeat)
+    with patch.object(type(matcher), "candidates", lambda self, text: -1):
+        parse_full = _timeit(core.parse, corpus, repeat)
+    rows += [("parse() sem trie", parse_full), ("parse() com trie", parse_trie)]
+
+    uncached = command_nl._normalize_cached.__wrapped__
+    calls = 5  # rate limit no agent loop + handlers que a chamam em série para a mesma mensagem
+    cold = _timeit(lambda t: [uncached(t) for _ in range(calls)], corpus, repeat)
+    warm = _timeit(lambda t: [command_nl.normalize_nl_to_command(t) for _ in range(calls)], corpus, repeat)
+    rows += [(f"normalize_nl_to_command x{calls} sem cache", cold), (f"normalize_nl_to_command x{calls} com cache", warm)]
+
+    for label, us in rows:
+        print(f"{label:40s} {us:8.2f} µs/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,3 +5,14 @@ from pathlib import Path
 root = Path(__file__).resolve().parent.parent
 if str(root) not in sys.path:
     sys.path.insert(0, str(root))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _clear_user_profile_cache():
+    """Cada teste começa sem perfis em cache (BDs de teste diferentes reutilizam os mesmos chat_id)."""
+    yield
+    user_store = sys.modules.get("backend.user_store")
+    if user_store is not None:
+        user_store.clear_user_profile_cache()
@@ -95,7 +95,7 @@ class TestAgendaTimeLocalization(unittest.IsolatedAsyncioTestCase):
         mock_job.payload.deadline_main_job_id = None
         
         mock_ctx.chat_id = "user123"
-        mock_ctx.cron_service.list_jobs.return_value = [mock_job]
+        mock_ctx.cron_service.occurrences_between.return_value = [(ts_ms, mock_job)]
         
         tz_lisbon = ZoneInfo("Europe/Lisbon")
         # Range covering the job
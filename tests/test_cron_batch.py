@@ -0,0 +1,108 @@
+"""Testes para o disparo em lote dos jobs devidos (concorrência limitada, ordem por destinatário)."""
+import asyncio
+import time
+
+from zapista.cron.service import CronService
+from zapista.cron.types import CronSchedule
+
+
+def _add_due(service: CronService, name: str, to: str, offset_ms: int = 0):
+    job = service.add_job(
+        name=name, schedule=CronSchedule(kind="at", at_ms=int(time.time() * 1000) + 3_600_000),
+        message=name, channel="whatsapp", to=to,
+    )
+    job.state.next_run_at_ms = int(time.time() * 1000) - 5_000 + offset_ms
+    service._index.reschedule(job)
+    return job
+
+
+def test_batch_bounded_concurrency_and_per_recipient_order(tmp_path):
+    async def run():
+        running = 0
+        peak = 0
+        order: dict[str, list[str]] = {}
+
+        async def on_job(job):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            order.setdefault(job.payload.to, []).append(job.name)
+            running -= 1
+
+        service = CronService(tmp_path / "jobs.json", on_job=on_job, fire_concurrency=3)
+        for u in range(6):
+            for k in range(3):
+                _add_due(service, f"u{u}-{k}", to=f"u{u}", offset_ms=k)
+        await service._on_timer()
+        return service, peak, order
+
+    service, peak, order = asyncio.run(run())
+    assert peak == 3
+    assert order == {f"u{u}": [f"u{u}-{k}" for k in range(3)] for u in range(6)}
+    assert service.list_jobs() == []  # "at" executados são removidos
+    stats = service.fire_stats()
+    assert stats["fired"] == 18
+    assert stats["late_p50_ms"] >= 4_000
+    assert stats["last_batch"]["jobs"] == 18 and stats["last_batch"]["recipients"] == 6
+
+
+def test_on_job_rescheduling_does_not_cancel_batch(tmp_path):
+    """on_job que adia outro job (→ _arm_timer) não cancela o lote em curso."""
+    async def run():
+        fired = []
+        service = CronService(tmp_path / "jobs.json", fire_concurrency=2)
+
+        async def on_job(job):
+            service.snooze_job(job.id, delay_seconds=600)
+            await asyncio.sleep(0)
+            fired.append(job.name)
+
+        service.on_job = on_job
+        service._running = True
+        for u in range(4):
+            _add_due(service, f"j{u}", to=f"u{u}")
+        service._arm_timer()
+        # o tick que executa o lote (o próprio rearmar no fim marca-o como cancelado)
+        await asyncio.gather(service._timer_task, return_exceptions=True)
+        service._running = False
+        if service._timer_task:
+            service._timer_task.cancel()
+        return fired
+
+    assert sorted(asyncio.run(run())) == ["j0", "j1", "j2", "j3"]
+
+
+def test_job_due_during_long_batch_fires_on_time(tmp_path):
+    """Um job adicionado para dentro de um lote longo dispara à hora, sem esperar pelo fim do lote."""
+    async def run():
+        fired: dict[str, float] = {}
+        release = asyncio.Event()
+        service = CronService(tmp_path / "jobs.json", fire_concurrency=4)
+
+        async def on_job(job):
+            fired[job.name] = time.monotonic()
+            if job.name == "lento":
+                await release.wait()
+
+        service.on_job = on_job
+        service._running = True
+        _add_due(service, "lento", to="u1")
+        service._arm_timer()
+        await asyncio.sleep(0.05)
+        assert "lento" in fired and service.fire_stats()["batches_in_flight"] == 1
+
+        quick = service.add_job(
+            name="rapido", schedule=CronSchedule(kind="at", at_ms=int(time.time() * 1000) + 100),
+            message="rapido", channel="whatsapp", to="u2",
+        )
+        await asyncio.sleep(0.4)
+        fired_quick = "rapido" in fired
+        release.set()
+        await asyncio.sleep(0.05)
+        service.stop()
+        return fired_quick, quick, service
+
+    fired_quick, quick, service = asyncio.run(run())
+    assert fired_quick
+    assert service.list_jobs() == []
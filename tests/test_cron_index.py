@@ -0,0 +1,92 @@
+"""Testes para o índice em memória do cron (JobIndex) e o seu uso no CronService."""
+import time
+
+from zapista.cron.index import JobIndex
+from zapista.cron.service import CronService
+from zapista.cron.types import CronJob, CronJobState, CronPayload, CronSchedule
+
+
+def _job(job_id: str, at_ms: int | None, to: str = "u1", **payload) -> CronJob:
+    return CronJob(
+        id=job_id,
+        name=job_id,
+        schedule=CronSchedule(kind="at", at_ms=at_ms),
+        payload=CronPayload(to=to, **payload),
+        state=CronJobState(next_run_at_ms=at_ms),
+    )
+
+
+def test_pop_due_in_time_order_and_skips_stale():
+    """pop_due devolve só os vencidos, por hora; entradas antigas (snooze/remoção) são ignoradas."""
+    idx = JobIndex([_job("a", 300), _job("b", 100), _job("c", 200), _job("d", 900)])
+    assert idx.next_wake_ms() == 100
+
+    # Snooze de b: a entrada antiga (100) fica no heap mas já não é válida
+    b = idx.get("b")
+    b.state.next_run_at_ms = 800
+    idx.reschedule(b)
+    idx.remove("c")
+    assert idx.next_wake_ms() == 300
+
+    due = idx.pop_due(850)
+    assert [j.id for j in due] == ["a", "b"]
+    assert idx.next_wake_ms() == 900
+
+
+def test_disabled_job_not_due():
+    idx = JobIndex([_job("a", 100)])
+    a = idx.get("a")
+    a.enabled = False
+    idx.reschedule(a)
+    assert idx.pop_due(1000) == []
+    assert idx.next_wake_ms() is None
+
+
+def test_recipient_and_link_indexes():
+    """Índices secundários: por destinatário e por ligações entre jobs; atualizados na remoção."""
+    idx = JobIndex([
+        _job("main", 100, to="u1"),
+        _job("pre", 50, to="u1", parent_job_id="main"),
+        _job("chk", 200, to="u1", deadline_check_for_job_id="main"),
+        _job("other", 100, to="u2"),
+    ])
+    assert [j.id for j in idx.for_recipient("u1")] == ["main", "pre", "chk"]
+    assert idx.count_for_recipient("u2") == 1
+    assert [j.id for j in idx.linked("parent_job_id", "main")] == ["pre"]
+
+    idx.remove("pre")
+    assert idx.linked("parent_job_id", "main") == []
+    assert "pre" not in idx
+    assert [j.id for j in idx.for_recipient("u1")] == ["main", "chk"]
+
+
+def test_service_uses_index(tmp_path):
+    """CronService: list_jobs(to=...), remoção em cascata e próximo wake via heap."""
+    service = CronService(tmp_path / "jobs.json")
+    now_ms = int(time.time() * 1000)
+    main = service.add_job(
+        name="main", schedule=CronSchedule(kind="at", at_ms=now_ms + 3_600_000),
+        message="Reunião", channel="whatsapp", to="u1",
+    )
+    service.add_job(
+        name="pre", schedule=CronSchedule(kind="at", at_ms=now_ms + 1_800_000),
+        message="Aviso", channel="whatsapp", to="u1", parent_job_id=main.id,
+    )
+    other = service.add_job(
+        name="other", schedule=CronSchedule(kind="at", at_ms=now_ms + 600_000),
+        message="Outro", channel="whatsapp", to="u2",
+    )
+
+    assert [j.name for j in service.list_jobs(to="u1")] == ["pre", "main"]
+    assert service._get_next_wake_ms() == other.state.next_run_at_ms
+
+    ok, _ = service.snooze_job(other.id, delay_seconds=7200)
+    assert ok
+    assert service._get_next_wake_ms() == now_ms + 1_800_000
+
+    assert service.remove_job_and_deadline_followups(main.id) == 2
+    assert service.list_jobs(to="u1") == []
+
+    # Persistência: um novo serviço lê o mesmo ficheiro e reconstrói o índice
+    reloaded = CronService(tmp_path / "jobs.json")
+    assert [j.id for j in reloaded.list_jobs()] == [other.id]
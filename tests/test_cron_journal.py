@@ -0,0 +1,135 @@
+"""Testes para a persistência do cron em snapshot + journal append-only."""
+import json
+import time
+
+from zapista.cron.journal import load_jobs_raw
+from zapista.cron.service import CronService
+from zapista.cron.types import CronSchedule
+
+
+def _add(service: CronService, name: str, to: str = "u1"):
+    at_ms = int(time.time() * 1000) + 3_600_000
+    return service.add_job(
+        name=name, schedule=CronSchedule(kind="at", at_ms=at_ms),
+        message=name, channel="whatsapp", to=to,
+    )
+
+
+def test_mutations_append_to_journal_and_replay(tmp_path):
+    """Cada alteração acrescenta 1 registo; um serviço novo reconstrói o estado a partir do journal."""
+    path = tmp_path / "jobs.json"
+    service = CronService(path)
+    a = _add(service, "a")
+    b = _add(service, "b")
+    service.snooze_job(a.id, delay_seconds=600)
+    service.remove_job(b.id)
+
+    # A 1.ª gravação cria o snapshot; as seguintes só acrescentam ao journal
+    assert [j["id"] for j in json.loads(path.read_text())["jobs"]] == [a.id]
+    journal = path.with_name("jobs.json.journal")
+    ops = [json.loads(line)["op"] for line in journal.read_text().splitlines()]
+    assert ops == ["put", "put", "del"]
+
+    reloaded = CronService(path)
+    jobs = reloaded.list_jobs()
+    assert [j.id for j in jobs] == [a.id]
+    assert jobs[0].state.snooze_count == 1
+
+
+def test_truncated_last_record_is_ignored(tmp_path):
+    """Crash a meio de uma escrita: a linha final incompleta é ignorada, o resto do store mantém-se."""
+    path = tmp_path / "jobs.json"
+    service = CronService(path)
+    a = _add(service, "a")
+    service._backend.close()
+    with path.with_name("jobs.json.journal").open("a") as f:
+        f.write('{"op": "put", "job": {"id": "x')
+    _, jobs = load_jobs_raw(path)
+    assert [j["id"] for j in jobs] == [a.id]
+
+
+def test_compaction_writes_snapshot_and_resets_journal(tmp_path, monkeypatch):
+    """Ao passar o limite, o journal é compactado num snapshot atómico (jobs.json) e recomeça vazio."""
+    monkeypatch.setenv("CRON_JOURNAL_COMPACT_EVERY", "3")
+    path = tmp_path / "jobs.json"
+    service = CronService(path)
+    ids = [_add(service, f"j{i}").id for i in range(4)]
+
+    # Snapshot inicial com o 1.º job; o 4.º registo (jobs 2–4 no journal) dispara a compactação
+    data = json.loads(path.read_text())
+    assert [j["id"] for j in data["jobs"]] == ids[:4]
+    assert not path.with_name("jobs.json.journal.1").exists()
+    ids.append(_add(service, "j4").id)
+
+    # O 5.º job ficou no journal novo; snapshot + journal = estado completo
+    _, jobs = load_jobs_raw(path)
+    assert [j["id"] for j in jobs] == ids
+    assert [j.id for j in CronService(path).list_jobs()] == ids
+
+
+def test_legacy_snapshot_only_store_still_loads(tmp_path):
+    """Store antigo (só jobs.json, sem journal) continua a carregar."""
+    path = tmp_path / "jobs.json"
+    service = CronService(path)
+    a = _add(service, "a")
+    assert not path.with_name("jobs.json.journal").exists()
+    assert [j.id for j in CronService(path).list_jobs()] == [a.id]
+
+
+def test_deleting_snapshot_discards_orphan_journal(tmp_path):
+    """Reset manual (apagar jobs.json) não ressuscita jobs a partir de um journal órfão."""
+    path = tmp_path / "jobs.json"
+    service = CronService(path)
+    _add(service, "a")
+    _add(service, "b")
+    service._backend.close()
+    path.unlink()
+    assert load_jobs_raw(path) == (1, [])
+    fresh = CronService(path)
+    assert fresh.list_jobs() == []
+    c = _add(fresh, "c")
+    assert [j.id for j in CronService(path).list_jobs()] == [c.id]
+
+
+def test_fsync_is_time_bounded_on_a_quiet_instance(tmp_path, monkeypatch):
+    """Poucas escritas (< CRON_JOURNAL_FSYNC_EVERY): o fsync periódico não deixa registos por sincronizar."""
+    import asyncio
+
+    monkeypatch.setenv("CRON_JOURNAL_FSYNC_EVERY", "1000")
+    monkeypatch.setenv("CRON_JOURNAL_FSYNC_SECONDS", "0.1")
+
+    async def run():
+        service = CronService(tmp_path / "jobs.json")
+        await service.start()
+        try:
+            _add(service, "a")
+            _add(service, "b")
+            assert service._backend._unsynced == 2
+            await asyncio.sleep(0.3)
+            return service._backend._unsynced
+        finally:
+            service.stop()
+
+    assert asyncio.run(run()) == 0
+
+
+def test_failed_compaction_is_retried_on_next_rotation(tmp_path, monkeypatch):
+    """Snapshot falhou: o .1 fica, a rotação seguinte junta-lhe o journal e volta a compactar."""
+    import zapista.cron.journal as journal_mod
+
+    monkeypatch.setenv("CRON_JOURNAL_COMPACT_EVERY", "2")
+    path = tmp_path / "jobs.json"
+    service = CronService(path)
+    ids = [_add(service, "j0").id]
+    real_write = journal_mod.write_snapshot
+    monkeypatch.setattr(journal_mod, "write_snapshot", lambda *a: (_ for _ in ()).throw(OSError("disco cheio")))
+    ids += [_add(service, f"j{i}").id for i in (1, 2)]
+    rotated = path.with_name("jobs.json.journal.1")
+    assert rotated.exists()  # compactação falhou
+    assert [j["id"] for j in load_jobs_raw(path)[1]] == ids
+
+    monkeypatch.setattr(journal_mod, "write_snapshot", real_write)
+    ids += [_add(service, f"j{i}").id for i in (3, 4)]
+    assert not rotated.exists()
+    assert [j["id"] for j in json.loads(path.read_text())["jobs"]] == ids
+    assert [j.id for j in CronService(path).list_jobs()] == ids
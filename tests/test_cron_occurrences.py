@@ -0,0 +1,84 @@
+"""Testes para a expansão de ocorrências de lembretes recorrentes (agenda /semana, /mes)."""
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from zapista.cron.occurrences import expand_occurrences, job_occurrences
+from zapista.cron.types import CronJob, CronJobState, CronSchedule
+
+LISBON = ZoneInfo("Europe/Lisbon")
+HOUR_MS = 3_600_000
+DAY_MS = 24 * HOUR_MS
+
+
+def _ms(y, m, d, h=0, mi=0, tz=LISBON) -> int:
+    return int(datetime(y, m, d, h, mi, tzinfo=tz).timestamp() * 1000)
+
+
+def test_cron_daily_in_week_honours_tz():
+    """'0 9 * * *' em Lisboa: 7 ocorrências numa semana, todas às 9h locais (inclui mudança de hora)."""
+    sched = CronSchedule(kind="cron", expr="0 9 * * *", tz="Europe/Lisbon")
+    start = _ms(2026, 10, 22)  # semana com o fim do horário de verão (25/10)
+    occ = expand_occurrences(sched, start, start + 7 * DAY_MS - 1)
+    assert len(occ) == 7
+    hours = {datetime.fromtimestamp(o / 1000, tz=LISBON).hour for o in occ}
+    assert hours == {9}
+
+
+def test_not_before_and_not_after_clip_window():
+    sched = CronSchedule(
+        kind="cron", expr="0 9 * * *", tz="Europe/Lisbon",
+        not_before_ms=_ms(2026, 7, 3), not_after_ms=_ms(2026, 7, 5, 12),
+    )
+    occ = expand_occurrences(sched, _ms(2026, 7, 1), _ms(2026, 7, 31))
+    assert [datetime.fromtimestamp(o / 1000, tz=LISBON).day for o in occ] == [3, 4, 5]
+
+
+def test_every_anchored_on_next_run():
+    """'every' 8h: ocorrências ancoradas na próxima execução, só as que caem na janela."""
+    first = _ms(2026, 7, 1, 10)
+    sched = CronSchedule(kind="every", every_ms=8 * HOUR_MS)
+    occ = expand_occurrences(sched, _ms(2026, 7, 2), _ms(2026, 7, 3) - 1, first_ms=first)
+    assert [datetime.fromtimestamp(o / 1000, tz=LISBON).hour for o in occ] == [2, 10, 18]
+
+
+def test_job_occurrences_skips_disabled_and_limits():
+    job = CronJob(
+        id="x", name="x",
+        schedule=CronSchedule(kind="every", every_ms=60_000),
+        state=CronJobState(next_run_at_ms=_ms(2026, 7, 1)),
+    )
+    assert len(job_occurrences(job, _ms(2026, 7, 1), _ms(2026, 8, 1), limit=50)) == 50
+    job.enabled = False
+    assert job_occurrences(job, _ms(2026, 7, 1), _ms(2026, 8, 1)) == []
+
+
+def test_snoozed_cron_shows_real_next_run():
+    """Cron adiado (soneca): a próxima execução real aparece em vez da ocorrência original."""
+    sched = CronSchedule(kind="cron", expr="0 9 * * *", tz="Europe/Lisbon")
+    snoozed = _ms(2026, 7, 1, 9, 5)
+    occ = expand_occurrences(sched, _ms(2026, 7, 1), _ms(2026, 7, 2, 23), first_ms=snoozed)
+    assert occ == [snoozed, _ms(2026, 7, 2, 9)]
+
+
+def test_cron_without_tz_matches_compute_next_run():
+    """Sem tz: a expansão usa UTC, como _compute_next_run (croniter sobre epoch), qualquer que seja o fuso do servidor."""
+    import os
+    import time
+
+    from zapista.cron.service import _compute_next_run
+
+    start = _ms(2030, 7, 1, tz=ZoneInfo("UTC"))
+    sched = CronSchedule(kind="cron", expr="0 9 * * *", not_before_ms=start)
+    old_tz = os.environ.get("TZ")
+    os.environ["TZ"] = "America/Sao_Paulo"
+    time.tzset()
+    try:
+        occ = expand_occurrences(sched, start, start + 3 * DAY_MS - 1)
+        assert occ[0] == _compute_next_run(sched, int(time.time() * 1000))
+        assert occ == [_ms(2030, 7, d, 9, tz=ZoneInfo("UTC")) for d in (1, 2, 3)]
+    finally:
+        if old_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = old_tz
+        time.tzset()
@@ -0,0 +1,134 @@
+"""Testes para o backend SQLite do cron (CRON_STORE=sqlite, tabela cron_jobs)."""
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from zapista.cron.service import CronService
+from zapista.cron.sqlite_store import SqliteCronStore
+from zapista.cron.types import CronSchedule
+
+
+def _session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'organizer.db'}")
+    return sessionmaker(bind=engine)
+
+
+def _add(service: CronService, name: str, at_ms: int, to: str = "u1", **kw):
+    return service.add_job(
+        name=name, schedule=CronSchedule(kind="at", at_ms=at_ms),
+        message=name, channel="whatsapp", to=to, **kw,
+    )
+
+
+def test_service_roundtrip_through_sqlite(tmp_path):
+    """CronService com backend SQLite: add/snooze/remove persistem e um serviço novo recarrega tudo."""
+    factory = _session_factory(tmp_path)
+    path = tmp_path / "jobs.json"
+    now_ms = int(time.time() * 1000)
+    service = CronService(path, backend=SqliteCronStore(path, session_factory=factory))
+    a = _add(service, "a", now_ms + 3_600_000)
+    b = _add(service, "b", now_ms + 7_200_000, parent_job_id=a.id)
+    service.snooze_job(a.id, delay_seconds=600)
+    c = _add(service, "c", now_ms + 600_000, to="u2")
+    service.remove_job(c.id)
+    assert not path.exists()  # nada escrito em jobs.json
+
+    reloaded = CronService(path, backend=SqliteCronStore(path, session_factory=factory))
+    jobs = reloaded.list_jobs(include_disabled=True)
+    assert {j.id for j in jobs} == {a.id, b.id}
+    assert reloaded.get_job(a.id).state.snooze_count == 1
+    assert reloaded.get_job(b.id).payload.parent_job_id == a.id
+
+
+def test_jobs_between_uses_range_and_recipient(tmp_path):
+    factory = _session_factory(tmp_path)
+    store = SqliteCronStore(session_factory=factory)
+    service = CronService(tmp_path / "jobs.json", backend=store)
+    now_ms = int(time.time() * 1000)
+    today = _add(service, "hoje", now_ms + 3_600_000)
+    _add(service, "amanha", now_ms + 30 * 3_600_000)
+    _add(service, "outro", now_ms + 3_600_000, to="u2")
+
+    rows = store.jobs_between(now_ms, now_ms + 12 * 3_600_000, to="u1")
+    assert [r["id"] for r in rows] == [today.id]
+    assert [j.id for j in service.list_jobs_between(now_ms, now_ms + 12 * 3_600_000, to="u1")] == [today.id]
+
+
+def test_imports_legacy_jobs_json_once(tmp_path):
+    """Tabela vazia + jobs.json existente: os jobs são importados para a BD na primeira carga."""
+    path = tmp_path / "jobs.json"
+    now_ms = int(time.time() * 1000)
+    legacy = CronService(path)
+    a = _add(legacy, "a", now_ms + 3_600_000)
+    legacy.stop()
+
+    factory = _session_factory(tmp_path)
+    service = CronService(path, backend=SqliteCronStore(path, session_factory=factory))
+    assert [j.id for j in service.list_jobs()] == [a.id]
+    _, rows = SqliteCronStore(session_factory=factory).load()
+    assert [r["id"] for r in rows] == [a.id]
+
+
+def test_load_jobs_between_for_out_of_process_readers(tmp_path, monkeypatch):
+    """Leitores fora do CronService (#painpoints): consulta por intervalo no backend ativo."""
+    from zapista.cron.storage import load_jobs_between
+
+    now_ms = int(time.time() * 1000)
+    path = tmp_path / "jobs.json"
+    for kind in ("json", "sqlite"):
+        monkeypatch.setenv("CRON_STORE", kind)
+        backend = None
+        if kind == "sqlite":
+            factory = _session_factory(tmp_path)
+            monkeypatch.setattr("backend.database.SessionLocal", factory)  # SqliteCronStore() do leitor
+            monkeypatch.setattr("zapista.cron.storage._READER", None)
+            backend = SqliteCronStore(session_factory=factory)
+        service = CronService(path, backend=backend)
+        late = _add(service, f"{kind}-atrasado", now_ms + 3_600_000)
+        late.state.next_run_at_ms = now_ms - 120_000
+        service._index.reschedule(late)
+        service._save_store()
+        _add(service, f"{kind}-futuro", now_ms + 3_600_000)
+
+        rows = load_jobs_between(path, 1, now_ms - 60_000)
+        assert [r["id"] for r in rows] == [late.id], kind
+
+    from zapista.cron import storage
+    reader = storage._READER
+    load_jobs_between(path, 1, now_ms)
+    assert reader is not None and storage._READER is reader  # um só SqliteCronStore para os leitores
+
+
+def test_job_and_reminder_history_share_a_transaction(tmp_path):
+    """add_job(db=...) + add_scheduled(commit=False): rollback desfaz os dois, commit grava os dois."""
+    from backend.models_db import Base, CronJobRow, ReminderHistory
+    from backend.reminder_history import add_scheduled
+    from backend.user_store import get_or_create_user
+
+    factory = _session_factory(tmp_path)
+    setup = factory()
+    Base.metadata.create_all(bind=setup.get_bind())
+    get_or_create_user(setup, "u1")
+    setup.close()
+    service = CronService(tmp_path / "jobs.json", backend=SqliteCronStore(session_factory=factory))
+    now_ms = int(time.time() * 1000)
+
+    db = factory()
+    job = _add(service, "falha", now_ms + 3_600_000, db=db)
+    add_scheduled(db, "u1", "falha", job_id=job.id, commit=False)
+    db.rollback()
+    db.close()
+    check = factory()
+    assert check.query(CronJobRow).count() == 0 and check.query(ReminderHistory).count() == 0
+    check.close()
+
+    db = factory()
+    job = _add(service, "ok", now_ms + 7_200_000, db=db)
+    add_scheduled(db, "u1", "ok", job_id=job.id, commit=False)
+    db.commit()
+    db.close()
+    check = factory()
+    assert [r.id for r in check.query(CronJobRow).all()] == [job.id]
+    assert [r.job_id for r in check.query(ReminderHistory).all()] == [job.id]
+    check.close()
@@ -0,0 +1,102 @@
+"""Contadores diários em memória: sem I/O por mensagem, gravação em lote, recarga e Redis opcional."""
+import asyncio
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import backend.daily_counters as dc
+from backend.daily_counters import ShardedState
+
+
+@pytest.fixture(autouse=True)
+def _no_redis():
+    with patch("backend.redis_client.get_redis_client", return_value=None):
+        yield
+
+
+def _bump(entry):
+    return {"date": "2026-10-16", "count": (entry or {}).get("count", 0) + 1}
+
+
+def test_updates_stay_in_memory_until_flush(tmp_path):
+    path = tmp_path / "daily_user_messages.json"
+    state = ShardedState(path)
+    writes = []
+    real_replace = dc.os.replace
+    with patch.object(dc.os, "replace", side_effect=lambda a, b: writes.append(b) or real_replace(a, b)):
+        for i in range(200):
+            state.update(f"chat{i % 7}", _bump)
+        assert not path.exists() and state.pending == 7
+        assert state.flush() == 7
+        assert state.flush() == 0  # nada mudou
+    assert writes == [path]
+    data = json.loads(path.read_text())
+    assert sum(v["count"] for v in data.values()) == 200
+
+    reloaded = ShardedState(path)
+    assert reloaded.get("chat0") == data["chat0"]
+
+
+def test_keep_drops_old_entries_on_write(tmp_path):
+    path = tmp_path / "smart_reminder_sent.json"
+    path.write_text(json.dumps({"old": "2020-01-01"}))
+    state = ShardedState(path, keep=lambda v: v >= "2026-01-01")
+    state.update("new", lambda _old: "2026-10-16")
+    state.flush()
+    assert json.loads(path.read_text()) == {"new": "2026-10-16"}
+
+
+def test_redis_backend_writes_only_changed_chats(tmp_path):
+    class FakeRedis:
+        def __init__(self):
+            self.hashes = {"zapista:state:daily_user_messages": {"a": json.dumps({"date": "2026-10-16", "count": 3})}}
+            self.hset_calls = []
+
+        def hgetall(self, key):
+            return dict(self.hashes.get(key, {}))
+
+        def hset(self, key, mapping):
+            self.hset_calls.append(mapping)
+            self.hashes.setdefault(key, {}).update(mapping)
+
+    fake = FakeRedis()
+    with patch("backend.redis_client.get_redis_client", return_value=fake):
+        state = ShardedState(tmp_path / "daily_user_messages.json")
+        state.update("a", _bump)
+        state.update("b", _bump)
+        state.flush()
+    assert set(fake.hset_calls[0]) == {"a", "b"}
+    assert json.loads(fake.hashes["zapista:state:daily_user_messages"]["a"])["count"] == 4
+    assert not (tmp_path / "daily_user_messages.json").exists()
+
+
+def test_periodic_flush_in_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setenv("DAILY_COUNTERS_FLUSH_SECONDS", "0.1")
+    monkeypatch.setattr(dc, "_STATES", [])
+    monkeypatch.setattr(dc, "_FLUSH_TASK", None)
+    state = dc.register_state(ShardedState(tmp_path / "c.json"))
+
+    async def run():
+        state.update("x", _bump)
+        await asyncio.sleep(0.3)
+        flushed = state.pending == 0 and (tmp_path / "c.json").exists()
+        dc.flush_daily_counters()
+        return flushed
+
+    assert asyncio.run(run())
+
+
+def test_smart_reminder_api_uses_counters(tmp_path, monkeypatch):
+    from backend import smart_reminder as sr
+
+    monkeypatch.setattr(sr, "_daily_user_msgs", ShardedState(tmp_path / "d.json"))
+    monkeypatch.setattr(sr, "_sent_state", ShardedState(tmp_path / "s.json"))
+    sr.record_user_message_sent("351910000001@s.whatsapp.net", "Europe/Lisbon")
+    sr.record_user_message_sent("351910000001@s.whatsapp.net", "Europe/Lisbon")
+    assert sr.get_daily_user_message_count("351910000001@s.whatsapp.net", "Europe/Lisbon") == 2
+    assert not sr._already_sent_today("351910000001@s.whatsapp.net")
+    sr._mark_sent_today("351910000001@s.whatsapp.net")
+    assert sr._already_sent_today("351910000001@s.whatsapp.net")
+    assert not Path(tmp_path / "d.json").exists()  # só em memória até ao flush
@@ -0,0 +1,78 @@
+"""FileCache: leituras servidas da memória, validação por (mtime_ns, size), write-through, LRU e MemoryStore."""
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from zapista.utils import file_cache
+from zapista.utils.file_cache import FileCache
+
+
+def test_reads_validated_by_mtime_and_size(tmp_path):
+    cache = FileCache(revalidate_seconds=0)
+    path = tmp_path / "MEMORY.md"
+    assert cache.read_text(path) is None  # entrada negativa
+    path.write_text("um")
+    assert cache.read_text(path) == "um"
+    assert cache.read_text(path) == "um"
+    st = path.stat()
+    path.write_text("dois!")  # edição externa: tamanho muda
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert cache.read_text(path) == "dois!"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["bytes_read"]) == (1, 3, 7)
+
+
+def test_no_filesystem_calls_within_revalidate_window(tmp_path):
+    cache = FileCache(revalidate_seconds=60)
+    path = tmp_path / "2026-10-16.md"
+    cache.write_text(path, "# nota")
+    assert cache.read_text(tmp_path / "missing.md") is None
+    with patch.object(Path, "stat", side_effect=AssertionError("stat")), \
+            patch.object(Path, "read_bytes", side_effect=AssertionError("read")):
+        for _ in range(10):
+            assert cache.read_text(path) == "# nota"
+            assert cache.read_text(tmp_path / "missing.md") is None
+    assert cache.stats()["bytes_read"] == 0
+
+
+def test_lru_bounds_entries_and_bytes(tmp_path):
+    cache = FileCache(max_entries=3, max_bytes=10, revalidate_seconds=60)
+    for i in range(5):
+        cache.write_text(tmp_path / f"{i}.md", "abcd")
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes_cached"] == 8 and stats["evictions"] == 3
+    assert cache.read_text(tmp_path / "0.md") == "abcd"  # evicted: volta a ler do disco
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    cache = FileCache(revalidate_seconds=60)
+    monkeypatch.setattr(file_cache, "_CACHE", cache)
+    return cache
+
+
+def test_memory_store_idle_turns_do_not_touch_disk(tmp_path, shared_cache):
+    from zapista.agent.memory import MemoryStore
+
+    store = MemoryStore(tmp_path)
+    key = "whatsapp:351910000001"
+    store.upsert_section(key, "## Perfil", "Nome: Ana")
+    store.append_today("ligou ao banco", session_key=key)
+    assert "Nome: Ana" in store.get_memory_context(key)
+    store.get_recent_memories(days=7, session_key=key)  # 1.ª vez: stat dos dias sem nota
+
+    with patch.object(Path, "stat", side_effect=AssertionError("stat")), \
+            patch.object(Path, "read_bytes", side_effect=AssertionError("read")), \
+            patch.object(Path, "mkdir", side_effect=AssertionError("mkdir")):
+        for _ in range(5):
+            ctx = store.get_memory_context(key)
+            assert "Nome: Ana" in ctx and "ligou ao banco" in ctx
+            store.get_recent_memories(days=7, session_key=key)
+
+    assert (tmp_path / "memory" / "whatsapp_351910000001" / "MEMORY.md").read_text().startswith("## Perfil")
+    assert not (tmp_path / "memory" / "whatsapp_351910000002").exists()  # leituras não criam pastas
+    store.get_memory_context("whatsapp:351910000002")
+    assert not (tmp_path / "memory" / "whatsapp_351910000002").exists()
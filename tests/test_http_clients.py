@@ -0,0 +1,68 @@
+"""Clientes HTTP partilhados por upstream: reutilização, histograma de latência, fecho."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from zapista.utils import http_clients
+from zapista.utils.http_clients import (
+    HttpClientRegistry,
+    close_http_clients,
+    get_http_client,
+    get_http_client_stats,
+    upstream_request,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry():
+    http_clients._REGISTRY = None
+    yield
+    http_clients._REGISTRY = None
+
+
+@pytest.mark.asyncio
+async def test_same_client_reused_per_upstream():
+    a = get_http_client("openai")
+    assert get_http_client("openai") is a
+    assert get_http_client("groq") is not a
+    await close_http_clients()
+    assert a.is_closed
+    assert get_http_client_stats() == {}
+
+
+def test_new_event_loop_gets_new_client():
+    registry = HttpClientRegistry()
+
+    async def _get():
+        return registry.client("whisper")
+
+    first = asyncio.run(_get())
+    second = asyncio.run(_get())
+    assert first is not second
+
+
+@pytest.mark.asyncio
+async def test_upstream_request_records_latency_and_errors():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(503 if request.url.path == "/down" else 200, json={"ok": True})
+
+    registry = http_clients.get_http_registry()
+    loop = asyncio.get_running_loop()
+    registry._clients["perplexity"] = (httpx.AsyncClient(transport=httpx.MockTransport(handler)), loop)
+
+    r = await upstream_request("perplexity", "POST", "https://api.example/search", json={"q": "x"})
+    assert r.json() == {"ok": True}
+    await upstream_request("perplexity", "GET", "https://api.example/down")
+    assert calls == ["/search", "/down"]
+
+    stats = get_http_client_stats()["perplexity"]
+    assert stats["count"] == 2
+    assert stats["errors"] == 1
+    assert sum(stats["buckets"].values()) == 2
+    assert stats["p50_ms"] <= stats["p95_ms"]
+    await close_http_clients()
@@ -0,0 +1,56 @@
+"""Matcher de intents (trie de prefixos): nunca deixa de fora um padrão que casa e não muda o parse()."""
+import re
+from unittest.mock import patch
+
+from backend.command_nl import _normalize_cached, normalize_nl_to_command
+from backend.command_parser import core
+from backend.command_parser.matcher import IntentMatcher, lead_prefixes
+
+SAMPLES = [
+    "/lembrete amanhã 10h reunião", "/LISTA mercado add leite", "/list filmes", "/feito mercado 2",
+    "/remover 3", "/hora", "/agenda amanhã", "/hoje", "mostra a minha lista de compras",
+    "mostra minha agenda", "adiciona leite na lista de compras", "cria uma lista de filmes Matrix",
+    "hoje tenho muita coisa para fazer: ler, correr", "tenho de ligar ao banco", "me lembra de pagar a luz",
+    "lembrete: beber água", "filme: Matrix", "anota comprar pão", "Mostre a AGENDA", "ÁGUA", "  /música  Fado ",
+    "não esquecer de comprar ovos", "olá, tudo bem?", "",
+]
+
+
+def test_lead_prefixes_from_vocab():
+    assert lead_prefixes(core.RE_HORA) == {"/hor", "/tim"}
+    assert lead_prefixes(re.compile(r"^(?:hoje\s+)?tenho\s+x", re.I)) == {"hoje", "tenh"}
+    assert lead_prefixes(re.compile(r"^[^/]+x")) == {""}  # classe negada: corre sempre
+
+
+def test_candidates_are_a_superset_of_matches():
+    matcher = core.INTENT_MATCHER
+    for raw in SAMPLES + [s.upper() for s in SAMPLES]:
+        text = raw.strip()
+        mask = matcher.candidates(text)
+        for i, pattern in enumerate(matcher.patterns):
+            if pattern.match(text):
+                assert mask >> i & 1, (matcher.names[i], text)
+    assert bin(matcher.candidates("olá, tudo bem?")).count("1") == 0
+
+
+def test_parse_unchanged_without_trie():
+    expected = {}
+    with patch.object(IntentMatcher, "candidates", lambda self, text: -1):
+        for s in SAMPLES:
+            expected[s] = core.parse(s)
+    assert {s: core.parse(s) for s in SAMPLES} == expected
+
+
+def test_match_intents_returns_every_match_with_captures():
+    names = {m.name: m.groups for m in core.match_intents("/feito mercado 2")}
+    assert names["RE_FEITO_LIST_ID"] == ("mercado", "2")
+    assert names["RE_FEITO_TEXT"] == ("mercado 2",)
+    assert core.match_intents("olá") == []
+
+
+def test_normalize_nl_to_command_is_cached():
+    _normalize_cached.cache_clear()
+    for _ in range(4):
+        assert normalize_nl_to_command("ajuda") == "/help"
+    assert _normalize_cached.cache_info().hits == 3
+    assert normalize_nl_to_command(None) is None
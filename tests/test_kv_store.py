@@ -0,0 +1,120 @@
+"""KVStore: namespaces, TTL, gravação em lote, importação dos JSON antigos e módulos migrados."""
+import json
+import threading
+import time
+
+import pytest
+
+from backend import kv_store
+from backend.kv_store import KVStore, Namespace, _SqliteBackend
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = KVStore(backend=_SqliteBackend(tmp_path / "state.db"))
+    previous = kv_store.set_kv_store(s)
+    yield s
+    s.close()
+    kv_store.set_kv_store(previous)
+
+
+def _reopen(tmp_path) -> KVStore:
+    return KVStore(backend=_SqliteBackend(tmp_path / "state.db"))
+
+
+def test_writes_are_batched_and_survive_reopen(store, tmp_path):
+    for i in range(100):
+        store.update("ns", "counter", lambda v: (v or 0) + 1)
+        store.set("ns", f"k{i % 3}", i)
+    store.set("ns", "short", 1, ttl=0.05)
+    assert store.get("ns", "counter") == 100 and store.pending == 5
+    assert _reopen(tmp_path).get("ns", "counter") is None  # nada gravado até ao flush
+
+    time.sleep(0.06)
+    assert store.get("ns", "short") is None
+    assert store.flush() == 5 and store.stats()["flushes"] == 1
+    reopened = _reopen(tmp_path)
+    assert reopened.get("ns", "counter") == 100
+    assert [k for k, _ in reopened.items("ns")] == ["counter", "k0", "k1", "k2"]
+
+
+def test_update_has_no_lost_updates_across_threads(store):
+    def worker():
+        for _ in range(200):
+            store.update("ns", "n", lambda v: (v or 0) + 1)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.get("ns", "n") == 1600
+
+
+def test_backend_is_chosen_by_setting(tmp_path, monkeypatch):
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:1/0")
+    monkeypatch.delenv("KV_BACKEND", raising=False)
+    assert kv_store._open_backend(tmp_path / "a.db").name == "sqlite"  # REDIS_URL sozinho não muda o backend
+
+    monkeypatch.setenv("KV_BACKEND", "redis")
+    monkeypatch.setattr("backend.redis_client.get_redis_client", lambda: None)
+    with pytest.raises(RuntimeError):
+        kv_store._open_backend(tmp_path / "b.db")  # sem fallback para SQLite
+    monkeypatch.setenv("KV_BACKEND", "memcached")
+    with pytest.raises(ValueError):
+        kv_store._open_backend(tmp_path / "c.db")
+
+
+def test_legacy_json_imported_once(store, tmp_path):
+    legacy = tmp_path / "muted.json"
+    legacy.write_text(json.dumps({"351910000001": {"count": 2, "muted_until_ts": None}}))
+    ns = Namespace("muted_test", legacy=lambda: json.loads(legacy.read_text()))
+    assert ns.get("351910000001")["count"] == 2
+    ns.delete("351910000001")
+    store.flush()
+
+    kv_store.set_kv_store(_reopen(tmp_path))
+    try:
+        assert ns.get("351910000001") is None  # não reimporta o ficheiro antigo
+    finally:
+        kv_store.set_kv_store(store)
+
+
+def test_migrated_modules_use_store(store, tmp_path, monkeypatch):
+    from backend.command_filter import get_blocked_stats, record_blocked
+    from backend.god_mode_lockout import clear_failed_attempts, is_locked_out, record_failed_attempt
+    from backend.painpoints_store import add_painpoint, get_painpoints
+    from backend.server_metrics import _load_metrics, record_event
+    from backend.stale_removal_notifications import add_removals, consume
+    from zapista.utils import extra_allowed
+
+    monkeypatch.setattr("backend.stale_removal_notifications._build_apology_message", lambda *a, **k: "desculpa")
+    chat = "kv_lockout_5511999887766"
+    for _ in range(5):
+        record_failed_attempt(chat)
+    assert is_locked_out(chat)
+    assert _reopen(tmp_path).get("god_mode_lockout", chat)["locked_until"] > time.time()  # gravado já
+    clear_failed_attempts(chat)
+    assert not is_locked_out(chat)
+
+    add_removals("whatsapp", "u1", [("j1", "Água")])
+    assert consume("whatsapp", "u1") == (False, None)
+    assert consume("whatsapp", "u1") == (True, "desculpa")
+    assert consume("whatsapp", "u1") == (False, None)
+
+    assert extra_allowed.add_extra_allowed("+351 910 000 002")
+    assert not extra_allowed.add_extra_allowed("351910000002")
+    assert "351910000002" in extra_allowed.get_extra_allowed_list()
+    assert extra_allowed.remove_extra_allowed("351910000002")
+
+    for _ in range(3):
+        record_event("whatsapp_skipped")
+    assert _load_metrics()["today_events"]["whatsapp_skipped"] == 3
+
+    for chat in ("5511999000001@c.us", "5511999000001@c.us", "5511999000002@c.us"):
+        add_painpoint(chat)
+    assert [p["digits"] for p in get_painpoints()] == ["5511999000002", "5511999000001"]  # sem duplicado nas 24h
+    for _ in range(2):
+        record_blocked("whatsapp", "5511999000003", "rm -rf /", "rm_rf_root")
+    [blocked] = get_blocked_stats()
+    assert blocked["total"] == 2 and blocked["reasons"] == {"rm_rf_root": 2}
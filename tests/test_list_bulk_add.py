@@ -0,0 +1,67 @@
+"""ListTool: adição em lote (uma transação, posições contíguas, dedup, auditoria em lote)."""
+import json
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.models_db import AuditLog, Base, List, ListItem
+from backend.user_store import get_or_create_user
+from zapista.agent.tools.list_tool import ListTool
+
+
+def _session_and_commits():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    commits = []
+    db = sessionmaker(bind=engine)()
+    event.listen(db, "after_commit", lambda s: commits.append(1))
+    return db, commits
+
+
+def test_add_many_single_commit_contiguous_positions_and_dedup():
+    db, commits = _session_and_commits()
+    user = get_or_create_user(db, "351910000001@s.whatsapp.net")
+    tool = ListTool()
+    assert tool._add_single(db, user.id, "mercado", "ovos")
+    commits.clear()
+
+    groceries = ["leite", "ovo", "pão", "Leite", "arroz"] + [f"item {i}" for i in range(25)]
+    added, total = tool._add_many(db, user.id, "mercado", groceries)
+
+    assert len(commits) == 1
+    assert added == 28  # "ovo" (já existe "ovos") e "Leite" (repetido no lote) ignorados
+    assert total == 29
+    lst = db.query(List).filter(List.user_id == user.id, List.name == "mercado").one()
+    positions = [p for (p,) in db.query(ListItem.position).filter(ListItem.list_id == lst.id).order_by(ListItem.position)]
+    assert positions == list(range(1, 30))
+    audits = db.query(AuditLog).filter(AuditLog.action == "list_add").all()
+    assert len(audits) == 29
+    ids = {json.loads(a.payload_json)["item_id"] for a in audits}
+    assert ids == {i for (i,) in db.query(ListItem.id)}
+
+
+def test_add_many_creates_list_and_nothing_new_skips_commit():
+    db, commits = _session_and_commits()
+    user = get_or_create_user(db, "351910000002@s.whatsapp.net")
+    tool = ListTool()
+    assert tool._add_many(db, user.id, "filmes", ["Matrix", "Alien"]) == (2, 2)
+    commits.clear()
+    assert tool._add_many(db, user.id, "filmes", ["matrix", ""]) == (0, 2)
+    assert commits == []
+
+
+@pytest.mark.asyncio
+async def test_execute_add_with_items_uses_bulk_path(monkeypatch):
+    db, commits = _session_and_commits()
+    monkeypatch.setattr("zapista.agent.tools.list_tool.get_session", lambda: db)
+    monkeypatch.setattr(db, "close", lambda: None)
+    tool = ListTool()
+    tool.set_context("whatsapp", "351910000003@s.whatsapp.net")
+    calls = []
+    monkeypatch.setattr(tool, "_add_many", lambda *a: calls.append(a[3]) or ListTool._add_many(tool, *a))
+
+    out = await tool.execute(action="add", list_name="mercado", items=["sal, grosso", "açúcar", "  "])
+
+    assert calls == [["sal, grosso", "açúcar"]]  # itens não são re-divididos
+    assert "mercado" in out
@@ -0,0 +1,89 @@
+"""Logs JSON em fila: escrita fora da thread do chamador, limite por evento, contadores e gate de nível."""
+import json
+import logging
+import threading
+
+import pytest
+
+from backend.logger import JSONLogHandler, log_enabled
+from zapista.utils.logging_config import reset_trace_id, set_trace_id
+
+
+@pytest.fixture
+def make_logger():
+    created = []
+
+    def _make(**kw):
+        handler = JSONLogHandler(**kw)
+        logger = logging.getLogger(f"test_logger_{len(created)}_{id(handler)}")
+        logger.handlers = [handler]
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        created.append(handler)
+        return logger, handler
+
+    yield _make
+    for handler in created:
+        handler.close()
+
+
+def _lines(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.strip()]
+
+
+def test_records_written_by_background_thread_in_batches(make_logger, capsys):
+    logger, handler = make_logger(rate_limit=0)
+    writers = []
+    real_write = handler._write
+    handler._write = lambda records: writers.append(threading.current_thread().name) or real_write(records)
+
+    token = set_trace_id("trace-123")
+    try:
+        for i in range(50):
+            logger.info("evt", extra={"extra": {"i": i}})
+    finally:
+        reset_trace_id(token)
+    handler.flush()
+
+    out = _lines(capsys)
+    assert [r["i"] for r in out] == list(range(50))
+    assert {r["trace_id"] for r in out} == {"trace-123"}  # capturado na thread do chamador
+    assert set(writers) == {"log-writer"} and handler.batches <= len(writers) < 50
+
+
+def test_rate_limit_per_event_counts_and_summarises(make_logger, capsys):
+    logger, handler = make_logger(use_queue=False, rate_limit=5)
+    for _ in range(20):
+        logger.info("noisy")
+    logger.info("other")
+    logger.error("noisy")  # ERROR nunca é limitado
+    assert handler.stats()["dropped_rate_limited"] == 15
+    assert handler.stats()["top_rate_limited"] == [("noisy", 15)]
+
+    handler._windows["noisy"][0] -= 1.0  # janela seguinte
+    logger.info("noisy")
+    out = _lines(capsys)
+    assert sum(r["message"] == "noisy" for r in out) == 7
+    assert {"message": "log_rate_limited", "event": "noisy", "dropped": 15}.items() <= out[-2].items()
+
+
+def test_queue_full_drops_and_counts(make_logger):
+    logger, handler = make_logger(queue_size=3, rate_limit=0)
+    handler._thread = threading.Thread(target=lambda: None)  # writer parado: a fila não esvazia
+    for i in range(10):
+        logger.info("evt")
+    assert handler.stats()["dropped_queue_full"] == 7 and handler.stats()["queued"] == 3
+
+
+def test_log_enabled_gate(make_logger, monkeypatch):
+    import backend.logger as bl
+
+    logger, handler = make_logger(use_queue=False, rate_limit=2)
+    monkeypatch.setattr(bl, "_HANDLER", handler)
+    assert not log_enabled(logger, logging.DEBUG, "evt")
+    assert log_enabled(logger, logging.INFO, "evt")
+    logger.info("evt")
+    logger.info("evt")
+    assert not log_enabled(logger, logging.INFO, "evt")  # já no limite: não vale a pena montar o extra
+    assert log_enabled(logger, logging.ERROR, "evt")
+    assert handler.dropped_rate_limited == 1
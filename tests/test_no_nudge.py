@@ -78,8 +78,10 @@ async def test_one_time_no_nudge():
     # Cleanup
     if db_path.exists():
         db_path.unlink()
-    if jobs_json.exists():
-        jobs_json.unlink()
+    service.stop()
+    for p in (jobs_json, Path("test_jobs.json.journal")):
+        if p.exists():
+            p.unlink()
 
 if __name__ == "__main__":
     asyncio.run(test_one_time_no_nudge())
@@ -0,0 +1,82 @@
+"""Etapas pré-LLM em paralelo: caminho crítico = etapa mais lenta, cancelamento em veredicto bloqueante, prazos."""
+
+import asyncio
+import time
+
+import pytest
+
+from zapista.agent.pre_llm import Stage, run_stages
+
+
+def _slow(result, delay: float, log: list | None = None, name: str = ""):
+    async def run():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(name)
+            raise
+        return result
+    return run
+
+
+@pytest.mark.asyncio
+async def test_stages_run_concurrently():
+    stages = [
+        Stage("sensitive", _slow(None, 0.2), 2.0),
+        Stage("scope", _slow(True, 0.2), 2.0, blocks=lambda r: r is False),
+        Stage("reasoning", _slow("passo 1", 0.2), 2.0),
+        Stage("compress", _slow(None, 0.2), 2.0),
+    ]
+    t0 = time.perf_counter()
+    report = await run_stages(stages)
+    elapsed = time.perf_counter() - t0
+
+    assert elapsed < 0.5  # em série seriam 0.8 s
+    assert report.blocked_by is None
+    assert report.get("scope") is True and report.get("reasoning") == "passo 1"
+    assert set(report.status.values()) == {"ok"}
+    assert report.as_log()["serial_ms"] > report.total_ms
+
+
+@pytest.mark.asyncio
+async def test_blocking_verdict_cancels_the_rest():
+    cancelled: list[str] = []
+    stages = [
+        Stage("sensitive", _slow(None, 0.1), 2.0, blocks=lambda r: bool(r), cancel_on_block=False),
+        Stage("scope", _slow(False, 0.02), 2.0, blocks=lambda r: r is False),
+        Stage("reasoning", _slow("x", 1.0, cancelled, "reasoning"), 2.0),
+    ]
+    t0 = time.perf_counter()
+    report = await run_stages(stages)
+    assert time.perf_counter() - t0 < 0.5
+    assert report.blocked_by == "scope"
+    assert report.status == {"scope": "ok", "reasoning": "cancelled", "sensitive": "ok"}  # sensível não é cancelado
+    await asyncio.sleep(0)
+    assert cancelled == ["reasoning"]
+
+
+@pytest.mark.asyncio
+async def test_earlier_blocking_stage_wins_over_faster_one():
+    stages = [
+        Stage("sensitive", _slow(True, 0.1), 2.0, blocks=lambda r: bool(r), cancel_on_block=False),
+        Stage("scope", _slow(False, 0.01), 2.0, blocks=lambda r: r is False),
+    ]
+    report = await run_stages(stages)
+    assert report.blocked_by == "sensitive"
+
+
+@pytest.mark.asyncio
+async def test_timeout_and_error_fall_back_to_default():
+    async def boom():
+        raise RuntimeError("provider down")
+
+    stages = [
+        Stage("scope", _slow(True, 1.0), 0.1, default=None),
+        Stage("reasoning", boom, 1.0, default=None),
+    ]
+    t0 = time.perf_counter()
+    report = await run_stages(stages)
+    assert time.perf_counter() - t0 < 0.5
+    assert report.get("scope") is None and report.status["scope"] == "timeout"
+    assert report.status["reasoning"] == "error" and "provider down" in report.errors["reasoning"]
@@ -0,0 +1,94 @@
+"""Prompt em prefixo estático (cache por idioma, com hash) + sufixo dinâmico; tokens em cache por chamada."""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from zapista.agent.context import ContextBuilder
+from zapista.agent.skills import SkillsLoader
+
+
+def test_static_prefix_built_once_and_time_only_in_suffix(tmp_path):
+    (tmp_path / "AGENTS.md").write_text("x")
+    cb = ContextBuilder(tmp_path)
+    with patch.object(SkillsLoader, "build_skills_summary", return_value="<skills/>") as skills, \
+            patch("zapista.clock_drift.get_effective_time", return_value=1_800_000_000.0):
+        first = cb.build_system_prompt(user_lang="pt-PT")
+    with patch("zapista.clock_drift.get_effective_time", return_value=1_800_000_600.0):
+        second = cb.build_system_prompt(user_lang="pt-PT")
+    assert skills.call_count == 1
+
+    prefix = cb.build_static_prefix("pt-PT")
+    assert first.startswith(prefix) and second.startswith(prefix)
+    assert first != second  # só o sufixo (hora) muda
+    assert "## Current Time" not in prefix and "AGENTS.md" in prefix and "STRICT LANGUAGE RULE" in prefix
+    with patch.object(SkillsLoader, "build_skills_summary", return_value="<skills/>"):
+        assert cb.prefix_hash("pt-PT") != cb.prefix_hash("en")
+        assert cb.prefix_hash("pt-PT") == ContextBuilder(tmp_path).prefix_hash("pt-PT")  # estável entre processos
+
+
+def test_prefix_rebuilt_when_skills_or_reference_files_change(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMPT_PREFIX_REVALIDATE_SECONDS", "0")
+    cb = ContextBuilder(tmp_path)
+    cb.skills.builtin_skills = tmp_path / "no-builtin"
+    before = cb.build_static_prefix("en")
+    assert cb.build_static_prefix("en") is before  # nada mudou: mesma string em cache
+
+    (tmp_path / "RULES_DATAS.md").write_text("regras")
+    skill = tmp_path / "skills" / "nova"
+    skill.mkdir(parents=True)
+    (skill / "SKILL.md").write_text("---\nname: nova\ndescription: skill nova\n---\nx")
+    after = cb.build_static_prefix("en")
+    assert after != before and "RULES_DATAS.md" in after and "nova" in after
+
+
+def test_client_memory_written_is_bounded(tmp_path, monkeypatch):
+    from zapista.agent import context
+
+    monkeypatch.setattr(context, "_CLIENT_MEMORY_MAX", 3)
+    written = []
+    monkeypatch.setattr("backend.client_memory.build_client_memory_content", lambda db, chat_id: f"nome {chat_id}")
+    monkeypatch.setattr("backend.client_memory.write_client_memory_file", lambda ws, chat_id, content: written.append(chat_id))
+    cb = ContextBuilder(tmp_path)
+    with patch.object(cb, "_time_block", return_value=""), patch("backend.database.get_session"):
+        for n in range(5):
+            cb.build_dynamic_suffix(session_key=f"whatsapp:{n}")
+        cb.build_dynamic_suffix(session_key="whatsapp:4")
+    assert written == ["0", "1", "2", "3", "4"]  # conteúdo igual não regrava
+    assert list(cb._client_memory_written) == ["2", "3", "4"]
+
+
+def test_cached_tokens_from_usage_formats():
+    from zapista.providers.litellm_provider import _cached_prompt_tokens
+
+    assert _cached_prompt_tokens(SimpleNamespace(prompt_tokens_details=SimpleNamespace(cached_tokens=800))) == 800
+    assert _cached_prompt_tokens(SimpleNamespace(prompt_tokens_details={"cached_tokens": 5})) == 5
+    assert _cached_prompt_tokens(SimpleNamespace(prompt_tokens_details=None, prompt_cache_hit_tokens=640)) == 640
+    assert _cached_prompt_tokens(SimpleNamespace(cache_read_input_tokens=12)) == 12
+    assert _cached_prompt_tokens(SimpleNamespace()) == 0
+
+
+def test_usage_callback_receives_cached_tokens_and_stats(monkeypatch):
+    from backend import token_usage
+    from zapista.providers import litellm_provider
+    from zapista.providers.litellm_provider import LiteLLMProvider
+
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="ok", tool_calls=None), finish_reason="stop")],
+        usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=10, total_tokens=1010,
+                              prompt_tokens_details=SimpleNamespace(cached_tokens=900)),
+    )
+
+    async def fake_acompletion(**kwargs):
+        return response
+
+    calls = []
+    monkeypatch.setattr(litellm_provider, "acompletion", fake_acompletion)
+    provider = LiteLLMProvider(api_key="k", default_model="deepseek/deepseek-chat", usage_callback=lambda **kw: calls.append(kw))
+    asyncio.run(provider.chat([{"role": "user", "content": "oi"}]))
+    assert calls[0]["cached_tokens"] == 900 and calls[0]["input_tokens"] == 1000
+
+    monkeypatch.setattr(token_usage, "_PROMPT_CACHE_STATS", {})
+    token_usage._record_prompt_cache("deepseek", 1000, 900)
+    token_usage._record_prompt_cache("deepseek", 1000, 0)
+    st = token_usage.get_prompt_cache_stats()["deepseek"]
+    assert st["hit_rate"] == 0.5 and st["cached_ratio"] == 0.45 and st["saved_usd"] > 0
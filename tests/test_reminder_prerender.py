@@ -0,0 +1,125 @@
+"""Texto de entrega dos lembretes gerado antes da hora: lotes, cache take/miss, add_job e sweep."""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from zapista.cron.prerender import (
+    ReminderPrerenderer,
+    get_reminder_prerender_stats,
+    parse_batch_reply,
+    resolve_reminder_language,
+)
+from zapista.cron.service import CronService
+from zapista.cron.types import CronSchedule
+
+
+class FakeProvider:
+    def __init__(self, batch_reply=None):
+        self.prompts: list[str] = []
+        self.batch_reply = batch_reply
+
+    async def chat(self, messages, model=None, max_tokens=4096, profile=None, **kw):
+        prompt = messages[0]["content"]
+        self.prompts.append(prompt)
+        if prompt.startswith("Reminders to users"):
+            n = prompt.count("\n") - 1
+            content = self.batch_reply if self.batch_reply is not None else json.dumps([f"txt {i} 🔔" for i in range(n)])
+        else:
+            content = "single 🔔 " + prompt.rsplit("Reminder: ", 1)[-1]
+        return SimpleNamespace(content=content)
+
+
+@pytest.fixture(autouse=True)
+def _no_db(monkeypatch):
+    def boom():
+        raise RuntimeError("sem BD")
+
+    monkeypatch.setattr("backend.database.get_session", boom)
+
+
+def test_resolve_language_phone_then_portuguese_hint():
+    assert resolve_reminder_language("351910000001@s.whatsapp.net", None, "call mom") == "pt-PT"
+    assert resolve_reminder_language("5511999999999@s.whatsapp.net", None, "call mom") == "pt-BR"
+    assert resolve_reminder_language("15550001111@s.whatsapp.net", None, "call mom") == "en"
+    assert resolve_reminder_language("15550001111@s.whatsapp.net", None, "beber água") == "pt-BR"
+
+
+def test_parse_batch_reply_requires_exact_count():
+    assert parse_batch_reply('Aqui: ["a", "b"]', 2) == ["a", "b"]
+    assert parse_batch_reply('["a"]', 2) is None
+    assert parse_batch_reply('["a", ""]', 2) is None
+    assert parse_batch_reply("nada", 1) is None
+
+
+@pytest.mark.asyncio
+async def test_render_many_batches_and_get_keeps_text():
+    provider = FakeProvider()
+    pr = ReminderPrerenderer(provider, "m", batch_size=3)
+    keys = [(f"msg {i}", "pt-PT") for i in range(5)]
+
+    assert await pr.render_many(keys + keys[:1]) == 5
+    assert len(provider.prompts) == 2  # lotes de 3 + 2, duplicado ignorado
+    assert pr.get("msg 0", "pt-PT") == "txt 0 🔔"
+    assert pr.get("msg 0", "pt-PT") == "txt 0 🔔"  # outro job com o mesmo texto/idioma também o recebe
+    assert pr.get("outra", "en") is None
+    assert pr.stats()["hits"] == 2 and pr.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_batch_reply_falls_back_to_single_prompts():
+    provider = FakeProvider(batch_reply="desculpa, não consigo")
+    pr = ReminderPrerenderer(provider, "m", batch_size=10)
+
+    assert await pr.render_many([("a", "en"), ("b", "en")]) == 2
+    assert len(provider.prompts) == 3
+    assert pr.get("b", "en") == "single 🔔 b"
+
+
+@pytest.mark.asyncio
+async def test_request_is_debounced_into_one_batch(monkeypatch):
+    provider = FakeProvider()
+    pr = ReminderPrerenderer(provider, "m", batch_size=10)
+    real_flush = pr._flush_soon
+    monkeypatch.setattr(pr, "_flush_soon", lambda delay=1.0: real_flush(0))
+
+    pr.request("tomar remédio", "pt-BR")
+    pr.request("tomar remédio", "pt-BR")
+    pr.request("beber água", "pt-BR")
+    await pr._flush_task
+
+    assert len(provider.prompts) == 1
+    assert pr.get("beber água", "pt-BR")
+
+
+@pytest.mark.asyncio
+async def test_add_job_hook_and_sweep_cover_jobs_in_horizon(tmp_path, monkeypatch):
+    provider = FakeProvider()
+    cron = CronService(tmp_path / "jobs.json")
+    pr = ReminderPrerenderer(provider, "m", cron_service=cron, horizon_hours=6, batch_size=10)
+    requested = []
+    monkeypatch.setattr(pr, "request", lambda msg, lang: requested.append((msg, lang)))
+    cron.on_job_added = pr.on_job_added
+    now_ms = int(time.time() * 1000)
+
+    def add(msg, in_hours):
+        return cron.add_job(
+            name=msg, schedule=CronSchedule(kind="at", at_ms=now_ms + int(in_hours * 3_600_000)),
+            message=msg, deliver=True, channel="whatsapp", to="351910000001@s.whatsapp.net",
+        )
+
+    add("reunião", 1)
+    add("dentista", 30)  # fora do horizonte
+    assert requested == [("reunião", "pt-PT")]
+
+    assert await pr.sweep() == 1
+    assert pr.get("reunião", "pt-PT") and pr.get("dentista", "pt-PT") is None
+    assert len(provider.prompts) == 1
+
+    pr.start()
+    assert get_reminder_prerender_stats()["cached"] == 1
+    pr.stop()
+    await asyncio.sleep(0)
+    assert get_reminder_prerender_stats() is None
@@ -0,0 +1,76 @@
+"""Testes para a sessão de BD por mensagem (request_scope / get_session)."""
+import asyncio
+
+import pytest
+
+from backend.database import RequestSession, get_session, request_scope
+
+
+def test_get_session_shares_request_session_and_close_is_noop():
+    with request_scope() as db:
+        a = get_session()
+        a.close()  # chamadores continuam a fechar: não pode fechar a sessão do pedido
+        assert a is db and get_session() is db
+        with request_scope() as inner:
+            assert inner is db
+    outside = get_session()
+    try:
+        assert outside is not db and not isinstance(outside, RequestSession)
+    finally:
+        outside.close()
+
+
+def test_rollback_on_error():
+    calls = []
+    with pytest.raises(RuntimeError):
+        with request_scope() as db:
+            db.rollback = lambda: calls.append("rollback")
+            db.commit = lambda: calls.append("commit")
+            raise RuntimeError("boom")
+    assert calls == ["rollback"]
+
+
+def test_concurrent_requests_get_separate_sessions():
+    async def one():
+        with request_scope() as db:
+            await asyncio.sleep(0)
+            assert get_session() is db
+            return db
+
+    async def run():
+        return await asyncio.gather(one(), one())
+
+    a, b = asyncio.run(run())
+    assert a is not b
+
+
+def test_close_rolls_back_failed_flush():
+    from sqlalchemy.exc import PendingRollbackError
+    from backend.models_db import List
+
+    with request_scope() as db:
+        db.add_all([List(id=-4242, user_id=-1, name="a"), List(id=-4242, user_id=-1, name="b")])
+        with pytest.raises(Exception):
+            db.flush()
+        with pytest.raises(PendingRollbackError):
+            db.query(List).count()
+        get_session().close()  # handler apanhou o erro e só fecha (sem rollback)
+        assert get_session().query(List).filter(List.id == -4242).count() == 0
+
+
+def test_tasks_spawned_in_scope_get_their_own_session():
+    async def run():
+        with request_scope() as db:
+            async def child():
+                s = get_session()
+                try:
+                    return s
+                finally:
+                    s.close()
+
+            spawned = await asyncio.create_task(child())
+            assert get_session() is db
+        return db, spawned
+
+    db, spawned = asyncio.run(run())
+    assert spawned is not db and not isinstance(spawned, RequestSession)
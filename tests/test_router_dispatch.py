@@ -0,0 +1,63 @@
+"""Índice de despacho do router: só os handlers cujas pré-condições batem são aguardados."""
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import backend.router as router
+
+
+def _names(text: str) -> list[str]:
+    return [r.name for r in router.candidate_routes(text)]
+
+
+def test_slash_command_selects_few_handlers():
+    names = _names("/stats semana")
+    assert "handle_stats" in names
+    assert "handle_hoje" not in names and "handle_meta" not in names
+    assert len(names) <= 6  # handle_stats + os handlers sempre candidatos (fluxos com estado)
+
+
+def test_prefix_semantics_match_handlers():
+    assert {"handle_metas", "handle_meta"} <= set(_names("/metas"))
+    assert "handle_metas" not in _names("/meta add Correr até 10/10")
+    assert "handle_deletar_tudo" in _names("/deletar tudo")
+
+
+def test_nl_commands_use_renormalized_text():
+    # handle_hoje renormaliza "hoje" → "/hoje"; o índice tem de o ver como candidato
+    assert "handle_hoje" in _names("hoje")
+    assert "handle_quiet" in _names("parar horário silencioso")
+
+
+def test_intent_precondition_parses_once():
+    calls = []
+    from backend.command_parser import parse as real_parse
+
+    def counting_parse(text, *a, **k):
+        calls.append(text)
+        return real_parse(text, *a, **k)
+
+    with patch("backend.command_parser.parse", counting_parse):
+        names = _names("/feito mercado 1")
+    assert "handle_feito" in names and "handle_remove" not in names
+    assert len(calls) == 1
+
+
+def test_route_records_handler_stats():
+    async def fake_stats(_ctx, content):
+        return "stats!" if content.startswith("/stats") else None
+
+    async def no_reply(*_a, **_k):
+        return None
+
+    routes = [
+        router.Route(fake_stats, commands=r.commands) if r.name == "handle_stats" else r
+        for r in router.ROUTES
+    ]
+    with patch("backend.handlers.contextual_reply.is_conversational_reply", no_reply), \
+            patch.object(router, "resolve_confirm", no_reply), \
+            patch.object(router, "ROUTES", routes):
+        out = asyncio.run(router.route(MagicMock(), "/stats"))
+    assert out == "stats!"
+    stats = router.get_router_stats()
+    assert stats["handlers"]["fake_stats"]["hits"] >= 1
+    assert stats["handlers"]["handle_hoje"]["skipped"] >= 1
@@ -0,0 +1,104 @@
+"""SessionManager: append-only, reescrita após truncagem, índice para list_sessions e cache LRU."""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from zapista.session.manager import SessionManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setenv("SESSION_FSYNC_SECONDS", "0")
+    return SessionManager(tmp_path, sessions_dir=tmp_path / "sessions")
+
+
+def _lines(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def test_save_appends_only_new_messages(manager):
+    session = manager.get_or_create("whatsapp:351900000001")
+    session.add_message("user", "olá")
+    manager.save(session)
+    path = manager._get_session_path(session.key)
+    first = path.read_text()
+
+    session.add_message("assistant", "olá! em que posso ajudar?")
+    session.add_message("user", "lembra-me amanhã")
+    manager.save(session)
+
+    assert path.read_text().startswith(first)
+    assert manager.stats["rewrites"] == 1 and manager.stats["appends"] == 1
+    assert len([l for l in _lines(path) if l.get("_type") != "metadata"]) == 3
+
+    manager.save(session)  # nada novo: não escreve
+    assert manager.stats["appends"] == 1
+
+
+def test_truncation_rewrites_and_reload_matches(manager, tmp_path):
+    session = manager.get_or_create("whatsapp:351900000002")
+    for i in range(30):
+        session.add_message("user", f"m{i}")
+    manager.save(session)
+    session.metadata["lang"] = "pt-PT"
+    manager.save(session)  # só metadata: linha de metadata acrescentada
+    assert manager.stats["appends"] == 1
+
+    session.messages = [{"role": "system", "content": "resumo"}] + session.messages[25:]
+    manager.save(session)
+    assert manager.stats["rewrites"] == 2
+
+    fresh = SessionManager(tmp_path, sessions_dir=tmp_path / "sessions")
+    loaded = fresh.get_or_create(session.key)
+    assert loaded.messages == session.messages
+    assert loaded.metadata == {"lang": "pt-PT"}
+
+
+def test_list_sessions_uses_index(manager, tmp_path):
+    for n in range(3):
+        s = manager.get_or_create(f"whatsapp:35190000001{n}")
+        s.add_message("user", "oi")
+        manager.save(s)
+    manager.flush()
+
+    fresh = SessionManager(tmp_path, sessions_dir=tmp_path / "sessions")
+    with patch("builtins.open", side_effect=AssertionError("list_sessions não deve abrir ficheiros de sessão")):
+        listed = fresh.list_sessions()
+    assert {s["key"] for s in listed} == {f"whatsapp:35190000001{n}" for n in range(3)}
+    assert all(s["messages"] == 1 and s["last_user_at"] for s in listed)
+
+    assert fresh.delete("whatsapp:351900000010")
+    assert len(fresh.list_sessions()) == 2
+
+
+def test_index_rebuilt_from_files(manager, tmp_path):
+    s = manager.get_or_create("whatsapp:351900000020")
+    s.add_message("user", "oi")
+    manager.save(s)  # índice ainda não gravado (só no flush)
+
+    fresh = SessionManager(tmp_path, sessions_dir=tmp_path / "sessions")
+    [entry] = fresh.list_sessions()
+    assert entry["key"] == "whatsapp:351900000020" and entry["messages"] == 1
+
+
+def test_cache_is_lru_bounded(tmp_path, monkeypatch):
+    monkeypatch.setenv("SESSION_FSYNC_SECONDS", "0")
+    monkeypatch.setenv("SESSION_CACHE_MAX_SESSIONS", "2")
+    manager = SessionManager(tmp_path, sessions_dir=tmp_path / "sessions")
+    sessions = []
+    for n in range(3):
+        s = manager.get_or_create(f"whatsapp:35190000003{n}")
+        s.add_message("user", "oi")
+        manager.save(s)
+        sessions.append(s)
+    assert len(manager._cache) == 2 and manager.stats["evictions"] == 1
+    assert "whatsapp:351900000030" not in manager._cache
+
+    # objeto evicted continua a poder ser gravado (reescrita completa, sem perder mensagens)
+    sessions[0].add_message("user", "ainda aqui")
+    manager.save(sessions[0])
+    reloaded = SessionManager(tmp_path, sessions_dir=tmp_path / "sessions").get_or_create(sessions[0].key)
+    assert [m["content"] for m in reloaded.messages] == ["oi", "ainda aqui"]
@@ -0,0 +1,144 @@
+"""Preprocessamento STT em memória: duração pelos cabeçalhos OGG, decodificação única, WAV 16 kHz."""
+
+import base64
+import io
+import struct
+import wave
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from zapista.stt.audio_utils import (
+    MAX_DURATION_SEC,
+    check_audio_duration,
+    convert_to_wav_mono_16k_bytes,
+    ogg_duration_seconds,
+    pcm_to_wav,
+    preprocess_audio,
+)
+
+
+def _ogg_page(serial: int, seq: int, granule: int, body: bytes, header_type: int = 0) -> bytes:
+    segs = []
+    n = len(body)
+    while n >= 255:
+        segs.append(255)
+        n -= 255
+    segs.append(n)
+    header = b"OggS" + struct.pack("<BBqIIIB", 0, header_type, granule, serial, seq, 0, len(segs))
+    return header + bytes(segs) + body
+
+
+def _opus_ogg(seconds: float, pre_skip: int = 312) -> bytes:
+    head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, pre_skip, 48000, 0, 0)
+    tags = b"OpusTags" + struct.pack("<I", 0) + struct.pack("<I", 0)
+    granule = pre_skip + int(seconds * 48000)
+    return (
+        _ogg_page(7, 0, 0, head, header_type=2)
+        + _ogg_page(7, 1, 0, tags)
+        + _ogg_page(7, 2, granule // 2, b"\x00" * 300)
+        + _ogg_page(7, 3, granule, b"\x00" * 40, header_type=4)
+    )
+
+
+def test_ogg_opus_duration_from_headers():
+    assert ogg_duration_seconds(_opus_ogg(12.5)) == pytest.approx(12.5)
+
+
+def test_ogg_duration_not_ogg_returns_none():
+    assert ogg_duration_seconds(b"RIFF....WAVE") is None
+
+
+def test_check_audio_duration_ogg_too_long_without_ffprobe():
+    b64 = base64.b64encode(_opus_ogg(MAX_DURATION_SEC + 5)).decode()
+    with patch("zapista.stt.audio_utils.subprocess.run", side_effect=AssertionError("ffprobe")):
+        assert check_audio_duration(b64, mimetype="audio/ogg; codecs=opus") == "AUDIO_TOO_LONG"
+        assert check_audio_duration(base64.b64encode(_opus_ogg(3)).decode()) is None
+
+
+@pytest.mark.asyncio
+async def test_preprocess_decodes_once_and_converts_once():
+    b64 = base64.b64encode(_opus_ogg(4)).decode()
+    audio = await preprocess_audio(b64, mimetype="audio/ogg; codecs=opus")
+    assert audio is not None
+    assert audio.duration == pytest.approx(4)
+    assert not audio.too_long
+    assert audio.mimetype == "audio/ogg"
+    wav = pcm_to_wav(b"\x00\x00" * 160)
+    with patch(
+        "zapista.stt.audio_utils.convert_to_wav_mono_16k_bytes", new_callable=AsyncMock, return_value=wav
+    ) as conv:
+        assert await audio.wav_16k() == wav
+        assert await audio.wav_16k() == wav
+    conv.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_preprocess_invalid_base64_returns_none():
+    assert await preprocess_audio("!!!") is None
+
+
+def test_pcm_to_wav_header():
+    with wave.open(io.BytesIO(pcm_to_wav(b"\x01\x00" * 16000)), "rb") as w:
+        assert (w.getnchannels(), w.getsampwidth(), w.getframerate(), w.getnframes()) == (1, 2, 16000, 16000)
+
+
+@pytest.mark.asyncio
+async def test_transcribe_local_posts_in_memory_wav():
+    from zapista.stt.local import transcribe_local
+
+    audio = await preprocess_audio(base64.b64encode(_opus_ogg(2)).decode())
+    wav = pcm_to_wav(b"\x00\x00" * 160)
+    sent = {}
+
+    class _Resp:
+        status_code = 200
+
+        def json(self):
+            return {"text": " olá "}
+
+    async def _request(upstream, method, url, files=None, data=None, timeout=None):
+        sent.update(upstream=upstream, url=url, file=files["file"])
+        return _Resp()
+
+    with patch.object(audio, "wav_16k", new_callable=AsyncMock, return_value=wav), \
+         patch("zapista.stt.local.upstream_request", _request):
+        assert await transcribe_local("", "http://stt:8080/", audio=audio) == "olá"
+    assert sent["upstream"] == "whisper"
+    assert sent["url"] == "http://stt:8080/inference"
+    assert sent["file"] == ("audio.wav", wav, "audio/wav")
+
+
+class _FakeFfmpeg:
+    """create_subprocess_exec falso: regista a entrada do ffmpeg e devolve PCM."""
+
+    def __init__(self):
+        self.source = None
+        self.stdin_data = None
+        self.source_existed = False
+        self.returncode = 0
+
+    async def __call__(self, *cmd, **kw):
+        self.source = cmd[cmd.index("-i") + 1]
+        self.source_existed = self.source != "pipe:0" and Path(self.source).exists()
+        return self
+
+    async def communicate(self, data=None):
+        self.stdin_data = data
+        return b"\x00\x00" * 160, b""
+
+
+@pytest.mark.asyncio
+async def test_ogg_goes_through_pipe_and_m4a_through_seekable_temp_file():
+    ogg = _opus_ogg(2)
+    m4a = b"\x00\x00\x00\x18ftypM4A " + b"\x00" * 64  # mdat antes do moov: precisa de seek
+    ffmpeg = _FakeFfmpeg()
+    with patch("zapista.stt.audio_utils.asyncio.create_subprocess_exec", new=ffmpeg):
+        assert await convert_to_wav_mono_16k_bytes(ogg)
+        assert ffmpeg.source == "pipe:0" and ffmpeg.stdin_data == ogg
+
+        assert await convert_to_wav_mono_16k_bytes(m4a, suffix=".m4a")
+    assert ffmpeg.source.endswith(".m4a") and ffmpeg.source_existed
+    assert ffmpeg.stdin_data is None
+    assert not Path(ffmpeg.source).exists()  # temporário apagado
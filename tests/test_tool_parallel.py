@@ -0,0 +1,111 @@
+"""ToolRegistry.execute_many: calls compatíveis em paralelo, conflitos em série, resultados pela ordem."""
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from zapista.agent.tools.base import GLOBAL_WRITE, READ_ONLY, USER_WRITE, Tool
+from zapista.agent.tools.registry import ToolRegistry, get_tool_stats
+
+DELAY = 0.2
+
+
+class SlowTool(Tool):
+    """Tool falsa: espera DELAY e regista início/fim."""
+
+    def __init__(self, name: str, concurrency: str, log: list, read_actions=frozenset()):
+        self._name = name
+        self.concurrency = concurrency
+        self.read_actions = frozenset(read_actions)
+        self.log = log
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return "slow fake tool"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {"action": {"type": "string"}, "item": {"type": "string"}}}
+
+    async def execute(self, action: str = "add", item: str = "", **kwargs: Any) -> str:
+        self.log.append(("start", self._name, item))
+        await asyncio.sleep(DELAY)
+        self.log.append(("end", self._name, item))
+        return f"{self._name}:{action}:{item}"
+
+
+def _registry(log: list) -> ToolRegistry:
+    registry = ToolRegistry()
+    registry.register(SlowTool("list", USER_WRITE, log, {"list"}))
+    registry.register(SlowTool("cron", USER_WRITE, log, {"list"}))
+    registry.register(SlowTool("search", READ_ONLY, log))
+    registry.register(SlowTool("message", GLOBAL_WRITE, log))
+    return registry
+
+
+@pytest.mark.asyncio
+async def test_independent_calls_run_concurrently():
+    log: list = []
+    registry = _registry(log)
+    calls = [("list", {"action": "add", "item": "leite"}), ("cron", {"action": "add", "item": "18h"}), ("search", {"item": "receita"})]
+
+    t0 = time.perf_counter()
+    results = await registry.execute_many(calls)
+    parallel = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for name, params in calls:
+        await registry.execute(name, params)
+    serial = time.perf_counter() - t0
+
+    assert results == ["list:add:leite", "cron:add:18h", "search:add:receita"]
+    assert parallel < 2 * DELAY < serial  # ~0.2 s vs ~0.6 s
+    stats = get_tool_stats()
+    assert stats["tools"]["list"]["calls"] >= 2 and stats["tools"]["list"]["avg_ms"] >= DELAY * 1000 * 0.9
+    assert stats["batches"]["serial_ms"] > stats["batches"]["wall_ms"]
+
+
+@pytest.mark.asyncio
+async def test_conflicting_calls_keep_serial_order():
+    log: list = []
+    registry = _registry(log)
+    calls = [
+        ("list", {"action": "add", "item": "a"}),
+        ("list", {"action": "list", "item": "b"}),  # leitura depois de escrita no mesmo recurso: espera
+        ("cron", {"action": "list", "item": "c"}),  # outro recurso: paralela
+    ]
+    results = await registry.execute_many(calls)
+    assert results == ["list:add:a", "list:list:b", "cron:list:c"]
+    assert log.index(("end", "list", "a")) < log.index(("start", "list", "b"))
+    assert log.index(("start", "cron", "c")) < log.index(("end", "list", "a"))
+
+
+@pytest.mark.asyncio
+async def test_global_write_is_a_barrier():
+    log: list = []
+    registry = _registry(log)
+    calls = [("search", {"item": "1"}), ("message", {"item": "2"}), ("search", {"item": "3"})]
+    results = await registry.execute_many(calls)
+    assert results == ["search:add:1", "message:add:2", "search:add:3"]
+    assert log == [
+        ("start", "search", "1"), ("end", "search", "1"),
+        ("start", "message", "2"), ("end", "message", "2"),
+        ("start", "search", "3"), ("end", "search", "3"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unknown_tool_and_parallel_limit(monkeypatch):
+    monkeypatch.setenv("TOOL_PARALLEL_MAX", "1")
+    log: list = []
+    registry = _registry(log)
+    t0 = time.perf_counter()
+    results = await registry.execute_many([("search", {"item": "1"}), ("search", {"item": "2"}), ("nope", {})])
+    assert time.perf_counter() - t0 >= 2 * DELAY * 0.9  # leituras, mas limite 1 = em série
+    assert results[2] == "Error: Tool 'nope' not found"
@@ -0,0 +1,64 @@
+"""Testes para a cache de voice notes (chave por texto+voz+locale, LRU com limite de tamanho)."""
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from zapista.tts.cache import VoiceNoteCache
+
+
+def _ogg(tmp_path: Path, name: str, size: int) -> Path:
+    p = tmp_path / name
+    p.write_bytes(b"x" * size)
+    return p
+
+
+def test_key_depends_on_text_model_and_locale(tmp_path):
+    model = _ogg(tmp_path, "pt.onnx", 10)
+    k = VoiceNoteCache.key("olá", str(model), "pt-PT")
+    assert k == VoiceNoteCache.key("olá", str(model), "pt-PT")
+    assert k != VoiceNoteCache.key("olá", str(model), "pt-BR")
+    assert k != VoiceNoteCache.key("olá!", str(model), "pt-PT")
+    model.write_bytes(b"y" * 20)  # voz trocada no mesmo caminho
+    assert k != VoiceNoteCache.key("olá", str(model), "pt-PT")
+
+
+def test_put_get_and_lru_eviction(tmp_path):
+    cache = VoiceNoteCache(tmp_path / "cache", max_bytes=350)
+    for i, key in enumerate(("a", "b", "c")):
+        cache.put(key, _ogg(tmp_path, f"{key}.ogg", 100))
+        t = time.time() - 100 + i
+        os.utime(cache._path(key), (t, t))
+    assert cache.get("a") is not None  # "a" passa a ser o mais recente
+    cache.put("d", _ogg(tmp_path, "d.ogg", 100))
+    assert cache.get("b") is None  # o menos usado
+    assert all(cache.get(k) is not None for k in ("a", "c", "d"))
+    assert (tmp_path / "d.ogg").exists()  # o original continua disponível para envio
+
+
+def test_synthesize_hit_skips_piper(tmp_path):
+    from zapista.tts import service
+
+    cache = VoiceNoteCache(tmp_path / "cache", max_bytes=10_000)
+    rendered = _ogg(tmp_path, "r.ogg", 50)
+
+    def fake_piper(text, wav_path, model_path, config_path):
+        Path(wav_path).write_bytes(b"wav")
+        return True
+
+    def fake_ogg(wav_path, ogg_path, max_seconds):
+        Path(ogg_path).write_bytes(rendered.read_bytes())
+        return True
+
+    with patch("zapista.tts.service.get_voice_cache", return_value=cache), \
+            patch("zapista.tts.service.tts_enabled", return_value=True), \
+            patch("zapista.tts.service.tts_tmp_dir", return_value=str(tmp_path / "tmp")), \
+            patch("zapista.tts.service.resolve_locale_for_audio", return_value="pt-PT"), \
+            patch("zapista.tts.service.get_voice_paths", return_value=("/m/model.onnx", "/m/config.json")), \
+            patch("zapista.tts.service.piper_synthesize", side_effect=fake_piper) as piper, \
+            patch("zapista.tts.service.wav_to_ogg_opus", side_effect=fake_ogg):
+        first = service.synthesize_voice_note("Beber água", "u1")
+        second = service.synthesize_voice_note("Beber água", "u2")
+    assert first is not None and second is not None
+    assert piper.call_count == 1
+    assert second.parent == tmp_path / "cache"
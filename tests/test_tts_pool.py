@@ -0,0 +1,144 @@
+"""Testes para o TTSPool: síntese fora do event loop, concorrência limitada e fila com timeout."""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from zapista.tts.pool import TTSPool
+
+
+def _fake_piper(text, wav_path, model_path, config_path):
+    time.sleep(0.05)  # bloqueante, como o subprocess real
+    Path(wav_path).write_bytes(b"wav")
+    return True
+
+
+def _fake_ogg(wav_path, ogg_path, max_seconds):
+    Path(ogg_path).write_bytes(b"ogg")
+    return True
+
+
+def test_runs_off_loop_with_bounded_concurrency(tmp_path):
+    peak = 0
+    running = 0
+    lock = threading.Lock()
+
+    def piper(*args):
+        nonlocal peak, running
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        try:
+            return _fake_piper(*args)
+        finally:
+            with lock:
+                running -= 1
+
+    async def run():
+        pool = TTSPool(max_concurrent=2, warm_per_locale=0, queue_timeout=5)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        t = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(
+            pool.run("olá", tmp_path / f"{i}.wav", tmp_path / f"{i}.ogg", "m.onnx", "m.json") for i in range(4)
+        ))
+        t.cancel()
+        return pool, results, ticks
+
+    with patch("zapista.tts.service.piper_synthesize", side_effect=piper), \
+            patch("zapista.tts.service.wav_to_ogg_opus", side_effect=_fake_ogg):
+        pool, results, ticks = asyncio.run(run())
+    assert results == [True] * 4
+    assert peak == 2
+    assert ticks >= 10  # o event loop continuou a correr durante a síntese
+    assert not list(tmp_path.glob("*.wav"))  # WAV apagados
+    assert pool.stats()["completed"] == 4
+
+
+def test_queue_timeout_returns_false(tmp_path):
+    async def run():
+        pool = TTSPool(max_concurrent=1, warm_per_locale=0, queue_timeout=0.01)
+        return await asyncio.gather(*(
+            pool.run("olá", tmp_path / f"{i}.wav", tmp_path / f"{i}.ogg", "m.onnx", "m.json") for i in range(2)
+        ))
+
+    with patch("zapista.tts.service.piper_synthesize", side_effect=_fake_piper), \
+            patch("zapista.tts.service.wav_to_ogg_opus", side_effect=_fake_ogg):
+        assert sorted(asyncio.run(run())) == [False, True]
+
+
+def test_warm_unavailable_falls_back_to_one_shot(tmp_path):
+    """Sem binário Piper para o processo quente: usa o Piper de uma só vez e não volta a tentar o quente."""
+    async def run():
+        pool = TTSPool(max_concurrent=1, warm_per_locale=1, queue_timeout=5)
+        ok = await pool.run("olá", tmp_path / "a.wav", tmp_path / "a.ogg", "m.onnx", "m.json")
+        return pool, ok
+
+    with patch("zapista.tts.pool.piper_bin", return_value=None), \
+            patch("zapista.tts.service.piper_synthesize", side_effect=_fake_piper), \
+            patch("zapista.tts.service.wav_to_ogg_opus", side_effect=_fake_ogg):
+        pool, ok = asyncio.run(run())
+    assert ok
+    assert "m.onnx" in pool._warm_disabled
+
+
+_FAKE_WARM_PIPER = """#!{python}
+import json, sys, time
+for line in sys.stdin:
+    req = json.loads(line)
+    if req["text"] == "lento":
+        time.sleep(0.5)
+    open(req["output_file"], "wb").write(b"wav")
+    print({reply}, flush=True)
+"""
+
+
+def _warm_piper_bin(tmp_path: Path, reply: str = 'req["output_file"]') -> str:
+    script = tmp_path / "piper"
+    script.write_text(_FAKE_WARM_PIPER.format(python=sys.executable, reply=reply))
+    script.chmod(0o755)
+    return str(script)
+
+
+def test_cancelled_warm_request_kills_process_so_next_reply_is_not_stale(tmp_path):
+    async def run():
+        pool = TTSPool(max_concurrent=2, warm_per_locale=1, queue_timeout=5)
+        slow = asyncio.create_task(pool._piper("lento", tmp_path / "a.wav", "m.onnx", "m.json"))
+        await asyncio.sleep(0.2)
+        warm = pool._warm["m.onnx"][0]
+        assert warm.alive
+        slow.cancel()
+        await asyncio.gather(slow, return_exceptions=True)
+        assert not warm.alive and not warm.busy
+        ok = await pool._piper("olá", tmp_path / "b.wav", "m.onnx", "m.json")
+        pool.close()
+        await asyncio.sleep(0.1)
+        return pool, ok, warm
+
+    with patch("zapista.tts.pool.piper_bin", return_value=_warm_piper_bin(tmp_path)), \
+            patch("zapista.tts.service.piper_synthesize", side_effect=AssertionError("one-shot")):
+        pool, ok, warm = asyncio.run(run())
+    assert ok and warm.ok_count == 1
+    assert "m.onnx" not in pool._warm_disabled
+
+
+def test_warm_reply_for_other_file_is_rejected(tmp_path):
+    async def run():
+        pool = TTSPool(max_concurrent=1, warm_per_locale=1, queue_timeout=5)
+        ok = await pool._piper("olá", tmp_path / "a.wav", "m.onnx", "m.json")
+        await asyncio.sleep(0.1)
+        return pool, ok
+
+    with patch("zapista.tts.pool.piper_bin", return_value=_warm_piper_bin(tmp_path, reply='"/tmp/outro.wav"')), \
+            patch("zapista.tts.service.piper_synthesize", side_effect=_fake_piper) as one_shot:
+        pool, ok = asyncio.run(run())
+    assert ok and one_shot.call_count == 1  # caiu no Piper de uma só vez
+    assert not pool._warm["m.onnx"][0].alive
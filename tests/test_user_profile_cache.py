@@ -0,0 +1,48 @@
+"""Testes para a cache de perfis em backend/user_store (read-through, invalidação pelos set_*)."""
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.models_db import Base
+from backend.user_store import (
+    get_user_language,
+    get_user_profile,
+    get_user_timezone,
+    set_user_quiet,
+    set_user_timezone,
+)
+
+
+def _session_and_counter():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    selects = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "users" in statement:
+            selects.append(statement)
+
+    return sessionmaker(bind=engine)(), selects
+
+
+def test_repeated_reads_hit_db_once():
+    db, selects = _session_and_counter()
+    chat_id = "351910000000@s.whatsapp.net"
+    get_user_profile(db, chat_id)
+    n = len(selects)
+    for _ in range(10):
+        get_user_language(db, chat_id)
+        get_user_timezone(db, chat_id)
+        get_user_profile(db, chat_id)
+    assert len(selects) == n
+
+
+def test_setters_invalidate_cached_profile():
+    db, _ = _session_and_counter()
+    chat_id = "351910000001@s.whatsapp.net"
+    assert get_user_profile(db, chat_id).timezone is None
+    assert set_user_timezone(db, chat_id, "America/Sao_Paulo")
+    assert get_user_timezone(db, chat_id) == "America/Sao_Paulo"
+    assert set_user_quiet(db, chat_id, "22:00", "08:00")
+    profile = get_user_profile(db, chat_id)
+    assert (profile.quiet_start, profile.quiet_end) == ("22:00", "08:00")
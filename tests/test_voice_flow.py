@@ -1,6 +1,7 @@
 """Stress tests for voice message flow: transcription, guardrails, i18n."""
 
 import json
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -114,10 +115,10 @@ async def test_voice_not_allowed_audio_sender_rejected():
 # --- duration too long (AUDIO_TOO_LONG) ---
 @pytest.mark.asyncio
 async def test_voice_duration_too_long_rejected():
-    """Áudio > 60s → check_audio_duration retorna AUDIO_TOO_LONG, mensagem localizada."""
+    """Áudio > 60s → preprocess_audio marca too_long, mensagem localizada."""
     channel = _make_channel(allow_from_audio=[])
     with _mock_db_and_lang("es"):
-        with patch("zapista.stt.audio_utils.check_audio_duration", return_value="AUDIO_TOO_LONG"):
+        with patch("zapista.stt.audio_utils.preprocess_audio", new_callable=AsyncMock, return_value=SimpleNamespace(too_long=True)):
             raw = json.dumps({
                 "type": "message", "id": "v5", "sender": "34612345678@s.whatsapp.net",
                 "pn": "34612345678", "content": "[Voice Message]", "timestamp": 1739123456,
@@ -136,7 +137,7 @@ async def test_voice_transcribe_failed_sends_error():
     """Transcrição falha → AUDIO_TRANSCRIBE_FAILED (não envia ao agente)."""
     channel = _make_channel(allow_from_audio=[])
     with _mock_db_and_lang("pt-BR"):
-        with patch("zapista.stt.audio_utils.check_audio_duration", return_value=None):
+        with patch("zapista.stt.audio_utils.preprocess_audio", new_callable=AsyncMock, return_value=None):
             with patch("zapista.stt.transcribe", new_callable=AsyncMock, return_value=""):
                 raw = json.dumps({
                     "type": "message", "id": "v6", "sender": "5511988887777@s.whatsapp.net",
@@ -156,7 +157,7 @@ async def test_voice_transcribe_success_forwards_to_agent():
     """Transcrição OK → content = texto transcrito, enviado ao agente (publish_inbound)."""
     channel = _make_channel(allow_from_audio=[])
     with _mock_db_and_lang("en"):
-        with patch("zapista.stt.audio_utils.check_audio_duration", return_value=None):
+        with patch("zapista.stt.audio_utils.preprocess_audio", new_callable=AsyncMock, return_value=None):
             with patch("zapista.stt.transcribe", new_callable=AsyncMock, return_value="remind me in 5 minutes"):
                 raw = json.dumps({
                     "type": "message", "id": "v7", "sender": "447700000001@s.whatsapp.net",
@@ -0,0 +1,110 @@
+"""Fila de média do bridge: leitor não bloqueia em STT/.ics, ordem por chat, backpressure."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from zapista.channels.media_jobs import MediaJobQueue, get_media_job_stats
+from zapista.channels.whatsapp import WhatsAppChannel
+from zapista.config.schema import WhatsAppConfig
+
+
+def _make_channel():
+    bus = MagicMock()
+    bus.publish_inbound = AsyncMock()
+    bus.publish_outbound = AsyncMock()
+    config = WhatsAppConfig(enabled=True, bridge_url="ws://localhost:3001")
+    return WhatsAppChannel(config, bus)
+
+
+@pytest.mark.asyncio
+async def test_queue_keeps_order_per_chat_and_runs_chats_in_parallel():
+    seen: list[tuple[str, int]] = []
+    release = asyncio.Event()
+
+    async def handler(data):
+        if data["chat"] == "a" and data["n"] == 0:
+            await release.wait()
+        seen.append((data["chat"], data["n"]))
+
+    q = MediaJobQueue(handler, workers=4, queue_max=0)
+    try:
+        await q.submit("a", {"chat": "a", "n": 0})
+        await q.submit("a", {"chat": "a", "n": 1})
+        # "b" num worker diferente de "a" para provar o paralelismo
+        b = next(k for k in ("b", "c", "d", "e", "f") if q.shard_for(k) != q.shard_for("a"))
+        await q.submit(b, {"chat": b, "n": 0})
+        for _ in range(20):
+            await asyncio.sleep(0)
+        assert seen == [(b, 0)]
+        assert q.pending("a") == 2 and q.pending(b) == 0
+        release.set()
+        await q.join()
+        assert seen == [(b, 0), ("a", 0), ("a", 1)]
+        assert q.pending("a") == 0
+        assert get_media_job_stats()["processed"] == 3
+    finally:
+        await q.stop()
+    assert get_media_job_stats() is None
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure():
+    gate = asyncio.Event()
+
+    async def handler(data):
+        await gate.wait()
+
+    q = MediaJobQueue(handler, workers=1, queue_max=1)
+    try:
+        await q.submit("x", {"n": 0})
+        await asyncio.sleep(0)  # worker retira o primeiro; fica em curso
+        await q.submit("x", {"n": 1})
+        third = asyncio.create_task(q.submit("x", {"n": 2}))
+        await asyncio.sleep(0)
+        assert not third.done()
+        assert q.blocked == 1
+        gate.set()
+        await third
+        await q.join()
+        assert q.stats()["processed"] == 3
+    finally:
+        await q.stop()
+
+
+@pytest.mark.asyncio
+async def test_reader_acks_while_voice_message_is_transcribing():
+    channel = _make_channel()
+    release = asyncio.Event()
+    handled: list[str] = []
+    real_handle = channel._handle_bridge_data
+
+    async def slow_handle(data):
+        if data.get("mediaBase64"):
+            await release.wait()
+        if data.get("type") == "message":
+            handled.append(data["content"])
+            return
+        await real_handle(data)
+
+    channel._handle_bridge_data = slow_handle
+    fut = asyncio.get_running_loop().create_future()
+    channel._pending_sends["req-1"] = fut
+    voice = {"type": "message", "id": "m1", "pn": "351911", "content": "[Voice Message]", "mediaBase64": "dGVzdA=="}
+    text = {"type": "message", "id": "m2", "pn": "351911", "content": "e mais isto"}
+    other = {"type": "message", "id": "m3", "pn": "351922", "content": "outro chat"}
+    try:
+        await asyncio.wait_for(channel._on_bridge_frame(json.dumps(voice)), 1)
+        await asyncio.wait_for(channel._on_bridge_frame(json.dumps({"type": "sent", "request_id": "req-1", "id": "w1"})), 1)
+        assert fut.done() and fut.result()["id"] == "w1"
+        # Mesmo chat com áudio pendente → fila (não ultrapassa o áudio); outro chat → já
+        await channel._on_bridge_frame(json.dumps(text))
+        await channel._on_bridge_frame(json.dumps(other))
+        assert handled == ["outro chat"]
+        release.set()
+        await channel._media_jobs.join()
+        assert handled == ["outro chat", "[Voice Message]", "e mais isto"]
+    finally:
+        await channel.stop()
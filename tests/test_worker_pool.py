@@ -0,0 +1,106 @@
+"""Testes para o pool de workers por chat do AgentLoop."""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from zapista.agent.tools.list_tool import ListTool
+from zapista.agent.worker_pool import ChatWorkerPool, get_worker_pool_stats
+from zapista.bus.events import InboundMessage
+
+
+def _make_msg(chat_id: str, content: str) -> InboundMessage:
+    return InboundMessage(
+        channel="whatsapp",
+        sender_id=chat_id,
+        chat_id=chat_id,
+        content=content,
+        timestamp=datetime.now(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_same_chat_processed_in_order():
+    """Mensagens do mesmo chat são processadas pela ordem de chegada, mesmo com atrasos variáveis."""
+    seen: list[str] = []
+
+    async def handler(msg: InboundMessage) -> None:
+        # A primeira é a mais lenta: se houvesse paralelismo no mesmo chat, a ordem trocava
+        await asyncio.sleep(0.05 if msg.content == "1" else 0.0)
+        seen.append(msg.content)
+
+    pool = ChatWorkerPool(handler, workers=4)
+    pool.start()
+    try:
+        for c in ("1", "2", "3"):
+            await pool.submit(_make_msg("AAA", c))
+        await asyncio.wait_for(pool.join(), timeout=2.0)
+    finally:
+        await pool.stop()
+    assert seen == ["1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_different_chats_run_in_parallel():
+    """Um chat lento não bloqueia chats noutros workers."""
+    done: list[str] = []
+
+    async def handler(msg: InboundMessage) -> None:
+        await asyncio.sleep(0.2 if msg.chat_id == "slow" else 0.0)
+        done.append(msg.chat_id)
+
+    pool = ChatWorkerPool(handler, workers=8)
+    # Escolher um chat "rápido" num shard diferente do lento
+    fast = next(f"fast{i}" for i in range(100) if pool.shard_for(f"whatsapp:fast{i}") != pool.shard_for("whatsapp:slow"))
+    pool.start()
+    try:
+        await pool.submit(_make_msg("slow", "x"))
+        await pool.submit(_make_msg(fast, "y"))
+        await asyncio.sleep(0.1)
+        assert done == [fast]
+        stats = get_worker_pool_stats()
+        assert stats is not None and len(stats) == 8
+        slow_w = stats[pool.shard_for("whatsapp:slow")]
+        assert slow_w["in_flight"] == 1
+        await asyncio.wait_for(pool.join(), timeout=2.0)
+    finally:
+        await pool.stop()
+    assert done == [fast, "slow"]
+    assert get_worker_pool_stats() is None
+
+
+@pytest.mark.asyncio
+async def test_handler_error_does_not_kill_worker():
+    """Exceção no handler conta como erro e o worker continua a consumir."""
+    seen: list[str] = []
+
+    async def handler(msg: InboundMessage) -> None:
+        if msg.content == "boom":
+            raise RuntimeError("boom")
+        seen.append(msg.content)
+
+    pool = ChatWorkerPool(handler, workers=2)
+    pool.start()
+    try:
+        await pool.submit(_make_msg("AAA", "boom"))
+        await pool.submit(_make_msg("AAA", "ok"))
+        await asyncio.wait_for(pool.join(), timeout=2.0)
+        stats = pool.stats()[pool.shard_for("whatsapp:AAA")]
+        assert stats["errors"] == 1 and stats["processed"] == 1
+    finally:
+        await pool.stop()
+    assert seen == ["ok"]
+
+
+@pytest.mark.asyncio
+async def test_tool_context_isolated_between_tasks():
+    """set_context numa task não afeta o contexto visto por outra task (tools partilhadas entre workers)."""
+    tool = ListTool()
+
+    async def run(chat_id: str, delay: float) -> str:
+        tool.set_context("whatsapp", chat_id)
+        await asyncio.sleep(delay)
+        return tool._chat_id
+
+    a, b = await asyncio.gather(run("A", 0.05), run("B", 0.0))
+    assert (a, b) == ("A", "B")
@@ -2,6 +2,7 @@
 
 import asyncio
 import json
+import logging
 import random
 import re
 import time
@@ -10,7 +11,7 @@ from pathlib import Path
 from typing import Any
 from datetime import datetime, timezone
 
-from backend.logger import get_logger
+from backend.logger import get_logger, log_enabled
 
 logger = get_logger(__name__)
 
@@ -73,6 +74,7 @@ class AgentLoop:
         max_tokens: int = 2048,
         cron_service: "CronService | None" = None,
         perplexity_api_key: str | None = None,
+        workers: int = 1,
     ):
         from zapista.cron.service import CronService
         self.bus = bus
@@ -85,6 +87,9 @@ class AgentLoop:
         self.max_tokens = max_tokens
         self.cron_service = cron_service
         self._perplexity_api_key = (perplexity_api_key or "").strip()
+        # Workers paralelos por chat (1 = processamento em série, comportamento original)
+        self.workers = max(1, int(workers or 1))
+        self._worker_pool = None
 
         self.context = ContextBuilder(workspace)
         self.sessions = SessionManager(workspace)
@@ -102,9 +107,9 @@ class AgentLoop:
         except Exception as e:
             logger.warning("init_db_failed", extra={"extra": {"error": str(e)}})
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.models_db import List
-            _db = SessionLocal()
+            _db = get_session()
             try:
                 _db.query(List).limit(1).first()
             finally:
@@ -131,8 +136,8 @@ class AgentLoop:
         
         # Event tool (per-user DB agenda events)
         from zapista.agent.tools.event_tool import EventTool
-        from backend.database import SessionLocal
-        self.tools.register(EventTool(db_session_factory=SessionLocal))
+        from backend.database import get_session
+        self.tools.register(EventTool(db_session_factory=get_session))
         # Search tool (Perplexity) — só quando API key disponível
         if self._perplexity_api_key:
             from zapista.agent.tools.search_tool import SearchTool
@@ -178,72 +183,97 @@ class AgentLoop:
         return res
     
     async def run(self) -> None:
-        """Run the agent loop, processing messages from the bus."""
+        """Run the agent loop, processing messages from the bus.
+
+        Com workers > 1, cada mensagem vai para o worker do seu chat (session_key):
+        o mesmo chat continua em ordem estrita e chats diferentes correm em paralelo.
+        """
         self._running = True
-        logger.info("agent_loop_started")
-        
-        while self._running:
-            try:
-                # Wait for next message
-                msg = await asyncio.wait_for(
-                    self.bus.consume_inbound(),
-                    timeout=1.0
-                )
-                
-                # Process it
+        logger.info("agent_loop_started", extra={"extra": {"workers": self.workers}})
+
+        pool = None
+        if self.workers > 1:
+            from zapista.agent.worker_pool import ChatWorkerPool
+            pool = ChatWorkerPool(self._handle_inbound, self.workers)
+            pool.start()
+        self._worker_pool = pool
+
+        try:
+            while self._running:
                 try:
-                    response = await self._process_message(msg)
-                    if response:
-                        # Extract content string safely
-                        content_str = getattr(response, "content", "") or ""
-                        
-                        if "FIX_OFFSET|" in content_str:
-                            try:
-                                # SEGURANÇA: Apenas Admin em God Mode pode alterar o relógio global do servidor
-                                from backend.admin_commands import is_god_mode_activated
-                                if not is_god_mode_activated(msg.chat_id):
-                                    logger.warning("security_clock_fix_unauthorized", extra={"extra": {
-                                        "chat_id": str(msg.chat_id),
-                                        "content": content_str
-                                    }})
-                                    # Fallthrough to normal publishing or other handlers
-                                    await self.bus.publish_outbound(response)
-                                else:
-                                    parts = content_str.split("|")
-                                    offset = float(parts[1])
-                                    
-                                    from zapista.clock_drift import set_manual_offset, get_effective_time
-                                    set_manual_offset(offset)
-                                    
-                                    # Recalcula hora para confirmar
-                                    new_ts = get_effective_time()
-                                    new_time = datetime.fromtimestamp(new_ts, tz=timezone.utc).strftime("%H:%M")
-                                    
-                                    await self.bus.publish_outbound(OutboundMessage(
-                                        channel=msg.channel,
-                                        chat_id=msg.chat_id,
-                                        content=f"🕒 **Relógio Corrigido (God Mode)!**\n\nApliquei uma correção manual de {offset/3600:.1f}h.\nNova hora do sistema: **{new_time}** (UTC).\nEsta correção é permanente e afeta todo o sistema."
-                                    ))
-                            except Exception as e:
-                                logger.error("clock_fix_failed", extra={"extra": {"error": str(e)}})
-                                await self.bus.publish_outbound(response)
+                    # Wait for next message
+                    msg = await asyncio.wait_for(
+                        self.bus.consume_inbound(),
+                        timeout=1.0
+                    )
+                except asyncio.TimeoutError:
+                    continue
+                if pool:
+                    await pool.submit(msg)
+                else:
+                    await self._handle_inbound(msg)
+        finally:
+            if pool:
+                await pool.stop()
+                self._worker_pool = None
+
+    def worker_stats(self) -> list[dict[str, Any]] | None:
+        """Gauges por worker (fila, em curso); None em modo série."""
+        return self._worker_pool.stats() if self._worker_pool else None
 
-                        elif "FIX|" in content_str:
-                            # This seems to be the timezone fix response which uses OutboundMessage
+    async def _handle_inbound(self, msg: InboundMessage) -> None:
+        """Processa uma mensagem do bus e publica a resposta (ou a mensagem de erro)."""
+        try:
+            response = await self._process_message(msg)
+            if response:
+                # Extract content string safely
+                content_str = getattr(response, "content", "") or ""
+                
+                if "FIX_OFFSET|" in content_str:
+                    try:
+                        # SEGURANÇA: Apenas Admin em God Mode pode alterar o relógio global do servidor
+                        from backend.admin_commands import is_god_mode_activated
+                        if not is_god_mode_activated(msg.chat_id):
+                            logger.warning("security_clock_fix_unauthorized", extra={"extra": {
+                                "chat_id": str(msg.chat_id),
+                                "content": content_str
+                            }})
+                            # Fallthrough to normal publishing or other handlers
                             await self.bus.publish_outbound(response)
                         else:
-                            await self.bus.publish_outbound(response)
-                except Exception as e:
-                    logger.error("message_processing_failed", extra={"extra": {"error": str(e)}})
-                    # Send error response
-                    await self.bus.publish_outbound(OutboundMessage(
-                        channel=msg.channel,
-                        chat_id=msg.chat_id,
-                        content=f"Sorry, I encountered an error: {str(e)}"
-                    ))
-            except asyncio.TimeoutError:
-                continue
-    
+                            parts = content_str.split("|")
+                            offset = float(parts[1])
+                            
+                            from zapista.clock_drift import set_manual_offset, get_effective_time
+                            set_manual_offset(offset)
+                            
+                            # Recalcula hora para confirmar
+                            new_ts = get_effective_time()
+                            new_time = datetime.fromtimestamp(new_ts, tz=timezone.utc).strftime("%H:%M")
+                            
+                            await self.bus.publish_outbound(OutboundMessage(
+                                channel=msg.channel,
+                                chat_id=msg.chat_id,
+                                content=f"🕒 **Relógio Corrigido (God Mode)!**\n\nApliquei uma correção manual de {offset/3600:.1f}h.\nNova hora do sistema: **{new_time}** (UTC).\nEsta correção é permanente e afeta todo o sistema."
+                            ))
+                    except Exception as e:
+                        logger.error("clock_fix_failed", extra={"extra": {"error": str(e)}})
+                        await self.bus.publish_outbound(response)
+
+                elif "FIX|" in content_str:
+                    # This seems to be the timezone fix response which uses OutboundMessage
+                    await self.bus.publish_outbound(response)
+                else:
+                    await self.bus.publish_outbound(response)
+        except Exception as e:
+            logger.error("message_processing_failed", extra={"extra": {"error": str(e)}})
+            # Send error response
+            await self.bus.publish_outbound(OutboundMessage(
+                channel=msg.channel,
+                chat_id=msg.chat_id,
+                content=f"Sorry, I encountered an error: {str(e)}"
+            ))
+
     def stop(self) -> None:
         """Stop the agent loop."""
         self._running = False
@@ -406,6 +436,44 @@ class AgentLoop:
             return await list_tool.execute(action="list", list_name=list_name or "")
         return None
 
+    async def _scope_verdict(self, content: str, session: Session) -> bool:
+        """Scope filter: LLM SIM/NAO (fallback: regex). Follow-ups: se a última mensagem do user estava no escopo, considerar esta também."""
+        from backend.scope_filter import is_in_scope_fast, is_in_scope_llm, is_follow_up_llm
+        try:
+            if self.circuit_breaker.is_open():
+                in_scope = is_in_scope_fast(content)
+            else:
+                try:
+                    scope_p = self.scope_provider if self.scope_provider else self.provider
+                    in_scope = await is_in_scope_llm(content, provider=scope_p, model=self.scope_model)
+                except Exception:
+                    self.circuit_breaker.record_failure()
+                    in_scope = is_in_scope_fast(content)
+        except Exception:
+            in_scope = is_in_scope_fast(content)
+        if not in_scope:
+            # Follow-up: última mensagem do user no escopo (regex) ou Mimo quando o regex não considera a anterior no escopo
+            try:
+                history = session.get_history(max_messages=20)
+                for m in reversed(history):
+                    if m.get("role") == "user":
+                        prev = (m.get("content") or "").strip()
+                        if not prev:
+                            break
+                        if is_in_scope_fast(prev):
+                            in_scope = True
+                        elif self.scope_provider and (self.scope_model or "").strip():
+                            if await is_follow_up_llm(
+                                prev, content or "",
+                                provider=self.scope_provider,
+                                model=self.scope_model,
+                            ):
+                                in_scope = True
+                        break
+            except Exception:
+                pass
+        return in_scope
+
     async def _out_of_scope_message(self, user_content: str, lang: str = "en") -> str:
         """Resposta natural e amigável quando o pedido está fora do escopo (Xiaomi ou fallback). Explica o que o bot faz, sugere acção e CTA."""
         from backend.locale import OUT_OF_SCOPE_FALLBACKS
@@ -817,9 +885,9 @@ class AgentLoop:
                         from zoneinfo import ZoneInfo
                         ZoneInfo(new_tz) # Valida IANA
                         
-                        from backend.database import SessionLocal
+                        from backend.database import get_session
                         from backend.user_store import set_user_timezone
-                        db = SessionLocal()
+                        db = get_session()
                         try:
                             set_user_timezone(db, msg.chat_id, new_tz)
                             self._sync_onboarding_to_memory(db, msg.chat_id, msg.session_key)
@@ -969,10 +1037,13 @@ class AgentLoop:
         Parser-first: structured commands (/lembrete, /list, /feito, /filme) are
         executed directly without LLM; only natural language or ambiguous cases use the LLM.
         """
+        from backend.database import request_scope
         trace_id = msg.trace_id or uuid.uuid4().hex[:12]
         token = set_trace_id(trace_id)
         try:
-            response = await self._process_message_impl(msg)
+            # Uma sessão de BD para toda a mensagem (get_session() em handlers, tools e context builder)
+            with request_scope():
+                response = await self._process_message_impl(msg)
             if response and response.content and msg.metadata:
                 transcribed_text = msg.metadata.get("transcribed_text")
                 if transcribed_text and msg.channel == "whatsapp":
@@ -1003,17 +1074,13 @@ class AgentLoop:
 
         # Analytics e contagem diária (lembrete inteligente só após >= 2 msgs no dia)
 
-        # Regista mensagem do cliente para contagem diária (lembrete inteligente só após >= 2 msgs no dia)
+        # Regista mensagem do cliente para contagem diária (lembrete inteligente só após >= 2 msgs no dia).
+        # Contador em memória (gravado em lote); fuso do perfil em cache (sem sessão de BD num hit).
         try:
-            from backend.database import SessionLocal
             from backend.user_store import get_user_timezone
             from backend.smart_reminder import record_user_message_sent
-            _db = SessionLocal()
-            try:
-                _tz = get_user_timezone(_db, msg.chat_id, msg.metadata.get("phone_for_locale") if msg.metadata else None) or "UTC"
-                record_user_message_sent(msg.chat_id, _tz)
-            finally:
-                _db.close()
+            _tz = get_user_timezone(None, msg.chat_id, msg.metadata.get("phone_for_locale") if msg.metadata else None) or "UTC"
+            record_user_message_sent(msg.chat_id, _tz)
         except Exception:
             pass
         # Não responder a mensagens triviais (ok, tá, não, emojis soltos) — evita loop e custo de tokens
@@ -1070,14 +1137,14 @@ class AgentLoop:
         try:
             from datetime import date, datetime
             from zoneinfo import ZoneInfo
-            from backend.database import SessionLocal
-            from backend.user_store import get_or_create_user, get_user_timezone
+            from backend.database import get_session
+            from backend.user_store import get_user_profile, get_user_timezone
             from backend.models_db import AuditLog
             from backend.weekly_recap import get_pending_recap_on_first_contact
             RECAP_ACTIVE_FROM = date(2026, 4, 1)
-            db = SessionLocal()
+            db = get_session()
             try:
-                user = get_or_create_user(db, msg.chat_id)
+                user = get_user_profile(db, msg.chat_id)
                 tz_iana = get_user_timezone(db, msg.chat_id, msg.metadata.get("phone_for_locale") if msg.metadata else None) or "UTC"
                 try:
                     tz = ZoneInfo(tz_iana)
@@ -1159,14 +1226,14 @@ class AgentLoop:
 
         # Pedido de mudança de idioma ANTES do calling — para "fale comigo em português" não ser tratado como chamada
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import get_user_language, set_user_language
             from backend.locale import (
                 parse_language_switch_request,
                 language_switch_confirmation_message,
                 LANGUAGE_ALREADY_MSG,
             )
-            db = SessionLocal()
+            db = get_session()
             try:
                 phone_for_locale = msg.metadata.get("phone_for_locale")
                 user_lang = get_user_language(db, msg.chat_id, phone_for_locale)
@@ -1226,14 +1293,14 @@ class AgentLoop:
         # Timezone é independente. Em falha de DB usa número para não assumir "en" à toa.
         user_lang: str = "en"
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import get_user_language, set_user_language
             from backend.locale import (
                 phone_to_default_language,
                 resolve_response_language,
                 SUPPORTED_LANGS,
             )
-            db = SessionLocal()
+            db = get_session()
             try:
                 phone_for_locale = msg.metadata.get("phone_for_locale")
                 user_lang = get_user_language(db, msg.chat_id, phone_for_locale)
@@ -1290,7 +1357,7 @@ class AgentLoop:
             try:
                 from datetime import datetime
                 from zoneinfo import ZoneInfo
-                from backend.database import SessionLocal
+                from backend.database import get_session
                 from backend.user_store import (
                     get_or_create_user, get_user_city, set_user_city, set_user_timezone,
                     get_user_language as _get_user_lang, set_user_preferred_name, get_user_preferred_name,
@@ -1314,7 +1381,7 @@ class AgentLoop:
                 from backend.onboarding_skip import is_likely_not_city, is_likely_valid_name, is_onboarding_refusal_or_skip
                 from backend.onboarding_time import parse_local_time_from_message
                 from backend.timezone import iana_from_offset_minutes, phone_to_default_timezone, is_valid_iana, ddd_city_and_tz
-                db = SessionLocal()
+                db = get_session()
                 try:
                     user = get_or_create_user(db, msg.chat_id)
                     session = self.sessions.get_or_create(msg.session_key)
@@ -1681,7 +1748,7 @@ class AgentLoop:
                             "list_name": intent.get("list_name")
                         }})
                         try:
-                            from backend.database import SessionLocal as _DB
+                            from backend.database import get_session as _DB
                             _db = _DB()
                             try:
                                 self._sync_onboarding_to_memory(_db, msg.chat_id, msg.session_key)
@@ -1696,8 +1763,8 @@ class AgentLoop:
                                 ))
                             result = result[0]
                         try:
-                            from backend.database import SessionLocal as _DB
-                            from backend.user_store import get_or_create_user as _get_user, get_user_language as _get_lang
+                            from backend.database import get_session as _DB
+                            from backend.user_store import get_user_profile as _get_user, get_user_language as _get_lang
                             from backend.locale import NUDGE_TZ_WHEN_MISSING
                             _db = _DB()
                             try:
@@ -1764,7 +1831,7 @@ class AgentLoop:
                         if result:
                             logger.info("list_intent_handled_fallback", extra={"extra": {"list_name": list_name}})
                             try:
-                                from backend.database import SessionLocal as _DB
+                                from backend.database import get_session as _DB
                                 _db = _DB()
                                 try:
                                     self._sync_onboarding_to_memory(_db, msg.chat_id, msg.session_key)
@@ -1779,8 +1846,8 @@ class AgentLoop:
                                     ))
                                 result = result[0]
                             try:
-                                from backend.database import SessionLocal as _DB
-                                from backend.user_store import get_or_create_user as _get_user, get_user_language as _get_lang
+                                from backend.database import get_session as _DB
+                                from backend.user_store import get_user_profile as _get_user, get_user_language as _get_lang
                                 from backend.locale import NUDGE_TZ_WHEN_MISSING
                                 _db = _DB()
                                 try:
@@ -1814,7 +1881,7 @@ class AgentLoop:
             if result is not None:
                 # Atualizar ficheiro de memória do cliente (ex.: /lang, /tz alteram dados na BD)
                 try:
-                    from backend.database import SessionLocal as _DB
+                    from backend.database import get_session as _DB
                     _db = _DB()
                     try:
                         self._sync_onboarding_to_memory(_db, msg.chat_id, msg.session_key)
@@ -1833,8 +1900,8 @@ class AgentLoop:
                     result = result[0]
                 # Nudge suave quando falta fuso (máx 1x por sessão para não incomodar)
                 try:
-                    from backend.database import SessionLocal as _DB
-                    from backend.user_store import get_or_create_user as _get_user, get_user_language as _get_lang
+                    from backend.database import get_session as _DB
+                    from backend.user_store import get_user_profile as _get_user, get_user_language as _get_lang
                     from backend.locale import NUDGE_TZ_WHEN_MISSING
                     _db = _DB()
                     try:
@@ -1878,11 +1945,11 @@ class AgentLoop:
             # Obter last_list_name do utilizador para contexto
             last_list = None
             try:
-                from backend.database import SessionLocal
-                from backend.user_store import get_or_create_user
-                _db = SessionLocal()
+                from backend.database import get_session
+                from backend.user_store import get_user_profile
+                _db = get_session()
                 try:
-                    _u = get_or_create_user(_db, msg.chat_id)
+                    _u = get_user_profile(_db, msg.chat_id)
                     last_list = _u.last_list_name
                 finally:
                     _db.close()
@@ -1920,81 +1987,89 @@ class AgentLoop:
         except Exception as e:
             logger.debug("contextual_reasoning_failed", extra={"extra": {"error": str(e)}})
 
-        # Sensitive Data Filter (LGPD/GDPR/Credentials)
+        # Etapas pré-LLM em paralelo (ver zapista/agent/pre_llm.py): dados sensíveis, escopo (+ follow-up),
+        # raciocínio Mimo e compressão da sessão. Um veredicto bloqueante (sensível / fora do escopo)
+        # cancela as restantes; o veredicto de dados sensíveis ganha ao de escopo.
+        from backend.sensitive_data_filter import check_sensitive_data, get_refusal_message
+        from backend.scope_filter import is_in_scope_fast
+        from zapista.agent.pre_llm import Stage, run_stages
+        from zapista.utils.helpers import env_float
+        session = self.sessions.get_or_create(msg.session_key)
+        scope_p = self.scope_provider if self.scope_provider else self.provider
+        classifier_timeout = env_float("PRE_LLM_CLASSIFIER_TIMEOUT", 8.0, lo=0.1)
+        stages = [
+            Stage(
+                "sensitive",
+                lambda: check_sensitive_data(msg.content, provider=scope_p, model=self.scope_model, user_language=user_lang),
+                classifier_timeout,
+                blocks=lambda r: bool(r is not None and r.blocked),
+                cancel_on_block=False,
+            ),
+            Stage("scope", lambda: self._scope_verdict(msg.content, session), classifier_timeout, blocks=lambda r: r is False),
+        ]
         try:
-            from backend.sensitive_data_filter import check_sensitive_data, get_refusal_message
-            import json
-            from backend.database import SessionLocal
-            from backend.models_db import AuditLog
-
-            # Use same provider/model as scope filter
-            scope_p = self.scope_provider if self.scope_provider else self.provider
-            sen_res = await check_sensitive_data(msg.content, provider=scope_p, model=self.scope_model, user_language=user_lang)
-            
-            if sen_res.blocked:
-                try:
-                    db = SessionLocal()
-                    user_id = None
-                    from backend.user_store import get_user_by_chat_id
-                    u = get_user_by_chat_id(db, msg.chat_id, msg.phone_for_locale)
-                    if u:
-                        user_id = u.id
-                    
-                    log = AuditLog(
-                        user_id=user_id,
-                        action="SENSITIVE_DATA_BLOCKED",
-                        resource=sen_res.category,
-                        payload_json=json.dumps({"stage": sen_res.stage})
-                    )
-                    db.add(log)
-                    db.commit()
-                    db.close()
-                except Exception as ex:
-                    logger.warning("failed_to_log_sensitive_data_block", extra={"extra": {"error": str(ex)}})
+            from backend.llm_handlers import is_analytical_message
+            analytical = is_analytical_message(msg.content)
+        except Exception:
+            analytical = False
+        # Raciocínio em paralelo quando a mensagem vai para o agente principal; mensagens analíticas
+        # podem ser respondidas por handle_analytics e só o recebem se este as recusar (mais abaixo).
+        # A compressão (>=45 msgs) corre sempre, como antes.
+        reasoning_enabled = bool(self.scope_provider and self.scope_model)
+        reasoning_timeout = env_float("PRE_LLM_REASONING_TIMEOUT", 12.0, lo=0.1)
+        if reasoning_enabled and not analytical and not self.circuit_breaker.is_open():
+            history_for_reasoning = session.get_history()
+            stages.append(Stage(
+                "reasoning",
+                lambda: self._reason_with_mimo(history_for_reasoning, msg.content),
+                reasoning_timeout,
+            ))
+        if len(session.messages) >= 45:
+            stages.append(Stage(
+                "compress",
+                lambda: self._maybe_compress_session(session, msg.session_key),
+                env_float("PRE_LLM_COMPRESS_TIMEOUT", 25.0, lo=0.1),
+            ))
+        pre_llm = await run_stages(stages)
+        logger.info("pre_llm_stages", extra={"extra": pre_llm.as_log()})
 
-                refusal = get_refusal_message(sen_res.category, sen_res.detected_language)
-                return OutboundMessage(
-                    channel=msg.channel, chat_id=msg.chat_id, content=refusal, metadata=dict(msg.metadata or {}),
+        # Sensitive Data Filter (LGPD/GDPR/Credentials)
+        sen_res = pre_llm.get("sensitive")
+        if "sensitive" in pre_llm.errors:
+            logger.warning("sensitive_data_filter_failed", extra={"extra": {"error": pre_llm.errors["sensitive"]}})
+        if sen_res is not None and sen_res.blocked:
+            try:
+                import json
+                from backend.database import get_session
+                from backend.models_db import AuditLog
+                db = get_session()
+                user_id = None
+                from backend.user_store import get_user_by_chat_id
+                u = get_user_by_chat_id(db, msg.chat_id, msg.phone_for_locale)
+                if u:
+                    user_id = u.id
+
+                log = AuditLog(
+                    user_id=user_id,
+                    action="SENSITIVE_DATA_BLOCKED",
+                    resource=sen_res.category,
+                    payload_json=json.dumps({"stage": sen_res.stage})
                 )
-        except Exception as e:
-            logger.warning("sensitive_data_filter_failed", extra={"extra": {"error": str(e)}})
+                db.add(log)
+                db.commit()
+                db.close()
+            except Exception as ex:
+                logger.warning("failed_to_log_sensitive_data_block", extra={"extra": {"error": str(ex)}})
 
-        # Scope filter: LLM SIM/NAO (fallback: regex). Follow-ups: se a última mensagem do user estava no escopo, considerar esta também.
-        from backend.scope_filter import is_in_scope_fast, is_in_scope_llm, is_follow_up_llm
-        session = self.sessions.get_or_create(msg.session_key)
-        try:
-            if self.circuit_breaker.is_open():
-                in_scope = is_in_scope_fast(msg.content)
-            else:
-                try:
-                    scope_p = self.scope_provider if self.scope_provider else self.provider
-                    in_scope = await is_in_scope_llm(msg.content, provider=scope_p, model=self.scope_model)
-                except Exception:
-                    self.circuit_breaker.record_failure()
-                    in_scope = is_in_scope_fast(msg.content)
-        except Exception:
+            refusal = get_refusal_message(sen_res.category, sen_res.detected_language)
+            return OutboundMessage(
+                channel=msg.channel, chat_id=msg.chat_id, content=refusal, metadata=dict(msg.metadata or {}),
+            )
+
+        # Scope filter: sem veredicto (prazo/erro) → regex
+        in_scope = pre_llm.get("scope")
+        if in_scope is None:
             in_scope = is_in_scope_fast(msg.content)
-        if not in_scope:
-            # Follow-up: última mensagem do user no escopo (regex) ou Mimo quando o regex não considera a anterior no escopo
-            try:
-                history = session.get_history(max_messages=20)
-                for m in reversed(history):
-                    if m.get("role") == "user":
-                        prev = (m.get("content") or "").strip()
-                        if not prev:
-                            break
-                        if is_in_scope_fast(prev):
-                            in_scope = True
-                        elif self.scope_provider and (self.scope_model or "").strip():
-                            if await is_follow_up_llm(
-                                prev, msg.content or "",
-                                provider=self.scope_provider,
-                                model=self.scope_model,
-                            ):
-                                in_scope = True
-                        break
-            except Exception:
-                pass
         if not in_scope:
             content = await self._out_of_scope_message(msg.content, user_lang)
             try:
@@ -2059,19 +2134,19 @@ class AgentLoop:
                 metadata=dict(msg.metadata or {}),
             )
 
-        preview = msg.content[:80] + "..." if len(msg.content) > 80 else msg.content
-        logger.info("processing_message", extra={"extra": {
-            "channel": msg.channel,
-            "sender_id": str(msg.sender_id),
-            "preview": preview
-        }})
+        if log_enabled(logger, logging.INFO, "processing_message"):
+            preview = msg.content[:80] + "..." if len(msg.content) > 80 else msg.content
+            logger.info("processing_message", extra={"extra": {
+                "channel": msg.channel,
+                "sender_id": str(msg.sender_id),
+                "preview": preview
+            }})
 
         # Conversacional: agente principal (DeepSeek)
         # Get or create session
         session = self.sessions.get_or_create(msg.session_key)
 
-        # Resumo automático: se convo longa (>=45 msgs), condensa via Mimo e guarda em MEMORY.md
-        await self._maybe_compress_session(session, msg.session_key)
+        # Resumo automático (>=45 msgs) já correu nas etapas pré-LLM ("compress")
 
         # Build initial messages (use get_history for LLM-formatted messages)
         # user_lang já definido acima: 1.º número, 2.º config, 3.º mensagem (se pt-PT/pt-BR/es/en)
@@ -2089,7 +2164,7 @@ class AgentLoop:
             _date_tz_label = "UTC"
             _dt_local = _dt_utc
             try:
-                from backend.database import SessionLocal as _DateDB
+                from backend.database import get_session as _DateDB
                 from backend.user_store import get_user_timezone as _get_user_tz
                 from zoneinfo import ZoneInfo as _ZI
                 _ddb = _DateDB()
@@ -2124,18 +2199,22 @@ class AgentLoop:
         used_fallback = False  # Para tentar scope_provider (Mimo) como fallback
 
         # Reasoning Phase (MIMO): Check if we need math/logic/checking
-        mimo_reasoning = None
-        if self.scope_provider and self.scope_model:
+        # (já calculado em paralelo nas etapas pré-LLM, "reasoning")
+        mimo_reasoning = pre_llm.get("reasoning")
+        if reasoning_enabled and "reasoning" not in pre_llm.status:
+            # Analítica que handle_analytics não tratou: vai para o agente, por isso raciocinar agora
             try:
-                mimo_reasoning = await self._reason_with_mimo(session.get_history(), msg.content)
-                if mimo_reasoning:
-                    # Injeta o raciocínio no contexto para o DeepSeek usar
-                    messages.append({
-                        "role": "system",
-                        "content": f"## Analytical Context (from MIMO Logic Engine)\nUse this context to ensure accuracy in your response.\n\n{mimo_reasoning}"
-                    })
+                mimo_reasoning = await asyncio.wait_for(
+                    self._reason_with_mimo(session.get_history(), msg.content), reasoning_timeout,
+                )
             except Exception as e:
                 logger.debug("mimo_reasoning_failed", extra={"extra": {"error": str(e)}})
+        if mimo_reasoning:
+            # Injeta o raciocínio no contexto para o DeepSeek usar
+            messages.append({
+                "role": "system",
+                "content": f"## Analytical Context (from MIMO Logic Engine)\nUse this context to ensure accuracy in your response.\n\n{mimo_reasoning}"
+            })
 
         while iteration < self.max_iterations:
             iteration += 1
@@ -2208,14 +2287,18 @@ class AgentLoop:
                     messages, response.content, tool_call_dicts
                 )
                 
-                # Execute tools
+                # Execute tools: calls compatíveis em paralelo (ToolRegistry.execute_many), resultados pela ordem original
                 for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
-                    logger.info("tool_call_initiated", extra={"extra": {
-                        "tool": tool_call.name,
-                        "arguments": args_str[:200]
-                    }})
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
+                    if log_enabled(logger, logging.INFO, "tool_call_initiated"):
+                        args_str = json.dumps(tool_call.arguments, ensure_ascii=False)
+                        logger.info("tool_call_initiated", extra={"extra": {
+                            "tool": tool_call.name,
+                            "arguments": args_str[:200]
+                        }})
+                results = await self.tools.execute_many(
+                    [(tool_call.name, tool_call.arguments) for tool_call in response.tool_calls]
+                )
+                for tool_call, result in zip(response.tool_calls, results):
                     # Log result (shortened if too long)
                     res_log = str(result)
                     if len(res_log) > 500:
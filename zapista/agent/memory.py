@@ -1,20 +1,27 @@
-"""Memory system for persistent agent memory. Isolado por session_key (channel:chat_id) para evitar vazamento entre usuários."""
+"""Memory system for persistent agent memory. Isolado por session_key (channel:chat_id) para evitar vazamento entre usuários.
+
+Leituras e escritas passam pela FileCache (zapista/utils/file_cache.py): chats parados não leem o disco a cada turno.
+"""
 
 from pathlib import Path
 from datetime import datetime
 
+from zapista.utils.file_cache import get_file_cache
 from zapista.utils.helpers import ensure_dir, today_date, safe_filename
 
 
-def _memory_dir_for_session(workspace: Path, session_key: str | None) -> Path:
-    """Diretório de memória: global (workspace/memory) se session_key vazio; por usuário (workspace/memory/<safe_key>) caso contrário."""
-    base = ensure_dir(workspace / "memory")
+def _memory_dir_for_session(workspace: Path, session_key: str | None, create: bool = True) -> Path:
+    """Diretório de memória: global (workspace/memory) se session_key vazio; por usuário (workspace/memory/<safe_key>) caso contrário.
+    create=False: só calcula o caminho (leituras; a pasta é criada ao gravar)."""
+    base = workspace / "memory"
+    if create:
+        ensure_dir(base)
     if not session_key or not str(session_key).strip():
         return base
     safe_key = safe_filename(str(session_key).strip().replace(":", "_"))
     if not safe_key:
         return base
-    return ensure_dir(base / safe_key)
+    return ensure_dir(base / safe_key) if create else base / safe_key
 
 
 class MemoryStore:
@@ -32,8 +39,8 @@ class MemoryStore:
         self.memory_dir = ensure_dir(workspace / "memory")
         self.memory_file = self.memory_dir / "MEMORY.md"
     
-    def _dir(self, session_key: str | None) -> Path:
-        return _memory_dir_for_session(self.workspace, session_key)
+    def _dir(self, session_key: str | None, create: bool = False) -> Path:
+        return _memory_dir_for_session(self.workspace, session_key, create=create)
     
     def get_today_file(self, session_key: str | None = None) -> Path:
         """Get path to today's memory file (for the given session if provided)."""
@@ -41,35 +48,28 @@ class MemoryStore:
     
     def read_today(self, session_key: str | None = None) -> str:
         """Read today's memory notes."""
-        today_file = self.get_today_file(session_key)
-        if today_file.exists():
-            return today_file.read_text(encoding="utf-8")
-        return ""
+        return get_file_cache().read_text(self.get_today_file(session_key)) or ""
     
     def append_today(self, content: str, session_key: str | None = None) -> None:
         """Append content to today's memory notes."""
+        cache = get_file_cache()
         today_file = self.get_today_file(session_key)
-        
-        if today_file.exists():
-            existing = today_file.read_text(encoding="utf-8")
+        existing = cache.read_text(today_file)
+        if existing is not None:
             content = existing + "\n" + content
         else:
             header = f"# {today_date()}\n\n"
             content = header + content
         
-        today_file.write_text(content, encoding="utf-8")
+        cache.write_text(today_file, content)
     
     def read_long_term(self, session_key: str | None = None) -> str:
         """Read long-term memory (MEMORY.md) for the given session."""
-        path = self._dir(session_key) / "MEMORY.md"
-        if path.exists():
-            return path.read_text(encoding="utf-8")
-        return ""
+        return get_file_cache().read_text(self._dir(session_key) / "MEMORY.md") or ""
     
     def write_long_term(self, content: str, session_key: str | None = None) -> None:
         """Write to long-term memory (MEMORY.md) for the given session."""
-        path = self._dir(session_key) / "MEMORY.md"
-        path.write_text(content, encoding="utf-8")
+        get_file_cache().write_text(self._dir(session_key, create=True) / "MEMORY.md", content)
     
     def get_recent_memories(self, days: int = 7, session_key: str | None = None) -> str:
         """Get memories from the last N days for the given session."""
@@ -84,13 +84,13 @@ class MemoryStore:
             _now_ts = time.time()
         today = datetime.fromtimestamp(_now_ts).date()
         d = self._dir(session_key)
+        cache = get_file_cache()
         
         for i in range(days):
             date = today - timedelta(days=i)
             date_str = date.strftime("%Y-%m-%d")
-            file_path = d / f"{date_str}.md"
-            if file_path.exists():
-                content = file_path.read_text(encoding="utf-8")
+            content = cache.read_text(d / f"{date_str}.md")
+            if content is not None:
                 memories.append(content)
         
         return "\n\n---\n\n".join(memories)
@@ -0,0 +1,154 @@
+"""Etapas antes do agente principal (classificadores Mimo) a correr em paralelo.
+
+Antes do loop de tools, _process_message_impl precisa de: filtro de dados sensíveis, filtro de
+escopo, raciocínio Mimo e (às vezes) compressão da sessão. São chamadas independentes ao modelo;
+em série, a latência é a soma de todas. run_stages() arranca-as como tasks ao mesmo tempo:
+- cada etapa tem o seu prazo (timeout → valor default, estado "timeout");
+- uma etapa pode dar um veredicto bloqueante (blocks(resultado) → True): as restantes com
+  cancel_on_block são canceladas logo; as outras (ex.: dados sensíveis, cujo veredicto ganha ao de
+  escopo) continuam até terminar ou ao seu prazo;
+- quando várias bloqueiam, ganha a primeira pela ordem da lista (não pela ordem de chegada);
+- exceções → default, estado "error".
+O caminho crítico passa a ser a etapa mais lenta (ou a que bloqueia), não a soma. Tempos por etapa
+no StageReport (log pre_llm_stages) e agregados em get_pre_llm_stats() (#system).
+
+Env (segundos): PRE_LLM_CLASSIFIER_TIMEOUT (8), PRE_LLM_REASONING_TIMEOUT (12), PRE_LLM_COMPRESS_TIMEOUT (25)
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    timeout: float
+    default: Any = None
+    blocks: Callable[[Any], bool] | None = None
+    cancel_on_block: bool = True
+
+
+@dataclass
+class StageReport:
+    results: dict[str, Any] = field(default_factory=dict)
+    status: dict[str, str] = field(default_factory=dict)  # ok | timeout | error | cancelled
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    blocked_by: str | None = None
+    total_ms: float = 0.0
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.results.get(name, default)
+
+    def as_log(self) -> dict[str, Any]:
+        return {
+            "total_ms": round(self.total_ms, 1),
+            "serial_ms": round(sum(self.timings_ms.values()), 1),
+            "blocked_by": self.blocked_by,
+            "stages": {
+                name: {"ms": round(ms, 1), "status": self.status.get(name)}
+                for name, ms in self.timings_ms.items()
+            },
+            **({"errors": self.errors} if self.errors else {}),
+        }
+
+
+_STATS: dict[str, Any] = {"runs": 0, "blocked": 0, "total_ms": 0.0, "serial_ms": 0.0, "stages": {}}
+
+
+def _record(report: StageReport) -> None:
+    _STATS["runs"] += 1
+    _STATS["blocked"] += 1 if report.blocked_by else 0
+    _STATS["total_ms"] += report.total_ms
+    _STATS["serial_ms"] += sum(report.timings_ms.values())
+    for name, ms in report.timings_ms.items():
+        s = _STATS["stages"].setdefault(name, {"runs": 0, "ms": 0.0, "timeout": 0, "error": 0, "cancelled": 0})
+        s["runs"] += 1
+        s["ms"] += ms
+        status = report.status.get(name)
+        if status in ("timeout", "error", "cancelled"):
+            s[status] += 1
+
+
+def get_pre_llm_stats() -> dict[str, Any] | None:
+    """Médias do pipeline (para #system); None se ainda não correu."""
+    runs = _STATS["runs"]
+    if not runs:
+        return None
+    return {
+        "runs": runs,
+        "blocked": _STATS["blocked"],
+        "avg_ms": round(_STATS["total_ms"] / runs, 1),
+        "avg_serial_ms": round(_STATS["serial_ms"] / runs, 1),
+        "stages": {
+            name: {**s, "avg_ms": round(s["ms"] / s["runs"], 1)} for name, s in _STATS["stages"].items()
+        },
+    }
+
+
+async def run_stages(stages: list[Stage]) -> StageReport:
+    """Corre as etapas em paralelo (ver docstring do módulo). Nunca levanta exceção das etapas."""
+    report = StageReport()
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    by_task: dict[asyncio.Task, Stage] = {}
+    deadlines: dict[asyncio.Task, float] = {}
+    for stage in stages:
+        report.results[stage.name] = stage.default
+        task = asyncio.ensure_future(stage.run())
+        by_task[task] = stage
+        deadlines[task] = loop.time() + stage.timeout
+    order = {stage.name: i for i, stage in enumerate(stages)}
+    pending = set(by_task)
+
+    def _finish(task: asyncio.Task, status: str) -> None:
+        stage = by_task[task]
+        report.status[stage.name] = status
+        report.timings_ms[stage.name] = (time.perf_counter() - start) * 1000
+
+    def _cancel(tasks) -> None:
+        for t in tasks:
+            t.cancel()
+            _finish(t, "cancelled")
+
+    try:
+        while pending:
+            timeout = max(0.0, min(deadlines[t] for t in pending) - loop.time())
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                stage = by_task[task]
+                if task.cancelled():
+                    _finish(task, "cancelled")
+                    continue
+                exc = task.exception()
+                if exc is not None:
+                    report.errors[stage.name] = str(exc)[:200]
+                    _finish(task, "error")
+                    continue
+                result = task.result()
+                report.results[stage.name] = result
+                _finish(task, "ok")
+                if stage.blocks is not None and stage.blocks(result):
+                    if report.blocked_by is None or order[stage.name] < order[report.blocked_by]:
+                        report.blocked_by = stage.name
+            now = loop.time()
+            expired = {t for t in pending if deadlines[t] <= now}
+            for task in expired:
+                task.cancel()
+                _finish(task, "timeout")
+            pending -= expired
+            if report.blocked_by is not None:
+                # Etapas antes da que bloqueou e sem cancel_on_block podem ainda ganhar-lhe: continuam.
+                winner = order[report.blocked_by]
+                doomed = {t for t in pending if by_task[t].cancel_on_block or order[by_task[t].name] > winner}
+                _cancel(doomed)
+                pending -= doomed
+    except asyncio.CancelledError:
+        _cancel(pending)
+        raise
+    report.total_ms = (time.perf_counter() - start) * 1000
+    _record(report)
+    return report
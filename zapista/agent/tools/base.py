@@ -1,9 +1,53 @@
 """Base class for agent tools."""
 
+import contextvars
 from abc import ABC, abstractmethod
 from typing import Any
 
 
+class TaskLocal:
+    """
+    Atributo de tool guardado por task asyncio (contextvars), não na instância partilhada.
+
+    As tools são singletons do AgentLoop; com vários workers a processar chats em paralelo,
+    o contexto definido por set_context (canal, chat_id, ...) não pode ser partilhado entre tasks.
+    """
+
+    def __init__(self, default: Any = None):
+        self._default = default
+        self._var: contextvars.ContextVar[dict[int, Any]] | None = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._var = contextvars.ContextVar(f"{owner.__name__}.{name}", default={})
+
+    def __get__(self, obj: Any, owner: type | None = None) -> Any:
+        if obj is None:
+            return self
+        return self._var.get().get(id(obj), self._default)
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        # Copy-on-write: o dict de outra task nunca é mutado
+        values = dict(self._var.get())
+        values[id(obj)] = value
+        self._var.set(values)
+
+
+# Classes de concorrência: várias tool calls na mesma resposta do LLM correm em paralelo quando não
+# entram em conflito (ToolRegistry.execute_many).
+READ_ONLY = "read_only"  # só lê: paralela com tudo exceto escritas no mesmo recurso e GLOBAL_WRITE
+USER_WRITE = "user_write"  # escreve dados do utilizador atual no seu recurso (lista, lembretes, agenda)
+GLOBAL_WRITE = "global_write"  # efeitos fora do chat atual ou desconhecidos: corre sozinha, pela ordem
+
+
+def calls_conflict(a: tuple[str, str], b: tuple[str, str]) -> bool:
+    """(classe, recurso) de duas calls: True se a segunda tem de esperar pela primeira."""
+    if GLOBAL_WRITE in (a[0], b[0]):
+        return True
+    if a[0] == READ_ONLY and b[0] == READ_ONLY:
+        return False
+    return a[1] == b[1]
+
+
 class Tool(ABC):
     """
     Abstract base class for agent tools.
@@ -12,6 +56,11 @@ class Tool(ABC):
     the environment, such as reading files, executing commands, etc.
     """
     
+    # Por omissão uma tool é GLOBAL_WRITE (serializada); as subclasses declaram a sua classe e as
+    # ações que só leem (ex.: action="list").
+    concurrency: str = GLOBAL_WRITE
+    read_actions: frozenset[str] = frozenset()
+
     _TYPE_MAP = {
         "string": str,
         "integer": int,
@@ -52,6 +101,12 @@ class Tool(ABC):
         """
         pass
 
+    def concurrency_key(self, params: dict[str, Any]) -> tuple[str, str]:
+        """(classe de concorrência, recurso) desta call; o recurso é o nome da tool."""
+        if self.read_actions and (params or {}).get("action") in self.read_actions:
+            return READ_ONLY, self.name
+        return self.concurrency, self.name
+
     def validate_params(self, params: dict[str, Any]) -> list[str]:
         """Validate tool parameters against JSON schema. Returns error list (empty if valid)."""
         schema = self.parameters or {}
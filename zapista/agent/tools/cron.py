@@ -5,7 +5,7 @@ from typing import Any, TYPE_CHECKING
 
 from backend.logger import get_logger
 logger = get_logger(__name__)
-from zapista.agent.tools.base import Tool
+from zapista.agent.tools.base import USER_WRITE, TaskLocal, Tool
 
 def _effective_now_ms() -> int:
     """Agora em ms (UTC); usa correção de clock_drift se houver desvio grande."""
@@ -26,6 +26,16 @@ if TYPE_CHECKING:
 class CronTool(Tool):
     """Tool to schedule reminders and recurring tasks."""
 
+    concurrency = USER_WRITE
+    read_actions = frozenset({"list"})
+
+    # Contexto e estado do turno atual (por task: workers processam chats em paralelo)
+    _channel = TaskLocal("")
+    _chat_id = TaskLocal("")
+    _phone_for_locale = TaskLocal(None)
+    _audio_mode = TaskLocal(False)
+    _allow_relaxed_interval = TaskLocal(False)
+
     def __init__(
         self,
         cron_service: CronService,
@@ -68,10 +78,10 @@ class CronTool(Tool):
         if not self._chat_id:
             return "pt-BR"
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import get_user_language
             from backend.locale import resolve_response_language
-            db = SessionLocal()
+            db = get_session()
             try:
                 lang = get_user_language(db, self._chat_id, getattr(self, "_phone_for_locale", None)) or "pt-BR"
                 return resolve_response_language(lang, self._chat_id, getattr(self, "_phone_for_locale", None))
@@ -255,12 +265,12 @@ class CronTool(Tool):
             if time_input:
                 try:
                     from backend.time_parse import parse_lembrete_time
-                    from backend.database import SessionLocal
+                    from backend.database import get_session
                     from backend.user_store import get_user_timezone
                     from backend.timezone import phone_to_default_timezone
 
                     tz_iana = "UTC"
-                    db = SessionLocal()
+                    db = get_session()
                     try:
                         tz_iana = get_user_timezone(db, self._chat_id, self._phone_for_locale) or phone_to_default_timezone(self._phone_for_locale or self._chat_id) or "UTC"
                     finally:
@@ -402,7 +412,7 @@ class CronTool(Tool):
         """
         msg_norm = (message or "").lower().strip()
         existing_jobs = [
-            j for j in self._cron.list_jobs(include_disabled=True)
+            j for j in self._cron.list_jobs(include_disabled=True, to=self._chat_id)
             if getattr(j.payload, "to", None) == self._chat_id
             and j.enabled
             and self._schedule_matches(j.schedule, schedule)
@@ -541,11 +551,11 @@ class CronTool(Tool):
                 try:
                     from datetime import datetime
                     from zoneinfo import ZoneInfo
-                    from backend.database import SessionLocal
+                    from backend.database import get_session
                     from backend.user_store import get_user_timezone
                     from backend.timezone import phone_to_default_timezone
                     
-                    db = SessionLocal()
+                    db = get_session()
                     try:
                         tz_name = get_user_timezone(db, self._chat_id, self._phone_for_locale) or phone_to_default_timezone(self._phone_for_locale or self._chat_id) or "UTC"
                     finally:
@@ -597,9 +607,9 @@ class CronTool(Tool):
         elif cron_expr:
             tz_iana = None
             try:
-                from backend.database import SessionLocal
+                from backend.database import get_session
                 from backend.user_store import get_user_timezone
-                db = SessionLocal()
+                db = get_session()
                 try:
                     tz_iana = get_user_timezone(db, self._chat_id, self._phone_for_locale)
                 finally:
@@ -626,7 +636,7 @@ class CronTool(Tool):
             if next_ms is not None:
                 from datetime import datetime
                 from zoneinfo import ZoneInfo
-                from backend.database import SessionLocal
+                from backend.database import get_session
                 from backend.user_store import get_user_timezone, get_or_create_user
                 from backend.limits import check_reminder_limits, LIMIT_REMINDERS_PER_DAY
                 from backend.locale import (
@@ -636,7 +646,7 @@ class CronTool(Tool):
                 )
                 tz_iana = "UTC"
                 try:
-                    db_lim = SessionLocal()
+                    db_lim = get_session()
                     try:
                         tz_iana = get_user_timezone(db_lim, self._chat_id) or "UTC"
                         user_lim = get_or_create_user(db_lim, self._chat_id)
@@ -681,7 +691,16 @@ class CronTool(Tool):
         else:
              remind_again_max_count = 0 # no follow-ups unless explicitly set
 
+        # Job e registo em ReminderHistory na mesma transação (com CRON_STORE=sqlite): os dois ou nenhum
+        from datetime import datetime
+        from backend.database import get_session
+        from backend.reminder_history import add_scheduled
+        from backend.user_store import get_or_create_user
+        db = get_session()
+        job = None
+        known_ids = {j.id for j in self._cron.list_jobs(include_disabled=True, to=self._chat_id)}
         try:
+            get_or_create_user(db, self._chat_id)  # criação do utilizador faz commit próprio: antes do job
             job = self._cron.add_job(
                 name=message,
                 schedule=schedule,
@@ -701,13 +720,33 @@ class CronTool(Tool):
                 pomodoro_cycle=pomodoro_cycle,
                 pomodoro_phase=pomodoro_phase,
                 is_important=is_important,
+                db=db,
+            )
+            add_scheduled(
+                db,
+                self._chat_id,
+                message,
+                job_id=job.id,
+                schedule_at=datetime.utcfromtimestamp(job.state.next_run_at_ms / 1000) if job.state.next_run_at_ms else None,
+                channel=self._channel,
+                recipient=self._chat_id,
+                commit=False,
             )
+            db.commit()
         except ValueError as e:
+            db.rollback()
             if "MAX_REMINDERS_EXCEEDED" in str(e):
                 from backend.locale import REMINDER_LIMIT_EXCEEDED
                 lang = self._get_user_lang()
                 return REMINDER_LIMIT_EXCEEDED.get(lang, REMINDER_LIMIT_EXCEEDED["pt-BR"])
             raise
+        except Exception:
+            db.rollback()
+            if job is not None and job.id not in known_ids:
+                self._cron.remove_job(job.id)  # transação desfeita: tirar também do índice em memória
+            raise
+        finally:
+            db.close()
         if use_deadline and job.schedule.kind == "at" and job.schedule.at_ms:
             at_ms = job.schedule.at_ms + (5 * 60 * 1000)
             from backend.locale import REMINDER_DEADLINE_PREFIX
@@ -730,7 +769,7 @@ class CronTool(Tool):
         if in_seconds is not None and in_seconds > 0 and use_pre_reminders:
             # Deduplicação: verificar quantos avisos já existem para este job pai
             _existing_pre = [
-                j for j in self._cron.list_jobs()
+                j for j in self._cron.list_jobs(to=self._chat_id)
                 if getattr(j.payload, "parent_job_id", None) == job.id
                 and not getattr(j.payload, "deadline_check_for_job_id", None)
                 and getattr(j.payload, "to", None) == self._chat_id
@@ -742,10 +781,10 @@ class CronTool(Tool):
                 )
             else:
                 try:
-                    from backend.database import SessionLocal
+                    from backend.database import get_session
                     from backend.user_store import get_default_reminder_lead_seconds, get_extra_reminder_leads_seconds
                     from backend.reminder_lead_classifier import AUTO_LEAD_LONG_EVENT_SECONDS
-                    db = SessionLocal()
+                    db = get_session()
                     try:
                         if long_event_24h:
                             # Evento muito longo (ex.: > 5 dias): um único aviso 24h antes, sem perguntar ao cliente
@@ -818,28 +857,6 @@ class CronTool(Tool):
                         db.close()
                 except Exception:
                     pass
-        try:
-            from datetime import datetime
-            from backend.database import SessionLocal
-            from backend.reminder_history import add_scheduled
-            db = SessionLocal()
-            try:
-                schedule_at_dt = None
-                if job.state.next_run_at_ms:
-                    schedule_at_dt = datetime.utcfromtimestamp(job.state.next_run_at_ms / 1000)
-                add_scheduled(
-                    db,
-                    self._chat_id,
-                    message,
-                    job_id=job.id,
-                    schedule_at=schedule_at_dt,
-                    channel=self._channel,
-                    recipient=self._chat_id,
-                )
-            finally:
-                db.close()
-        except Exception:
-            pass
         from backend.locale import (
             CRON_REMINDER_SCHEDULED, CRON_PRE_REMINDERS_ADDED, CRON_UNCONFIRMED_RETRY,
             CRON_DEPENDS_ON, CRON_WILL_BE_SENT, CRON_CREATED_BY_CLI,
@@ -868,12 +885,12 @@ class CronTool(Tool):
             else:
                 at_sec_display = ((at_sec + 30) // 60) * 60
             try:
-                from backend.database import SessionLocal
+                from backend.database import get_session
                 from backend.user_store import get_user_timezone
                 from backend.timezone import format_utc_timestamp_for_user, phone_to_default_timezone
                 from datetime import datetime, timezone as dt_timezone
                 from zoneinfo import ZoneInfo
-                db = SessionLocal()
+                db = get_session()
                 try:
                     tz = get_user_timezone(db, self._chat_id, self._phone_for_locale) or phone_to_default_timezone(self._phone_for_locale or self._chat_id) or "UTC"
                     hora_str = format_utc_timestamp_for_user(at_sec_display, tz, show_seconds=_show_secs)
@@ -897,7 +914,7 @@ class CronTool(Tool):
 
     def _remove_all_jobs(self, confirmed: bool = False) -> str:
         """Remove todos os lembretes do utilizador atual. Chamado quando user diz 'delete all', 'remove all', etc."""
-        all_jobs = self._cron.list_jobs()
+        all_jobs = self._cron.list_jobs(to=self._chat_id)
         user_jobs = [
             j for j in all_jobs
             if getattr(j.payload, "to", None) == self._chat_id
@@ -937,7 +954,7 @@ class CronTool(Tool):
     def _list_jobs(self, recurring_only: bool = False) -> str:
         """Lista apenas os lembretes do usuário atual (payload.to == chat_id). Isolamento por conversa.
         Nudge proativo, avisos e prazos internos não aparecem — apenas lembretes principais."""
-        all_jobs = self._cron.list_jobs()
+        all_jobs = self._cron.list_jobs(to=self._chat_id)
         jobs = [
             j for j in all_jobs
             if getattr(j.payload, "to", None) == self._chat_id
@@ -997,9 +1014,9 @@ class CronTool(Tool):
                 return CRON_JOB_NOT_FOUND.get(_lang, CRON_JOB_NOT_FOUND["en"]).format(job_id=job_id)
         # Lembrete único pode já ter sido executado e removido automaticamente
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.reminder_history import get_reminder_history
-            db = SessionLocal()
+            db = get_session()
             try:
                 entries = get_reminder_history(db, self._chat_id, kind="delivered", limit=5)
                 if entries:
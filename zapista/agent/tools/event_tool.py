@@ -3,7 +3,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Any
 from zoneinfo import ZoneInfo
 
-from zapista.agent.tools.base import Tool
+from zapista.agent.tools.base import USER_WRITE, TaskLocal, Tool
 
 class EventTool(Tool):
     """
@@ -16,6 +16,12 @@ class EventTool(Tool):
     """
 
     name = "event"
+    concurrency = USER_WRITE
+    read_actions = frozenset({"list"})
+
+    # Contexto do turno atual (por task: workers processam chats em paralelo)
+    chat_id = TaskLocal(None)
+    phone = TaskLocal(None)
     description = (
         "Adiciona, lista ou remove eventos/compromissos na agenda do utilizador. "
         "Ações válidas: 'add', 'list', 'remove'. "
@@ -242,10 +248,10 @@ class EventTool(Tool):
         if not self.chat_id:
             return "pt-BR"
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import get_user_language
             from backend.locale import resolve_response_language
-            db = SessionLocal()
+            db = get_session()
             try:
                 lang = get_user_language(db, self.chat_id) or "pt-BR"
                 return resolve_response_language(lang, self.chat_id)
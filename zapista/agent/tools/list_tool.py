@@ -8,9 +8,9 @@ from backend.logger import get_logger
 logger = get_logger(__name__)
 from sqlalchemy import func
 
-from zapista.agent.tools.base import Tool
-from backend.database import SessionLocal
-from backend.user_store import get_or_create_user
+from zapista.agent.tools.base import USER_WRITE, TaskLocal, Tool
+from backend.database import get_session
+from backend.user_store import get_or_create_user, invalidate_user_profile
 from backend.models_db import User, List, ListItem, AuditLog, Project
 from backend.sanitize import sanitize_string, MAX_LIST_NAME_LEN, MAX_LIST_ITEM_TEXT_LEN, looks_like_confidential_data
 from backend.list_item_correction import suggest_correction
@@ -25,6 +25,14 @@ from backend.locale import CONFIRM_ITEMS_ADDED_TO_LIST
 class ListTool(Tool):
     """Manage lists per user: add item, list items, remove, mark done (feito)."""
 
+    concurrency = USER_WRITE
+    read_actions = frozenset({"list"})
+
+    # Contexto do turno atual (por task: workers processam chats em paralelo)
+    _channel = TaskLocal("")
+    _chat_id = TaskLocal("")
+    _phone_for_locale = TaskLocal(None)
+
     def __init__(self, scope_provider=None, scope_model: str = ""):
         self._channel = ""
         self._chat_id = ""
@@ -39,9 +47,9 @@ class ListTool(Tool):
 
     def _get_lang(self) -> str:
         try:
-            from backend.database import SessionLocal
+            from backend.database import get_session
             from backend.user_store import get_user_language
-            db = SessionLocal()
+            db = get_session()
             try:
                 return get_user_language(db, self._chat_id, self._phone_for_locale) or "pt-BR"
             finally:
@@ -58,7 +66,7 @@ class ListTool(Tool):
         return (
             "Manage user lists. Always use this tool when the user asks to create a list, add items (e.g. books, recipes), or show lists; do not say the system is broken without calling the tool first. "
             "Actions: add (list_name, item_text — REQUIRED: never call add without a non-empty item_text, ask the user what to add first; "
-            "IMPORTANT: when adding multiple items, call add once per item — never pack multiple items into a single item_text), "
+            "IMPORTANT: when adding multiple items, pass them in items (one string per item) in a single add call — never pack multiple items into a single item_text), "
             "list (list_name), remove (list_name, item_id), "
             "feito (list_name, item_id to mark done), habitual (list_name), shuffle (list_name)."
         )
@@ -75,6 +83,11 @@ class ListTool(Tool):
                 },
                 "list_name": {"type": "string", "description": "List name (e.g. mercado, pendentes)"},
                 "item_text": {"type": "string", "description": "Item text (for add)"},
+                "items": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Several items to add at once (for add; one string per item, instead of item_text)",
+                },
                 "item_id": {"type": "integer", "description": "Item id (for remove/feito)"},
                 "no_split": {"type": "boolean", "description": "If true, do not split item_text by commas even if short."},
             },
@@ -88,11 +101,12 @@ class ListTool(Tool):
         item_text: str = "",
         item_id: int | None = None,
         no_split: bool = False,
+        items: list[str] | None = None,
         **kwargs: Any,
     ) -> str:
         if not self._chat_id:
             return "Error: no user context (chat_id)"
-        db = SessionLocal()
+        db = get_session()
         try:
             user = get_or_create_user(db, self._chat_id)
             # Save last_list_name for context (only if list_name was provided or inferred)
@@ -101,6 +115,7 @@ class ListTool(Tool):
                 if ln_norm:
                     user.last_list_name = ln_norm
                     db.commit()
+                    invalidate_user_profile(self._chat_id)
 
             if action == "add":
                 list_name_requested = list_name or ""
@@ -109,16 +124,21 @@ class ListTool(Tool):
                 if not list_clean and user.last_list_name:
                     list_clean = user.last_list_name
 
+                target_list = list_clean or list_name_requested or "mercado"
+                if items:
+                    batch = await self._correct_items(target_list, [i for i in items if isinstance(i, str)])
+                    return self._add(db, user.id, target_list, "", items=batch)
+
                 item_clean = sanitize_string(item_text or "", MAX_LIST_ITEM_TEXT_LEN, allow_newline=True)
                 corrected = await suggest_correction(
-                    list_clean or list_name_requested or "mercado", item_clean,
+                    target_list, item_clean,
                     self._scope_provider, self._scope_model,
                     max_len=MAX_LIST_ITEM_TEXT_LEN,
                 )
                 if corrected:
                     item_clean = sanitize_string(corrected, MAX_LIST_ITEM_TEXT_LEN, allow_newline=True)
                 
-                result = self._add(db, user.id, list_clean or list_name_requested or "mercado", item_clean, no_split=no_split)
+                result = self._add(db, user.id, target_list, item_clean, no_split=no_split)
                 return result
 
             if action == "list":
@@ -127,6 +147,7 @@ class ListTool(Tool):
                 if list_clean:
                     user.last_list_name = list_clean
                     db.commit()
+                    invalidate_user_profile(self._chat_id)
                 return res
             
             if action == "remove":
@@ -346,7 +367,35 @@ class ListTool(Tool):
             
         return clean.strip() or name.strip()
 
-    def _add(self, db, user_id: int, list_name: str, item_text: str, no_split: bool = False) -> str:
+    async def _correct_items(self, list_name: str, items: list[str]) -> list[str]:
+        """Correção (Mimo) de vários itens em paralelo; um item corrigido pode dar vários (vírgulas)."""
+        import asyncio
+        cleaned = [sanitize_string(i or "", MAX_LIST_ITEM_TEXT_LEN) for i in items]
+        cleaned = [c for c in cleaned if c and c.strip()]
+        if not cleaned or not (self._scope_provider and self._scope_model):
+            return cleaned
+        corrections = await asyncio.gather(*(
+            suggest_correction(list_name, c, self._scope_provider, self._scope_model, max_len=MAX_LIST_ITEM_TEXT_LEN)
+            for c in cleaned
+        ), return_exceptions=True)
+        out: list[str] = []
+        for original, corrected in zip(cleaned, corrections):
+            if isinstance(corrected, str) and corrected.strip():
+                out.extend(self._split_items(sanitize_string(corrected, MAX_LIST_ITEM_TEXT_LEN, allow_newline=True)))
+            else:
+                out.append(original)
+        return out
+
+    def _add(
+        self,
+        db,
+        user_id: int,
+        list_name: str,
+        item_text: str,
+        no_split: bool = False,
+        items: list[str] | None = None,
+    ) -> str:
+        """Adiciona item_text (dividido em vários itens, salvo no_split) ou a lista items já separada."""
         list_name = self._normalize_list_name(sanitize_string(list_name or "", MAX_LIST_NAME_LEN))
         
         # Fallback to last used list if name is empty (connector)
@@ -355,7 +404,11 @@ class ListTool(Tool):
             if user and user.last_list_name:
                 list_name = user.last_list_name
         
-        item_text = sanitize_string(item_text or "", MAX_LIST_ITEM_TEXT_LEN, allow_newline=True)
+        if items is not None:
+            items_to_add = [s for s in (sanitize_string(i or "", MAX_LIST_ITEM_TEXT_LEN) for i in items) if s and s.strip()]
+            item_text = "\n".join(items_to_add)
+        else:
+            item_text = sanitize_string(item_text or "", MAX_LIST_ITEM_TEXT_LEN, allow_newline=True)
         if not list_name:
             from backend.locale import LIST_NAME_REQUIRED_ADD
             lang = self._get_lang()
@@ -363,9 +416,9 @@ class ListTool(Tool):
         if not item_text or not item_text.strip():
             from backend.locale import LIST_EMPTY_ITEM_ERROR
             try:
-                from backend.database import SessionLocal
+                from backend.database import get_session
                 from backend.user_store import get_user_language
-                _db = SessionLocal()
+                _db = get_session()
                 try:
                     _lg = get_user_language(_db, self._chat_id) or "pt-BR"
                 finally:
@@ -379,10 +432,8 @@ class ListTool(Tool):
             return LIST_PRIVACY_WARNING.get(lang, LIST_PRIVACY_WARNING["en"])
 
         # Auto-split: se LLM passou múltiplos itens numa string, dividir e adicionar cada um
-        if no_split:
-            items_to_add = [item_text]
-        else:
-            items_to_add = self._split_items(item_text)
+        if items is None:
+            items_to_add = [item_text] if no_split else self._split_items(item_text)
         
         # Obter idioma para confirmação
         try:
@@ -391,50 +442,66 @@ class ListTool(Tool):
         except Exception:
             _lg = "pt-BR"
 
-        added_count = 0
-        for single_item in items_to_add:
-            single_clean = sanitize_string(single_item, MAX_LIST_ITEM_TEXT_LEN)
-            if single_clean:
-                if self._add_single(db, user_id, list_name, single_clean):
-                    added_count += 1
-        
-        # Obter contagem total de itens pendentes
-        lst = db.query(List).filter(List.user_id == user_id, List.name == list_name).first()
-        total_count = db.query(ListItem).filter(ListItem.list_id == lst.id, ListItem.done.is_(False)).count() if lst else 0
+        _, total_count = self._add_many(
+            db, user_id, list_name, [sanitize_string(s, MAX_LIST_ITEM_TEXT_LEN) for s in items_to_add]
+        )
         
         return CONFIRM_ITEMS_ADDED_TO_LIST.get(_lg, CONFIRM_ITEMS_ADDED_TO_LIST["en"]).format(
             list_name=list_name, count=total_count
         )
 
-    def _add_single(self, db, user_id: int, list_name: str, item_text: str) -> bool:
-        """Adiciona um único item à lista (uso interno; deduplica). Retorna True se adicionou."""
+    def _add_many(self, db, user_id: int, list_name: str, items: list[str]) -> tuple[int, int]:
+        """
+        Adiciona vários itens numa só transação: lista resolvida uma vez, conjunto normalizado dos
+        pendentes construído uma vez (dedup também dentro do lote), posições contíguas e auditoria
+        em lote. Retorna (itens adicionados, total de pendentes na lista).
+        """
         lst = db.query(List).filter(List.user_id == user_id, List.name == list_name).first()
         if not lst:
             proj = db.query(Project).filter(Project.user_id == user_id, Project.name == list_name).first()
             lst = List(user_id=user_id, name=list_name, project_id=proj.id if proj else None)
             db.add(lst)
             db.flush()
-        
-        # Deduplicação: verifica se já existe item pendente idêntico ou muito similar
-        norm_new = self._normalize_for_dedup(item_text)
-        existing_items = db.query(ListItem).filter(ListItem.list_id == lst.id, ListItem.done.is_(False)).all()
-        for ex in existing_items:
-            if self._normalize_for_dedup(ex.text) == norm_new:
-                return False
 
+        # Deduplicação: ignora itens pendentes idênticos ou muito similares (ex.: plural)
+        pending_texts = [
+            t for (t,) in db.query(ListItem.text).filter(ListItem.list_id == lst.id, ListItem.done.is_(False))
+        ]
+        seen = {self._normalize_for_dedup(t) for t in pending_texts}
         max_pos = (
             db.query(func.max(ListItem.position))
             .filter(ListItem.list_id == lst.id)
             .scalar()
             or 0
         )
-        item = ListItem(list_id=lst.id, text=item_text, position=max_pos + 1)
-        db.add(item)
-        db.flush()  # obter item.id antes do commit
-        audit_payload = json.dumps({"list_name": list_name, "item_text": item_text, "item_id": item.id})
-        db.add(AuditLog(user_id=user_id, action="list_add", resource=list_name, payload_json=audit_payload))
+        new_items: list[ListItem] = []
+        for text in items:
+            if not text:
+                continue
+            norm = self._normalize_for_dedup(text)
+            if norm in seen:
+                continue
+            seen.add(norm)
+            new_items.append(ListItem(list_id=lst.id, text=text, position=max_pos + len(new_items) + 1))
+        if not new_items:
+            return 0, len(pending_texts)
+        db.add_all(new_items)
+        db.flush()  # obter ids antes da auditoria
+        db.add_all([
+            AuditLog(
+                user_id=user_id,
+                action="list_add",
+                resource=list_name,
+                payload_json=json.dumps({"list_name": list_name, "item_text": it.text, "item_id": it.id}),
+            )
+            for it in new_items
+        ])
         db.commit()
-        return True
+        return len(new_items), len(pending_texts) + len(new_items)
+
+    def _add_single(self, db, user_id: int, list_name: str, item_text: str) -> bool:
+        """Adiciona um único item à lista (uso interno; deduplica). Retorna True se adicionou."""
+        return self._add_many(db, user_id, list_name, [item_text])[0] == 1
 
     async def _habitual(self, db, user_id: int, list_name: str) -> str:
         """Adiciona itens habituais à lista. Mimo sugere com base no contexto (dia, época); fallback: top frequentes."""
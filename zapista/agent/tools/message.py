@@ -2,12 +2,18 @@
 
 from typing import Any, Callable, Awaitable
 
-from zapista.agent.tools.base import Tool
+from zapista.agent.tools.base import GLOBAL_WRITE, TaskLocal, Tool
 from zapista.bus.events import OutboundMessage
 
 
 class MessageTool(Tool):
     """Tool to send messages to users on chat channels."""
+
+    concurrency = GLOBAL_WRITE  # envia para outros chats: pela ordem, sem nada em paralelo
+
+    # Contexto do turno atual (por task: workers processam chats em paralelo)
+    _default_channel = TaskLocal("")
+    _default_chat_id = TaskLocal("")
     
     def __init__(
         self, 
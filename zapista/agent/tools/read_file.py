@@ -3,12 +3,14 @@
 from pathlib import Path
 from typing import Any
 
-from zapista.agent.tools.base import Tool
+from zapista.agent.tools.base import READ_ONLY, Tool
 
 
 class ReadFileTool(Tool):
     """Tool to read files from workspace (bootstrap, skills, rules)."""
 
+    concurrency = READ_ONLY
+
     def __init__(self, workspace: Path):
         self.workspace = workspace.resolve()
 
@@ -1,11 +1,63 @@
-"""Tool registry for dynamic tool management."""
+"""Tool registry for dynamic tool management.
 
+execute_many(): as tool calls de uma resposta do LLM correm em paralelo quando as classes de
+concorrência o permitem (ver base.calls_conflict): cada call espera só pelas calls anteriores com
+que entra em conflito, por isso o efeito é o mesmo que em série e os resultados voltam pela ordem
+original. TOOL_PARALLEL_MAX (4; 1 = em série) limita quantas correm ao mesmo tempo.
+Latência por tool (chamadas, média, p95, máx., erros) em get_tool_stats() (#system).
+"""
+
+import asyncio
+import time
+from collections import deque
 from typing import Any
 
 from backend.logger import get_logger
 logger = get_logger(__name__)
 
-from zapista.agent.tools.base import Tool
+from zapista.agent.tools.base import GLOBAL_WRITE, Tool, calls_conflict
+from zapista.utils.helpers import env_int
+
+
+class _ToolLatency:
+    __slots__ = ("calls", "errors", "total_ms", "max_ms", "recent")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.recent: deque[float] = deque(maxlen=256)
+
+    def add(self, ms: float, error: bool) -> None:
+        self.calls += 1
+        self.errors += 1 if error else 0
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.recent.append(ms)
+
+    def as_dict(self) -> dict[str, Any]:
+        ordered = sorted(self.recent)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            "p95_ms": round(p95, 1),
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+_LATENCY: dict[str, _ToolLatency] = {}
+_BATCHES = {"batches": 0, "calls": 0, "wall_ms": 0.0, "serial_ms": 0.0}
+
+
+def get_tool_stats() -> dict[str, Any]:
+    """Latência por tool e ganho das execuções em paralelo (para #system)."""
+    return {
+        "tools": {name: lat.as_dict() for name, lat in _LATENCY.items()},
+        "batches": dict(_BATCHES),
+    }
 
 
 class ToolRegistry:
@@ -56,12 +108,16 @@ class ToolRegistry:
         if not tool:
             return f"Error: Tool '{name}' not found"
 
+        start = time.perf_counter()
+        failed = False
         try:
             errors = tool.validate_params(params)
             if errors:
+                failed = True
                 return f"Error: Invalid parameters for tool '{name}': " + "; ".join(errors)
             return await tool.execute(**params)
         except Exception as e:
+            failed = True
             logger.exception(
                 "Tool execute failed: name={} params_keys={} error={}",
                 name,
@@ -69,6 +125,65 @@ class ToolRegistry:
                 str(e),
             )
             return f"Error executing {name}: {str(e)}"
+        finally:
+            _LATENCY.setdefault(name, _ToolLatency()).add((time.perf_counter() - start) * 1000, failed)
+
+    def concurrency_key(self, name: str, params: dict[str, Any]) -> tuple[str, str]:
+        """(classe, recurso) de uma call; tool desconhecida → GLOBAL_WRITE."""
+        tool = self._tools.get(name)
+        if not tool:
+            return GLOBAL_WRITE, name
+        try:
+            return tool.concurrency_key(params)
+        except Exception:
+            return GLOBAL_WRITE, name
+
+    async def execute_many(self, calls: list[tuple[str, dict[str, Any]]]) -> list[str]:
+        """
+        Execute several tool calls, concurrently where their concurrency classes allow.
+
+        Each call waits only for the earlier calls it conflicts with, so side effects happen in the
+        same order as a serial run. Results are returned in the original order.
+        """
+        if len(calls) <= 1:
+            return [await self.execute(name, params) for name, params in calls]
+
+        keys = [self.concurrency_key(name, params) for name, params in calls]
+        limit = asyncio.Semaphore(env_int("TOOL_PARALLEL_MAX", 4, lo=1))
+        tasks: list[asyncio.Task] = []
+        timings: list[float] = [0.0] * len(calls)
+
+        async def run(index: int, deps: list[asyncio.Task]) -> str:
+            if deps:
+                await asyncio.wait(deps)
+            async with limit:
+                start = time.perf_counter()
+                try:
+                    return await self.execute(*calls[index])
+                finally:
+                    timings[index] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for i in range(len(calls)):
+            deps = [tasks[j] for j in range(i) if calls_conflict(keys[j], keys[i])]
+            tasks.append(asyncio.create_task(run(i, deps)))
+        try:
+            results = await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        wall_ms = (time.perf_counter() - start) * 1000
+        _BATCHES["batches"] += 1
+        _BATCHES["calls"] += len(calls)
+        _BATCHES["wall_ms"] += wall_ms
+        _BATCHES["serial_ms"] += sum(timings)
+        logger.info("tool_batch_executed", extra={"extra": {
+            "tools": [name for name, _ in calls],
+            "wall_ms": round(wall_ms, 1),
+            "serial_ms": round(sum(timings), 1),
+        }})
+        return list(results)
     
     @property
     def tool_names(self) -> list[str]:
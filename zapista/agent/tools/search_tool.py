@@ -3,7 +3,7 @@
 import re
 from typing import Any
 
-from zapista.agent.tools.base import Tool
+from zapista.agent.tools.base import READ_ONLY, Tool
 from backend.search_guardrails import is_search_reasonable, is_absurd_search
 
 PERPLEXITY_SEARCH_URL = "https://api.perplexity.ai/search"
@@ -22,6 +22,8 @@ _RECIPE_QUERY_RE = re.compile(
 class SearchTool(Tool):
     """Search the web via Perplexity to enrich lists/events — scope-limited, use sparingly."""
 
+    concurrency = READ_ONLY
+
     def __init__(self, api_key: str):
         self._api_key = (api_key or "").strip()
 
@@ -54,20 +56,22 @@ class SearchTool(Tool):
 
     async def _call_search_api(self, q: str) -> dict | None:
         """Chama a API de search. Retorna data ou None em erro."""
-        import httpx
+        from zapista.utils.http_clients import upstream_request
         for attempt in range(MAX_RETRIES):
             try:
-                async with httpx.AsyncClient(timeout=SEARCH_TIMEOUT) as client:
-                    r = await client.post(
-                        PERPLEXITY_SEARCH_URL,
-                        headers={
-                            "Authorization": f"Bearer {self._api_key}",
-                            "Content-Type": "application/json",
-                        },
-                        json={"query": q, "max_results": MAX_RESULTS},
-                    )
-                    r.raise_for_status()
-                    return r.json()
+                r = await upstream_request(
+                    "perplexity",
+                    "POST",
+                    PERPLEXITY_SEARCH_URL,
+                    headers={
+                        "Authorization": f"Bearer {self._api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json={"query": q, "max_results": MAX_RESULTS},
+                    timeout=SEARCH_TIMEOUT,
+                )
+                r.raise_for_status()
+                return r.json()
             except Exception:
                 if attempt == MAX_RETRIES - 1:
                     return None
@@ -76,30 +80,32 @@ class SearchTool(Tool):
     async def _call_chat_fallback(self, q: str) -> str | None:
         """Fallback: Perplexity Chat API para receitas quando search falha."""
         try:
-            import httpx
-            async with httpx.AsyncClient(timeout=45.0) as client:
-                r = await client.post(
-                    PERPLEXITY_CHAT_URL,
-                    headers={
-                        "Authorization": f"Bearer {self._api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": "sonar",
-                        "messages": [
-                            {"role": "system", "content": "Lista ingredientes ou passos. Formato claro, numerado. Português."},
-                            {"role": "user", "content": q},
-                        ],
-                        "max_tokens": 1024,
-                        "temperature": 0.2,
-                    },
-                )
-                r.raise_for_status()
-                data = r.json()
-                choices = data.get("choices") or []
-                if choices:
-                    msg = choices[0].get("message") or {}
-                    return (msg.get("content") or "").strip()
+            from zapista.utils.http_clients import upstream_request
+            r = await upstream_request(
+                "perplexity",
+                "POST",
+                PERPLEXITY_CHAT_URL,
+                headers={
+                    "Authorization": f"Bearer {self._api_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": "sonar",
+                    "messages": [
+                        {"role": "system", "content": "Lista ingredientes ou passos. Formato claro, numerado. Português."},
+                        {"role": "user", "content": q},
+                    ],
+                    "max_tokens": 1024,
+                    "temperature": 0.2,
+                },
+                timeout=45.0,
+            )
+            r.raise_for_status()
+            data = r.json()
+            choices = data.get("choices") or []
+            if choices:
+                msg = choices[0].get("message") or {}
+                return (msg.get("content") or "").strip()
         except Exception:
             pass
         return None
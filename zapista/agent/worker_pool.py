@@ -0,0 +1,63 @@
+"""Pool de workers por chat para o AgentLoop.
+
+Cada mensagem é encaminhada para um worker fixo pelo session_key (hash estável),
+por isso o mesmo chat é sempre processado em ordem estrita, enquanto chats
+diferentes correm em paralelo em workers diferentes.
+
+- AGENT_WORKERS (ou agents.defaults.workers no config): número de workers; 1 = modo série (legado)
+- AGENT_WORKER_QUEUE_MAX: limite da fila de cada worker (0 = sem limite); com fila cheia, submit espera
+"""
+
+from typing import Any, Awaitable, Callable
+
+from zapista.bus.events import InboundMessage
+from zapista.utils.helpers import env_int
+from zapista.utils.sharded_pool import ShardedWorkerPool
+
+# Pool ativo no processo (para #system e métricas); None quando em modo série
+_ACTIVE_POOL: "ChatWorkerPool | None" = None
+
+
+def workers_from_env(default: int = 1) -> int:
+    """Número de workers: AGENT_WORKERS se definido, senão default. Limite 1–64."""
+    return env_int("AGENT_WORKERS", int(default), 1, 64)
+
+
+class ChatWorkerPool(ShardedWorkerPool[InboundMessage]):
+    """
+    N workers com sharding por session_key.
+
+    A ordem por chat é garantida porque um session_key mapeia sempre para o mesmo
+    worker e cada worker processa a sua fila uma mensagem de cada vez.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[InboundMessage], Awaitable[None]],
+        workers: int,
+        queue_max: int | None = None,
+    ):
+        qmax = env_int("AGENT_WORKER_QUEUE_MAX", 0, lo=0) if queue_max is None else max(0, queue_max)
+        super().__init__(handler, key=lambda msg: msg.session_key, workers=workers, queue_max=qmax, name="agent-worker")
+
+    def start(self) -> None:
+        global _ACTIVE_POOL
+        super().start()
+        _ACTIVE_POOL = self
+
+    async def stop(self) -> None:
+        """Cancela os workers. Mensagens ainda na fila são descartadas (como no modo série ao parar)."""
+        global _ACTIVE_POOL
+        await super().stop()
+        if _ACTIVE_POOL is self:
+            _ACTIVE_POOL = None
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Gauges por worker (ver ShardedWorkerPool.worker_stats)."""
+        return self.worker_stats()
+
+
+def get_worker_pool_stats() -> list[dict[str, Any]] | None:
+    """Gauges do pool ativo, ou None quando o AgentLoop está em modo série."""
+    pool = _ACTIVE_POOL
+    return pool.stats() if pool else None
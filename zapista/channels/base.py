@@ -67,7 +67,7 @@ class BaseChannel(ABC):
         """
         Check if a sender is allowed to use this bot.
         Compara o identificador exato e também só os dígitos (ex.: 351912540117 = 351 912 540 117).
-        Lista = allow_from (config) + números adicionados via #add (allowed_extra.json).
+        Lista = allow_from (config) + números adicionados via #add (KVStore, namespace allowed_extra).
         """
         from zapista.utils.extra_allowed import get_extra_allowed_list
         allow_list = list(getattr(self.config, "allow_from", [])) + get_extra_allowed_list()
@@ -0,0 +1,65 @@
+"""Fila de jobs de média do bridge WhatsApp (transcrição de áudio, importação .ics).
+
+O leitor do WebSocket só faz parse e enfileira: o trabalho lento corre aqui, fora do
+`async for message in ws`, para que acks "sent", reações e mensagens de outros chats
+continuem a ser lidos durante um transcribe() de 60 s.
+
+- Ordem por chat: cada chat mapeia sempre para o mesmo worker (crc32), que processa a sua
+  fila um evento de cada vez. Enquanto um chat tem jobs pendentes, as mensagens de texto
+  seguintes desse chat também entram na fila (não ultrapassam o áudio).
+- WHATSAPP_MEDIA_WORKERS: número de workers (default 4)
+- WHATSAPP_MEDIA_QUEUE_MAX: limite da fila de cada worker (default 50); fila cheia = o leitor
+  espera (backpressure), contado em "blocked"
+"""
+
+from typing import Any, Awaitable, Callable
+
+from zapista.utils.helpers import env_int
+from zapista.utils.sharded_pool import ShardedWorkerPool
+
+# Fila ativa no processo (para #system)
+_ACTIVE_QUEUE: "MediaJobQueue | None" = None
+
+
+class MediaJobQueue(ShardedWorkerPool[tuple[str, dict]]):
+    """N workers com sharding por chat; handler(data) processa um evento do bridge já em dict."""
+
+    def __init__(
+        self,
+        handler: Callable[[dict], Awaitable[None]],
+        workers: int | None = None,
+        queue_max: int | None = None,
+    ):
+        n = env_int("WHATSAPP_MEDIA_WORKERS", 4, 1, 32) if workers is None else max(1, workers)
+        qmax = env_int("WHATSAPP_MEDIA_QUEUE_MAX", 50, 0, 10000) if queue_max is None else max(0, queue_max)
+
+        async def _run(job: tuple[str, dict]) -> None:
+            await handler(job[1])
+
+        super().__init__(_run, key=lambda job: job[0], workers=n, queue_max=qmax, name="whatsapp-media")
+
+    def start(self) -> None:
+        global _ACTIVE_QUEUE
+        super().start()
+        _ACTIVE_QUEUE = self
+
+    async def submit(self, chat_key: str, data: dict) -> None:
+        """Enfileira o evento no worker do chat; com a fila cheia espera (backpressure para o leitor)."""
+        if not self._running:
+            self.start()
+        await super().submit((chat_key, data))
+
+    async def stop(self) -> None:
+        """Cancela os workers; jobs ainda na fila são descartados."""
+        global _ACTIVE_QUEUE
+        await super().stop()
+        if _ACTIVE_QUEUE is self:
+            _ACTIVE_QUEUE = None
+
+    def stats(self) -> dict[str, Any]:
+        return self.totals()
+
+
+def get_media_job_stats() -> dict[str, Any] | None:
+    """Métricas da fila de média ativa (None se o canal ainda não a criou)."""
+    return _ACTIVE_QUEUE.stats() if _ACTIVE_QUEUE is not None else None
@@ -17,6 +17,7 @@ logger = get_logger(__name__)
 from zapista.bus.events import OutboundMessage
 from zapista.bus.queue import MessageBus
 from zapista.channels.base import BaseChannel
+from zapista.channels.media_jobs import MediaJobQueue
 from zapista.config.schema import WhatsAppConfig
 
 from backend.locale import (
@@ -109,6 +110,7 @@ class WhatsAppChannel(BaseChannel):
         self._cron_service = None  # para remover job ao reagir com emoji positivo
         self._restart_executor = None  # (channel, chat_id) -> awaitable; injetado pelo gateway
         self._pending_sends: dict[str, asyncio.Future] = {}
+        self._media_jobs: MediaJobQueue | None = None
 
     def set_restart_executor(self, executor) -> None:
         """Injetar função async execute_restart(channel, chat_id) para o comando /restart."""
@@ -150,7 +152,7 @@ class WhatsAppChannel(BaseChannel):
                     # Listen for messages
                     async for message in ws:
                         try:
-                            await self._handle_bridge_message(message)
+                            await self._on_bridge_frame(message)
                         except Exception as e:
                             logger.error(f"Error handling bridge message: {e}")
                     
@@ -173,6 +175,14 @@ class WhatsAppChannel(BaseChannel):
         if self._ws:
             await self._ws.close()
             self._ws = None
+        if self._media_jobs is not None:
+            await self._media_jobs.stop()
+            self._media_jobs = None
+        try:
+            from zapista.tts.pool import close_tts_pool
+            close_tts_pool()
+        except Exception:
+            pass
     
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through WhatsApp (text or voice note)."""
@@ -193,7 +203,7 @@ class WhatsAppChannel(BaseChannel):
         audio_mode = (msg.metadata or {}).get("audio_mode") is True
         locale_override = (msg.metadata or {}).get("audio_locale_override")
         phone_for_locale = (msg.metadata or {}).get("phone_for_locale")
-        ogg_paths: list = []
+        tts_tasks: list[asyncio.Task] = []
         chat_id_str = str(msg.chat_id)
         tts_allowed = (
             not chat_id_str.strip().endswith(WHATSAPP_GROUP_SUFFIX)
@@ -203,26 +213,22 @@ class WhatsAppChannel(BaseChannel):
             logger.info(f"TTS: audio_mode=True chat_id={str(msg.chat_id)[:24]}... tts_allowed={tts_allowed} content_len={len(msg.content or '')}")
         if audio_mode and msg.content and tts_allowed:
             try:
-                from zapista.tts.service import synthesize_voice_note, split_text_for_tts
+                from zapista.tts.service import synthesize_voice_note_async, split_text_for_tts
                 from zapista.tts.config import tts_max_words, tts_enabled
                 if not tts_enabled():
                     logger.info("TTS requested but TTS disabled or Piper not configured; sending text only. Set TTS_ENABLED=1 and PIPER_BIN/TTS_MODELS_BASE for voice replies.")
                 else:
-                    chunks = split_text_for_tts(msg.content, tts_max_words())
-                    for chunk in chunks:
-                        if not chunk.strip():
-                            continue
-                        ogg = synthesize_voice_note(
+                    # Todos os blocos em paralelo no TTSPool (fora do event loop); enviados abaixo por ordem
+                    chunks = [c for c in split_text_for_tts(msg.content, tts_max_words()) if c.strip()]
+                    tts_tasks = [
+                        asyncio.create_task(synthesize_voice_note_async(
                             chunk,
                             chat_id_str,
                             locale_override=locale_override,
                             phone_for_locale=phone_for_locale,
-                        )
-                        if ogg and ogg.exists():
-                            ogg_paths.append(ogg)
-                    logger.info(f"TTS: tts_enabled=1 chunks={len(chunks)} ogg_paths={len(ogg_paths)} (Piper em PIPER_BIN/TTS_MODELS_BASE)")
-                    if not ogg_paths and msg.content:
-                        logger.info("TTS requested but no audio generated (check TTS_MODELS_BASE/Piper voices and logs). Sending text only.")
+                        ))
+                        for chunk in chunks
+                    ]
             except Exception as e:
                 logger.warning(f"TTS synthesize failed: {e}")
 
@@ -231,8 +237,17 @@ class WhatsAppChannel(BaseChannel):
         if audio_mode and not (msg.content or "").strip():
             logger.info("TTS: audio_mode=True but content empty; sending nothing or text only")
         try:
-            if ogg_paths:
-                for i, ogg_path in enumerate(ogg_paths):
+            sent_voice = 0
+            try:
+                # Cada áudio segue para o bridge assim que ele e os anteriores estiverem prontos
+                for task in tts_tasks:
+                    try:
+                        ogg_path = await task
+                    except Exception as e:
+                        logger.warning(f"TTS synthesize failed: {e}")
+                        continue
+                    if not (ogg_path and ogg_path.exists()):
+                        continue
                     payload = {
                         "type": "send_voice",
                         "to": msg.chat_id,
@@ -244,8 +259,17 @@ class WhatsAppChannel(BaseChannel):
                         payload["request_id"] = request_id
                     logger.info(f"WhatsApp send_voice: to={str(msg.chat_id)[:30]}...")
                     # Só esperar confirmação no primeiro áudio (para store_sent_mapping)
-                    rid = request_id if i == 0 else None
+                    rid = request_id if sent_voice == 0 else None
                     await self._send_payload(payload, rid, msg.chat_id, job_id)
+                    sent_voice += 1
+            finally:
+                for task in tts_tasks:
+                    task.cancel()
+            if tts_tasks:
+                logger.info(f"TTS: tts_enabled=1 chunks={len(tts_tasks)} ogg_paths={sent_voice} (Piper em PIPER_BIN/TTS_MODELS_BASE)")
+                if not sent_voice and msg.content:
+                    logger.info("TTS requested but no audio generated (check TTS_MODELS_BASE/Piper voices and logs). Sending text only.")
+            if sent_voice:
                 if msg.content:
                     payload = {
                         "type": "send",
@@ -307,6 +331,30 @@ class WhatsAppChannel(BaseChannel):
             finally:
                 self._pending_sends.pop(request_id, None)
 
+    async def _on_bridge_frame(self, raw: str) -> None:
+        """
+        Leitor do bridge: acks, reações e texto são tratados já; áudio (STT) e anexos .ics vão para a
+        fila de média para não bloquear a leitura. Texto de um chat com média pendente também vai
+        para a fila, para manter a ordem do chat.
+        """
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            logger.warning(f"Invalid JSON from bridge: {raw[:100]}")
+            return
+        if isinstance(data, dict) and data.get("type") == "message":
+            chat_key = (data.get("pn") or data.get("sender") or "").strip()
+            has_media = bool(
+                data.get("mediaBase64") or data.get("media_base_64")
+                or data.get("attachmentIcs") or data.get("attachment_ics")
+            )
+            if has_media or (self._media_jobs is not None and self._media_jobs.pending(chat_key)):
+                if self._media_jobs is None:
+                    self._media_jobs = MediaJobQueue(self._handle_bridge_data)
+                await self._media_jobs.submit(chat_key, data)
+                return
+        await self._handle_bridge_data(data)
+
     async def _handle_bridge_message(self, raw: str) -> None:
         """Handle a message from the bridge."""
         try:
@@ -314,7 +362,10 @@ class WhatsAppChannel(BaseChannel):
         except json.JSONDecodeError:
             logger.warning(f"Invalid JSON from bridge: {raw[:100]}")
             return
-        
+        await self._handle_bridge_data(data)
+
+    async def _handle_bridge_data(self, data: dict) -> None:
+        """Trata um evento do bridge já decodificado (inline ou num worker da fila de média)."""
         msg_type = data.get("type")
 
         if msg_type == "sent":
@@ -436,10 +487,11 @@ class WhatsAppChannel(BaseChannel):
                     return
                 if media_base64 and isinstance(media_base64, str):
                     from zapista.stt import transcribe
-                    from zapista.stt.audio_utils import check_audio_duration
+                    from zapista.stt.audio_utils import preprocess_audio
 
-                    duration_error_key = check_audio_duration(media_base64.strip(), mimetype=mimetype)
-                    if duration_error_key == "AUDIO_TOO_LONG":
+                    # Decodifica uma vez (duração pelos cabeçalhos OGG); o mesmo buffer segue para o STT
+                    prepared_audio = await preprocess_audio(media_base64.strip(), mimetype=mimetype)
+                    if prepared_audio is not None and prepared_audio.too_long:
                         await self.bus.publish_outbound(OutboundMessage(
                             channel=self.name,
                             chat_id=user_id,
@@ -447,7 +499,7 @@ class WhatsAppChannel(BaseChannel):
                         ))
                         return
 
-                    transcribed = await transcribe(media_base64.strip(), mimetype=mimetype)
+                    transcribed = await transcribe(media_base64.strip(), mimetype=mimetype, audio=prepared_audio)
                     if transcribed and transcribed.strip():
                         content = transcribed.strip()
                         transcribed_text = content
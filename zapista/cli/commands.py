@@ -223,6 +223,7 @@ def gateway(
     from zapista.config.loader import load_config, get_data_dir
     from zapista.bus.queue import MessageBus
     from zapista.agent.loop import AgentLoop
+    from zapista.agent.worker_pool import workers_from_env
     from zapista.channels.manager import ChannelManager
     from zapista.cron.service import CronService
     from zapista.cron.types import CronJob
@@ -282,8 +283,16 @@ def gateway(
         max_tokens=config.agents.defaults.max_tokens,
         cron_service=cron,
         perplexity_api_key=perplexity_key or None,
+        workers=workers_from_env(config.agents.defaults.workers),
     )
     
+    # Texto de entrega dos lembretes gerado antes da hora (DeepSeek em lotes, fora do disparo)
+    from zapista.cron.prerender import ReminderPrerenderer, resolve_reminder_language
+    prerenderer = ReminderPrerenderer(provider, config.agents.defaults.model or "", cron_service=cron)
+    prerender_enabled = bool(provider and (config.agents.defaults.model or "").strip())
+    if prerender_enabled:
+        cron.on_job_added = prerenderer.on_job_added
+
     # Recap de Ano Novo (1º jan): system_event yearly_recap → DeepSeek + Mimo para cada utilizador
     async def on_cron_job(job: CronJob) -> str | None:
         from zapista.bus.events import OutboundMessage
@@ -581,48 +590,10 @@ def gateway(
                 logger.warning(f"Quiet mode check failed: {e}")
                 pass
             try:
-                # Idioma do destinatário: preferência na BD; senão inferir pelo número (JID); nunca deixar "en" se tiver número PT/BR/ES
-                user_lang = "en"
-                try:
-                    from backend.database import SessionLocal
-                    from backend.user_store import get_user_language
-                    from backend.locale import phone_to_default_language
-                    db = SessionLocal()
-                    try:
-                        phone_for_locale = getattr(job.payload, "phone_for_locale", None)
-                        user_lang = get_user_language(db, job.payload.to, phone_for_locale)
-                        if not user_lang:
-                            user_lang = phone_to_default_language(phone_for_locale or job.payload.to or "")
-                    finally:
-                        db.close()
-                except Exception:
-                    pass
-                # Se a BD falhou ou não devolveu idioma, inferir pelo JID (ex.: 351... → pt-PT, 55... → pt-BR)
-                if not user_lang and job.payload.to:
-                    try:
-                        from backend.locale import phone_to_default_language
-                        user_lang = phone_to_default_language(job.payload.to)
-                    except Exception:
-                        pass
-                user_lang = user_lang or "en"
-                # Último recurso: texto do lembrete parece português → entregar em português (pt-PT se 351, senão pt-BR)
-                if user_lang == "en" and (job.payload.message or "").strip():
-                    _msg = (job.payload.message or "").lower()
-                    if any(
-                        w in _msg
-                        for w in (
-                            "água", "agua", "beber", "lembrete", "tomar", "daqui", "amanhã", "amanha",
-                            "reunião", "reuniao", "consulta", "médico", "medico", "obrigado", "obrigada",
-                        )
-                    ):
-                        _digits = "".join(c for c in (job.payload.to or "").split("@")[0] if c.isdigit())
-                        user_lang = "pt-PT" if _digits.startswith("351") else "pt-BR"
-                lang_instruction = {
-                    "pt-PT": "Escreve a mensagem em português de Portugal.",
-                    "pt-BR": "Escreve a mensagem em português do Brasil.",
-                    "es": "Escribe el mensaje en español.",
-                    "en": "Write the message in English.",
-                }.get(user_lang, "Write the message in English.")
+                # Idioma do destinatário: BD → número (JID) → texto do lembrete parece português
+                user_lang = resolve_reminder_language(
+                    job.payload.to, getattr(job.payload, "phone_for_locale", None), job.payload.message or ""
+                )
                 # Lembrete "mandar mensagem para X: texto" → entregar com o texto isolado para o cliente encaminhar
                 try:
                     from backend.reminder_format import format_delivery_with_isolated_message
@@ -644,22 +615,11 @@ def gateway(
                     )
 
                 if response is None:
-                    # DeepSeek: mensagem criativa e variada a partir do contexto do lembrete (sem frases fixas)
-                    prompt = (
-                    "Reminder to user. Write ONE very short, friendly sentence. 1 emoji. "
-                    "Context-aware tone. No filler. "
-                    f"{lang_instruction} Reply only with the message.\n\nReminder: "
-                ) + (job.payload.message or "")
-                    try:
-                        r = await provider.chat(
-                            messages=[{"role": "user", "content": prompt}],
-                            model=config.agents.defaults.model or "",
-                            profile="assistant",
-                        )
-                        response = (r.content or job.payload.message or "").strip()
-                    except Exception as e:
-                        logger.warning(f"Cron (DeepSeek reminder message) failed: {e}")
-                        response = job.payload.message or ""
+                    # Frase do DeepSeek gerada antes da hora (prerenderer); sem ela, a mensagem original.
+                    # Nada de LLM no disparo: a pontualidade não depende da latência do modelo.
+                    response = prerenderer.get(job.payload.message or "", user_lang) or (job.payload.message or "")
+                    if job.schedule.kind != "at":
+                        prerenderer.request(job.payload.message or "", user_lang)  # texto novo para a próxima vez
             except Exception as e:
                 logger.warning(f"Cron deliver failed: {e}")
                 response = job.payload.message or ""
@@ -915,6 +875,8 @@ def gateway(
     if cron_status["jobs"] > 0:
         console.print(f"[green]✓[/green] Cron: {cron_status['jobs']} scheduled jobs")
     
+    if agent.workers > 1:
+        console.print(f"[green]✓[/green] Agent workers: {agent.workers} (paralelo por chat)")
     console.print("[green]✓[/green] Heartbeat: every 30m")
     console.print("[green]✓[/green] Clock drift check: every 45m (alerta se desvio > 60s)")
 
@@ -954,7 +916,7 @@ def gateway(
             console.print("[green]✓[/green] Redis outbound queue enabled")
         try:
             # Phase 4: Sincronismo inicial do relógio ANTES de iniciar o cron. 
-            # Evita disparar lembretes baseados em offset obsoleto do clock_state.json.
+            # Evita disparar lembretes baseados em offset obsoleto guardado (KVStore, clock_state).
             try:
                 from zapista.clock_drift import check_clock_drift
                 await check_clock_drift()
@@ -963,6 +925,8 @@ def gateway(
                 logger.debug(f"Clock drift initial sync failed: {e}")
 
             await cron.start()
+            if prerender_enabled:
+                prerenderer.start()
             await heartbeat.start()
 
             metrics_task = asyncio.create_task(_metrics_loop())
@@ -976,10 +940,20 @@ def gateway(
         except KeyboardInterrupt:
             console.print("\nShutting down...")
             heartbeat.stop()
+            if prerender_enabled:
+                prerenderer.stop()
             cron.stop()
             agent.stop()
             bus.stop()
             await channels.stop_all()
+            from zapista.utils.http_clients import close_http_clients
+            await close_http_clients()
+            from backend.daily_counters import flush_daily_counters
+            flush_daily_counters()
+            from backend.kv_store import flush_kv_store
+            flush_kv_store()
+            from backend.logger import flush_logs
+            flush_logs()
     
     asyncio.run(run())
 
@@ -117,28 +117,35 @@ def _get_state_file_path():
         from pathlib import Path
         return Path.home() / ".zapista" / "clock_state.json"
 
-CLOCK_STATE_FILE = _get_state_file_path()
+CLOCK_STATE_FILE = _get_state_file_path()  # formato antigo; importado 1x para o KVStore
+
+
+def _import_legacy_state() -> dict:
+    from backend.kv_store import read_legacy_json
+    data = read_legacy_json(CLOCK_STATE_FILE)
+    return {"offset": data} if isinstance(data, dict) else {}
+
+
+def _clock_state():
+    from backend.kv_store import Namespace
+    return Namespace("clock_state", legacy=_import_legacy_state)
+
 
 def _load_persisted_offset() -> float:
-    """Carrega offset salvo em disco (se existir)."""
+    """Carrega offset guardado (KVStore, namespace clock_state)."""
     try:
-        if CLOCK_STATE_FILE.exists():
-            import json
-            with open(CLOCK_STATE_FILE, "r") as f:
-                data = json.load(f)
-                global _last_manual_offset_at
-                _last_manual_offset_at = data.get("updated_at", 0.0)
-                return data.get("offset_seconds", 0.0)
+        data = _clock_state().get("offset") or {}
+        global _last_manual_offset_at
+        _last_manual_offset_at = data.get("updated_at", 0.0)
+        return data.get("offset_seconds", 0.0)
     except Exception as e:
         logger.warning(f"Clock drift: failed to load persisted offset: {e}")
     return 0.0
 
 def _persist_offset(offset_s: float) -> None:
-    """Salva offset em disco."""
+    """Guarda offset (KVStore; gravado já, para valer no próximo arranque)."""
     try:
-        import json
-        with open(CLOCK_STATE_FILE, "w") as f:
-            json.dump({"offset_seconds": offset_s, "updated_at": time.time()}, f)
+        _clock_state().set("offset", {"offset_seconds": offset_s, "updated_at": time.time()}, sync=True)
     except Exception as e:
         logger.warning(f"Clock drift: failed to persist offset: {e}")
 
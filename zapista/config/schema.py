@@ -33,6 +33,7 @@ class AgentDefaults(BaseModel):
     max_tokens: int = 2048
     temperature: float = 0.7
     max_tool_iterations: int = 20
+    workers: int = 1  # workers paralelos por chat no AgentLoop (1 = em série); env AGENT_WORKERS sobrepõe
 
 
 class AgentsConfig(BaseModel):
@@ -3,6 +3,7 @@ Usa a lista de ~400 palavras (PT-PT, PT-BR, ES, EN) em reminder_keywords; fora d
 
 import re
 import unicodedata
+from collections.abc import Collection, Set
 
 from zapista.cron.reminder_keywords import REMINDER_KEYWORDS
 
@@ -77,7 +78,7 @@ def _sanitize_prefix(prefix: str) -> str:
 
 def generate_friendly_job_id(
     message: str,
-    existing_ids: list[str],
+    existing_ids: Collection[str],
     prefix_override: str | None = None,
 ) -> str:
     """
@@ -88,9 +89,9 @@ def generate_friendly_job_id(
     return _next_available_id(prefix, existing_ids)
 
 
-def _next_available_id(prefix: str, existing_ids: list[str]) -> str:
-    """Devolve prefix + próximo número livre (01, 02, ...)."""
-    existing_set = frozenset(str(i) for i in existing_ids)
+def _next_available_id(prefix: str, existing_ids: Collection[str]) -> str:
+    """Devolve prefix + próximo número livre (01, 02, ...). Aceita um set/keys() para evitar copiar todos os ids."""
+    existing_set = existing_ids if isinstance(existing_ids, Set) else frozenset(str(i) for i in existing_ids)
     for num in range(1, 1000):
         suffix = f"{num:02d}" if num < 100 else f"{num:03d}"
         candidate = prefix + suffix
@@ -99,6 +100,6 @@ def _next_available_id(prefix: str, existing_ids: list[str]) -> str:
     return prefix + "99"
 
 
-def generate_friendly_job_id_with_prefix(prefix: str, existing_ids: list[str]) -> str:
+def generate_friendly_job_id_with_prefix(prefix: str, existing_ids: Collection[str]) -> str:
     """Gera ID único quando o prefixo já é conhecido (ex: sugerido pelo MIMO)."""
     return _next_available_id(_sanitize_prefix(prefix), existing_ids)
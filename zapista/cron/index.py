@@ -0,0 +1,178 @@
+"""Índice em memória dos jobs do cron.
+
+Mantém os jobs por id (ordem de inserção = ordem de persistência) e índices
+secundários por destinatário (payload.to) e pelas relações entre jobs
+(depends_on_job_id, parent_job_id, deadline_main_job_id, deadline_check_for_job_id).
+O próximo disparo vem de um min-heap por next_run_at_ms com invalidação lazy:
+quando um job muda de hora, é desativado ou removido, a entrada antiga fica no heap
+e é descartada ao chegar ao topo.
+
+Regra para quem altera jobs: depois de mudar enabled ou state.next_run_at_ms de um job
+indexado, chamar reschedule(job). add/remove/reschedule marcam o job como sujo
+(drain_dirty) para o CronService gravar só os jobs alterados no journal.
+"""
+
+import heapq
+import itertools
+from typing import Iterator
+
+from zapista.cron.types import CronJob
+
+# Campos do payload que ligam um job a outro (nome do índice → atributo do payload)
+_LINK_FIELDS = (
+    "depends_on_job_id",
+    "parent_job_id",
+    "deadline_main_job_id",
+    "deadline_check_for_job_id",
+)
+
+
+class JobIndex:
+    """Jobs por id + índices secundários + heap de next_run_at_ms."""
+
+    def __init__(self, jobs: list[CronJob] | None = None):
+        self._by_id: dict[str, CronJob] = {}
+        self._by_to: dict[str, dict[str, CronJob]] = {}
+        self._links: dict[str, dict[str, dict[str, None]]] = {f: {} for f in _LINK_FIELDS}
+        self._heap: list[tuple[int, int, str]] = []
+        self._seq = itertools.count()
+        self._dirty: set[str] = set()
+        for job in jobs or []:
+            self._insert(job)
+        self.rebuild_heap()
+
+    # ---------- leitura ----------
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, job_id: object) -> bool:
+        return job_id in self._by_id
+
+    def __iter__(self) -> Iterator[CronJob]:
+        return iter(list(self._by_id.values()))
+
+    @property
+    def jobs(self) -> list[CronJob]:
+        """Snapshot dos jobs na ordem de inserção."""
+        return list(self._by_id.values())
+
+    def ids(self):
+        """Vista (set-like) dos ids; membership O(1)."""
+        return self._by_id.keys()
+
+    def get(self, job_id: str | None) -> CronJob | None:
+        if not job_id:
+            return None
+        return self._by_id.get(job_id)
+
+    def for_recipient(self, to: str | None) -> list[CronJob]:
+        """Jobs de um destinatário (payload.to), na ordem de inserção."""
+        return list(self._by_to.get(to or "", {}).values())
+
+    def count_for_recipient(self, to: str | None) -> int:
+        return len(self._by_to.get(to or "", {}))
+
+    def linked(self, field: str, job_id: str) -> list[CronJob]:
+        """Jobs cujo payload.<field> == job_id (ex.: linked("parent_job_id", x) = follow-ups de x)."""
+        ids = self._links[field].get(job_id) or ()
+        return [self._by_id[i] for i in ids if i in self._by_id]
+
+    # ---------- escrita ----------
+
+    def add(self, job: CronJob) -> None:
+        """Adiciona (ou substitui) um job e agenda-o no heap."""
+        if job.id in self._by_id:
+            self._discard(self._by_id[job.id])
+        self._insert(job)
+        self._dirty.add(job.id)
+        self._push(job)
+
+    def remove(self, job_id: str) -> CronJob | None:
+        """Remove o job do índice. A entrada no heap é descartada de forma lazy."""
+        job = self._by_id.get(job_id)
+        if job is not None:
+            self._discard(job)
+            self._dirty.add(job_id)
+        return job
+
+    def reschedule(self, job: CronJob) -> None:
+        """Regista a nova next_run_at_ms/enabled de um job indexado (ignora jobs já removidos)."""
+        if self._by_id.get(job.id) is job:
+            self._dirty.add(job.id)
+            self._push(job)
+
+    def drain_dirty(self) -> set[str]:
+        """Ids alterados desde a última chamada (add/remove/reschedule); limpa o conjunto."""
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def rebuild_heap(self) -> None:
+        """Reconstrói o heap a partir do estado atual (após recomputar todos os next_run)."""
+        self._heap = [
+            (j.state.next_run_at_ms, next(self._seq), j.id)
+            for j in self._by_id.values()
+            if j.enabled and j.state.next_run_at_ms
+        ]
+        heapq.heapify(self._heap)
+
+    # ---------- heap ----------
+
+    def next_wake_ms(self) -> int | None:
+        """Menor next_run_at_ms entre jobs ativos (descarta entradas obsoletas do topo)."""
+        while self._heap:
+            at_ms, _, job_id = self._heap[0]
+            if self._is_current(at_ms, job_id):
+                return at_ms
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now_ms: int) -> list[CronJob]:
+        """Retira do heap e devolve os jobs ativos com next_run_at_ms <= now_ms, por ordem de hora."""
+        due: list[CronJob] = []
+        seen: set[str] = set()
+        while self._heap and self._heap[0][0] <= now_ms:
+            at_ms, _, job_id = heapq.heappop(self._heap)
+            if job_id in seen or not self._is_current(at_ms, job_id):
+                continue
+            seen.add(job_id)
+            due.append(self._by_id[job_id])
+        return due
+
+    # ---------- internos ----------
+
+    def _is_current(self, at_ms: int, job_id: str) -> bool:
+        job = self._by_id.get(job_id)
+        return bool(job and job.enabled and job.state.next_run_at_ms == at_ms)
+
+    def _push(self, job: CronJob) -> None:
+        if job.enabled and job.state.next_run_at_ms:
+            heapq.heappush(self._heap, (job.state.next_run_at_ms, next(self._seq), job.id))
+            # Muitas entradas obsoletas (snoozes, remoções): compactar para o heap não crescer sem limite
+            if len(self._heap) > 2 * len(self._by_id) + 64:
+                self.rebuild_heap()
+
+    def _insert(self, job: CronJob) -> None:
+        self._by_id[job.id] = job
+        to = getattr(job.payload, "to", None)
+        if to:
+            self._by_to.setdefault(to, {})[job.id] = job
+        for field in _LINK_FIELDS:
+            target = getattr(job.payload, field, None)
+            if target:
+                self._links[field].setdefault(target, {})[job.id] = None
+
+    def _discard(self, job: CronJob) -> None:
+        self._by_id.pop(job.id, None)
+        to = getattr(job.payload, "to", None)
+        if to and to in self._by_to:
+            self._by_to[to].pop(job.id, None)
+            if not self._by_to[to]:
+                del self._by_to[to]
+        for field in _LINK_FIELDS:
+            target = getattr(job.payload, field, None)
+            ids = self._links[field].get(target) if target else None
+            if ids is not None:
+                ids.pop(job.id, None)
+                if not ids:
+                    del self._links[field][target]
@@ -0,0 +1,205 @@
+"""Persistência do cron: snapshot (jobs.json) + journal append-only.
+
+Cada alteração a um job acrescenta uma linha JSON ao journal (jobs.json.journal):
+  {"op": "put", "job": {...}}   job completo (mesmo formato camelCase do snapshot)
+  {"op": "del", "id": "..."}
+Assim cada add/snooze/remove escreve só o job alterado, em vez de reescrever o ficheiro todo.
+
+Compactação: quando o journal passa de CRON_JOURNAL_COMPACT_EVERY registos, o journal atual é
+rodado para jobs.json.journal.1 e o snapshot é reescrito (ficheiro temporário + fsync + os.replace,
+atómico) numa thread; no fim o .1 é apagado. Se a escrita do snapshot falhar, o .1 fica: na
+rotação seguinte o journal atual é juntado ao .1 e a compactação volta a ser tentada (o journal
+não cresce sem limite). Ao carregar: snapshot + .1 (se existir) + journal.
+Como cada "put" leva o estado completo do job, repetir registos já incluídos no snapshot é inócuo.
+O journal só vale com snapshot: o CronService escreve o snapshot antes do primeiro registo, por isso
+apagar jobs.json (reset manual) descarta também o journal órfão.
+
+- CRON_JOURNAL_FSYNC_EVERY: fsync do journal a cada N registos (default 16); flush ao SO é sempre imediato
+- CRON_JOURNAL_FSYNC_SECONDS: registos por sincronizar nunca ficam mais do que isto sem fsync
+  (default 2; o CronService chama sync() periodicamente, mesmo sem novas escritas)
+- CRON_JOURNAL_COMPACT_EVERY: registos no journal antes de compactar (default 500)
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from backend.logger import get_logger
+from zapista.utils.helpers import env_float, env_int
+
+logger = get_logger(__name__)
+
+
+def _journal_path(snapshot_path: Path) -> Path:
+    return snapshot_path.with_name(snapshot_path.name + ".journal")
+
+
+def _rotated_path(snapshot_path: Path) -> Path:
+    return snapshot_path.with_name(snapshot_path.name + ".journal.1")
+
+
+def _replay(path: Path, jobs: dict[str, dict[str, Any]]) -> int:
+    """Aplica os registos de um journal a jobs (id → dict). Linha final truncada (crash) é ignorada."""
+    if not path.exists():
+        return 0
+    applied = 0
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("cron_journal_bad_record", extra={"extra": {"path": str(path)}})
+                continue
+            if rec.get("op") == "put" and isinstance(rec.get("job"), dict) and rec["job"].get("id"):
+                jobs[rec["job"]["id"]] = rec["job"]
+                applied += 1
+            elif rec.get("op") == "del" and rec.get("id"):
+                jobs.pop(rec["id"], None)
+                applied += 1
+    return applied
+
+
+def load_jobs_raw(snapshot_path: Path) -> tuple[int, list[dict[str, Any]]]:
+    """
+    (version, jobs em dict camelCase) = snapshot + journal rodado + journal.
+    Para leitores que não instanciam o CronService (ex.: comandos admin).
+    """
+    if not snapshot_path.exists():
+        return 1, []
+    data = json.loads(snapshot_path.read_text())
+    version = data.get("version", 1)
+    jobs: dict[str, dict[str, Any]] = {}
+    for j in data.get("jobs", []):
+        if j.get("id"):
+            jobs[j["id"]] = j
+    _replay(_rotated_path(snapshot_path), jobs)
+    _replay(_journal_path(snapshot_path), jobs)
+    return version, list(jobs.values())
+
+
+def write_snapshot(snapshot_path: Path, version: int, jobs: list[dict[str, Any]]) -> None:
+    """Escreve o snapshot de forma atómica: um crash a meio nunca trunca o jobs.json existente."""
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = snapshot_path.with_name(snapshot_path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump({"version": version, "jobs": jobs}, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, snapshot_path)
+
+
+class CronJournal:
+    """Journal append-only do store do cron (um por CronService)."""
+
+    def __init__(self, snapshot_path: Path):
+        self.snapshot_path = snapshot_path
+        self.path = _journal_path(snapshot_path)
+        self.rotated_path = _rotated_path(snapshot_path)
+        self.fsync_every = env_int("CRON_JOURNAL_FSYNC_EVERY", 16, lo=1)
+        self.compact_every = env_int("CRON_JOURNAL_COMPACT_EVERY", 500, lo=1)
+        self.fsync_seconds = env_float("CRON_JOURNAL_FSYNC_SECONDS", 2.0, lo=0.1)
+        self._file = None
+        self._records = 0  # registos no journal atual (desde a última rotação)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._compacting = False  # finish_compaction em curso (numa thread)
+
+    def load(self) -> tuple[int, list[dict[str, Any]]]:
+        """Replay completo; conta os registos já existentes para decidir a próxima compactação."""
+        version, jobs = load_jobs_raw(self.snapshot_path)
+        if self.snapshot_path.exists() and self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                self._records = sum(1 for line in f if line.strip())
+        return version, jobs
+
+    @property
+    def needs_full_write(self) -> bool:
+        """Sem snapshot: a próxima gravação tem de ser completa (o journal sozinho não vale)."""
+        return not self.snapshot_path.exists()
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self._records >= self.compact_every
+
+    def append(self, records: list[dict[str, Any]]) -> None:
+        """Acrescenta registos (flush imediato; fsync a cada fsync_every registos ou fsync_seconds)."""
+        if not records:
+            return
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", encoding="utf-8")
+        self._file.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+        self._file.flush()
+        self._records += len(records)
+        self._unsynced += len(records)
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_seconds:
+            self.sync()
+
+    def sync(self) -> None:
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def rotate(self) -> bool:
+        """
+        Fecha o journal atual e renomeia-o para .1 (novos registos vão para um journal novo).
+        Retorna False se uma compactação anterior ainda estiver em curso. Um .1 deixado por uma
+        compactação que falhou recebe o journal atual no fim (mesma ordem do replay) e é reaproveitado.
+        """
+        if self._compacting:
+            return False
+        self.close()
+        if self.path.exists():
+            if self.rotated_path.exists():
+                with self.rotated_path.open("ab") as dst, self.path.open("rb") as src:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                self.path.unlink()
+                logger.warning("cron_journal_compaction_retry", extra={"extra": {"path": str(self.rotated_path)}})
+            else:
+                os.replace(self.path, self.rotated_path)
+        self._records = 0
+        self._compacting = True
+        return True
+
+    def compact_now(self, version: int, jobs: list[dict[str, Any]]) -> None:
+        """Compactação síncrona com o estado completo (arranque): snapshot novo e journals vazios."""
+        self.close()
+        write_snapshot(self.snapshot_path, version, jobs)
+        for p in (self.rotated_path, self.path):
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+        self._records = 0
+
+    def finish_compaction(self, version: int, jobs: list[dict[str, Any]]) -> None:
+        """
+        Escreve o snapshot (estado à data da rotação) e descarta o journal rodado. Seguro numa thread.
+        Se falhar, o .1 fica e a próxima rotação tenta de novo.
+        """
+        t0 = time.perf_counter()
+        try:
+            write_snapshot(self.snapshot_path, version, jobs)
+            try:
+                self.rotated_path.unlink()
+            except FileNotFoundError:
+                pass
+        finally:
+            self._compacting = False
+        logger.info("cron_journal_compacted", extra={"extra": {
+            "jobs": len(jobs), "ms": round((time.perf_counter() - t0) * 1000, 1),
+        }})
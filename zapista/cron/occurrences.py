@@ -0,0 +1,104 @@
+"""Expansão de ocorrências de lembretes recorrentes numa janela (para /hoje, /semana, /mes, agenda).
+
+state.next_run_at_ms só dá a próxima execução; um lembrete "every" ou "cron" pode disparar várias
+vezes numa semana ou num mês. expand_occurrences enumera todas as execuções de um job em
+[start_ms, end_ms], respeitando schedule.tz, not_before_ms e not_after_ms.
+
+Os croniter são compilados uma vez por (expr, tz) e reposicionados com set_current (parse da
+expressão só na primeira vez).
+"""
+
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from zapista.cron.types import CronJob, CronSchedule
+
+# Limite de ocorrências por job numa janela (ex.: "a cada 5 min" durante um mês = milhares)
+MAX_OCCURRENCES_PER_JOB = 200
+
+
+@lru_cache(maxsize=512)
+def _compiled_cron(expr: str, tz: str | None) -> Any:
+    """croniter compilado para (expr, tz); reposicionar com set_current antes de usar."""
+    from croniter import croniter
+    return croniter(expr, datetime.now(ZoneInfo(tz) if tz else timezone.utc))
+
+
+def _cron_occurrences(schedule: CronSchedule, start_ms: int, end_ms: int, limit: int) -> list[int]:
+    try:
+        it = _compiled_cron(schedule.expr, schedule.tz)
+    except Exception:
+        return []
+    # Sem tz, _compute_next_run usa croniter sobre epoch (UTC): expandir também em UTC, senão a
+    # agenda mostra horas diferentes das que disparam.
+    try:
+        zone = ZoneInfo(schedule.tz) if schedule.tz else timezone.utc
+    except Exception:
+        zone = timezone.utc
+    # get_next devolve instantes estritamente depois do atual: recuar 1 ms para incluir start_ms
+    start = datetime.fromtimestamp((start_ms - 1) / 1000, tz=zone)
+    it.set_current(start, force=True)
+    out: list[int] = []
+    while len(out) < limit:
+        next_ms = int(it.get_next(float) * 1000)
+        if next_ms > end_ms:
+            break
+        out.append(next_ms)
+    return out
+
+
+def expand_occurrences(
+    schedule: CronSchedule,
+    start_ms: int,
+    end_ms: int,
+    first_ms: int | None = None,
+    limit: int = MAX_OCCURRENCES_PER_JOB,
+) -> list[int]:
+    """
+    Instantes (ms, UTC) em que o schedule dispara dentro de [start_ms, end_ms], por ordem.
+    first_ms: próxima execução conhecida (state.next_run_at_ms). Ocorrências anteriores já passaram
+    (ou foram adiadas por soneca) e não são listadas; para "every" é também a âncora do intervalo.
+    """
+    if schedule.not_before_ms:
+        start_ms = max(start_ms, schedule.not_before_ms)
+    if schedule.not_after_ms:
+        end_ms = min(end_ms, schedule.not_after_ms)
+    if first_ms is not None:
+        start_ms = max(start_ms, first_ms)
+    if start_ms > end_ms:
+        return []
+
+    if schedule.kind == "at":
+        at_ms = first_ms or schedule.at_ms
+        return [at_ms] if at_ms and start_ms <= at_ms <= end_ms else []
+
+    if schedule.kind == "every":
+        step = schedule.every_ms or 0
+        anchor = first_ms or schedule.not_before_ms
+        if step <= 0 or not anchor:
+            return []
+        k = max(0, -(-(start_ms - anchor) // step))  # ceil: 1.ª ocorrência >= start_ms
+        out = []
+        t = anchor + k * step
+        while t <= end_ms and len(out) < limit:
+            out.append(t)
+            t += step
+        return out
+
+    if schedule.kind == "cron" and schedule.expr:
+        occ = _cron_occurrences(schedule, start_ms, end_ms, limit)
+        # A próxima execução real pode ter sido adiada (soneca/horário silencioso): mostrar essa
+        if first_ms is not None and start_ms == first_ms and (not occ or occ[0] != first_ms):
+            occ = [first_ms] + occ[: limit - 1]
+        return occ
+
+    return []
+
+
+def job_occurrences(job: CronJob, start_ms: int, end_ms: int, limit: int = MAX_OCCURRENCES_PER_JOB) -> list[int]:
+    """Ocorrências de um job ativo na janela (vazio se desativado ou sem próxima execução)."""
+    if not job.enabled or not job.state.next_run_at_ms:
+        return []
+    return expand_occurrences(job.schedule, start_ms, end_ms, first_ms=job.state.next_run_at_ms, limit=limit)
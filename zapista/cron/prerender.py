@@ -0,0 +1,337 @@
+"""
+Texto de entrega dos lembretes gerado antes da hora (tira o LLM do caminho do disparo).
+
+O DeepSeek reescreve payload.message numa frase curta e simpática. Em vez de o chamar no
+momento do disparo (pontualidade dependente da latência do LLM nos minutos de pico):
+- add_job (CronService.on_job_added) pede o texto logo que o lembrete é criado;
+- um sweep em fundo (REMINDER_PRERENDER_INTERVAL_SECONDS) cobre os jobs devidos nas próximas
+  REMINDER_PRERENDER_HOURS horas (recorrentes, reinícios);
+- pedidos agrupados em lotes de REMINDER_PRERENDER_BATCH lembretes por chamada ao LLM;
+- cache LRU em memória por (mensagem, idioma), limitada por REMINDER_PRERENDER_CACHE_MAX; no disparo,
+  get() lê o texto sem o retirar (vários jobs com o mesmo texto e idioma, ou a próxima ocorrência de
+  um recorrente, reutilizam-no) e sem texto pronto entrega-se a mensagem original.
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any
+
+from backend.logger import get_logger
+from zapista.utils.helpers import env_int
+logger = get_logger(__name__)
+
+# Prerenderer ativo no processo (para #system)
+_ACTIVE_PRERENDERER: "ReminderPrerenderer | None" = None
+
+_LANG_INSTRUCTION = {
+    "pt-PT": "Escreve a mensagem em português de Portugal.",
+    "pt-BR": "Escreve a mensagem em português do Brasil.",
+    "es": "Escribe el mensaje en español.",
+    "en": "Write the message in English.",
+}
+_LANG_NAME = {
+    "pt-PT": "European Portuguese",
+    "pt-BR": "Brazilian Portuguese",
+    "es": "Spanish",
+    "en": "English",
+}
+# Texto do lembrete parece português (quando a BD/número não dão idioma)
+_PT_HINT_WORDS = (
+    "água", "agua", "beber", "lembrete", "tomar", "daqui", "amanhã", "amanha",
+    "reunião", "reuniao", "consulta", "médico", "medico", "obrigado", "obrigada",
+)
+
+
+def resolve_reminder_language(to: str, phone_for_locale: str | None, message: str) -> str:
+    """
+    Idioma do destinatário: preferência na BD; senão inferir pelo número (JID); nunca deixar "en"
+    se o texto do lembrete parecer português (pt-PT se 351, senão pt-BR).
+    """
+    user_lang = None
+    try:
+        from backend.database import get_session
+        from backend.user_store import get_user_language
+        from backend.locale import phone_to_default_language
+        db = get_session()
+        try:
+            user_lang = get_user_language(db, to, phone_for_locale)
+            if not user_lang:
+                user_lang = phone_to_default_language(phone_for_locale or to or "")
+        finally:
+            db.close()
+    except Exception:
+        pass
+    if not user_lang and to:
+        try:
+            from backend.locale import phone_to_default_language
+            user_lang = phone_to_default_language(to)
+        except Exception:
+            pass
+    user_lang = user_lang or "en"
+    if user_lang == "en" and (message or "").strip():
+        low = message.lower()
+        if any(w in low for w in _PT_HINT_WORDS):
+            digits = "".join(c for c in (to or "").split("@")[0] if c.isdigit())
+            user_lang = "pt-PT" if digits.startswith("351") else "pt-BR"
+    return user_lang
+
+
+def single_prompt(message: str, lang: str) -> str:
+    """Prompt de um lembrete (igual ao usado antes no disparo)."""
+    instruction = _LANG_INSTRUCTION.get(lang, _LANG_INSTRUCTION["en"])
+    return (
+        "Reminder to user. Write ONE very short, friendly sentence. 1 emoji. "
+        "Context-aware tone. No filler. "
+        f"{instruction} Reply only with the message.\n\nReminder: "
+    ) + (message or "")
+
+
+def batch_prompt(items: list[tuple[str, str]]) -> str:
+    """Prompt de vários lembretes: resposta esperada é um array JSON na mesma ordem."""
+    lines = [
+        f"{i}. [{_LANG_NAME.get(lang, 'English')}] {' '.join((msg or '').split())}"
+        for i, (msg, lang) in enumerate(items, 1)
+    ]
+    return (
+        "Reminders to users. For EACH numbered reminder write ONE very short, friendly sentence "
+        "in the language shown in brackets. 1 emoji each. Context-aware tone. No filler. "
+        f"Reply ONLY with a JSON array of {len(items)} strings, in the same order.\n\n" + "\n".join(lines)
+    )
+
+
+def parse_batch_reply(text: str, n: int) -> list[str] | None:
+    """Array JSON com n strings não vazias, ou None."""
+    m = re.search(r"\[.*\]", text or "", re.S)
+    if not m:
+        return None
+    try:
+        data = json.loads(m.group(0))
+    except ValueError:
+        return None
+    if not isinstance(data, list) or len(data) != n:
+        return None
+    out = [s.strip() if isinstance(s, str) else "" for s in data]
+    return out if all(out) else None
+
+
+def needs_rendering(job: Any) -> bool:
+    """Lembretes entregues pelo fluxo DeepSeek (não: system_event, prazos, pomodoro, follow-up importante)."""
+    p = job.payload
+    if not (p.deliver and p.to and (p.message or "").strip()):
+        return False
+    if getattr(p, "kind", None) in ("system_event", "deadline_check"):
+        return False
+    if getattr(p, "deadline_post_index", None) is not None or getattr(p, "pomodoro_cycle", None) is not None:
+        return False
+    if getattr(p, "is_important", False) and getattr(p, "parent_job_id", None):
+        return False
+    try:
+        from backend.reminder_format import extract_message_to_forward
+        if extract_message_to_forward(p.message or ""):
+            return False
+    except Exception:
+        pass
+    return True
+
+
+class ReminderPrerenderer:
+    """Cache (mensagem, idioma) → texto de entrega, preenchida em lotes fora do disparo."""
+
+    def __init__(
+        self,
+        provider: Any,
+        model: str,
+        cron_service: Any = None,
+        horizon_hours: int | None = None,
+        batch_size: int | None = None,
+        interval_seconds: int | None = None,
+        cache_max: int | None = None,
+    ):
+        self.provider = provider
+        self.model = model
+        self.cron = cron_service
+        self.horizon_ms = (
+            env_int("REMINDER_PRERENDER_HOURS", 6, 1, 72) if horizon_hours is None else horizon_hours
+        ) * 3600 * 1000
+        self.batch_size = env_int("REMINDER_PRERENDER_BATCH", 10, 1, 50) if batch_size is None else max(1, batch_size)
+        self.interval = (
+            env_int("REMINDER_PRERENDER_INTERVAL_SECONDS", 600, 30, 86400) if interval_seconds is None else interval_seconds
+        )
+        self.cache_max = env_int("REMINDER_PRERENDER_CACHE_MAX", 5000, 10, 1_000_000) if cache_max is None else cache_max
+        self._cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._pending: dict[tuple[str, str], None] = {}  # pedidos à espera do próximo lote (ordem preservada)
+        self._inflight: set[tuple[str, str]] = set()
+        self._flush_task: asyncio.Task | None = None
+        self._sweep_task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.rendered = 0
+        self.batches = 0
+        self.failures = 0
+
+    # --- cache ---
+
+    def get(self, message: str, lang: str) -> str | None:
+        return self._cache.get((message, lang))
+
+    def get(self, message: str, lang: str) -> str | None:
+        """Texto pronto para este disparo ou None → entregar a mensagem original. Fica em cache (LRU)."""
+        key = (message, lang)
+        text = self._cache.get(key)
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        return text
+
+    def _store(self, key: tuple[str, str], text: str) -> None:
+        self._cache[key] = text
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max:
+            self._cache.popitem(last=False)
+
+    # --- pedidos ---
+
+    def request(self, message: str, lang: str) -> None:
+        """Pede o texto em fundo (agrupa pedidos próximos num lote). Sem event loop: ignora."""
+        key = (message or "", lang)
+        if not key[0].strip() or key in self._cache or key in self._inflight:
+            return
+        self._pending[key] = None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_soon())
+
+    def on_job_added(self, job: Any) -> None:
+        """Callback de CronService.add_job: lembretes que disparam dentro do horizonte são pedidos já."""
+        try:
+            next_ms = job.state.next_run_at_ms
+            if not next_ms or next_ms - int(time.time() * 1000) > self.horizon_ms or not needs_rendering(job):
+                return
+            p = job.payload
+            self.request(p.message, resolve_reminder_language(p.to, getattr(p, "phone_for_locale", None), p.message))
+        except Exception as e:
+            logger.debug(f"reminder prerender request failed: {e}")
+
+    async def _flush_soon(self, delay: float = 1.0) -> None:
+        await asyncio.sleep(delay)  # juntar pedidos (ex.: vários lembretes criados na mesma mensagem)
+        while self._pending:
+            keys = list(self._pending)[: self.batch_size]
+            for k in keys:
+                self._pending.pop(k, None)
+            await self.render_many(keys)
+
+    async def render_many(self, keys: list[tuple[str, str]]) -> int:
+        """Gera o texto para (mensagem, idioma) ainda sem cache, em lotes. Retorna quantos ficaram prontos."""
+        todo = [k for k in dict.fromkeys(keys) if k not in self._cache and k not in self._inflight]
+        done = 0
+        for i in range(0, len(todo), self.batch_size):
+            chunk = todo[i : i + self.batch_size]
+            self._inflight.update(chunk)
+            try:
+                texts = await self._render_chunk(chunk)
+            finally:
+                self._inflight.difference_update(chunk)
+            for key, text in zip(chunk, texts):
+                if text:
+                    self._store(key, text)
+                    done += 1
+        self.rendered += done
+        return done
+
+    async def _chat(self, prompt: str, max_tokens: int) -> str:
+        r = await self.provider.chat(
+            messages=[{"role": "user", "content": prompt}],
+            model=self.model,
+            max_tokens=max_tokens,
+            profile="assistant",
+        )
+        return (r.content or "").strip()
+
+    async def _render_chunk(self, chunk: list[tuple[str, str]]) -> list[str | None]:
+        self.batches += 1
+        if len(chunk) > 1:
+            try:
+                parsed = parse_batch_reply(await self._chat(batch_prompt(chunk), 120 * len(chunk)), len(chunk))
+                if parsed:
+                    return parsed
+                logger.warning("reminder_prerender_batch_unparsed", extra={"extra": {"size": len(chunk)}})
+            except Exception as e:
+                logger.warning("reminder_prerender_batch_failed", extra={"extra": {"size": len(chunk), "error": str(e)[:200]}})
+        # Lote de 1 ou resposta em lote inválida: um pedido por lembrete
+        out: list[str | None] = []
+        for message, lang in chunk:
+            try:
+                out.append(await self._chat(single_prompt(message, lang), 256) or None)
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Cron (DeepSeek reminder message) prerender failed: {e}")
+                out.append(None)
+        return out
+
+    # --- sweep ---
+
+    async def sweep(self) -> int:
+        """Pede o texto dos lembretes devidos nas próximas horas que ainda não o têm."""
+        if self.cron is None:
+            return 0
+        now = int(time.time() * 1000)
+        keys: list[tuple[str, str]] = []
+        for job in self.cron.list_jobs():
+            next_ms = job.state.next_run_at_ms
+            if not next_ms or next_ms > now + self.horizon_ms or not needs_rendering(job):
+                continue
+            p = job.payload
+            keys.append((p.message, resolve_reminder_language(p.to, getattr(p, "phone_for_locale", None), p.message)))
+        return await self.render_many(keys)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                n = await self.sweep()
+                if n:
+                    logger.info("reminder_prerender_sweep", extra={"extra": {"rendered": n, "cached": len(self._cache)}})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"reminder prerender sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        global _ACTIVE_PRERENDERER
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._sweep_loop(), name="reminder-prerender")
+        _ACTIVE_PRERENDERER = self
+
+    def stop(self) -> None:
+        global _ACTIVE_PRERENDERER
+        for t in (self._sweep_task, self._flush_task):
+            if t and not t.done():
+                t.cancel()
+        self._sweep_task = self._flush_task = None
+        if _ACTIVE_PRERENDERER is self:
+            _ACTIVE_PRERENDERER = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "cached": len(self._cache),
+            "pending": len(self._pending) + len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "rendered": self.rendered,
+            "batches": self.batches,
+            "failures": self.failures,
+        }
+
+
+def get_reminder_prerender_stats() -> dict[str, int] | None:
+    """Métricas do prerenderer ativo (None se o gateway não o arrancou)."""
+    return _ACTIVE_PRERENDERER.stats() if _ACTIVE_PRERENDERER is not None else None
@@ -8,8 +8,9 @@ use schedule.tz so "0 11 * * *" = 11:00 in that timezone, not server local.
 """
 
 import asyncio
-import json
+import os
 import time
+from collections import deque
 from pathlib import Path
 from typing import Any, Callable, Coroutine
 
@@ -23,7 +24,10 @@ from zapista.cron.friendly_id import (
     generate_friendly_job_id,
     generate_friendly_job_id_with_prefix,
 )
+from zapista.cron.index import JobIndex
+from zapista.cron.storage import open_store
 from zapista.cron.types import CronJob, CronJobState, CronPayload, CronSchedule, CronStore
+from zapista.utils.helpers import env_int
 
 
 def _now_ms() -> int:
@@ -39,6 +43,17 @@ def _now_ms() -> int:
 # em vez de serem silenciosamente eliminados. 12 horas cobre paragens prolongadas do serviço (como reparado em 26/03).
 _CATCHUP_WINDOW_MS = 12 * 60 * 60 * 1000  # 12 horas (ex: de 10h às 18h)
 
+# Serviço ativo no processo (para #system: atraso dos disparos); None antes de start()
+_ACTIVE_SERVICE: "CronService | None" = None
+
+# Atrasos (ms) guardados para p50/p95 no #system
+_LATENESS_SAMPLES = 1000
+
+
+def fire_concurrency_from_env(default: int = 8) -> int:
+    """Jobs devidos disparados em simultâneo: CRON_FIRE_CONCURRENCY se definido, senão default. 1 = em série; limite 1–64."""
+    return env_int("CRON_FIRE_CONCURRENCY", int(default), 1, 64)
+
 
 def _compute_next_run(schedule: CronSchedule, now_ms: int) -> int | None:
     """Compute next run time in ms. Respeita not_before_ms para recorrentes (ex.: «a partir de 1º julho»)."""
@@ -90,6 +105,106 @@ def _compute_next_run(schedule: CronSchedule, now_ms: int) -> int | None:
     return None
 
 
+def _job_from_dict(j: dict[str, Any]) -> CronJob:
+    """Job a partir do formato persistido (camelCase, snapshot e journal)."""
+    return CronJob(
+        id=j["id"],
+        name=j["name"],
+        enabled=j.get("enabled", True),
+        schedule=CronSchedule(
+            kind=j["schedule"]["kind"],
+            at_ms=j["schedule"].get("atMs"),
+            every_ms=j["schedule"].get("everyMs"),
+            expr=j["schedule"].get("expr"),
+            tz=j["schedule"].get("tz"),
+            not_before_ms=j["schedule"].get("notBeforeMs"),
+            not_after_ms=j["schedule"].get("notAfterMs"),
+        ),
+        payload=CronPayload(
+            kind=j["payload"].get("kind", "agent_turn"),
+            message=j["payload"].get("message", ""),
+            deliver=j["payload"].get("deliver", False),
+            channel=j["payload"].get("channel"),
+            to=j["payload"].get("to"),
+            phone_for_locale=j["payload"].get("phoneForLocale"),
+            remind_again_if_unconfirmed_seconds=j["payload"].get("remindAgainIfUnconfirmedSeconds"),
+            remind_again_max_count=j["payload"].get("remindAgainMaxCount", 3),
+            depends_on_job_id=j["payload"].get("dependsOnJobId"),
+            parent_job_id=j["payload"].get("parentJobId"),
+            has_deadline=j["payload"].get("hasDeadline", False),
+            audio_mode=j["payload"].get("audioMode", False),
+            deadline_check_for_job_id=j["payload"].get("deadlineCheckForJobId"),
+            deadline_main_job_id=j["payload"].get("deadlineMainJobId"),
+            deadline_post_index=j["payload"].get("deadlinePostIndex"),
+            is_proactive_nudge=j["payload"].get("isProactiveNudge", False),
+            pomodoro_cycle=j["payload"].get("pomodoroCycle"),
+            pomodoro_phase=j["payload"].get("pomodoroPhase"),
+            suggested_draft=j["payload"].get("suggestedDraft"),
+            is_important=j["payload"].get("isImportant", False),
+        ),
+        state=CronJobState(
+            next_run_at_ms=j.get("state", {}).get("nextRunAtMs"),
+            last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
+            last_status=j.get("state", {}).get("lastStatus"),
+            last_error=j.get("state", {}).get("lastError"),
+            snooze_count=j.get("state", {}).get("snoozeCount", 0),
+        ),
+        created_at_ms=j.get("createdAtMs", 0),
+        updated_at_ms=j.get("updatedAtMs", 0),
+        delete_after_run=j.get("deleteAfterRun", False),
+    )
+
+
+def _job_to_dict(j: CronJob) -> dict[str, Any]:
+    """Formato persistido de um job (camelCase)."""
+    return {
+        "id": j.id,
+        "name": j.name,
+        "enabled": j.enabled,
+        "schedule": {
+            "kind": j.schedule.kind,
+            "atMs": j.schedule.at_ms,
+            "everyMs": j.schedule.every_ms,
+            "expr": j.schedule.expr,
+            "tz": j.schedule.tz,
+            "notBeforeMs": j.schedule.not_before_ms,
+            "notAfterMs": j.schedule.not_after_ms,
+        },
+        "payload": {
+            "kind": j.payload.kind,
+            "message": j.payload.message,
+            "deliver": j.payload.deliver,
+            "channel": j.payload.channel,
+            "to": j.payload.to,
+            "phoneForLocale": getattr(j.payload, "phone_for_locale", None),
+            "remindAgainIfUnconfirmedSeconds": getattr(j.payload, "remind_again_if_unconfirmed_seconds", None),
+            "remindAgainMaxCount": getattr(j.payload, "remind_again_max_count", 10),
+            "dependsOnJobId": getattr(j.payload, "depends_on_job_id", None),
+            "parentJobId": getattr(j.payload, "parent_job_id", None),
+            "hasDeadline": getattr(j.payload, "has_deadline", False),
+            "audioMode": getattr(j.payload, "audio_mode", False),
+            "deadlineCheckForJobId": getattr(j.payload, "deadline_check_for_job_id", None),
+            "deadlineMainJobId": getattr(j.payload, "deadline_main_job_id", None),
+            "deadlinePostIndex": getattr(j.payload, "deadline_post_index", None),
+            "isProactiveNudge": getattr(j.payload, "is_proactive_nudge", False),
+            "pomodoroCycle": getattr(j.payload, "pomodoro_cycle", None),
+            "pomodoroPhase": getattr(j.payload, "pomodoro_phase", None),
+            "suggestedDraft": getattr(j.payload, "suggested_draft", None),
+            "isImportant": getattr(j.payload, "is_important", False),
+        },
+        "state": {
+            "nextRunAtMs": j.state.next_run_at_ms,
+            "lastRunAtMs": j.state.last_run_at_ms,
+            "lastStatus": j.state.last_status,
+            "lastError": j.state.last_error,
+            "snoozeCount": getattr(j.state, "snooze_count", 0),
+        },
+        "createdAtMs": j.created_at_ms,
+        "updatedAtMs": j.updated_at_ms,
+        "deleteAfterRun": j.delete_after_run,
+    }
+
+
 class CronService:
     """Service for managing and executing scheduled jobs."""
     
@@ -98,150 +213,111 @@ class CronService:
         store_path: Path,
         on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None,
         on_stale_removed: Callable[[StaleRemovals], None] | None = None,
+        backend: Any | None = None,
+        fire_concurrency: int | None = None,
     ):
         self.store_path = store_path
         self.on_job = on_job  # Callback to execute job, returns response text
         self.on_stale_removed = on_stale_removed  # Chamado 1x/dia com lembretes removidos (at no passado)
+        self.on_job_added: Callable[[CronJob], None] | None = None  # ex.: pré-gerar texto de entrega
         self._store: CronStore | None = None
+        self._index: JobIndex | None = None  # jobs por id/destinatário/ligações + heap de next_run
+        self._backend = backend or open_store(store_path)  # CRON_STORE: jobs.json + journal (default) ou tabela cron_jobs
         self._timer_task: asyncio.Task | None = None
         self._daily_stale_task: asyncio.Task | None = None
         self._stale_loop_task: asyncio.Task | None = None
+        self._journal_sync_task: asyncio.Task | None = None
         self._running = False
         self._startup_time_ms = _now_ms()
+        # Lote de jobs devidos: até N em paralelo, jobs do mesmo destinatário em ordem (CRON_FIRE_CONCURRENCY)
+        self.fire_concurrency = fire_concurrency_from_env() if fire_concurrency is None else max(1, fire_concurrency)
+        # Lotes em curso (ticks que já acordaram): _arm_timer só cancela o tick que ainda dorme, por
+        # isso um job adicionado/adiado para dentro de um lote longo dispara à hora, num lote paralelo.
+        self._batch_tasks: set[asyncio.Task] = set()
+        self._fire_sem: asyncio.Semaphore | None = None  # fire_concurrency partilhado entre lotes
+        self._recipient_locks: dict[str, list] = {}  # destinatário -> [Lock, utilizadores]: ordem entre lotes
+        self._lateness_ms: deque[int] = deque(maxlen=_LATENESS_SAMPLES)
+        self._fired = 0
+        self._last_batch: dict[str, Any] | None = None
     
-    def _load_store(self) -> CronStore:
-        """Load jobs from disk."""
-        if self._store:
-            return self._store
+    def _load_store(self) -> JobIndex:
+        """Load jobs from disk (1x: snapshot + journal) e devolve o índice em memória."""
+        if self._index is not None:
+            return self._index
         
-        if self.store_path.exists():
+        self._store = CronStore()
+        jobs: list[CronJob] = []
+        try:
+            version, raw_jobs = self._backend.load()
+            self._store.version = version
+            jobs = [_job_from_dict(j) for j in raw_jobs]
+        except Exception as e:
+            logger.warning("cron_store_load_failed", extra={"extra": {"error": str(e)}})
+            jobs = []
+
+        # O índice passa a ser a fonte de verdade; store.jobs fica vazio para não divergir
+        self._index = JobIndex(jobs)
+        self._index.drain_dirty()
+        return self._index
+    
+    def _save_store(self, db: Any = None) -> None:
+        """Persist jobs alterados desde a última gravação (1 registo por job no journal).
+        db: Session do chamador; com backend SQLite a gravação entra na transação dele (sem commit)."""
+        if not self._store or self._index is None:
+            return
+        if self._backend.needs_full_write:
+            # Primeira gravação (ou jobs.json apagado): snapshot completo; journals antigos são órfãos
+            self._compact_store()
+            return
+        records = []
+        for job_id in self._index.drain_dirty():
+            job = self._index.get(job_id)
+            records.append({"op": "put", "job": _job_to_dict(job)} if job else {"op": "del", "id": job_id})
+        if db is not None and getattr(self._backend, "shares_db", False):
+            self._backend.append(records, db=db)
+        else:
+            self._backend.append(records)
+        self._maybe_compact()
+
+    def _compact_store(self) -> None:
+        """Snapshot completo síncrono (arranque/paragem) e journals vazios."""
+        if not self._store or self._index is None:
+            return
+        self._index.drain_dirty()
+        self._backend.compact_now(self._store.version, [_job_to_dict(j) for j in self._index.jobs])
+
+    def _maybe_compact(self) -> None:
+        """Journal grande: roda-o e escreve o snapshot numa thread (sem bloquear o event loop)."""
+        if not self._backend.needs_compaction:
+            return
+        jobs = [_job_to_dict(j) for j in self._index.jobs]
+        if not self._backend.rotate():
+            return  # compactação anterior ainda em curso
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
             try:
-                data = json.loads(self.store_path.read_text())
-                jobs = []
-                for j in data.get("jobs", []):
-                    jobs.append(CronJob(
-                        id=j["id"],
-                        name=j["name"],
-                        enabled=j.get("enabled", True),
-                        schedule=CronSchedule(
-                            kind=j["schedule"]["kind"],
-                            at_ms=j["schedule"].get("atMs"),
-                            every_ms=j["schedule"].get("everyMs"),
-                            expr=j["schedule"].get("expr"),
-                            tz=j["schedule"].get("tz"),
-                            not_before_ms=j["schedule"].get("notBeforeMs"),
-                            not_after_ms=j["schedule"].get("notAfterMs"),
-                        ),
-                        payload=CronPayload(
-                            kind=j["payload"].get("kind", "agent_turn"),
-                            message=j["payload"].get("message", ""),
-                            deliver=j["payload"].get("deliver", False),
-                            channel=j["payload"].get("channel"),
-                            to=j["payload"].get("to"),
-                            phone_for_locale=j["payload"].get("phoneForLocale"),
-                            remind_again_if_unconfirmed_seconds=j["payload"].get("remindAgainIfUnconfirmedSeconds"),
-                            remind_again_max_count=j["payload"].get("remindAgainMaxCount", 3),
-                            depends_on_job_id=j["payload"].get("dependsOnJobId"),
-                            parent_job_id=j["payload"].get("parentJobId"),
-                            has_deadline=j["payload"].get("hasDeadline", False),
-                            audio_mode=j["payload"].get("audioMode", False),
-                            deadline_check_for_job_id=j["payload"].get("deadlineCheckForJobId"),
-                            deadline_main_job_id=j["payload"].get("deadlineMainJobId"),
-                            deadline_post_index=j["payload"].get("deadlinePostIndex"),
-                            is_proactive_nudge=j["payload"].get("isProactiveNudge", False),
-                            pomodoro_cycle=j["payload"].get("pomodoroCycle"),
-                            pomodoro_phase=j["payload"].get("pomodoroPhase"),
-                            suggested_draft=j["payload"].get("suggestedDraft"),
-                            is_important=j["payload"].get("isImportant", False),
-                        ),
-                        state=CronJobState(
-                            next_run_at_ms=j.get("state", {}).get("nextRunAtMs"),
-                            last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
-                            last_status=j.get("state", {}).get("lastStatus"),
-                            last_error=j.get("state", {}).get("lastError"),
-                            snooze_count=j.get("state", {}).get("snoozeCount", 0),
-                        ),
-                        created_at_ms=j.get("createdAtMs", 0),
-                        updated_at_ms=j.get("updatedAtMs", 0),
-                        delete_after_run=j.get("deleteAfterRun", False),
-                    ))
-                self._store = CronStore(jobs=jobs)
+                self._backend.finish_compaction(self._store.version, jobs)
             except Exception as e:
-                logger.warning("cron_store_load_failed", extra={"extra": {"error": str(e)}})
-                self._store = CronStore()
-        else:
-            self._store = CronStore()
-        
-        return self._store
-    
-    def _save_store(self) -> None:
-        """Save jobs to disk."""
-        if not self._store:
+                logger.warning("cron_journal_compaction_failed", extra={"extra": {"error": str(e)}})
             return
-        
-        self.store_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        data = {
-            "version": self._store.version,
-            "jobs": [
-                {
-                    "id": j.id,
-                    "name": j.name,
-                    "enabled": j.enabled,
-                    "schedule": {
-                        "kind": j.schedule.kind,
-                        "atMs": j.schedule.at_ms,
-                        "everyMs": j.schedule.every_ms,
-                        "expr": j.schedule.expr,
-                        "tz": j.schedule.tz,
-                        "notBeforeMs": j.schedule.not_before_ms,
-                        "notAfterMs": j.schedule.not_after_ms,
-                    },
-                    "payload": {
-                        "kind": j.payload.kind,
-                        "message": j.payload.message,
-                        "deliver": j.payload.deliver,
-                        "channel": j.payload.channel,
-                        "to": j.payload.to,
-                        "phoneForLocale": getattr(j.payload, "phone_for_locale", None),
-                        "remindAgainIfUnconfirmedSeconds": getattr(j.payload, "remind_again_if_unconfirmed_seconds", None),
-                        "remindAgainMaxCount": getattr(j.payload, "remind_again_max_count", 10),
-                        "dependsOnJobId": getattr(j.payload, "depends_on_job_id", None),
-                        "parentJobId": getattr(j.payload, "parent_job_id", None),
-                        "hasDeadline": getattr(j.payload, "has_deadline", False),
-                        "audioMode": getattr(j.payload, "audio_mode", False),
-                        "deadlineCheckForJobId": getattr(j.payload, "deadline_check_for_job_id", None),
-                        "deadlineMainJobId": getattr(j.payload, "deadline_main_job_id", None),
-                        "deadlinePostIndex": getattr(j.payload, "deadline_post_index", None),
-                        "isProactiveNudge": getattr(j.payload, "is_proactive_nudge", False),
-                        "pomodoroCycle": getattr(j.payload, "pomodoro_cycle", None),
-                        "pomodoroPhase": getattr(j.payload, "pomodoro_phase", None),
-                        "suggestedDraft": getattr(j.payload, "suggested_draft", None),
-                        "isImportant": getattr(j.payload, "is_important", False),
-                    },
-                    "state": {
-                        "nextRunAtMs": j.state.next_run_at_ms,
-                        "lastRunAtMs": j.state.last_run_at_ms,
-                        "lastStatus": j.state.last_status,
-                        "lastError": j.state.last_error,
-                        "snoozeCount": getattr(j.state, "snooze_count", 0),
-                    },
-                    "createdAtMs": j.created_at_ms,
-                    "updatedAtMs": j.updated_at_ms,
-                    "deleteAfterRun": j.delete_after_run,
-                }
-                for j in self._store.jobs
-            ]
-        }
-        
-        self.store_path.write_text(json.dumps(data, indent=2))
+        fut = loop.run_in_executor(None, self._backend.finish_compaction, self._store.version, jobs)
+
+        def _done(f: asyncio.Future) -> None:
+            if not f.cancelled() and f.exception():
+                logger.warning("cron_journal_compaction_failed", extra={"extra": {"error": str(f.exception())}})
+
+        fut.add_done_callback(_done)
     
     async def start(self) -> None:
         """Start the cron service."""
+        global _ACTIVE_SERVICE
         self._running = True
+        _ACTIVE_SERVICE = self
         self._load_store()
         self._recompute_next_runs()
-        self._save_store()
+        # next_run de todos os jobs mudou: snapshot completo em vez de um registo por job
+        self._compact_store()
         self._arm_timer()
         # Limpeza de jobs "at" no passado: 1x ao arranque e depois 1x por dia
         # NOTA: remove_stale_at_jobs não toca em jobs que foram resgatados pelo catch-up
@@ -253,17 +329,28 @@ class CronService:
             except Exception as e:
                 logger.warning("cron_stale_removed_callback_failed", extra={"extra": {"error": str(e)}})
         self._daily_stale_task = asyncio.create_task(self._daily_stale_loop())
-        logger.info("cron_service_started", extra={"extra": {"job_count": len(self._store.jobs if self._store else [])}})
+        if getattr(self._backend, "fsync_seconds", 0):
+            self._journal_sync_task = asyncio.create_task(self._journal_sync_loop())
+        logger.info("cron_service_started", extra={"extra": {"job_count": len(self._index) if self._index is not None else 0}})
     
     def stop(self) -> None:
         """Stop the cron service."""
+        global _ACTIVE_SERVICE
         self._running = False
+        if _ACTIVE_SERVICE is self:
+            _ACTIVE_SERVICE = None
         if self._timer_task:
             self._timer_task.cancel()
             self._timer_task = None
+        for task in list(self._batch_tasks):
+            task.cancel()
         if self._daily_stale_task:
             self._daily_stale_task.cancel()
             self._daily_stale_task = None
+        if self._journal_sync_task:
+            self._journal_sync_task.cancel()
+            self._journal_sync_task = None
+        self._backend.close()
     
     def _recompute_next_runs(self) -> None:
         """Recompute next run times for all enabled jobs.
@@ -272,10 +359,10 @@ class CronService:
         (_CATCHUP_WINDOW_MS), agenda-os para disparar daqui a 1s em vez de os descartar.
         Isso garante que lembretes agendados durante uma paragem do serviço não se percam.
         """
-        if not self._store:
+        if self._index is None:
             return
         now = _now_ms()
-        for job in self._store.jobs:
+        for job in self._index.jobs:
             if not job.enabled:
                 continue
             if job.schedule.kind == "at" and job.schedule.at_ms:
@@ -298,19 +385,19 @@ class CronService:
                     job.state.next_run_at_ms = at_ms
             else:
                 job.state.next_run_at_ms = _compute_next_run(job.schedule, now)
+        self._index.rebuild_heap()
     
     def _get_next_wake_ms(self) -> int | None:
-        """Get the earliest next run time across all jobs."""
-        if not self._store:
+        """Get the earliest next run time across all jobs (topo do heap, O(log n) amortizado)."""
+        if self._index is None:
             return None
-        times = [j.state.next_run_at_ms for j in self._store.jobs 
-                 if j.enabled and j.state.next_run_at_ms]
-        return min(times) if times else None
+        return self._index.next_wake_ms()
     
     def _arm_timer(self) -> None:
-        """Schedule the next timer tick."""
+        """Schedule the next timer tick (só o tick ainda a dormir é substituído; lotes em curso continuam)."""
         if self._timer_task:
             self._timer_task.cancel()
+            self._timer_task = None
         
         next_wake = self._get_next_wake_ms()
         if not next_wake or not self._running:
@@ -321,8 +408,17 @@ class CronService:
         
         async def tick():
             await asyncio.sleep(delay_s)
-            if self._running:
+            if not self._running:
+                return
+            # A partir daqui é um lote: um _arm_timer durante o lote arma um tick novo em vez de o cancelar
+            task = asyncio.current_task()
+            if self._timer_task is task:
+                self._timer_task = None
+            self._batch_tasks.add(task)
+            try:
                 await self._on_timer()
+            finally:
+                self._batch_tasks.discard(task)
         
         self._timer_task = asyncio.create_task(tick())
 
@@ -344,27 +440,86 @@ class CronService:
             except Exception as e:
                 logger.warning("cron_daily_stale_loop_error", extra={"extra": {"error": str(e)}})
     
+    async def _journal_sync_loop(self) -> None:
+        """fsync periódico do journal: as últimas alterações não ficam por sincronizar numa instância parada."""
+        while self._running:
+            try:
+                await asyncio.sleep(self._backend.fsync_seconds)
+                self._backend.sync()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning("cron_journal_sync_failed", extra={"extra": {"error": str(e)}})
+
     async def _on_timer(self) -> None:
         """Handle timer tick - run due jobs."""
-        if not self._store:
+        if self._index is None:
             return
         
         now = _now_ms()
-        due_jobs = [
-            j for j in self._store.jobs
-            if j.enabled and j.state.next_run_at_ms and now >= j.state.next_run_at_ms
-        ]
+        due_jobs = self._index.pop_due(now)
         
-        for job in due_jobs:
-            await self._execute_job(job)
+        if due_jobs:
+            await self._execute_batch(due_jobs)
         
+        # Uma gravação por lote (não por job)
         self._save_store()
         self._arm_timer()
     
-    async def _execute_job(self, job: CronJob) -> None:
-        """Execute a single job."""
+    async def _execute_batch(self, jobs: list[CronJob]) -> None:
+        """
+        Dispara um lote de jobs devidos com no máximo fire_concurrency em simultâneo.
+        Jobs do mesmo destinatário (payload.to) correm em série, pela ordem de hora, para
+        que as mensagens cheguem ao chat na ordem em que foram agendadas. O limite e a ordem por
+        destinatário valem também entre lotes que se sobreponham.
+        """
+        t0 = time.perf_counter()
+        # Hora agendada antes de disparar: _execute_job substitui next_run_at_ms pela próxima
+        scheduled = {j.id: j.state.next_run_at_ms for j in jobs}
+        groups: dict[str, list[CronJob]] = {}
+        for job in jobs:
+            groups.setdefault(job.payload.to or f"job:{job.id}", []).append(job)
+        if self._fire_sem is None:
+            self._fire_sem = asyncio.Semaphore(self.fire_concurrency)
+        sem = self._fire_sem
+
+        async def run_group(key: str, group: list[CronJob]) -> None:
+            entry = self._recipient_locks.setdefault(key, [asyncio.Lock(), 0])
+            entry[1] += 1
+            try:
+                async with entry[0]:
+                    for job in group:
+                        async with sem:
+                            await self._execute_job(job, scheduled_ms=scheduled.get(job.id))
+            finally:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._recipient_locks.pop(key, None)
+
+        results = await asyncio.gather(*(run_group(k, g) for k, g in groups.items()), return_exceptions=True)
+        for r in results:
+            if isinstance(r, Exception):
+                logger.error("cron_batch_group_failed", extra={"extra": {"error": str(r)}})
+
+        self._last_batch = {
+            "jobs": len(jobs),
+            "recipients": len(groups),
+            "duration_ms": round((time.perf_counter() - t0) * 1000, 1),
+            "finished_at_ms": _now_ms(),
+        }
+        logger.info("cron_batch_completed", extra={"extra": {
+            **self._last_batch,
+            "concurrency": self.fire_concurrency,
+        }})
+    
+    async def _execute_job(self, job: CronJob, scheduled_ms: int | None = None) -> None:
+        """Execute a single job. scheduled_ms: hora agendada (para medir o atraso do disparo)."""
         start_ms = _now_ms()
-        logger.info("cron_executing_job", extra={"extra": {"job_id": job.id, "job_name": job.name}})
+        late_ms = max(0, start_ms - scheduled_ms) if scheduled_ms else None
+        if late_ms is not None:
+            self._lateness_ms.append(late_ms)
+        self._fired += 1
+        logger.info("cron_executing_job", extra={"extra": {"job_id": job.id, "job_name": job.name, "late_ms": late_ms}})
         
         try:
             response = None
@@ -390,7 +545,7 @@ class CronService:
         if job.schedule.kind == "at" and job.state.last_status == "ok":
             if not getattr(job.payload, "has_deadline", False):
                 # Job pontual normal: remove da lista após executar
-                self._store.jobs = [j for j in self._store.jobs if j.id != job.id]
+                self._index.remove(job.id)
             else:
                 # Deadline job: só volta a disparar se remind_again_if_unconfirmed_seconds estiver definido
                 # (e com mínimo de 900s = 15 min para evitar spam)
@@ -416,15 +571,34 @@ class CronService:
         else:
             # Recorrente: manter listado e agendar próxima execução até o utilizador remover (ou fim da recorrência se implementado)
             job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+        # Novo next_run (ou desativado) → heap; no-op se o job já saiu do índice (ex.: removido pelo on_job)
+        self._index.reschedule(job)
     
     # ========== Public API ==========
     
-    def list_jobs(self, include_disabled: bool = False) -> list[CronJob]:
-        """List all jobs."""
-        store = self._load_store()
-        jobs = store.jobs if include_disabled else [j for j in store.jobs if j.enabled]
+    def list_jobs(self, include_disabled: bool = False, to: str | None = None) -> list[CronJob]:
+        """List all jobs (ou só os de um destinatário, via índice, quando to é dado)."""
+        index = self._load_store()
+        jobs = index.for_recipient(to) if to else index.jobs
+        if not include_disabled:
+            jobs = [j for j in jobs if j.enabled]
         return sorted(jobs, key=lambda j: j.state.next_run_at_ms or float('inf'))
     
+    def list_jobs_between(self, start_ms: int, end_ms: int, to: str | None = None) -> list[CronJob]:
+        """Jobs ativos com próxima execução em [start_ms, end_ms] (ex.: «lembretes de hoje»), por hora."""
+        return [
+            j for j in self.list_jobs(to=to)
+            if j.state.next_run_at_ms and start_ms <= j.state.next_run_at_ms <= end_ms
+        ]
+
+    def occurrences_between(self, start_ms: int, end_ms: int, to: str | None = None) -> list[tuple[int, CronJob]]:
+        """Todas as execuções (ms, job) em [start_ms, end_ms], incluindo repetições de every/cron, por hora.
+        Com to, só os jobs desse destinatário (índice por destinatário, sem varrer todos os jobs)."""
+        from zapista.cron.occurrences import job_occurrences
+        out = [(at_ms, j) for j in self.list_jobs(to=to) for at_ms in job_occurrences(j, start_ms, end_ms)]
+        out.sort(key=lambda x: x[0])
+        return out
+
     def add_job(
         self,
         name: str,
@@ -451,8 +625,9 @@ class CronService:
         pomodoro_phase: str | None = None,
         suggested_draft: str | None = None,
         is_important: bool = False,
+        db: Any = None,
     ) -> CronJob:
-        """Add a new job."""
+        """Add a new job. db: Session do chamador para gravar o job na mesma transação (CRON_STORE=sqlite)."""
         logger.debug("cron_add_job_start", extra={"extra": {
             "name": name,
             "schedule_kind": getattr(schedule, "kind", "?"),
@@ -463,11 +638,11 @@ class CronService:
         msg_preview = (message or "")[:60] + ("..." if len(message or "") > 60 else "")
         logger.debug("Cron add_job: message_len=%d message_preview=%r", len(message or ""), msg_preview)
 
-        store = self._load_store()
+        index = self._load_store()
 
         # Per-user cap: max 200 active jobs to prevent runaway chains
         MAX_JOBS_PER_USER = 200
-        existing_for_user = [j for j in store.jobs if getattr(j.payload, "to", None) == to]
+        existing_for_user = index.for_recipient(to) if to else [j for j in index.jobs if not getattr(j.payload, "to", None)]
         if to and len(existing_for_user) >= MAX_JOBS_PER_USER:
             logger.warning("cron_max_jobs_exceeded", extra={"extra": {"to": to, "job_count": len(existing_for_user)}})
             raise ValueError("MAX_REMINDERS_EXCEEDED")
@@ -482,16 +657,14 @@ class CronService:
             (schedule.expr or "")[:50],
             schedule.at_ms,
             len(existing_for_user),
-            len(store.jobs),
+            len(index),
         )
 
         # Verificação de duplicatas: mesmo destinatário + mesma mensagem + mesmo schedule (antes do limite)
         msg_norm = (message or "").lower().strip()
-        for existing in store.jobs:
+        for existing in existing_for_user:
             if not existing.enabled:
                 continue
-            if getattr(existing.payload, "to", None) != to:
-                continue
             if (existing.payload.message or "").lower().strip() != msg_norm:
                 continue
             if existing.schedule.kind != schedule.kind:
@@ -508,14 +681,14 @@ class CronService:
             else:
                 continue
             logger.info("cron_duplicate_job", extra={"extra": {"existing_id": existing.id}})
-            logger.debug("Cron add_job: duplicate returned, total_jobs=%d", len(store.jobs))
+            logger.debug("Cron add_job: duplicate returned, total_jobs=%d", len(index))
             return existing
 
         # Limite por dia (40 lembretes / 80 total) é aplicado no cron_tool antes de add_job
 
         now = _now_ms()
         kind = payload_kind if payload_kind in ("agent_turn", "system_event", "deadline_check") else "agent_turn"
-        existing_ids = [j.id for j in store.jobs]
+        existing_ids = index.ids()
         if suggested_prefix:
             job_id = generate_friendly_job_id_with_prefix(suggested_prefix, existing_ids)
         else:
@@ -568,11 +741,11 @@ class CronService:
             delete_after_run=delete_after_run,
         )
 
-        store.jobs.append(job)
-        self._save_store()
+        index.add(job)
+        self._save_store(db=db)
         self._arm_timer()
 
-        logger.debug("Cron add_job: job created, total_jobs=%d", len(store.jobs))
+        logger.debug("Cron add_job: job created, total_jobs=%d", len(index))
         sched_desc = schedule.kind
         if schedule.kind == "at" and schedule.at_ms:
             sched_desc += f" at={time.strftime('%Y-%m-%d %H:%M', time.localtime(schedule.at_ms / 1000))}"
@@ -589,25 +762,27 @@ class CronService:
         }})
         if deliver and channel == "cli":
             logger.info("Cron: job will not be delivered to WhatsApp (channel=cli); create reminder from WhatsApp to receive there.")
+        if self.on_job_added:
+            try:
+                self.on_job_added(job)
+            except Exception as e:
+                logger.debug(f"Cron on_job_added failed: {e}")
         return job
     
     def get_job(self, job_id: str) -> CronJob | None:
         """Retorna o job por id ou None."""
-        store = self._load_store()
-        for j in store.jobs:
-            if j.id == job_id:
-                return j
-        return None
+        return self._load_store().get(job_id)
 
     def trigger_dependents(self, completed_job_id: str) -> int:
         """Ativa jobs que dependem de completed_job_id. Retorna quantidade ativada."""
-        store = self._load_store()
+        index = self._load_store()
         now = _now_ms()
         count = 0
-        for j in store.jobs:
-            if getattr(j.payload, "depends_on_job_id", None) == completed_job_id and not j.enabled:
+        for j in index.linked("depends_on_job_id", completed_job_id):
+            if not j.enabled:
                 j.enabled = True
                 j.state.next_run_at_ms = now
+                index.reschedule(j)
                 count += 1
                 logger.info("cron_dependent_triggered", extra={"extra": {"job_id": j.id, "completed_id": completed_job_id}})
         if count > 0:
@@ -622,13 +797,13 @@ class CronService:
         para notificar o utilizador no idioma correto (inclui phone_for_locale para resolver @lid).
         Deve ser chamado 1x por dia; a notificação é enviada só após 2 msgs do user (anti-spam).
         """
-        store = self._load_store()
+        index = self._load_store()
         now = _now_ms()
         to_remove: list[CronJob] = []
         notif_by_chat: dict[tuple[str | None, str | None], list[tuple[str, str]]] = {}
         # Guarda phone_for_locale por chat key (último valor encontrado)
         phone_by_chat: dict[tuple[str | None, str | None], str | None] = {}
-        for j in store.jobs:
+        for j in index.jobs:
             if j.schedule.kind != "at":
                 continue
             # Se for "at" e estiver desativado, é candidato a remoção se já tiver passado (ou se nunca teve next_run)
@@ -663,7 +838,7 @@ class CronService:
                     if pfl and not phone_by_chat.get(key):
                         phone_by_chat[key] = pfl
         for j in to_remove:
-            store.jobs = [x for x in store.jobs if x.id != j.id]
+            index.remove(j.id)
         if to_remove:
             self._save_store()
             self._arm_timer()
@@ -676,10 +851,7 @@ class CronService:
 
     def remove_job(self, job_id: str) -> bool:
         """Remove a job by ID."""
-        store = self._load_store()
-        before = len(store.jobs)
-        store.jobs = [j for j in store.jobs if j.id != job_id]
-        removed = len(store.jobs) < before
+        removed = self._load_store().remove(job_id) is not None
         
         if removed:
             self._save_store()
@@ -690,18 +862,11 @@ class CronService:
 
     def remove_job_and_deadline_followups(self, job_id: str) -> int:
         """Remove job + deadline_check + pre-reminders + post-deadline 1/2/3. Retorna total removidos."""
-        store = self._load_store()
+        index = self._load_store()
         to_remove = {job_id}
-        for j in store.jobs:
-            if getattr(j.payload, "deadline_check_for_job_id", None) == job_id:
-                to_remove.add(j.id)
-            if getattr(j.payload, "deadline_main_job_id", None) == job_id:
-                to_remove.add(j.id)
-            if getattr(j.payload, "parent_job_id", None) == job_id:
-                to_remove.add(j.id)
-        before = len(store.jobs)
-        store.jobs = [j for j in store.jobs if j.id not in to_remove]
-        removed = before - len(store.jobs)
+        for field in ("deadline_check_for_job_id", "deadline_main_job_id", "parent_job_id"):
+            to_remove.update(j.id for j in index.linked(field, job_id))
+        removed = sum(1 for jid in to_remove if index.remove(jid) is not None)
         if removed:
             self._save_store()
             self._arm_timer()
@@ -716,57 +881,81 @@ class CronService:
         Adia o job em delay_seconds (default 5 min). Máx 3 sonecas.
         Retorna (sucesso, snooze_count atual). Se já tiver 3 sonecas, retorna (False, 3).
         """
-        store = self._load_store()
+        index = self._load_store()
         now = _now_ms()
         delay_ms = (delay_seconds or self.SNOOZE_DELAY_SECONDS) * 1000
-        for job in store.jobs:
-            if job.id == job_id:
-                count = getattr(job.state, "snooze_count", 0)
-                if count >= self.SNOOZE_MAX_COUNT:
-                    return False, count
-                job.state.snooze_count = count + 1
-                job.state.next_run_at_ms = now + delay_ms
-                job.updated_at_ms = now
-                self._save_store()
-                self._arm_timer()
-                logger.info("cron_job_snoozed", extra={"extra": {"job_id": job_id, "delay_ms": delay_ms, "count": count + 1}})
-                return True, count + 1
+        job = index.get(job_id)
+        if job is not None:
+            count = getattr(job.state, "snooze_count", 0)
+            if count >= self.SNOOZE_MAX_COUNT:
+                return False, count
+            job.state.snooze_count = count + 1
+            job.state.next_run_at_ms = now + delay_ms
+            job.updated_at_ms = now
+            index.reschedule(job)
+            self._save_store()
+            self._arm_timer()
+            logger.info("cron_job_snoozed", extra={"extra": {"job_id": job_id, "delay_ms": delay_ms, "count": count + 1}})
+            return True, count + 1
         return False, 0
 
     def enable_job(self, job_id: str, enabled: bool = True) -> CronJob | None:
         """Enable or disable a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                job.enabled = enabled
-                job.updated_at_ms = _now_ms()
-                if enabled:
-                    job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
-                else:
-                    job.state.next_run_at_ms = None
-                self._save_store()
-                self._arm_timer()
-                return job
+        index = self._load_store()
+        job = index.get(job_id)
+        if job is not None:
+            job.enabled = enabled
+            job.updated_at_ms = _now_ms()
+            if enabled:
+                job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+            else:
+                job.state.next_run_at_ms = None
+            index.reschedule(job)
+            self._save_store()
+            self._arm_timer()
+            return job
         return None
     
     async def run_job(self, job_id: str, force: bool = False) -> bool:
         """Manually run a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                if not force and not job.enabled:
-                    return False
-                await self._execute_job(job)
-                self._save_store()
-                self._arm_timer()
-                return True
+        job = self._load_store().get(job_id)
+        if job is not None:
+            if not force and not job.enabled:
+                return False
+            await self._execute_job(job)
+            self._save_store()
+            self._arm_timer()
+            return True
         return False
     
     def status(self) -> dict:
         """Get service status."""
-        store = self._load_store()
+        index = self._load_store()
         return {
             "enabled": self._running,
-            "jobs": len(store.jobs),
+            "jobs": len(index),
             "next_wake_at_ms": self._get_next_wake_ms(),
         }
+
+    def fire_stats(self) -> dict[str, Any]:
+        """Disparos desde o arranque, atraso (real - agendado) p50/p95/máx nos últimos disparos e último lote."""
+        samples = sorted(self._lateness_ms)
+
+        def pct(p: float) -> int:
+            return samples[min(len(samples) - 1, int(p * len(samples)))] if samples else 0
+
+        return {
+            "fired": self._fired,
+            "concurrency": self.fire_concurrency,
+            "late_p50_ms": pct(0.5),
+            "late_p95_ms": pct(0.95),
+            "late_max_ms": samples[-1] if samples else 0,
+            "last_batch": self._last_batch,
+            "batches_in_flight": len(self._batch_tasks),
+        }
+
+
+def get_cron_fire_stats() -> dict[str, Any] | None:
+    """Métricas de disparo do CronService ativo, ou None se o serviço não arrancou neste processo."""
+    service = _ACTIVE_SERVICE
+    return service.fire_stats() if service else None
@@ -0,0 +1,143 @@
+"""Persistência do cron na BD principal (organizer.db, SQLite/SQLCipher), tabela cron_jobs.
+
+Ativada com CRON_STORE=sqlite. Mesma interface que o CronJournal (load/append/compact_now/close),
+por isso o CronService e quem o usa (tools, views) não mudam. Vantagens face ao jobs.json:
+- cada alteração é um UPSERT/DELETE numa transação; com a Session do chamador (shares_db) entra na
+  transação dele: criar um lembrete (CronService.add_job(..., db=db)) e o seu registo em
+  ReminderHistory (add_scheduled(..., commit=False)) ficam gravados juntos ou nenhum;
+- leitores fora do CronService (comandos admin, via zapista.cron.storage.load_jobs_between) fazem
+  consultas por intervalo com os índices, sem carregar todos os jobs; dentro do processo o índice em
+  memória do CronService continua a ser a fonte de verdade (list_jobs_between, agenda);
+- um único ficheiro para backup.
+
+Na entrega ainda não: o histórico é atualizado (com commit próprio) pelo callback de entrega e o
+estado do job só é gravado a partir do índice em memória no fim do lote.
+
+Na primeira utilização, se a tabela estiver vazia e existir jobs.json (+ journal), os jobs são importados.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Callable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.logger import get_logger
+from backend.models_db import CronJobRow
+
+logger = get_logger(__name__)
+
+
+def _row_values(job: dict[str, Any]) -> dict[str, Any]:
+    payload = job.get("payload") or {}
+    state = job.get("state") or {}
+    return {
+        "id": job["id"],
+        "name": (job.get("name") or "")[:256],
+        "enabled": bool(job.get("enabled", True)),
+        "schedule_kind": (job.get("schedule") or {}).get("kind", "at"),
+        "next_run_at_ms": state.get("nextRunAtMs"),
+        "payload_to": payload.get("to"),
+        "depends_on_job_id": payload.get("dependsOnJobId"),
+        "parent_job_id": payload.get("parentJobId"),
+        "deadline_check_for_job_id": payload.get("deadlineCheckForJobId"),
+        "deadline_main_job_id": payload.get("deadlineMainJobId"),
+        "updated_at_ms": job.get("updatedAtMs", 0),
+        "data": json.dumps(job, separators=(",", ":")),
+    }
+
+
+class SqliteCronStore:
+    """Jobs do cron na tabela cron_jobs (uma linha por job)."""
+
+    needs_compaction = False
+    needs_full_write = False
+    shares_db = True  # append aceita a Session do chamador (mesma BD que ReminderHistory)
+    fsync_seconds = 0.0  # cada append já é uma transação com commit
+
+    def __init__(self, json_path: Path | None = None, session_factory: Callable[[], Session] | None = None):
+        if session_factory is None:
+            from backend.database import SessionLocal
+            session_factory = SessionLocal
+        self._session_factory = session_factory
+        self._json_path = json_path  # jobs.json legado, importado 1x se a tabela estiver vazia
+        db = self._session_factory()
+        try:
+            CronJobRow.__table__.create(bind=db.get_bind(), checkfirst=True)
+        finally:
+            db.close()
+
+    def load(self) -> tuple[int, list[dict[str, Any]]]:
+        """Todos os jobs, pela ordem de inserção (rowid)."""
+        db = self._session_factory()
+        try:
+            rows = db.query(CronJobRow.data).order_by(text("rowid")).all()
+            jobs = [json.loads(r.data) for r in rows]
+        finally:
+            db.close()
+        if not jobs and self._json_path and self._json_path.exists():
+            from zapista.cron.journal import load_jobs_raw
+            _, jobs = load_jobs_raw(self._json_path)
+            if jobs:
+                self.compact_now(1, jobs)
+                logger.info("cron_store_migrated_to_sqlite", extra={"extra": {"jobs": len(jobs), "from": str(self._json_path)}})
+        return 1, jobs
+
+    def append(self, records: list[dict[str, Any]], db: Session | None = None) -> None:
+        """Aplica put/del numa transação. Com db, usa a sessão do chamador e o commit fica a cargo dele."""
+        if not records:
+            return
+        own = db is None
+        session = self._session_factory() if own else db
+        try:
+            for rec in records:
+                if rec.get("op") == "put":
+                    session.merge(CronJobRow(**_row_values(rec["job"])))
+                elif rec.get("op") == "del":
+                    session.query(CronJobRow).filter(CronJobRow.id == rec["id"]).delete(synchronize_session=False)
+            if own:
+                session.commit()
+            else:
+                session.flush()
+        except Exception:
+            if own:
+                session.rollback()
+            raise
+        finally:
+            if own:
+                session.close()
+
+    def compact_now(self, version: int, jobs: list[dict[str, Any]]) -> None:
+        """Substitui a tabela pelo estado completo (arranque: todos os next_run foram recalculados)."""
+        db = self._session_factory()
+        try:
+            db.query(CronJobRow).delete(synchronize_session=False)
+            db.bulk_insert_mappings(CronJobRow, [_row_values(j) for j in jobs])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def jobs_between(self, start_ms: int, end_ms: int, to: str | None = None) -> list[dict[str, Any]]:
+        """Jobs ativos com next_run_at_ms em [start_ms, end_ms] (opcionalmente só de um destinatário)."""
+        db = self._session_factory()
+        try:
+            q = db.query(CronJobRow.data).filter(
+                CronJobRow.enabled.is_(True),
+                CronJobRow.next_run_at_ms >= start_ms,
+                CronJobRow.next_run_at_ms <= end_ms,
+            )
+            if to:
+                q = q.filter(CronJobRow.payload_to == to)
+            return [json.loads(r.data) for r in q.order_by(CronJobRow.next_run_at_ms).all()]
+        finally:
+            db.close()
+
+    def sync(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
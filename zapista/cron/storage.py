@@ -0,0 +1,59 @@
+"""Escolha do backend de persistência do cron (CRON_STORE).
+
+- json (default): jobs.json (snapshot) + journal append-only (zapista.cron.journal)
+- sqlite: tabela cron_jobs na BD principal (zapista.cron.sqlite_store)
+"""
+
+import os
+from pathlib import Path
+from typing import Any
+
+from zapista.cron.journal import CronJournal
+
+
+def cron_store_kind() -> str:
+    v = os.environ.get("CRON_STORE", "json").strip().lower()
+    return "sqlite" if v == "sqlite" else "json"
+
+
+def open_store(store_path: Path, kind: str | None = None):
+    """Backend para o CronService. store_path = jobs.json (no modo sqlite, só para importação inicial)."""
+    if (kind or cron_store_kind()) == "sqlite":
+        from zapista.cron.sqlite_store import SqliteCronStore
+        return SqliteCronStore(json_path=store_path)
+    return CronJournal(store_path)
+
+
+_READER = None  # SqliteCronStore partilhado pelos leitores (criar a tabela/verificar só 1x)
+
+
+def _sqlite_reader():
+    global _READER
+    if _READER is None:
+        from zapista.cron.sqlite_store import SqliteCronStore
+        _READER = SqliteCronStore()
+    return _READER
+
+
+def load_jobs_raw(store_path: Path) -> list[dict[str, Any]]:
+    """Jobs (dicts camelCase) do backend ativo, para leitores fora do CronService (comandos admin, métricas)."""
+    if cron_store_kind() == "sqlite":
+        return _sqlite_reader().load()[1]
+    from zapista.cron.journal import load_jobs_raw as _load_json
+    return _load_json(store_path)[1]
+
+
+def load_jobs_between(store_path: Path, start_ms: int, end_ms: int) -> list[dict[str, Any]]:
+    """Jobs ativos com nextRunAtMs em [start_ms, end_ms]. Com sqlite é uma consulta indexada; com json filtra o store."""
+    if cron_store_kind() == "sqlite":
+        return _sqlite_reader().jobs_between(start_ms, end_ms)
+    jobs = [
+        j for j in load_jobs_raw(store_path)
+        if j.get("enabled", True) and start_ms <= ((j.get("state") or {}).get("nextRunAtMs") or 0) <= end_ms
+    ]
+    return sorted(jobs, key=lambda j: j["state"]["nextRunAtMs"])
+
+
+def store_available(store_path: Path) -> bool:
+    """Há jobs persistidos a ler? (jobs.json existe, ou backend sqlite)."""
+    return cron_store_kind() == "sqlite" or store_path.exists()
@@ -62,6 +62,21 @@ def _provider_from_model(model: str) -> str:
     return "other"
 
 
+def _cached_prompt_tokens(usage: Any) -> int:
+    """Tokens do prompt servidos pela cache do provedor (prefix caching), nos vários formatos do LiteLLM."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached is None and isinstance(details, dict):
+        cached = details.get("cached_tokens")
+    for attr in ("prompt_cache_hit_tokens", "cache_read_input_tokens"):  # DeepSeek, Anthropic
+        if not cached:
+            cached = getattr(usage, attr, None)
+    try:
+        return int(cached or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
 class LiteLLMProvider(LLMProvider):
     """
     LLM provider using LiteLLM for multi-provider support.
@@ -226,6 +241,7 @@ class LiteLLMProvider(LLMProvider):
                             model=model,
                             input_tokens=inp,
                             output_tokens=out,
+                            cached_tokens=parsed.usage.get("cached_tokens") or 0,
                         )
                     except Exception:
                         pass
@@ -268,6 +284,7 @@ class LiteLLMProvider(LLMProvider):
                 "prompt_tokens": getattr(response.usage, "prompt_tokens", 0) or 0,
                 "completion_tokens": getattr(response.usage, "completion_tokens", 0) or 0,
                 "total_tokens": getattr(response.usage, "total_tokens", 0) or 0,
+                "cached_tokens": _cached_prompt_tokens(response.usage),
             }
         
         return LLMResponse(
@@ -1,6 +1,10 @@
 """Session management for conversation history."""
 
+import atexit
 import json
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -9,7 +13,7 @@ from typing import Any
 from backend.logger import get_logger
 logger = get_logger(__name__)
 
-from zapista.utils.helpers import ensure_dir, safe_filename
+from zapista.utils.helpers import ensure_dir, env_float, env_int, safe_filename
 
 
 @dataclass
@@ -110,17 +114,69 @@ class Session:
             self.updated_at = datetime.now()
 
 
+_LAST_MANAGER: "SessionManager | None" = None
+
+
+def get_session_store_stats() -> dict[str, Any] | None:
+    """Contadores do SessionManager do processo (para #system); None se ainda não foi criado."""
+    return _LAST_MANAGER.get_stats() if _LAST_MANAGER is not None else None
+
+
+class _Persisted:
+    """O que já está no ficheiro da sessão: nº de mensagens, 1.ª/última (identidade) e metadata gravada."""
+
+    __slots__ = ("count", "first", "last", "metadata", "bytes")
+
+    def __init__(self, messages: list[dict[str, Any]], metadata_json: str, size: int):
+        self.count = len(messages)
+        self.first = messages[0] if messages else None
+        self.last = messages[-1] if messages else None
+        self.metadata = metadata_json
+        self.bytes = size
+
+    def is_prefix_of(self, messages: list[dict[str, Any]]) -> bool:
+        """True se as mensagens gravadas continuam no início da lista (só houve append)."""
+        if len(messages) < self.count:
+            return False
+        if self.count == 0:
+            return True
+        return messages[0] is self.first and messages[self.count - 1] is self.last
+
+
 class SessionManager:
     """
     Manages conversation sessions.
     
-    Sessions are stored as JSONL files in the sessions directory.
+    Sessions are stored as JSONL files in the sessions directory (metadata line + one line per message).
+    - save() só acrescenta as mensagens novas (e uma linha de metadata se mudou); o ficheiro só é
+      reescrito quando a lista deixa de ser um prolongamento do que foi gravado (resumo em
+      _maybe_compress_session, clear, reset). fsync em lote a cada SESSION_FSYNC_SECONDS (0 = em cada save).
+    - índice compacto (_index.json: key, updated_at, nº de mensagens, última mensagem do utilizador)
+      para list_sessions() sem abrir os ficheiros; reconstruído a partir dos ficheiros se não existir.
+    - cache LRU limitada por SESSION_CACHE_MAX_SESSIONS e SESSION_CACHE_MAX_BYTES (tamanho em disco).
     """
     
-    def __init__(self, workspace: Path):
+    INDEX_FILE = "_index.json"
+
+    def __init__(self, workspace: Path, sessions_dir: Path | None = None):
         self.workspace = workspace
-        self.sessions_dir = ensure_dir(Path.home() / ".zapista" / "sessions")
-        self._cache: dict[str, Session] = {}
+        self.sessions_dir = ensure_dir(sessions_dir or Path.home() / ".zapista" / "sessions")
+        self._cache: OrderedDict[str, Session] = OrderedDict()
+        self._persisted: dict[str, _Persisted] = {}
+        self._cache_bytes = 0
+        self.max_sessions = env_int("SESSION_CACHE_MAX_SESSIONS", 512, lo=1)
+        self.max_bytes = env_int("SESSION_CACHE_MAX_BYTES", 64 * 1024 * 1024, lo=1)
+        self.fsync_seconds = env_float("SESSION_FSYNC_SECONDS", 1.0, lo=0.0)
+        self._lock = threading.Lock()
+        self._unsynced: set[Path] = set()
+        self._index: dict[str, dict[str, Any]] | None = None
+        self._index_dirty = False
+        self._flusher: threading.Thread | None = None
+        self._wake = threading.Event()
+        self.stats = {"appends": 0, "rewrites": 0, "bytes_written": 0, "fsyncs": 0, "loads": 0, "evictions": 0}
+        atexit.register(self.flush)
+        global _LAST_MANAGER
+        _LAST_MANAGER = self
     
     def _get_session_path(self, key: str) -> Path:
         """Get the file path for a session."""
@@ -138,17 +194,45 @@ class SessionManager:
             The session.
         """
         # Check cache
-        if key in self._cache:
-            return self._cache[key]
+        session = self._cache.get(key)
+        if session is not None:
+            self._cache.move_to_end(key)
+            return session
         
         # Try to load from disk
         session = self._load(key)
         if session is None:
             session = Session(key=key)
+            self._set_persisted(key, None)
         
-        self._cache[key] = session
+        self._remember(session)
         return session
-    
+
+    # --- cache LRU ---
+
+    def _set_persisted(self, key: str, persisted: _Persisted | None) -> None:
+        old = self._persisted.pop(key, None)
+        if old is not None and key in self._cache:
+            self._cache_bytes -= old.bytes
+        if persisted is not None:
+            self._persisted[key] = persisted
+            if key in self._cache:
+                self._cache_bytes += persisted.bytes
+
+    def _remember(self, session: Session) -> None:
+        key = session.key
+        if key not in self._cache:
+            persisted = self._persisted.get(key)
+            self._cache_bytes += persisted.bytes if persisted is not None else 0
+        self._cache[key] = session
+        self._cache.move_to_end(key)
+        while len(self._cache) > 1 and (len(self._cache) > self.max_sessions or self._cache_bytes > self.max_bytes):
+            old_key, _ = self._cache.popitem(last=False)
+            old = self._persisted.pop(old_key, None)  # objeto fora da cache: próximo save reescreve
+            if old is not None:
+                self._cache_bytes -= old.bytes
+            self.stats["evictions"] += 1
+
     def _load(self, key: str) -> Session | None:
         """Load a session from disk."""
         path = self._get_session_path(key)
@@ -160,9 +244,11 @@ class SessionManager:
             messages = []
             metadata = {}
             created_at = None
+            size = 0
             
             with open(path) as f:
                 for line in f:
+                    size += len(line)
                     line = line.strip()
                     if not line:
                         continue
@@ -170,40 +256,178 @@ class SessionManager:
                     data = json.loads(line)
                     
                     if data.get("_type") == "metadata":
+                        # Linhas de metadata acrescentadas depois: a última ganha
                         metadata = data.get("metadata", {})
-                        created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
+                        created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else created_at
                     else:
                         messages.append(data)
             
-            return Session(
+            session = Session(
                 key=key,
                 messages=messages,
                 created_at=created_at or Session._get_now(),
                 metadata=metadata
             )
+            self._set_persisted(key, _Persisted(messages, json.dumps(metadata, sort_keys=True), size))
+            self.stats["loads"] += 1
+            return session
         except Exception as e:
             logger.warning("session_load_failed", extra={"extra": {"key": key, "error": str(e)}})
             return None
+
+    @staticmethod
+    def _metadata_line(session: Session) -> str:
+        return json.dumps({
+            "_type": "metadata",
+            "created_at": session.created_at.isoformat(),
+            "updated_at": session.updated_at.isoformat(),
+            "metadata": session.metadata
+        }) + "\n"
     
     def save(self, session: Session) -> None:
-        """Save a session to disk."""
+        """Save a session to disk: append das mensagens novas, ou reescrita se a lista foi truncada/substituída."""
         path = self._get_session_path(session.key)
-        
-        with open(path, "w") as f:
-            # Write metadata first
-            metadata_line = {
-                "_type": "metadata",
+        metadata_json = json.dumps(session.metadata, sort_keys=True)
+        persisted = self._persisted.get(session.key)
+        cached = self._cache.get(session.key)
+        if cached is not None and cached is not session:
+            persisted = None  # outro objeto para a mesma chave (ex.: evicted e recarregado)
+
+        if persisted is not None and path.exists() and persisted.is_prefix_of(session.messages):
+            new = session.messages[persisted.count:]
+            chunk = "".join(json.dumps(m) + "\n" for m in new)
+            if metadata_json != persisted.metadata:
+                chunk += self._metadata_line(session)
+            if chunk:
+                with open(path, "a") as f:
+                    f.write(chunk)
+                self.stats["appends"] += 1
+            size = persisted.bytes + len(chunk)
+        else:
+            chunk = self._metadata_line(session) + "".join(json.dumps(m) + "\n" for m in session.messages)
+            tmp = path.with_name(path.name + ".tmp")
+            with open(tmp, "w") as f:
+                f.write(chunk)
+            os.replace(tmp, path)
+            self.stats["rewrites"] += 1
+            size = len(chunk)
+
+        self.stats["bytes_written"] += len(chunk)
+        self._set_persisted(session.key, _Persisted(session.messages, metadata_json, size))
+        self._remember(session)
+        self._touch_index(session, path)
+        if chunk:
+            self._schedule_fsync(path)
+
+    # --- fsync em lote + índice ---
+
+    def _schedule_fsync(self, path: Path) -> None:
+        if self.fsync_seconds <= 0:
+            self._fsync(path)
+            return
+        with self._lock:
+            self._unsynced.add(path)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="session-fsync", daemon=True)
+                self._flusher.start()
+
+    def _fsync(self, path: Path) -> None:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return
+        try:
+            os.fsync(fd)
+            self.stats["fsyncs"] += 1
+        finally:
+            os.close(fd)
+
+    def _flush_loop(self) -> None:
+        while not self._wake.wait(self.fsync_seconds):
+            self.flush()
+
+    def flush(self) -> None:
+        """fsync dos ficheiros alterados e gravação do índice (thread de fundo, paragem e atexit)."""
+        with self._lock:
+            paths, self._unsynced = self._unsynced, set()
+            index = dict(self._index) if self._index_dirty and self._index is not None else None
+            self._index_dirty = False
+        for path in paths:
+            try:
+                self._fsync(path)
+            except OSError as e:
+                logger.warning("session_fsync_failed", extra={"extra": {"path": str(path), "error": str(e)}})
+        if index is not None:
+            try:
+                target = self.sessions_dir / self.INDEX_FILE
+                tmp = target.with_name(target.name + ".tmp")
+                tmp.write_text(json.dumps(index, separators=(",", ":")))
+                os.replace(tmp, target)
+            except OSError as e:
+                logger.warning("session_index_write_failed", extra={"extra": {"error": str(e)}})
+                with self._lock:
+                    self._index_dirty = True
+
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        """Índice por nome do ficheiro (stem); "key" é a chave real da sessão quando já foi gravada."""
+        if self._index is not None:
+            return self._index
+        index: dict[str, dict[str, Any]] | None = None
+        path = self.sessions_dir / self.INDEX_FILE
+        if path.exists():
+            try:
+                data = json.loads(path.read_text())
+                index = data if isinstance(data, dict) else None
+            except Exception:
+                index = None
+        if index is None:
+            index = self._scan_index()
+            self._index_dirty = True
+        self._index = index
+        return index
+
+    def _scan_index(self) -> dict[str, dict[str, Any]]:
+        """Índice a partir dos ficheiros (1.ª vez, ou _index.json perdido)."""
+        index: dict[str, dict[str, Any]] = {}
+        for path in self.sessions_dir.glob("*.jsonl"):
+            try:
+                entry = {"key": path.stem.replace("_", ":"), "created_at": None, "updated_at": None,
+                         "messages": 0, "last_user_at": None, "path": str(path)}
+                with open(path) as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        data = json.loads(line)
+                        if data.get("_type") == "metadata":
+                            entry["created_at"] = entry["created_at"] or data.get("created_at")
+                            entry["updated_at"] = data.get("updated_at") or entry["updated_at"]
+                        else:
+                            entry["messages"] += 1
+                            if data.get("role") == "user" and data.get("timestamp"):
+                                entry["last_user_at"] = data["timestamp"]
+                index[path.stem] = entry
+            except Exception:
+                continue
+        return index
+
+    def _touch_index(self, session: Session, path: Path) -> None:
+        last_user_at = None
+        for m in reversed(session.messages):
+            if m.get("role") == "user":
+                last_user_at = m.get("timestamp")
+                break
+        with self._lock:
+            index = self._load_index()
+            index[path.stem] = {
+                "key": session.key,
                 "created_at": session.created_at.isoformat(),
                 "updated_at": session.updated_at.isoformat(),
-                "metadata": session.metadata
+                "messages": len(session.messages),
+                "last_user_at": last_user_at,
+                "path": str(path),
             }
-            f.write(json.dumps(metadata_line) + "\n")
-            
-            # Write messages
-            for msg in session.messages:
-                f.write(json.dumps(msg) + "\n")
-        
-        self._cache[session.key] = session
+            self._index_dirty = True
     
     def delete(self, key: str) -> bool:
         """
@@ -216,10 +440,16 @@ class SessionManager:
             True if deleted, False if not found.
         """
         # Remove from cache
+        self._set_persisted(key, None)
         self._cache.pop(key, None)
         
         # Remove file
         path = self._get_session_path(key)
+        with self._lock:
+            index = self._load_index()
+            if index.pop(path.stem, None) is not None:
+                self._index_dirty = True
+            self._unsynced.discard(path)
         if path.exists():
             path.unlink()
             return True
@@ -227,28 +457,20 @@ class SessionManager:
     
     def list_sessions(self) -> list[dict[str, Any]]:
         """
-        List all sessions.
+        List all sessions (a partir do índice; não abre os ficheiros).
         
         Returns:
-            List of session info dicts.
+            List of session info dicts (key, created_at, updated_at, messages, last_user_at, path).
         """
-        sessions = []
-        
-        for path in self.sessions_dir.glob("*.jsonl"):
-            try:
-                # Read just the metadata line
-                with open(path) as f:
-                    first_line = f.readline().strip()
-                    if first_line:
-                        data = json.loads(first_line)
-                        if data.get("_type") == "metadata":
-                            sessions.append({
-                                "key": path.stem.replace("_", ":"),
-                                "created_at": data.get("created_at"),
-                                "updated_at": data.get("updated_at"),
-                                "path": str(path)
-                            })
-            except Exception:
-                continue
-        
-        return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+        with self._lock:
+            sessions = [dict(entry) for entry in self._load_index().values()]
+        return sorted(sessions, key=lambda x: x.get("updated_at") or "", reverse=True)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Contadores de gravação e da cache (para #system)."""
+        return {
+            **self.stats,
+            "cached": len(self._cache),
+            "cached_bytes": self._cache_bytes,
+            "indexed": len(self._index) if self._index is not None else None,
+        }
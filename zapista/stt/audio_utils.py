@@ -1,36 +1,63 @@
-"""Audio utilities: base64 decoding, ffmpeg conversion, duration validation."""
+"""Audio utilities: base64 decoding, ffmpeg conversion, duration validation.
 
+preprocess_audio: etapa única e assíncrona para o STT — decodifica o base64 uma vez para memória,
+lê a duração dos cabeçalhos OGG (Opus/Vorbis) sem ffprobe e converte para PCM 16 kHz mono com
+ffmpeg (OGG via pipes, sem ficheiros temporários; MP4/M4A e outros via ficheiro temporário, que
+precisam de seek), limitado por STT_PREPROCESS_MAX_CONCURRENT.
+"""
+
+import asyncio
 import base64
+import io
 import os
+import struct
 import subprocess
 import tempfile
+import wave
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from backend.logger import get_logger
+from zapista.utils.helpers import env_int
 logger = get_logger(__name__)
 
 # Duração máxima em segundos — comandos de voz devem ser sucintos
 MAX_DURATION_SEC = 60
 
 
-def decode_base64_to_temp(
-    b64: str, suffix: str = ".ogg", mimetype: str | None = None
-) -> Path | None:
-    """Decodifica base64 e grava num ficheiro temporário. Retorna o path ou None."""
+def _suffix_for_mimetype(mimetype: str | None, default: str = ".ogg") -> str:
     if mimetype:
         import mimetypes
         # Sanitize mimetype (e.g. "audio/ogg; codecs=opus" -> "audio/ogg")
         clean_mime = mimetype.split(";")[0].strip().lower()
         ext = mimetypes.guess_extension(clean_mime)
         if ext:
-            suffix = ext
+            return ext
+    return default
+
+
+def decode_base64(b64: str) -> bytes | None:
+    """Decodifica base64 para bytes. None se inválido ou vazio."""
     try:
         data = base64.b64decode(b64, validate=True)
     except Exception as e:
         logger.warning(f"Invalid base64 audio: {e}")
         return None
+    return data or None
+
+
+def decode_base64_to_temp(
+    b64: str, suffix: str = ".ogg", mimetype: str | None = None
+) -> Path | None:
+    """Decodifica base64 e grava num ficheiro temporário. Retorna o path ou None."""
+    suffix = _suffix_for_mimetype(mimetype, suffix)
+    data = decode_base64(b64)
     if not data:
         return None
+    return _write_temp(data, suffix)
+
+
+def _write_temp(data: bytes, suffix: str) -> Path | None:
     try:
         fd, path = tempfile.mkstemp(suffix=suffix)
         try:
@@ -79,45 +106,179 @@ def convert_to_wav_mono_16k(path: Path, out_path: Path) -> bool:
         return False
 
 
-def check_audio_duration(audio_base64: str, mimetype: str | None = None) -> str | None:
+def ogg_duration_seconds(data: bytes) -> float | None:
     """
-    Valida duração do áudio. Retorna None se OK, ou chave de erro ("AUDIO_TOO_LONG")
-    para o gateway mapear ao idioma do utilizador.
+    Duração de um stream OGG (Opus ou Vorbis) lida dos cabeçalhos das páginas, sem ffprobe:
+    granule position da última página do primeiro stream ÷ sample rate (Opus: 48 kHz menos pre-skip).
+    None se não for OGG ou o codec não for reconhecido.
     """
-    inp = decode_base64_to_temp(audio_base64, mimetype=mimetype)
-    if not inp:
-        return None  # erro técnico; gateway usa mensagem genérica
-    try:
-        dur = get_duration_seconds(inp)
-        if dur is not None and dur > MAX_DURATION_SEC:
-            return "AUDIO_TOO_LONG"
+    if data[:4] != b"OggS":
+        return None
+    pos = 0
+    serial = None
+    rate = 0
+    pre_skip = 0
+    last_granule = -1
+    n = len(data)
+    while pos + 27 <= n and data[pos : pos + 4] == b"OggS":
+        granule, page_serial = struct.unpack_from("<qI", data, pos + 6)
+        nsegs = data[pos + 26]
+        body_start = pos + 27 + nsegs
+        if body_start > n:
+            break
+        body_len = sum(data[pos + 27 : body_start])
+        if serial is None:
+            serial = page_serial
+            head = data[body_start : body_start + body_len]
+            if head[:8] == b"OpusHead" and len(head) >= 12:
+                rate = 48000
+                pre_skip = struct.unpack_from("<H", head, 10)[0]
+            elif head[:7] == b"\x01vorbis" and len(head) >= 16:
+                rate = struct.unpack_from("<I", head, 12)[0]
+            else:
+                return None
+        if page_serial == serial and granule >= 0:
+            last_granule = granule
+        pos = body_start + body_len
+    if not rate or last_granule < 0:
+        return None
+    return max(0, last_granule - pre_skip) / rate
+
+
+def audio_duration_seconds(data: bytes, suffix: str = ".ogg") -> float | None:
+    """Duração de áudio em memória: cabeçalhos OGG; outros formatos via ffprobe (bloqueante)."""
+    dur = ogg_duration_seconds(data)
+    if dur is not None:
+        return dur
+    tmp = _write_temp(data, suffix)
+    if not tmp:
         return None
+    try:
+        return get_duration_seconds(tmp)
     finally:
         try:
-            inp.unlink(missing_ok=True)
+            tmp.unlink(missing_ok=True)
         except OSError:
             pass
 
 
-def prepare_audio_for_whisper(audio_base64: str, mimetype: str | None = None) -> Path | None:
+def check_audio_duration(audio_base64: str, mimetype: str | None = None) -> str | None:
     """
-    Base64 -> temp OGG -> (opcional) valida duração -> converte para WAV mono 16kHz.
-    Retorna path do WAV ou None.
+    Valida duração do áudio. Retorna None se OK, ou chave de erro ("AUDIO_TOO_LONG")
+    para o gateway mapear ao idioma do utilizador.
     """
-    inp = decode_base64_to_temp(audio_base64, mimetype=mimetype)
-    if not inp:
-        return None
-    try:
-        dur = get_duration_seconds(inp)
-        if dur is not None and dur > MAX_DURATION_SEC:
-            logger.warning(f"Audio too long: {dur:.0f}s > {MAX_DURATION_SEC}s")
+    data = decode_base64(audio_base64)
+    if not data:
+        return None  # erro técnico; gateway usa mensagem genérica
+    dur = audio_duration_seconds(data, _suffix_for_mimetype(mimetype))
+    if dur is not None and dur > MAX_DURATION_SEC:
+        return "AUDIO_TOO_LONG"
+    return None
+
+
+_PCM_SEM: asyncio.Semaphore | None = None
+
+
+def _pcm_semaphore() -> asyncio.Semaphore:
+    global _PCM_SEM
+    if _PCM_SEM is None:
+        _PCM_SEM = asyncio.Semaphore(env_int("STT_PREPROCESS_MAX_CONCURRENT", 2, lo=1))
+    return _PCM_SEM
+
+
+def pcm_to_wav(pcm: bytes, rate: int = 16000) -> bytes:
+    """Envolve PCM s16le mono num contentor WAV (em memória)."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm)
+    return buf.getvalue()
+
+
+async def convert_to_wav_mono_16k_bytes(data: bytes, timeout: float = 60.0, suffix: str = ".ogg") -> bytes | None:
+    """
+    Áudio em memória → WAV mono 16 kHz em memória. ffmpeg escreve PCM cru no stdout (cabeçalho WAV
+    montado aqui: um WAV em pipe não tem tamanhos válidos). Não bloqueia o event loop.
+    OGG é lido do stdin; outros contentores vão para um ficheiro temporário (com seek): um MP4/M4A
+    com o átomo moov no fim (áudio reencaminhado do iOS) não se lê de um pipe.
+    """
+    tmp: Path | None = None
+    if data[:4] == b"OggS":
+        source, stdin_data = "pipe:0", data
+    else:
+        tmp = await asyncio.get_running_loop().run_in_executor(None, _write_temp, data, suffix)
+        if tmp is None:
             return None
-        out = inp.with_suffix(".wav")
-        if convert_to_wav_mono_16k(inp, out):
-            return out
-        return None
+        source, stdin_data = str(tmp), None
+    try:
+        async with _pcm_semaphore():
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    "ffmpeg", "-v", "error", "-i", source,
+                    "-ac", "1", "-ar", "16000", "-f", "s16le", "-acodec", "pcm_s16le", "pipe:1",
+                    stdin=asyncio.subprocess.PIPE if stdin_data is not None else asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except FileNotFoundError as e:
+                logger.warning(f"ffmpeg convert failed: {e}")
+                return None
+            try:
+                pcm, err = await asyncio.wait_for(proc.communicate(stdin_data), timeout=timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                logger.warning(f"ffmpeg convert failed: timeout after {timeout:.0f}s")
+                return None
     finally:
-        try:
-            inp.unlink(missing_ok=True)
-        except OSError:
-            pass
+        if tmp is not None:
+            tmp.unlink(missing_ok=True)
+    if proc.returncode != 0 or not pcm:
+        logger.warning(f"ffmpeg convert failed: rc={proc.returncode} {(err or b'')[:200].decode('utf-8', 'replace')}")
+        return None
+    return pcm_to_wav(pcm)
+
+
+@dataclass
+class PreparedAudio:
+    """Áudio decodificado uma vez; partilhado entre validação, whisper local e fallbacks."""
+
+    data: bytes
+    suffix: str
+    mimetype: str
+    duration: float | None
+    _wav: bytes | None = field(default=None, repr=False)
+    _wav_done: bool = field(default=False, repr=False)
+
+    @property
+    def too_long(self) -> bool:
+        return self.duration is not None and self.duration > MAX_DURATION_SEC
+
+    @property
+    def filename(self) -> str:
+        return f"audio{self.suffix}"
+
+    async def wav_16k(self) -> bytes | None:
+        """WAV mono 16 kHz (convertido na primeira chamada; reutilizado depois)."""
+        if not self._wav_done:
+            self._wav = await convert_to_wav_mono_16k_bytes(self.data, suffix=self.suffix)
+            self._wav_done = True
+        return self._wav
+
+
+async def preprocess_audio(audio_base64: str, mimetype: str | None = None) -> PreparedAudio | None:
+    """
+    Base64 → bytes (uma vez) → duração. None se o base64 for inválido.
+    OGG é lido nos cabeçalhos; outros formatos usam ffprobe numa thread.
+    """
+    data = decode_base64((audio_base64 or "").strip())
+    if not data:
+        return None
+    suffix = _suffix_for_mimetype(mimetype)
+    duration = ogg_duration_seconds(data)
+    if duration is None:
+        duration = await asyncio.get_running_loop().run_in_executor(None, audio_duration_seconds, data, suffix)
+    clean_mime = (mimetype or "audio/ogg").split(";")[0].strip().lower() or "audio/ogg"
+    return PreparedAudio(data=data, suffix=suffix, mimetype=clean_mime, duration=duration)
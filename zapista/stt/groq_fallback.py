@@ -1,39 +1,36 @@
 """Fallback de transcrição com Groq Whisper API."""
 
-from pathlib import Path
-
-import httpx
 from backend.logger import get_logger
 logger = get_logger(__name__)
 
-from zapista.stt.audio_utils import decode_base64_to_temp, get_duration_seconds
+from zapista.stt.audio_utils import PreparedAudio, preprocess_audio
 from zapista.stt.config import groq_api_key
-
-MAX_DURATION_SEC = 60
+from zapista.utils.http_clients import upstream_request
 
 
-async def transcribe_groq(audio_base64: str) -> str:
+async def transcribe_groq(audio_base64: str, audio: PreparedAudio | None = None) -> str:
     """Transcreve áudio usando Groq Whisper API (rápido, tier gratuito)."""
     key = groq_api_key()
     if not key:
         logger.debug("Groq API key not set, skipping Groq fallback")
         return ""
-    inp = decode_base64_to_temp(audio_base64)
-    if not inp:
+    if audio is None:
+        audio = await preprocess_audio(audio_base64)
+    if audio is None:
+        return ""
+    if audio.too_long:
+        logger.warning(f"Audio too long for Groq: {audio.duration:.0f}s")
         return ""
     try:
-        dur = get_duration_seconds(inp)
-        if dur is not None and dur > MAX_DURATION_SEC:
-            logger.warning(f"Audio too long for Groq: {dur:.0f}s")
-            return ""
-        with open(inp, "rb") as f:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                r = await client.post(
-                    "https://api.groq.com/openai/v1/audio/transcriptions",
-                    headers={"Authorization": f"Bearer {key}"},
-                    files={"file": (inp.name, f, "audio/ogg")},
-                    data={"model": "whisper-large-v3"},
-                )
+        r = await upstream_request(
+            "groq",
+            "POST",
+            "https://api.groq.com/openai/v1/audio/transcriptions",
+            headers={"Authorization": f"Bearer {key}"},
+            files={"file": (audio.filename, audio.data, "audio/ogg")},
+            data={"model": "whisper-large-v3"},
+            timeout=60.0,
+        )
         if r.status_code != 200:
             logger.warning(f"Groq Whisper error {r.status_code}: {r.text[:200]}")
             return ""
@@ -43,8 +40,3 @@ async def transcribe_groq(audio_base64: str) -> str:
     except Exception as e:
         logger.warning(f"Groq Whisper failed: {e}")
         return ""
-    finally:
-        try:
-            inp.unlink(missing_ok=True)
-        except OSError:
-            pass
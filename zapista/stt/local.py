@@ -1,29 +1,43 @@
 """Cliente HTTP para whisper.cpp server."""
 
-import httpx
 from backend.logger import get_logger
 logger = get_logger(__name__)
 
-from zapista.stt.audio_utils import prepare_audio_for_whisper
+from zapista.stt.audio_utils import PreparedAudio, preprocess_audio
+from zapista.utils.http_clients import upstream_request
 
 
-async def transcribe_local(audio_base64: str, base_url: str, mimetype: str | None = None) -> str:
+async def transcribe_local(
+    audio_base64: str,
+    base_url: str,
+    mimetype: str | None = None,
+    audio: PreparedAudio | None = None,
+) -> str:
     """
     Envia áudio ao whisper.cpp e devolve texto transcrito.
     base_url: ex. http://stt:8080 (sem /inference)
+    audio: áudio já preprocessado (evita decodificar o base64 de novo); WAV enviado da memória.
     """
-    wav_path = prepare_audio_for_whisper(audio_base64, mimetype=mimetype)
-    if not wav_path:
+    if audio is None:
+        audio = await preprocess_audio(audio_base64, mimetype=mimetype)
+    if audio is None:
+        return ""
+    if audio.too_long:
+        logger.warning(f"Audio too long: {audio.duration:.0f}s")
+        return ""
+    wav = await audio.wav_16k()
+    if not wav:
         return ""
     try:
         url = base_url.rstrip("/") + "/inference"
-        with open(wav_path, "rb") as f:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                r = await client.post(
-                    url,
-                    files={"file": (wav_path.name, f, "audio/wav")},
-                    data={"response_format": "json"},
-                )
+        r = await upstream_request(
+            "whisper",
+            "POST",
+            url,
+            files={"file": ("audio.wav", wav, "audio/wav")},
+            data={"response_format": "json"},
+            timeout=60.0,
+        )
         if r.status_code != 200:
             logger.warning(f"whisper.cpp error {r.status_code}: {r.text[:200]}")
             return ""
@@ -34,8 +48,3 @@ async def transcribe_local(audio_base64: str, base_url: str, mimetype: str | Non
     except Exception as e:
         logger.warning(f"whisper.cpp request failed: {e}")
         return ""
-    finally:
-        try:
-            wav_path.unlink(missing_ok=True)
-        except OSError:
-            pass
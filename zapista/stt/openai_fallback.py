@@ -1,41 +1,40 @@
 """Fallback de transcrição com OpenAI Whisper API."""
 
-import base64
-import tempfile
-from pathlib import Path
-
-import httpx
 from backend.logger import get_logger
 logger = get_logger(__name__)
 
-from zapista.stt.audio_utils import decode_base64_to_temp, get_duration_seconds
+from zapista.stt.audio_utils import PreparedAudio, preprocess_audio
 from zapista.stt.config import openai_api_key
-
-MAX_DURATION_SEC = 60
+from zapista.utils.http_clients import upstream_request
 
 
-async def transcribe_openai(audio_base64: str, mimetype: str | None = None) -> str:
-    """Transcreve áudio usando OpenAI Whisper API."""
+async def transcribe_openai(
+    audio_base64: str,
+    mimetype: str | None = None,
+    audio: PreparedAudio | None = None,
+) -> str:
+    """Transcreve áudio usando OpenAI Whisper API (envia o original, sem conversão)."""
     key = openai_api_key()
     if not key:
         logger.debug("OpenAI API key not set, skipping Whisper fallback")
         return ""
-    inp = decode_base64_to_temp(audio_base64, mimetype=mimetype)
-    if not inp:
+    if audio is None:
+        audio = await preprocess_audio(audio_base64, mimetype=mimetype)
+    if audio is None:
+        return ""
+    if audio.too_long:
+        logger.warning(f"Audio too long for OpenAI: {audio.duration:.0f}s")
         return ""
     try:
-        dur = get_duration_seconds(inp)
-        if dur is not None and dur > MAX_DURATION_SEC:
-            logger.warning(f"Audio too long for OpenAI: {dur:.0f}s")
-            return ""
-        with open(inp, "rb") as f:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                r = await client.post(
-                    "https://api.openai.com/v1/audio/transcriptions",
-                    headers={"Authorization": f"Bearer {key}"},
-                    files={"file": (inp.name, f, mimetype or "audio/ogg")},
-                    data={"model": "whisper-1"},
-                )
+        r = await upstream_request(
+            "openai",
+            "POST",
+            "https://api.openai.com/v1/audio/transcriptions",
+            headers={"Authorization": f"Bearer {key}"},
+            files={"file": (audio.filename, audio.data, audio.mimetype)},
+            data={"model": "whisper-1"},
+            timeout=60.0,
+        )
         if r.status_code != 200:
             logger.warning(f"OpenAI Whisper error {r.status_code}: {r.text[:200]}")
             return ""
@@ -45,8 +44,3 @@ async def transcribe_openai(audio_base64: str, mimetype: str | None = None) -> s
     except Exception as e:
         logger.warning(f"OpenAI Whisper failed: {e}")
         return ""
-    finally:
-        try:
-            inp.unlink(missing_ok=True)
-        except OSError:
-            pass
@@ -3,27 +3,37 @@
 from backend.logger import get_logger
 logger = get_logger(__name__)
 
+from zapista.stt.audio_utils import PreparedAudio, preprocess_audio
 from zapista.stt.config import openai_api_key, stt_enabled, stt_local_url
 from zapista.stt.local import transcribe_local
 from zapista.stt.openai_fallback import transcribe_openai
 
 
-async def transcribe(audio_base64: str, mimetype: str | None = None) -> str:
+async def transcribe(
+    audio_base64: str,
+    mimetype: str | None = None,
+    audio: PreparedAudio | None = None,
+) -> str:
     """
     Transcreve áudio base64 (OGG/Opus PTT WhatsApp ou outro formato) em texto.
     Ordem: whisper.cpp local → OpenAI (OPENAI_API_KEY do install_vps.sh).
+    audio: resultado de preprocess_audio já feito pelo canal (o base64 é decodificado uma só vez).
     """
     if not stt_enabled():
         return ""
-    if not (audio_base64 or "").strip():
-        return ""
+    if audio is None:
+        if not (audio_base64 or "").strip():
+            return ""
+        audio = await preprocess_audio(audio_base64, mimetype=mimetype)
+        if audio is None:
+            return ""
     local_url = stt_local_url()
     if local_url:
-        text = await transcribe_local(audio_base64, local_url, mimetype=mimetype)
+        text = await transcribe_local(audio_base64, local_url, mimetype=mimetype, audio=audio)
         if text:
             return text
     if openai_api_key():
-        text = await transcribe_openai(audio_base64, mimetype=mimetype)
+        text = await transcribe_openai(audio_base64, mimetype=mimetype, audio=audio)
         if text:
             return text
     logger.warning("No STT provider succeeded")
@@ -0,0 +1,140 @@
+"""
+Cache em disco de voice notes (OGG Opus) endereçada por conteúdo.
+
+Chave: sha256 de (texto já normalizado por prepare_text_for_tts, modelo de voz, locale). Inclui o
+mtime/tamanho do ficheiro do modelo, para que trocar a voz no mesmo caminho não sirva áudio antigo.
+Um lembrete recorrente em áudio só passa pelo Piper/ffmpeg na primeira vez.
+
+LRU pelo mtime dos ficheiros (tocado em cada hit); acima de TTS_CACHE_MAX_MB remove os mais antigos.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+
+from backend.logger import get_logger
+logger = get_logger(__name__)
+
+from zapista.tts.config import tts_cache_dir, tts_cache_max_mb
+
+
+def _model_fingerprint(model_path: str) -> str:
+    try:
+        st = os.stat(model_path)
+        return f"{model_path}:{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        return model_path
+
+
+class VoiceNoteCache:
+    """Ficheiros <chave>.ogg num directório, com limite de tamanho e remoção LRU."""
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._total: int | None = None  # bytes em disco (calculado no primeiro uso)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(text: str, model_path: str, locale: str) -> str:
+        raw = "\0".join((locale, _model_fingerprint(model_path), text))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.ogg"
+
+    def get(self, key: str) -> Path | None:
+        """Caminho do OGG em cache (e marca-o como usado agora), ou None."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def put(self, key: str, src: Path) -> None:
+        """Guarda uma cópia de src (hardlink quando possível); o original continua válido para envio."""
+        if not self.enabled:
+            return
+        try:
+            size = src.stat().st_size
+            if size <= 0 or size > self.max_bytes:
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.root / f".{key}.{uuid.uuid4().hex[:8]}.tmp"
+            try:
+                os.link(src, tmp)
+            except OSError:
+                shutil.copyfile(src, tmp)
+            dest = self._path(key)
+            existed = dest.exists()
+            os.replace(tmp, dest)
+        except OSError as e:
+            logger.debug(f"TTS cache put failed: {e}")
+            return
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan_total()
+            elif not existed:
+                self._total += size
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _scan_total(self) -> int:
+        total = 0
+        for p in self.root.glob("*.ogg"):
+            try:
+                total += p.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _evict(self) -> None:
+        """Remove os menos usados até ficar a 90% do limite (chamar com _lock)."""
+        entries = []
+        for p in self.root.glob("*.ogg"):
+            try:
+                st = p.stat()
+                entries.append((st.st_mtime, st.st_size, p))
+            except OSError:
+                pass
+        entries.sort()
+        total = sum(e[1] for e in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, p in entries:
+            if total <= target:
+                break
+            try:
+                p.unlink()
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        self._total = total
+        if removed:
+            logger.info("tts_cache_evicted", extra={"extra": {"removed": removed, "bytes": total}})
+
+
+_CACHE: VoiceNoteCache | None = None
+
+
+def get_voice_cache() -> VoiceNoteCache:
+    """Cache do processo, configurada por TTS_CACHE_DIR / TTS_CACHE_MAX_MB."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = VoiceNoteCache(Path(tts_cache_dir()), int(tts_cache_max_mb() * 1024 * 1024))
+    return _CACHE
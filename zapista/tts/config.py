@@ -2,6 +2,8 @@
 
 import os
 
+from zapista.utils.helpers import env_float
+
 
 def tts_enabled() -> bool:
     """True se TTS estiver ativa. Se TTS_ENABLED não estiver definido, ativa quando Piper estiver configurado."""
@@ -48,3 +50,14 @@ def piper_bin() -> str | None:
     """Path do binário Piper (ex.: /usr/local/bin/piper). None se não configurado."""
     path = (os.environ.get("PIPER_BIN", "") or "").strip()
     return path if path else None
+
+
+def tts_cache_dir() -> str:
+    """Directório da cache de voice notes (OGG por texto+voz), ex.: /root/.zapista/cache/tts."""
+    base = os.environ.get("ZAPISTA_DATA", "") or os.path.expanduser("~/.zapista")
+    return os.environ.get("TTS_CACHE_DIR", "").strip() or os.path.join(base, "cache", "tts")
+
+
+def tts_cache_max_mb() -> float:
+    """Tamanho máximo da cache de voice notes em MB (default 200; 0 = desativada)."""
+    return env_float("TTS_CACHE_MAX_MB", 200.0, lo=0.0)
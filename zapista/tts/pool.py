@@ -0,0 +1,224 @@
+"""
+Pool assíncrono de síntese TTS: Piper + ffmpeg fora do event loop.
+
+- Processos Piper "quentes" por locale (modelo carregado uma vez): recebem uma linha JSON
+  {"text", "output_file"} no stdin (--json-input) e escrevem o caminho do WAV no stdout quando
+  está pronto. Se o processo morrer, não responder, responder com outro caminho ou o pedido for
+  cancelado a meio, é terminado (não fica resposta pendente para o pedido seguinte) e usa-se o
+  Piper de uma só vez (piper_synthesize) numa thread.
+- Concorrência total limitada por TTS_MAX_CONCURRENT; pedidos acima disso esperam na fila até
+  TTS_QUEUE_TIMEOUT_SECONDS (depois: sem áudio, o canal envia texto).
+- TTS_PIPER_WARM_PER_LOCALE: processos quentes por locale (0 = sempre Piper de uma só vez).
+"""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from backend.logger import get_logger
+logger = get_logger(__name__)
+
+from zapista.tts.config import piper_bin, tts_piper_timeout_seconds
+from zapista.utils.helpers import env_float, env_int
+
+
+class _WarmPiper:
+    """Um processo Piper persistente para um modelo; uma síntese de cada vez."""
+
+    def __init__(self, model_path: str, config_path: str):
+        self.model_path = model_path
+        self.config_path = config_path
+        self._proc: asyncio.subprocess.Process | None = None
+        self.busy = False
+        self.ok_count = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    async def _spawn(self) -> None:
+        bin_path = piper_bin()
+        if not bin_path or not Path(bin_path).exists():
+            raise FileNotFoundError(f"Piper binary not found: {bin_path}")
+        cmd = [bin_path, "--model", self.model_path, "--config", self.config_path, "--json-input"]
+        espeak_data = Path(bin_path).parent / "espeak-ng-data"
+        if espeak_data.is_dir():
+            cmd.extend(["--espeak_data", str(espeak_data)])
+        self._proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        logger.info("tts_piper_warm_started", extra={"extra": {"model": Path(self.model_path).name, "pid": self._proc.pid}})
+
+    async def synthesize(self, text: str, output_wav: Path, timeout: float) -> bool:
+        if not self.alive:
+            await self._spawn()
+        assert self._proc and self._proc.stdin and self._proc.stdout
+        line = json.dumps({"text": " ".join(text.split()), "output_file": str(output_wav)}, ensure_ascii=False)
+        try:
+            self._proc.stdin.write((line + "\n").encode("utf-8"))
+            await self._proc.stdin.drain()
+            out = await asyncio.wait_for(self._proc.stdout.readline(), timeout=timeout)
+        except asyncio.CancelledError:
+            # A linha de resposta deste pedido ainda vai chegar: o próximo pedido leria a linha errada
+            self.kill()
+            raise
+        except (asyncio.TimeoutError, BrokenPipeError, ConnectionResetError) as e:
+            logger.warning("tts_piper_warm_failed", extra={"extra": {"error": type(e).__name__, "timeout_s": timeout}})
+            self.kill()
+            return False
+        finally:
+            self.last_used = time.monotonic()
+        if not out:  # EOF: processo morreu
+            self.kill()
+            return False
+        # O Piper responde com o caminho do WAV escrito; outra linha = stdout dessincronizado
+        if out.decode("utf-8", errors="replace").strip() != str(output_wav) or not output_wav.exists():
+            logger.warning("tts_piper_warm_out_of_sync", extra={"extra": {"line": out[:200].decode("utf-8", errors="replace")}})
+            self.kill()
+            return False
+        self.ok_count += 1
+        return True
+
+    def kill(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+        try:
+            asyncio.get_running_loop().create_task(proc.wait())  # recolher o processo (sem zombies)
+        except RuntimeError:
+            pass
+
+
+class TTSPool:
+    """Fila + limite de concorrência para sínteses, com processos Piper quentes por modelo (locale)."""
+
+    def __init__(
+        self,
+        max_concurrent: int | None = None,
+        warm_per_locale: int | None = None,
+        queue_timeout: float | None = None,
+    ):
+        self.max_concurrent = max_concurrent or env_int("TTS_MAX_CONCURRENT", 2, 1, 16)
+        self.warm_per_locale = (
+            env_int("TTS_PIPER_WARM_PER_LOCALE", 1, 0, 8) if warm_per_locale is None else max(0, warm_per_locale)
+        )
+        self.queue_timeout = env_float("TTS_QUEUE_TIMEOUT_SECONDS", 20.0) if queue_timeout is None else queue_timeout
+        self._sem = asyncio.Semaphore(self.max_concurrent)
+        self._warm: dict[str, list[_WarmPiper]] = {}  # model_path -> processos
+        self._warm_disabled: set[str] = set()  # modelos cujo Piper não respondeu em modo --json-input
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _acquire_warm(self, model_path: str, config_path: str) -> _WarmPiper | None:
+        if self.warm_per_locale <= 0 or model_path in self._warm_disabled:
+            return None
+        procs = self._warm.setdefault(model_path, [])
+        for p in procs:
+            if not p.busy:
+                p.busy = True
+                return p
+        if len(procs) < self.warm_per_locale:
+            p = _WarmPiper(model_path, config_path)
+            p.busy = True
+            procs.append(p)
+            return p
+        return None  # todos ocupados: Piper de uma só vez numa thread
+
+    async def _piper(self, text: str, wav_path: Path, model_path: str, config_path: str) -> bool:
+        timeout = tts_piper_timeout_seconds()
+        warm = self._acquire_warm(model_path, config_path)
+        if warm is not None:
+            try:
+                if await warm.synthesize(text, wav_path, timeout):
+                    return True
+                if warm.ok_count == 0:
+                    # Nunca respondeu (Piper sem --json-input?): não voltar a tentar com este modelo
+                    self._warm_disabled.add(model_path)
+            except Exception as e:
+                logger.warning("tts_piper_warm_unavailable", extra={"extra": {"error": str(e)[:200]}})
+                warm.kill()
+                if warm.ok_count == 0:
+                    self._warm_disabled.add(model_path)
+            finally:
+                warm.busy = False
+        from zapista.tts import service
+        return await asyncio.get_running_loop().run_in_executor(
+            None, service.piper_synthesize, text, wav_path, model_path, config_path
+        )
+
+    async def run(self, text: str, wav_path: Path, ogg_path: Path, model_path: str, config_path: str) -> bool:
+        """Piper (WAV) + ffmpeg (OGG) sem bloquear o event loop. False se fila cheia, timeout ou erro."""
+        from zapista.tts import service
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("tts_queue_timeout", extra={"extra": {"waiting": self.waiting, "timeout_s": self.queue_timeout}})
+            self.failed += 1
+            return False
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            if not await self._piper(text, wav_path, model_path, config_path):
+                self.failed += 1
+                return False
+            ok = await asyncio.get_running_loop().run_in_executor(
+                None, service.wav_to_ogg_opus, wav_path, ogg_path, service.tts_max_audio_seconds()
+            )
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            return ok
+        finally:
+            self.running -= 1
+            self._sem.release()
+            service.cleanup_wav(wav_path)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "warm": {Path(m).stem: sum(1 for p in ps if p.alive) for m, ps in self._warm.items()},
+        }
+
+    def close(self) -> None:
+        for procs in self._warm.values():
+            for p in procs:
+                p.kill()
+        self._warm.clear()
+
+
+_POOL: TTSPool | None = None
+
+
+def get_tts_pool() -> TTSPool:
+    """Pool do processo (criado no primeiro uso, dentro do event loop)."""
+    global _POOL
+    if _POOL is None:
+        _POOL = TTSPool()
+    return _POOL
+
+
+def close_tts_pool() -> None:
+    """Termina os processos Piper quentes (paragem do canal)."""
+    global _POOL
+    if _POOL is not None:
+        _POOL.close()
+        _POOL = None
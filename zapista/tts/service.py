@@ -18,6 +18,7 @@ from backend.logger import get_logger
 logger = get_logger(__name__)
 
 from zapista.tts.audio import ensure_tmp_dir, cleanup_wav, wav_to_ogg_opus
+from zapista.tts.cache import get_voice_cache
 from zapista.tts.config import (
     tts_enabled,
     tts_max_audio_seconds,
@@ -110,17 +111,15 @@ def _split_by_words(text: str, max_words: int) -> list[str]:
     return [" ".join(words[i : i + max_words]) for i in range(0, len(words), max_words)]
 
 
-def synthesize_voice_note(
+def _prepare_synthesis(
     reply_text: str,
     chat_id: str,
-    locale_override: str | None = None,
-    phone_for_locale: str | None = None,
-) -> Path | None:
+    locale_override: str | None,
+    phone_for_locale: str | None,
+) -> tuple[str, str, str, str, Path | None] | None:
     """
-    Sintetiza texto em voice note (OGG Opus).
-    locale_override: pedido explícito de idioma (None = usar default do utilizador).
-    phone_for_locale: quando chat_id é LID, número para inferir idioma (ex.: 351910070509 → pt-PT).
-    Retorna path do ficheiro .ogg ou None (fallback para texto).
+    Validação comum (texto, palavras, voz) → (texto, model, config, chave da cache, OGG em cache) ou None.
+    Com OGG em cache não é preciso sintetizar.
     """
     if not tts_enabled():
         return None
@@ -142,10 +141,36 @@ def synthesize_voice_note(
         logger.debug(f"TTS: no voice for locale {locale}")
         return None
 
+    cache = get_voice_cache()
+    key = cache.key(text, model_path, locale)
+    return text, model_path, config_path, key, cache.get(key)
+
+
+def _tmp_paths() -> tuple[Path, Path]:
     base_dir = ensure_tmp_dir(tts_tmp_dir())
     file_id = uuid.uuid4().hex[:12]
-    wav_path = base_dir / f"{file_id}.wav"
-    ogg_path = base_dir / f"{file_id}.ogg"
+    return base_dir / f"{file_id}.wav", base_dir / f"{file_id}.ogg"
+
+
+def synthesize_voice_note(
+    reply_text: str,
+    chat_id: str,
+    locale_override: str | None = None,
+    phone_for_locale: str | None = None,
+) -> Path | None:
+    """
+    Sintetiza texto em voice note (OGG Opus). Bloqueante: no event loop usar synthesize_voice_note_async.
+    locale_override: pedido explícito de idioma (None = usar default do utilizador).
+    phone_for_locale: quando chat_id é LID, número para inferir idioma (ex.: 351910070509 → pt-PT).
+    Retorna path do ficheiro .ogg ou None (fallback para texto).
+    """
+    prepared = _prepare_synthesis(reply_text, chat_id, locale_override, phone_for_locale)
+    if prepared is None:
+        return None
+    text, model_path, config_path, key, cached = prepared
+    if cached is not None:
+        return cached
+    wav_path, ogg_path = _tmp_paths()
 
     if not piper_synthesize(text, wav_path, model_path, config_path):
         return None
@@ -154,8 +179,30 @@ def synthesize_voice_note(
         if not wav_to_ogg_opus(wav_path, ogg_path, tts_max_audio_seconds()):
             return None
         if ogg_path.exists():
+            get_voice_cache().put(key, ogg_path)
             return ogg_path
     finally:
         cleanup_wav(wav_path)
 
     return None
+
+
+async def synthesize_voice_note_async(
+    reply_text: str,
+    chat_id: str,
+    locale_override: str | None = None,
+    phone_for_locale: str | None = None,
+) -> Path | None:
+    """Como synthesize_voice_note, mas Piper/ffmpeg correm no TTSPool (fila, limite, processos quentes)."""
+    prepared = _prepare_synthesis(reply_text, chat_id, locale_override, phone_for_locale)
+    if prepared is None:
+        return None
+    text, model_path, config_path, key, cached = prepared
+    if cached is not None:
+        return cached
+    wav_path, ogg_path = _tmp_paths()
+    from zapista.tts.pool import get_tts_pool
+    if await get_tts_pool().run(text, wav_path, ogg_path, model_path, config_path) and ogg_path.exists():
+        get_voice_cache().put(key, ogg_path)
+        return ogg_path
+    return None
@@ -1,35 +1,25 @@
 """Lista extra de números autorizados (adicionados via #add no god-mode).
 
-Persistida em allowed_extra.json no data dir. Combinada com config allow_from em is_allowed().
+Persistida no KVStore (namespace allowed_extra, chave = dígitos; o allowed_extra.json antigo é
+importado na primeira carga). Combinada com config allow_from em is_allowed().
 """
 
-import json
-from pathlib import Path
+import time
 
+from backend.kv_store import Namespace, read_legacy_json
 from zapista.config.loader import get_data_dir
 
 _FILENAME = "allowed_extra.json"
 
 
-def _path() -> Path:
-    return get_data_dir() / _FILENAME
+def _import_legacy() -> dict[str, float]:
+    data = read_legacy_json(get_data_dir() / _FILENAME)
+    if not isinstance(data, list):
+        return {}
+    return {str(digits): i for i, digits in enumerate(data)}  # valor = ordem de inserção
 
 
-def _load() -> list[str]:
-    p = _path()
-    if not p.exists():
-        return []
-    try:
-        data = json.loads(p.read_text(encoding="utf-8"))
-        return list(data) if isinstance(data, list) else []
-    except (json.JSONDecodeError, OSError):
-        return []
-
-
-def _save(entries: list[str]) -> None:
-    p = _path()
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(entries, ensure_ascii=False, indent=0), encoding="utf-8")
+_allowed = Namespace("allowed_extra", legacy=_import_legacy)
 
 
 def _normalize(phone: str) -> str:
@@ -38,20 +28,16 @@ def _normalize(phone: str) -> str:
 
 
 def get_extra_allowed_list() -> list[str]:
-    """Lista de números adicionados via #add (só dígitos)."""
-    return _load()
+    """Lista de números adicionados via #add (só dígitos), pela ordem de inserção."""
+    return [digits for digits, _ in sorted(_allowed.items(), key=lambda kv: kv[1])]
 
 
 def add_extra_allowed(phone: str) -> bool:
     """Adiciona número à lista. Retorna True se foi adicionado (ainda não estava)."""
     digits = _normalize(phone)
-    if not digits:
+    if not digits or _allowed.get(digits) is not None:
         return False
-    entries = _load()
-    if digits in entries:
-        return False
-    entries.append(digits)
-    _save(entries)
+    _allowed.set(digits, time.time(), sync=True)
     return True
 
 
@@ -60,9 +46,4 @@ def remove_extra_allowed(phone: str) -> bool:
     digits = _normalize(phone)
     if not digits:
         return False
-    entries = _load()
-    if digits not in entries:
-        return False
-    entries.remove(digits)
-    _save(entries)
-    return True
+    return _allowed.delete(digits, sync=True)
@@ -0,0 +1,164 @@
+"""
+Cache de conteúdo de ficheiros de texto pequenos (MEMORY.md, notas diárias) por caminho.
+
+Cada entrada guarda o texto com a chave (mtime_ns, size) do momento em que foi lido ou escrito:
+- leitura dentro de FILE_CACHE_REVALIDATE_SECONDS desde a última verificação → sem syscalls;
+- depois disso, um stat(): se (mtime_ns, size) não mudou, continua a servir da memória;
+  senão relê o ficheiro (edições externas são apanhadas);
+- ficheiros inexistentes também ficam em cache (entrada negativa), com a mesma regra;
+- write_text() grava no disco e atualiza a entrada (write-through), por isso a próxima leitura
+  do mesmo processo não toca no disco.
+LRU limitado por FILE_CACHE_MAX_ENTRIES e FILE_CACHE_MAX_BYTES (texto em cache). Contadores em
+get_file_cache_stats() (#system).
+
+Env:
+- FILE_CACHE_REVALIDATE_SECONDS (2; 0 = stat em todas as leituras)
+- FILE_CACHE_MAX_ENTRIES (1024), FILE_CACHE_MAX_BYTES (8 MB)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from zapista.utils.helpers import env_float, env_int
+
+
+class _Entry:
+    __slots__ = ("text", "key", "checked", "size")
+
+    def __init__(self, text: str | None, key: tuple[int, int] | None, checked: float):
+        self.text = text  # None = ficheiro não existe
+        self.key = key  # (mtime_ns, size) ou None
+        self.checked = checked
+        self.size = len(text) if text else 0
+
+
+class FileCache:
+    """Cache LRU de texto por caminho, validada por (mtime_ns, size)."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 8 * 1024 * 1024, revalidate_seconds: float = 2.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stats_calls = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.evictions = 0
+
+    # --- LRU ---
+
+    def _put(self, key: str, entry: _Entry) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def _stat_key(self, path: Path) -> tuple[int, int] | None:
+        self.stats_calls += 1
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    # --- API ---
+
+    def read_text(self, path: Path) -> str | None:
+        """Conteúdo do ficheiro (None se não existir)."""
+        key = str(path)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry.checked < self.revalidate_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.text
+                stat_key = self._stat_key(path)
+                if stat_key == entry.key:
+                    entry.checked = now
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.text
+            else:
+                stat_key = self._stat_key(path)
+            self.misses += 1
+            text = None
+            if stat_key is not None:
+                try:
+                    data = path.read_bytes()
+                except FileNotFoundError:
+                    stat_key = None
+                else:
+                    self.bytes_read += len(data)
+                    text = data.decode("utf-8")
+            self._put(key, _Entry(text, stat_key, now))
+            return text
+
+    def exists(self, path: Path) -> bool:
+        return self.read_text(path) is not None
+
+    def write_text(self, path: Path, content: str) -> None:
+        """Grava no disco (cria a pasta) e atualiza a entrada em cache."""
+        data = content.encode("utf-8")
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+            self.bytes_written += len(data)
+            self._put(str(path), _Entry(content, self._stat_key(path), time.monotonic()))
+
+    def invalidate(self, path: Path | None = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            old = self._entries.pop(str(path), None)
+            if old is not None:
+                self._bytes -= old.size
+
+    def stats(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes_cached": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "stat_calls": self.stats_calls,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "evictions": self.evictions,
+        }
+
+
+_CACHE: FileCache | None = None
+
+
+def get_file_cache() -> FileCache:
+    """Cache partilhada pelo processo (MemoryStore)."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = FileCache(
+            max_entries=env_int("FILE_CACHE_MAX_ENTRIES", 1024, lo=1),
+            max_bytes=env_int("FILE_CACHE_MAX_BYTES", 8 * 1024 * 1024, lo=1),
+            revalidate_seconds=env_float("FILE_CACHE_REVALIDATE_SECONDS", 2.0, lo=0.0),
+        )
+    return _CACHE
+
+
+def get_file_cache_stats() -> dict[str, Any] | None:
+    """Contadores da cache (para #system); None se ainda não foi usada."""
+    return _CACHE.stats() if _CACHE is not None else None
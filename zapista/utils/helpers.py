@@ -1,5 +1,6 @@
 """Utility functions for zapista."""
 
+import os
 from pathlib import Path
 from datetime import datetime
 
@@ -32,6 +33,32 @@ def get_workspace_path(workspace: str | None = None) -> Path:
     return ensure_dir(path)
 
 
+def env_int(name: str, default: int, lo: int | None = None, hi: int | None = None) -> int:
+    """Inteiro de uma variável de ambiente (vazia/inválida → default), limitado a [lo, hi] quando dados."""
+    try:
+        value = int(os.environ.get(name, "").strip() or default)
+    except ValueError:
+        value = default
+    if lo is not None:
+        value = max(lo, value)
+    if hi is not None:
+        value = min(hi, value)
+    return value
+
+
+def env_float(name: str, default: float, lo: float | None = None, hi: float | None = None) -> float:
+    """Float de uma variável de ambiente (vazia/inválida → default), limitado a [lo, hi] quando dados."""
+    try:
+        value = float(os.environ.get(name, "").strip() or default)
+    except ValueError:
+        value = default
+    if lo is not None:
+        value = max(lo, value)
+    if hi is not None:
+        value = min(hi, value)
+    return value
+
+
 def get_sessions_path() -> Path:
     """Get the sessions storage directory."""
     return ensure_dir(get_data_path() / "sessions")
@@ -0,0 +1,170 @@
+"""
+Clientes HTTP partilhados por upstream (whisper.cpp, OpenAI, Groq, Perplexity).
+
+Um httpx.AsyncClient por upstream, reutilizado entre pedidos: ligações keep-alive (sem novo
+TCP/TLS por voice note ou pesquisa), HTTP/2 nos upstreams HTTPS quando o pacote h2 existe.
+Cada pedido via upstream_request() entra no histograma de latência do upstream (#system).
+
+Env:
+- HTTP_POOL_MAX_CONNECTIONS (20), HTTP_POOL_MAX_KEEPALIVE (10), HTTP_POOL_KEEPALIVE_EXPIRY (30 s)
+- HTTP_HTTP2=0 desativa HTTP/2
+"""
+
+import asyncio
+import importlib.util
+import os
+import time
+from bisect import bisect_left
+from typing import Any
+
+import httpx
+
+from backend.logger import get_logger
+from zapista.utils.helpers import env_float, env_int
+logger = get_logger(__name__)
+
+# Upstreams conhecidos → usa HTTP/2 (só HTTPS; whisper.cpp local é HTTP/1.1)
+UPSTREAMS: dict[str, bool] = {
+    "whisper": False,
+    "openai": True,
+    "groq": True,
+    "perplexity": True,
+}
+
+# Limites superiores dos buckets do histograma (ms); o último bucket é "acima de 30 s"
+LATENCY_BUCKETS_MS: tuple[int, ...] = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+def _http2_available() -> bool:
+    if os.environ.get("HTTP_HTTP2", "1").strip().lower() in ("0", "false", "no"):
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+class _LatencyHistogram:
+    """Contagens por bucket + erros; percentis aproximados pelo limite do bucket."""
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float, ok: bool) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if not ok:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count) if self.count else 0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms),
+            "buckets": dict(zip([*map(str, LATENCY_BUCKETS_MS), "inf"], self.buckets)),
+        }
+
+
+class HttpClientRegistry:
+    """Um AsyncClient por upstream, criado no primeiro uso e recriado se o event loop mudar."""
+
+    def __init__(self) -> None:
+        self._clients: dict[str, tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+        self._latency: dict[str, _LatencyHistogram] = {}
+        self.limits = httpx.Limits(
+            max_connections=env_int("HTTP_POOL_MAX_CONNECTIONS", 20, lo=1),
+            max_keepalive_connections=env_int("HTTP_POOL_MAX_KEEPALIVE", 10, lo=1),
+            keepalive_expiry=env_float("HTTP_POOL_KEEPALIVE_EXPIRY", 30.0),
+        )
+        self.http2 = _http2_available()
+
+    def client(self, upstream: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(upstream)
+        if entry is not None:
+            client, client_loop = entry
+            if client_loop is loop and not client.is_closed:
+                return client
+            # Ligações presas a outro loop (ex.: testes) não são reutilizáveis
+        http2 = self.http2 and UPSTREAMS.get(upstream, True)
+        client = httpx.AsyncClient(limits=self.limits, http2=http2, timeout=60.0)
+        self._clients[upstream] = (client, loop)
+        logger.info("http_client_created", extra={"extra": {"upstream": upstream, "http2": http2}})
+        return client
+
+    def observe(self, upstream: str, ms: float, ok: bool) -> None:
+        self._latency.setdefault(upstream, _LatencyHistogram()).observe(ms, ok)
+
+    def stats(self) -> dict[str, dict]:
+        return {name: h.snapshot() for name, h in sorted(self._latency.items())}
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client, _loop in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.debug(f"http client close failed: {e}")
+
+
+_REGISTRY: HttpClientRegistry | None = None
+
+
+def get_http_registry() -> HttpClientRegistry:
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = HttpClientRegistry()
+    return _REGISTRY
+
+
+def get_http_client(upstream: str) -> httpx.AsyncClient:
+    """AsyncClient partilhado do upstream (chamar dentro do event loop)."""
+    return get_http_registry().client(upstream)
+
+
+async def upstream_request(upstream: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """
+    Pedido pelo cliente partilhado do upstream, medindo a latência.
+    kwargs seguem httpx (headers, json, data, files, timeout...). Exceções propagam como no httpx.
+    """
+    registry = get_http_registry()
+    client = registry.client(upstream)
+    t0 = time.perf_counter()
+    try:
+        r = await client.request(method, url, **kwargs)
+    except Exception:
+        registry.observe(upstream, (time.perf_counter() - t0) * 1000, ok=False)
+        raise
+    registry.observe(upstream, (time.perf_counter() - t0) * 1000, ok=r.status_code < 500)
+    return r
+
+
+def get_http_client_stats() -> dict[str, dict]:
+    """Latência por upstream (para #system). Vazio se ainda não houve pedidos."""
+    return _REGISTRY.stats() if _REGISTRY is not None else {}
+
+
+async def close_http_clients() -> None:
+    """Fecha as ligações (paragem do gateway)."""
+    global _REGISTRY
+    if _REGISTRY is not None:
+        await _REGISTRY.aclose()
+        _REGISTRY = None
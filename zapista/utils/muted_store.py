@@ -1,13 +1,13 @@
 """Mute/penalidade por número: níveis 1–6 com duração crescente.
 
 1º: 15 min, 2º: 30 min, 3º: 2 h, 4º: 24 h, 5º: 7 dias, 6º: bloqueio permanente.
-Persistido em muted.json no data dir.
+Persistido no KVStore (namespace muted, chave = dígitos do número); is_muted() corre a cada
+mensagem e só lê da cache em memória. O muted.json antigo é importado na primeira carga.
 """
 
-import json
 import time
-from pathlib import Path
 
+from backend.kv_store import Namespace, read_legacy_json
 from zapista.config.loader import get_data_dir
 
 _FILENAME = "muted.json"
@@ -23,28 +23,16 @@ _LEVELS: list[tuple[int, str, str]] = [
 ]
 
 
-def _path() -> Path:
-    return get_data_dir() / _FILENAME
+def _import_legacy() -> dict:
+    data = read_legacy_json(get_data_dir() / _FILENAME)
+    return data if isinstance(data, dict) else {}
 
 
-def _normalize(phone: str) -> str:
-    return "".join(c for c in str(phone or "") if c.isdigit())
-
-
-def _load() -> dict:
-    p = _path()
-    if not p.exists():
-        return {}
-    try:
-        return json.loads(p.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
-        return {}
+_muted = Namespace("muted", legacy=_import_legacy)
 
 
-def _save(data: dict) -> None:
-    p = _path()
-    p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+def _normalize(phone: str) -> str:
+    return "".join(c for c in str(phone or "") if c.isdigit())
 
 
 def is_muted(phone: str) -> bool:
@@ -55,8 +43,7 @@ def is_muted(phone: str) -> bool:
     digits = _normalize(phone)
     if not digits:
         return False
-    data = _load()
-    entry = data.get(digits)
+    entry = _muted.get(digits)
     if not entry:
         return False
     count = entry.get("count", 0)
@@ -81,21 +68,18 @@ def apply_mute(phone: str) -> tuple[str, int, str]:
     digits = _normalize(phone)
     if not digits:
         return ("", 0, "Número inválido.")
-    data = _load()
-    entry = data.get(digits) or {"count": 0, "muted_until_ts": None}
-    count = min(entry.get("count", 0) + 1, 6)
-    idx = count - 1
-    duration_sec, duration_label, user_message = _LEVELS[idx]
     try:
         from zapista.clock_drift import get_effective_time
         now = get_effective_time()
     except Exception:
         now = time.time()
-    if count >= 6:
-        muted_until_ts = None  # permanente
-    else:
-        muted_until_ts = now + duration_sec
-    data[digits] = {"count": count, "muted_until_ts": muted_until_ts}
-    _save(data)
+
+    def _next_level(entry: dict | None) -> dict:
+        count = min((entry or {}).get("count", 0) + 1, 6)
+        muted_until_ts = None if count >= 6 else now + _LEVELS[count - 1][0]  # None = permanente
+        return {"count": count, "muted_until_ts": muted_until_ts}
+
+    count = _muted.update(digits, _next_level, sync=True)["count"]
+    _, duration_label, user_message = _LEVELS[count - 1]
     admin_msg = f"Mute aplicado: {count}ª punição, {duration_label}."
     return (user_message, count, admin_msg)
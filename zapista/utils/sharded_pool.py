@@ -0,0 +1,173 @@
+"""Pool de workers asyncio com sharding por chave (base do ChatWorkerPool e da fila de média do WhatsApp).
+
+Cada item é encaminhado para um worker fixo pela sua chave (crc32 de key(item), estável entre
+processos, ao contrário de hash()). Cada worker processa a sua fila um item de cada vez, por isso
+itens com a mesma chave correm em ordem estrita e chaves diferentes correm em paralelo.
+
+- fila de cada worker limitada a queue_max (0 = sem limite); fila cheia = submit espera
+  (backpressure), contado em "blocked";
+- pending(chave): itens dessa chave na fila ou em curso (ex.: mensagem de texto não ultrapassar
+  um áudio ainda a transcrever);
+- exceções do handler contam como erro e o worker continua.
+"""
+
+import asyncio
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Generic, TypeVar
+
+from backend.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class _Worker(Generic[T]):
+    """Um worker: fila própria + contadores (gauges)."""
+
+    def __init__(self, index: int, queue_max: int):
+        self.index = index
+        self.queue: asyncio.Queue[tuple[str, T, float]] = asyncio.Queue(maxsize=queue_max)
+        self.in_flight = 0
+        self.processed = 0
+        self.errors = 0
+        self.busy_since: float | None = None
+        self.task: asyncio.Task | None = None
+
+
+class ShardedWorkerPool(Generic[T]):
+    """N workers; handler(item) processa um item, key(item) escolhe o worker."""
+
+    def __init__(
+        self,
+        handler: Callable[[T], Awaitable[None]],
+        key: Callable[[T], str],
+        workers: int,
+        queue_max: int = 0,
+        name: str = "worker",
+    ):
+        self._handler = handler
+        self._key = key
+        self.name = name
+        self._workers: list[_Worker[T]] = [_Worker(i, max(0, queue_max)) for i in range(max(1, workers))]
+        self._pending: dict[str, int] = {}  # chave -> itens na fila ou em curso
+        self._running = False
+        self.blocked = 0
+        self.wait_max_ms = 0.0
+        self.last_wait_ms = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    def shard_for(self, key: str) -> int:
+        """Índice do worker para esta chave."""
+        return zlib.crc32(key.encode("utf-8")) % len(self._workers)
+
+    def pending(self, key: str) -> int:
+        """Itens desta chave ainda por terminar."""
+        return self._pending.get(key, 0)
+
+    def start(self) -> None:
+        """Arranca as tasks dos workers (requer event loop a correr)."""
+        if self._running:
+            return
+        self._running = True
+        for w in self._workers:
+            w.task = asyncio.create_task(self._worker_loop(w), name=f"{self.name}-{w.index}")
+        logger.info("worker_pool_started", extra={"extra": {"pool": self.name, "workers": len(self._workers)}})
+
+    async def submit(self, item: T) -> None:
+        """Coloca o item na fila do worker da sua chave (espera se a fila estiver cheia)."""
+        key = self._key(item)
+        w = self._workers[self.shard_for(key)]
+        self._pending[key] = self._pending.get(key, 0) + 1
+        entry = (key, item, time.monotonic())
+        try:
+            w.queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.blocked += 1
+            logger.warning(
+                "worker_pool_queue_full",
+                extra={"extra": {"pool": self.name, "worker": w.index, "depth": w.queue.qsize(), "blocked": self.blocked}},
+            )
+            try:
+                await w.queue.put(entry)
+            except BaseException:
+                self._done(key)
+                raise
+
+    def _done(self, key: str) -> None:
+        left = self._pending.get(key, 0) - 1
+        if left > 0:
+            self._pending[key] = left
+        else:
+            self._pending.pop(key, None)
+
+    async def _worker_loop(self, w: _Worker[T]) -> None:
+        while self._running:
+            key, item, enqueued = await w.queue.get()
+            self.last_wait_ms = (time.monotonic() - enqueued) * 1000
+            self.wait_max_ms = max(self.wait_max_ms, self.last_wait_ms)
+            w.in_flight += 1
+            w.busy_since = time.monotonic()
+            try:
+                await self._handler(item)
+                w.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                w.errors += 1
+                logger.error(
+                    "worker_pool_handler_failed",
+                    extra={"extra": {"pool": self.name, "worker": w.index, "error": str(e)}},
+                )
+            finally:
+                w.in_flight -= 1
+                w.busy_since = None
+                self._done(key)
+                w.queue.task_done()
+
+    async def join(self) -> None:
+        """Espera até todas as filas estarem vazias e sem itens em curso."""
+        for w in self._workers:
+            await w.queue.join()
+
+    async def stop(self) -> None:
+        """Cancela os workers. Itens ainda na fila são descartados."""
+        self._running = False
+        tasks = [w.task for w in self._workers if w.task and not w.task.done()]
+        for t in tasks:
+            t.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._pending.clear()
+
+    def worker_stats(self) -> list[dict[str, Any]]:
+        """Gauges por worker: profundidade da fila, itens em curso, totais e há quanto tempo está ocupado."""
+        now = time.monotonic()
+        return [
+            {
+                "worker": w.index,
+                "queue_depth": w.queue.qsize(),
+                "in_flight": w.in_flight,
+                "processed": w.processed,
+                "errors": w.errors,
+                "busy_s": round(now - w.busy_since, 1) if w.busy_since is not None else 0.0,
+            }
+            for w in self._workers
+        ]
+
+    def totals(self) -> dict[str, Any]:
+        """Agregado de todos os workers, com backpressure e tempo de espera na fila."""
+        return {
+            "workers": len(self._workers),
+            "queue_depth": sum(w.queue.qsize() for w in self._workers),
+            "in_flight": sum(w.in_flight for w in self._workers),
+            "processed": sum(w.processed for w in self._workers),
+            "errors": sum(w.errors for w in self._workers),
+            "blocked": self.blocked,
+            "wait_last_ms": round(self.last_wait_ms),
+            "wait_max_ms": round(self.wait_max_ms),
+        }